@@ -9,6 +9,8 @@ from pathlib import Path
 from types import ModuleType
 from typing import Optional, Any
 
+from uzoncalc.handcalc import import_hook
+
 _dynamic_import_lock = asyncio.Lock()
 _BUNDLE_RUNTIME_PACKAGE_NAMES = ("__uzon_deps__",)
 
@@ -87,6 +89,7 @@ class DynamicImportSession:
     - 每次导入同名模块时会自动覆盖
     - 为了避免并发 runner 互相影响 sys.modules/sys.path，导入过程加全局锁
     - 模块会保留在 sys.modules 中，同名模块会被自动覆盖
+    - 启用导入钩子时，脚本及工作区模块在编译前整体插桩，每个模块只解析一次
     """
 
     def __init__(
@@ -96,12 +99,19 @@ class DynamicImportSession:
         script_path: str,
         package_root: Optional[str] = None,
         source_root: Optional[str] = None,
+        instrument_imports: Optional[bool] = None,
     ):
         self.module_name = module_name
         self.script_path = os.path.abspath(script_path)
         self.script_dir = os.path.dirname(self.script_path)
         self.package_root = os.path.abspath(package_root) if package_root else None
         self.source_root = os.path.abspath(source_root) if source_root else None
+        # 未显式指定时由 UZONCALC_IMPORT_HOOK 环境变量决定
+        self.instrument_imports = (
+            import_hook.is_import_hook_enabled()
+            if instrument_imports is None
+            else instrument_imports
+        )
 
         self._inserted_sys_paths: list[str] = []
         self._locked: bool = False
@@ -109,6 +119,7 @@ class DynamicImportSession:
         self._replaced_private_modules: dict[str, ModuleType] = {}
         self._installed_runtime_packages: set[str] = set()
         self._baseline_module_names: set[str] = set()
+        self._import_hook: Optional[import_hook.InstrumentingFinder] = None
         self._workspace_package_name = (
             module_name.split(".", 1)[0]
             if source_root and module_name.startswith("__uzon_workspace_")
@@ -138,6 +149,12 @@ class DynamicImportSession:
                         self._inserted_sys_paths.append(import_path)
 
             self._baseline_module_names = set(sys.modules)
+            if self.instrument_imports:
+                self._import_hook = import_hook.install_import_hook(
+                    path
+                    for path in (self.package_root, self.source_root, self.script_dir)
+                    if path
+                )
             self._install_bundle_runtime_packages()
             self._install_workspace_package()
 
@@ -156,7 +173,12 @@ class DynamicImportSession:
             parent_module = self.module_name.rpartition(".")[0]
             if parent_module:
                 importlib.import_module(parent_module)
-            spec = importlib.util.spec_from_file_location(
+            spec_from_file_location = (
+                import_hook.spec_from_file_location
+                if self.instrument_imports
+                else importlib.util.spec_from_file_location
+            )
+            spec = spec_from_file_location(
                 self.module_name,
                 self.script_path,
                 submodule_search_locations=(
@@ -312,6 +334,9 @@ class DynamicImportSession:
                 sys.modules.pop(module_name, None)
         sys.modules.update(self._replaced_private_modules)
         self._replaced_private_modules.clear()
+        if self._import_hook is not None:
+            import_hook.uninstall_import_hook(self._import_hook)
+            self._import_hook = None
         self._installed_runtime_packages.clear()
         self._baseline_module_names.clear()
         self._cleanup_sys_path()
@@ -92,3 +92,42 @@ def test_dynamic_import_session_keeps_host_modules_and_sys_path_unchanged(
             sys.modules.pop("values", None)
         else:
             sys.modules["values"] = original_values
+
+
+def test_dynamic_import_session_instruments_workspace_modules_once(
+    tmp_path: Path,
+) -> None:
+    """The opt-in import hook should pre-instrument imported workspace helpers."""
+    (tmp_path / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "helpers.py").write_text(
+        "from uzoncalc import uzon_calc_func\n"
+        "\n"
+        "@uzon_calc_func\n"
+        "def double(value):\n"
+        "    result = value * 2\n"
+        "    return result\n",
+        encoding="utf-8",
+    )
+    entry = tmp_path / "main.py"
+    entry.write_text(
+        "from .helpers import double\nRESULT = double(21)\n", encoding="utf-8"
+    )
+    original_meta_path = list(sys.meta_path)
+
+    async def load_module() -> None:
+        """Load the entry with import instrumentation enabled."""
+        async with DynamicImportSession(
+            module_name="__uzon_workspace_hooked.main",
+            script_path=str(entry),
+            package_root=str(tmp_path),
+            source_root=str(tmp_path),
+            instrument_imports=True,
+        ) as module:
+            assert module.RESULT == 42
+            assert getattr(module.double.__wrapped__, "__uzon_instrumented__", False)
+
+    try:
+        asyncio.run(load_module())
+        assert sys.meta_path == original_meta_path
+    finally:
+        clear_module_cache(str(entry))
@@ -3,7 +3,13 @@
 from .context import CalcContext
 from .context_utils import *
 from .context_utils import __all__ as _context_utils_all
-from .exporting import DocumentExporter, HtmlDocumentExporter, TocPageNumberResolver
+from .exporting import (
+    ContentSink,
+    DocumentExporter,
+    HtmlDocumentExporter,
+    HtmlStreamSink,
+    TocPageNumberResolver,
+)
 from .startup import (
     uzon_calc,
     uzon_calc_func,
@@ -11,17 +17,24 @@ from .startup import (
     get_current_instance,
     run,
     run_sync,
+    run_values,
     view,
 )
+from .sweep import SweepResult, sweep
 
 __all__ = [
     "CalcContext",
+    "ContentSink",
     "DocumentExporter",
     "HtmlDocumentExporter",
+    "HtmlStreamSink",
+    "SweepResult",
     "TocPageNumberResolver",
     "get_current_instance",
     "run",
     "run_sync",
+    "run_values",
+    "sweep",
     "uzon_calc",
     "uzon_calc_core",
     "uzon_calc_func",
@@ -0,0 +1,211 @@
+"""Content-addressed storage for images embedded in generated documents."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+# 预览服务提供资源的路径前缀，与保存时默认的资源目录名一致
+ASSET_ROUTE = "/assets/"
+
+_DATA_URL_RE = re.compile(
+    r"data:image/(png|jpeg|gif|webp|svg\+xml);base64,([A-Za-z0-9+/]+={0,2})"
+)
+
+_EXTENSIONS = {
+    "png": "png",
+    "jpeg": "jpg",
+    "gif": "gif",
+    "webp": "webp",
+    "svg+xml": "svg",
+}
+
+MIME_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+}
+
+
+def asset_name(data: bytes, extension: str) -> str:
+    """Return the content-addressed file name of an asset.
+
+    Args:
+        data: Asset content.
+        extension: File extension without the dot.
+
+    Returns:
+        ``<sha256>.<extension>``.
+    """
+    return f"{hashlib.sha256(data).hexdigest()}.{extension}"
+
+
+def externalize_data_urls(html: str, put: Callable[[bytes, str], str]) -> str:
+    """Replace base64 image data URLs by URLs of stored assets.
+
+    Args:
+        html: Rendered HTML containing ``data:image/...;base64,`` URLs.
+        put: Stores decoded content with the given extension and returns the
+            URL referencing it.
+
+    Returns:
+        HTML referencing the stored assets. Malformed data URLs are kept.
+    """
+    if "data:image/" not in html:
+        return html
+
+    urls: dict[str, str] = {}
+
+    def replace(match: re.Match[str]) -> str:
+        data_url = match.group(0)
+        url = urls.get(data_url)
+        if url is None:
+            try:
+                data = base64.b64decode(match.group(2), validate=True)
+            except binascii.Error:
+                return data_url
+            url = urls[data_url] = put(data, _EXTENSIONS[match.group(1)])
+        return url
+
+    return _DATA_URL_RE.sub(replace, html)
+
+
+class DirectoryAssetStore:
+    """Write assets as hash-named files into a directory next to a document.
+
+    Files are never rewritten, so assets shared by several documents or
+    unchanged between runs are written once and keep their modification time.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], url_prefix: str) -> None:
+        """Initialize the store.
+
+        Args:
+            directory: Directory receiving the asset files, created on demand.
+            url_prefix: URL of the directory relative to the document.
+
+        Returns:
+            None.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        self.directory = Path(directory)
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def put(self, data: bytes, extension: str) -> str:
+        """Write an asset unless it exists and return its relative URL.
+
+        Args:
+            data: Asset content.
+            extension: File extension without the dot.
+
+        Returns:
+            URL of the asset relative to the document.
+
+        Raises:
+            OSError: If the asset cannot be written.
+        """
+        name = asset_name(data, extension)
+        path = self.directory / name
+        if not path.exists():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再替换，避免并发保存或中断时留下不完整的文件
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        return f"{self.url_prefix}/{name}"
+
+
+class MemoryAssetStore:
+    """Keep assets in memory for the preview server."""
+
+    def __init__(self, url_prefix: str = ASSET_ROUTE.strip("/")) -> None:
+        """Initialize an empty store.
+
+        Args:
+            url_prefix: URL of the asset route relative to the document.
+
+        Returns:
+            None.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        self.url_prefix = url_prefix.rstrip("/")
+        self._assets: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes, extension: str) -> str:
+        """Store an asset and return its URL relative to the document."""
+        name = asset_name(data, extension)
+        with self._lock:
+            self._assets.setdefault(name, data)
+        return f"{self.url_prefix}/{name}"
+
+    def get(self, name: str) -> bytes | None:
+        """Return the content of a stored asset."""
+        with self._lock:
+            return self._assets.get(name)
+
+    def retain(self, html: str) -> None:
+        """Drop assets no longer referenced by the current document.
+
+        Args:
+            html: Document whose assets should be kept.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            for name in [name for name in self._assets if name not in html]:
+                del self._assets[name]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._assets)
+
+
+def externalize_to_directory(html: str, document_path: str, asset_dir: str) -> str:
+    """Move embedded images of a document into its sidecar asset directory.
+
+    Args:
+        html: Rendered HTML document.
+        document_path: Path the document is saved to.
+        asset_dir: Asset directory relative to the document's directory.
+
+    Returns:
+        HTML referencing the asset files by relative URL.
+
+    Raises:
+        OSError: If an asset cannot be written.
+    """
+    directory = os.path.join(os.path.dirname(os.path.abspath(document_path)), asset_dir)
+    url_prefix = Path(asset_dir).as_posix()
+    return externalize_data_urls(html, DirectoryAssetStore(directory, url_prefix).put)
+
+
+__all__ = [
+    "ASSET_ROUTE",
+    "MIME_TYPES",
+    "DirectoryAssetStore",
+    "MemoryAssetStore",
+    "asset_name",
+    "externalize_data_urls",
+    "externalize_to_directory",
+]
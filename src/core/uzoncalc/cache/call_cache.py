@@ -0,0 +1,243 @@
+"""uzon_calc_func 的调用结果缓存：返回值与调用期间记录的内容一起复用"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Mapping, NamedTuple
+
+from .fingerprint import fingerprint
+from .lru import BoundedLRUCache
+
+if TYPE_CHECKING:
+    from ..context import CalcContext
+
+# 磁盘缓存目录总大小上限，超出时按最近使用时间淘汰
+DEFAULT_DISK_MAX_BYTES = 64 * 1024 * 1024
+
+_CACHE_FILE_SUFFIX = ".call"
+
+# 影响记录内容的选项，回放的内容只在这些选项相同时有效
+# 别名等后处理器状态通过各处理器的 cache_key 计入
+_RENDER_OPTION_FIELDS = (
+    "enable_debug",
+    "enable_substitution",
+    "suppress_private_assignments",
+    "enable_formula_expression",
+    "enable_fstring_equation",
+    "loop_record",
+    "defer_rendering",
+    "float_precision",
+    "array_threshold",
+    "array_edge_items",
+    "prefix_settings",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CallCacheEntry:
+    """A memoized helper call.
+
+    ``fragments`` holds the content recorded during the call, replayed into
+    the calling context on a hit; it is None when nothing was being recorded
+    at the time, so the entry can only serve calls that do not record either.
+    """
+
+    result: Any
+    fragments: tuple[tuple[Any, ...], ...] | None
+
+
+class CallCacheInfo(NamedTuple):
+    """Statistics of the in-memory helper call cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class DiskCallCache:
+    """以 pickle 文件保存调用结果，跨运行复用
+
+    无法序列化的结果（如返回值或记录的局部变量不可 pickle）不会写入磁盘，
+    损坏或无法读取的文件视为未命中并被删除。
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        max_bytes: int = DEFAULT_DISK_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> CallCacheEntry | None:
+        """读取缓存条目，不存在或已损坏时返回 None。"""
+        path = self._path_for(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+
+        try:
+            entry = pickle.loads(data)
+        except Exception:
+            self._remove(path)
+            return None
+        if not isinstance(entry, CallCacheEntry):
+            self._remove(path)
+            return None
+
+        # 刷新修改时间，淘汰时视为最近使用
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, key: str, entry: CallCacheEntry) -> None:
+        """写入缓存条目，无法序列化或写入失败时静默忽略。"""
+        try:
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+
+        path = self._path_for(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def clear(self) -> None:
+        """删除全部缓存文件"""
+        with self._lock:
+            for path in self._iter_entries():
+                self._remove(path)
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / f"{key}{_CACHE_FILE_SUFFIX}"
+
+    def _iter_entries(self) -> list[Path]:
+        try:
+            return [
+                entry
+                for entry in self.directory.iterdir()
+                if entry.suffix == _CACHE_FILE_SUFFIX
+            ]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        """总大小超过上限时，从最久未使用的条目开始删除。"""
+        with self._lock:
+            entries: list[tuple[float, int, Path]] = []
+            total = 0
+            for path in self._iter_entries():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort(key=lambda entry: entry[0])
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def make_call_key(
+    function_key: str, arguments: Mapping[str, Any], ctx: CalcContext
+) -> str | None:
+    """Build the cache key of a helper call, or None when it must not be cached.
+
+    The key combines the helper identity, a fingerprint of the bound
+    arguments and, when the context is recording, the options that shape the
+    recorded content. Calls with arguments or post handlers lacking a stable
+    fingerprint are not cached.
+    """
+    arguments_key = fingerprint(dict(arguments))
+    if arguments_key is None:
+        return None
+
+    options_key: str | None = ""
+    if ctx.is_recording:
+        options = ctx.options
+        handler_keys: list[Any] = []
+        for handler in options.post_handlers:
+            handler_key = handler.cache_key(ctx)
+            if handler_key is None:
+                return None
+            handler_keys.append((type(handler).__qualname__, handler_key))
+        state = [getattr(options, name) for name in _RENDER_OPTION_FIELDS]
+        options_key = fingerprint((state, handler_keys))
+        if options_key is None:
+            return None
+
+    digest = hashlib.sha256()
+    for part in (function_key, arguments_key, options_key):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+_DEFAULT_CALL_CACHE_SIZE = 1024
+# 进程内的调用缓存，按调用指纹的最近使用时间淘汰
+_CALL_CACHE: BoundedLRUCache[str, CallCacheEntry] = BoundedLRUCache(
+    _DEFAULT_CALL_CACHE_SIZE
+)
+
+
+def get_cached_call(key: str) -> CallCacheEntry | None:
+    """Return the memoized call for a key."""
+    return _CALL_CACHE.get(key)
+
+
+def store_cached_call(key: str, entry: CallCacheEntry) -> None:
+    """Memoize a call."""
+    _CALL_CACHE.put(key, entry)
+
+
+def call_cache_info() -> CallCacheInfo:
+    """Return process-wide statistics of the in-memory helper call cache."""
+    stats = _CALL_CACHE.stats()
+    return CallCacheInfo(
+        hits=stats.hits,
+        misses=stats.misses,
+        maxsize=stats.maxsize,
+        currsize=stats.currsize,
+    )
+
+
+def clear_call_cache() -> None:
+    """Drop all memoized helper calls and reset statistics."""
+    _CALL_CACHE.clear()
+
+
+def set_call_cache_size(maxsize: int) -> None:
+    """Set the maximum number of memoized calls; 0 disables the cache."""
+    _CALL_CACHE.resize(maxsize)
@@ -0,0 +1,174 @@
+"""Matplotlib 图形的 PNG 缓存：按调用方给出的 cache_key 复用导出结果，并支持后台导出"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import io
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Hashable, Literal, NamedTuple
+
+from .fingerprint import fingerprint
+from .lru import BoundedLRUCache
+
+# 内存缓存中 PNG 数据的总大小上限，超出时按最近使用时间淘汰
+DEFAULT_FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+
+# 后台导出时文档中的占位 src，导出完成后替换为 data URL
+FIGURE_PLACEHOLDER_PREFIX = "uzoncalc-figure:"
+
+
+class FigureCacheInfo(NamedTuple):
+    """Statistics of the in-memory figure cache."""
+
+    hits: int
+    misses: int
+    maxbytes: int
+    currbytes: int
+
+
+# 以 PNG 数据的字节数计入容量
+_FIGURE_CACHE: BoundedLRUCache[str, bytes] = BoundedLRUCache(
+    DEFAULT_FIGURE_CACHE_BYTES, weigh=len
+)
+
+
+def figure_key(fig: Any, cache_key: Hashable | None = None) -> str | None:
+    """Return the cache key of a figure, or None when it cannot be cached.
+
+    Only an explicit ``cache_key`` yields a key, so a figure is reused only
+    when the caller vouches that the same key means the same image. The
+    figure itself is not inspected. Keys without a stable fingerprint, and
+    figures without a ``cache_key``, are never cached.
+    """
+    if cache_key is None:
+        return None
+    return fingerprint(("cache_key", cache_key))
+
+
+def get_cached_figure(key: str) -> bytes | None:
+    """Return the cached PNG data of a figure key."""
+    return _FIGURE_CACHE.get(key)
+
+
+def store_cached_figure(key: str, data: bytes) -> None:
+    """Cache the PNG data of a figure key."""
+    _FIGURE_CACHE.put(key, data)
+
+
+def figure_cache_info() -> FigureCacheInfo:
+    """Return process-wide statistics of the in-memory figure cache."""
+    stats = _FIGURE_CACHE.stats()
+    return FigureCacheInfo(
+        hits=stats.hits,
+        misses=stats.misses,
+        maxbytes=stats.maxsize,
+        currbytes=stats.weight,
+    )
+
+
+def clear_figure_cache() -> None:
+    """Drop all cached figures and reset statistics."""
+    _FIGURE_CACHE.clear()
+
+
+def set_figure_cache_size(maxbytes: int) -> None:
+    """Set the maximum total size of cached PNG data; 0 disables the cache."""
+    _FIGURE_CACHE.resize(maxbytes)
+
+
+def save_figure_png(fig: Any) -> bytes:
+    """将图形保存为 PNG 二进制内容"""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return buf.getvalue()
+
+
+def png_data_url(data: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+
+
+# region 后台导出
+
+_EXECUTORS: dict[str, Executor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def submit_figure(fig: Any, mode: Literal["thread", "process"]) -> Future[bytes] | None:
+    """Export a snapshot of a figure in a background thread or process.
+
+    The figure is pickled at call time, so later changes to it do not affect
+    the exported image. Returns None when the figure cannot be pickled; the
+    caller should then export it synchronously.
+    """
+    try:
+        snapshot = _pickle_figure(fig)
+    except Exception:
+        return None
+    return _executor(mode).submit(_render_snapshot, snapshot)
+
+
+def _executor(mode: Literal["thread", "process"]) -> Executor:
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(mode)
+        if executor is None:
+            if mode == "process":
+                # 调用方通常已有线程（如线程导出），fork 可能死锁，改用 spawn
+                executor = ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                # Agg 绘制本身持有全局锁，多个线程并不能同时绘制
+                executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="uzoncalc-figure"
+                )
+            _EXECUTORS[mode] = executor
+        return executor
+
+
+@atexit.register
+def _shutdown_executors() -> None:
+    """退出时取消排队的导出任务并关闭工作线程与进程"""
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown(cancel_futures=True)
+
+
+class _FigurePickler(pickle.Pickler):
+    """Pickle a figure without re-registering the copy with pyplot."""
+
+    def __init__(self, file: io.BytesIO, figure: Any) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._figure = figure
+
+    def reducer_override(self, obj: Any) -> Any:
+        if obj is not self._figure:
+            return NotImplemented
+        reduced = list(obj.__reduce_ex__(pickle.HIGHEST_PROTOCOL))
+        state = reduced[2]
+        if isinstance(state, dict) and "_restore_to_pylab" in state:
+            # 否则还原时会为副本创建 pyplot 窗口管理器
+            reduced[2] = {k: v for k, v in state.items() if k != "_restore_to_pylab"}
+        return tuple(reduced)
+
+
+def _pickle_figure(fig: Any) -> bytes:
+    buf = io.BytesIO()
+    _FigurePickler(buf, fig).dump(fig)
+    return buf.getvalue()
+
+
+def _render_snapshot(snapshot: bytes) -> bytes:
+    """在工作线程或进程中还原图形并导出"""
+    return save_figure_png(pickle.loads(snapshot))
+
+
+# endregion
+
@@ -0,0 +1,151 @@
+"""稳定的参数指纹：相同取值在不同进程、不同运行间得到相同的摘要"""
+
+from __future__ import annotations
+
+import dataclasses
+import enum
+import hashlib
+import marshal
+import sys
+from types import CodeType
+from typing import Any
+
+import pint
+
+
+class _Unsupported(Exception):
+    """值的类型无法生成稳定指纹。"""
+
+
+def fingerprint(value: Any) -> str | None:
+    """Return a stable SHA-256 digest of a value, or None if it has none.
+
+    Supported values are None, bools, numbers, strings, bytes, enums, pint
+    quantities and units, NumPy arrays and scalars, dataclass instances, and
+    tuples, lists, dicts and sets of those. Any other object has no stable
+    fingerprint, since its ``repr`` or ``hash`` may differ between runs.
+    """
+    digest = hashlib.sha256()
+    try:
+        _feed(digest, value)
+    except _Unsupported:
+        return None
+    return digest.hexdigest()
+
+
+def callable_fingerprint(func: Any) -> str:
+    """Describe a function by its name and code as a stable string.
+
+    Functions sharing a qualified name, such as lambdas, are told apart by
+    their bytecode, constants and closure values. Callables without code
+    objects fall back to their module and qualified name.
+    """
+    name = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', '')}"
+    code = getattr(func, "__code__", None)
+    if not isinstance(code, CodeType):
+        return name or type(func).__qualname__
+
+    digest = hashlib.sha256()
+    # 代码对象中的文件名与行号不影响行为，只取字节码、常量与名称
+    _feed_code(digest, code)
+    for cell in func.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            value = None
+        digest.update((fingerprint(value) or _type_tag(value).decode()).encode())
+    for default in func.__defaults__ or ():
+        digest.update((fingerprint(default) or _type_tag(default).decode()).encode())
+    return f"{name}:{digest.hexdigest()[:16]}"
+
+
+def _feed_code(digest: Any, code: CodeType) -> None:
+    digest.update(code.co_code)
+    _feed(digest, code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _feed_code(digest, const)
+            continue
+        # frozenset 常量的 marshal 结果随字符串哈希种子变化，优先使用稳定指纹
+        const_digest = fingerprint(const)
+        digest.update(
+            const_digest.encode() if const_digest else marshal.dumps(const)
+        )
+
+
+def _type_tag(value: Any) -> bytes:
+    cls = type(value)
+    return f"{cls.__module__}.{cls.__qualname__}\0".encode()
+
+
+def _feed(digest: Any, value: Any) -> None:
+    digest.update(_type_tag(value))
+
+    if value is None or isinstance(value, (bool, int, float, complex)):
+        # float 的 repr 可精确往返，能区分 0.1 与 0.1000000001
+        digest.update(repr(value).encode())
+        return
+    if isinstance(value, str):
+        digest.update(value.encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+        return
+    if isinstance(value, bytes):
+        digest.update(len(value).to_bytes(8, "little"))
+        digest.update(value)
+        return
+    if isinstance(value, enum.Enum):
+        _feed(digest, value.value)
+        return
+    if isinstance(value, pint.Quantity):
+        _feed(digest, value.magnitude)
+        _feed(digest, str(value.units))
+        return
+    if isinstance(value, pint.Unit):
+        _feed(digest, str(value))
+        return
+    if isinstance(value, (tuple, list)):
+        digest.update(f"{len(value)}\0".encode())
+        for item in value:
+            _feed(digest, item)
+        return
+    if isinstance(value, dict):
+        # 按键的指纹排序，使插入顺序不同的等价字典得到相同结果
+        items = sorted(
+            (_fingerprint_or_raise(key), item) for key, item in value.items()
+        )
+        digest.update(f"{len(items)}\0".encode())
+        for key_digest, item in items:
+            digest.update(key_digest.encode())
+            _feed(digest, item)
+        return
+    if isinstance(value, (set, frozenset)):
+        for item_digest in sorted(_fingerprint_or_raise(item) for item in value):
+            digest.update(item_digest.encode())
+        return
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        for field in dataclasses.fields(value):
+            _feed(digest, field.name)
+            _feed(digest, getattr(value, field.name))
+        return
+
+    np = sys.modules.get("numpy")
+    if np is not None:
+        if isinstance(value, np.ndarray):
+            if value.dtype.hasobject:
+                raise _Unsupported
+            digest.update(f"{value.dtype.str}:{value.shape}\0".encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+            return
+        if isinstance(value, np.generic):
+            digest.update(f"{value.dtype.str}\0".encode())
+            digest.update(value.tobytes())
+            return
+
+    raise _Unsupported
+
+
+def _fingerprint_or_raise(value: Any) -> str:
+    result = fingerprint(value)
+    if result is None:
+        raise _Unsupported
+    return result
@@ -0,0 +1,147 @@
+"""进程内共享的有界 LRU 缓存，供各模块的结果缓存复用"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, NamedTuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCacheStats(NamedTuple):
+    """Counters of a :class:`BoundedLRUCache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+    weight: int
+
+
+class BoundedLRUCache(Generic[K, V]):
+    """Thread-safe LRU cache bounded by entry count or total entry weight.
+
+    Every operation, including the hit path, runs under one lock, so the
+    statistics stay exact under concurrent use.
+
+    Args:
+        maxsize: Upper bound of the total weight; 0 or less disables storing.
+        weigh: Weight of a value; every entry weighs 1 when omitted.
+        on_evict: Called with each entry removed by eviction, replacement,
+            :meth:`remove_if` or :meth:`clear`, after the lock is released.
+            Used to release resources such as open files.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        *,
+        weigh: Callable[[V], int] | None = None,
+        on_evict: Callable[[K, V], None] | None = None,
+    ) -> None:
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self._weigh = weigh
+        self._on_evict = on_evict
+        self._weight = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Return the value of a key and mark it as recently used."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> bool:
+        """Store a value; return False when it was not stored.
+
+        Values are not stored while the cache is disabled or when a single
+        value outweighs ``maxsize``.
+        """
+        weight = self._weight_of(value)
+        if self._maxsize <= 0 or weight > self._maxsize:
+            return False
+        with self._lock:
+            removed = []
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._weight -= self._weight_of(previous)
+                if previous is not value:
+                    removed.append((key, previous))
+            self._entries[key] = value
+            self._weight += weight
+            removed += self._evict(self._maxsize)
+        self._release(removed)
+        return True
+
+    def remove_if(self, predicate: Callable[[K], bool]) -> None:
+        """Remove every entry whose key matches ``predicate``."""
+        with self._lock:
+            removed = [
+                (key, self._entries[key]) for key in self._entries if predicate(key)
+            ]
+            for key, value in removed:
+                del self._entries[key]
+                self._weight -= self._weight_of(value)
+        self._release(removed)
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self._maxsize = maxsize
+            removed = self._evict(maxsize)
+        self._release(removed)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            removed = list(self._entries.items())
+            self._entries.clear()
+            self._weight = 0
+            self._hits = self._misses = self._evictions = 0
+        self._release(removed)
+
+    def stats(self) -> LRUCacheStats:
+        with self._lock:
+            return LRUCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                maxsize=self._maxsize,
+                currsize=len(self._entries),
+                weight=self._weight,
+            )
+
+    def _weight_of(self, value: V) -> int:
+        return 1 if self._weigh is None else self._weigh(value)
+
+    def _evict(self, maxsize: int) -> list[tuple[K, V]]:
+        removed = []
+        while self._entries and self._weight > max(maxsize, 0):
+            key, value = self._entries.popitem(last=False)
+            self._weight -= self._weight_of(value)
+            self._evictions += 1
+            removed.append((key, value))
+        return removed
+
+    def _release(self, removed: list[tuple[K, V]]) -> None:
+        if self._on_evict is not None:
+            for key, value in removed:
+                self._on_evict(key, value)
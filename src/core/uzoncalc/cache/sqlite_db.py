@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+# 默认最多保留的条目数，超出时删除最早写入的条目
+DEFAULT_MAX_ENTRIES = 10_000
+
+# 等待其它进程释放写锁的最长时间（秒）
+_BUSY_TIMEOUT = 30.0
+
+# 每写入多少次检查一次条目数上限
+_EVICT_INTERVAL = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS kv_updated_at ON kv (updated_at);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SqliteDB:
+    """
+    基于 SQLite 的键值数据库，接口与 JsonDB 相同
+
+    按键读取、每次写入立即提交，无需整体加载或重写文件；
+    使用 WAL 日志，多个上下文或进程可同时读写同一个数据库。
+    值以 JSON 文本保存，键的规则与 JsonDB 一致，旧的 JSON 文件可直接迁移。
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        ttl: float | None = None,
+        max_entries: int | None = DEFAULT_MAX_ENTRIES,
+        json_path: str | None = None,
+    ):
+        """
+        Args:
+            db_path: 数据库文件路径，父级目录不存在时自动创建
+            ttl: 条目有效期（秒），超过后视为不存在；为 None 时永不过期
+            max_entries: 最多保留的条目数，为 None 时不限制
+            json_path: 旧版 JsonDB 文件路径，存在时首次打开会导入其中的数据
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        # isolation_level=None：由本类显式控制事务
+        self._conn: sqlite3.Connection | None = sqlite3.connect(
+            db_path,
+            timeout=_BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        if json_path is not None:
+            self._migrate_json(json_path)
+
+    @staticmethod
+    def make_key(key: Any) -> str:
+        """将任意可 JSON 序列化的键转换为字符串键"""
+        if isinstance(key, (str, int, float)):
+            return str(key)
+        str_key = json.dumps(key, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(str_key.encode("utf-8")).hexdigest()
+
+    def get(self, key: Any, default=None):
+        """
+        获取指定键的值，若不存在或已过期则返回默认值
+        """
+        str_key = self.make_key(key)
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, updated_at FROM kv WHERE key = ?", (str_key,)
+            ).fetchone()
+        if row is None:
+            return default
+
+        value, updated_at = row
+        if self.ttl is not None and time.time() - updated_at > self.ttl:
+            self.delete(key)
+            return default
+        return json.loads(value)
+
+    def set(self, key: Any, value):
+        """
+        更新单个键值对，立即提交
+        """
+        str_key = self.make_key(key)
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, updated_at) "
+                "VALUES (?, ?, ?)",
+                (str_key, data, time.time()),
+            )
+            self._writes += 1
+            if self._writes % _EVICT_INTERVAL == 0:
+                self._evict(conn)
+
+    def delete(self, key: Any) -> None:
+        """删除指定键"""
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM kv WHERE key = ?", (self.make_key(key),)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+
+    def save(self):
+        """写入已在 set 时提交，保留该方法以兼容 JsonDB；同时执行一次淘汰"""
+        with self._lock:
+            if self._conn is not None:
+                self._evict(self._conn)
+
+    def close(self) -> None:
+        """淘汰过期与超量条目后关闭连接"""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._evict(self._conn)
+            self._conn.close()
+            self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("SqliteDB is closed")
+        return self._conn
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if self.ttl is not None:
+                conn.execute(
+                    "DELETE FROM kv WHERE updated_at < ?", (time.time() - self.ttl,)
+                )
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM kv WHERE key IN ("
+                    "SELECT key FROM kv ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def _migrate_json(self, json_path: str) -> None:
+        """导入旧版 JsonDB 文件，只执行一次；JSON 文件本身保持不变"""
+        if not os.path.exists(json_path):
+            return
+
+        with self._lock:
+            conn = self._connection()
+            # 在写事务中检查迁移标记，避免多个进程重复导入
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                migrated = conn.execute(
+                    "SELECT value FROM meta WHERE name = 'json_migrated'"
+                ).fetchone()
+                if migrated is not None:
+                    return
+
+                with open(json_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR IGNORE INTO kv (key, value, updated_at) "
+                    "VALUES (?, ?, ?)",
+                    (
+                        (key, json.dumps(value, ensure_ascii=False), now)
+                        for key, value in data.items()
+                    ),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                    ("json_migrated", os.path.abspath(json_path)),
+                )
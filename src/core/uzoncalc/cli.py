@@ -15,23 +15,46 @@ import os
 from pathlib import Path
 import sys
 
+from .assets import MemoryAssetStore, externalize_data_urls, externalize_to_directory
 from .cli_core.cli_archive import create_uzc_archive
 from .cli_core.cli_archive_runtime import run_workspace_archive
+from .handcalc import import_hook
 from .http_server import DEFAULT_SERVER_PORT, serve_reloadable_html
 
 # 环境变量名：设置后 doc.save() 将变为空操作
 _CLI_MODE_ENV = "UZONCALC_CLI_MODE"
 
+# 预览服务在外部资源模式下提供的图片，重新渲染时只保留新文档引用的部分
+_PREVIEW_ASSETS = MemoryAssetStore()
+
 
 def _load_module_from_path(script_path: str):
-    """将脚本作为独立模块加载并返回，不执行顶层代码中的 if __name__=="__main__" 块"""
-    spec = importlib.util.spec_from_file_location("_uzoncalc_script", script_path)
+    """将脚本作为独立模块加载并返回，不执行顶层代码中的 if __name__=="__main__" 块
+
+    启用导入钩子时，脚本及其同目录下导入的模块在编译前整体插桩。
+    """
+    use_import_hook = import_hook.is_import_hook_enabled()
+    spec_from_file_location = (
+        import_hook.spec_from_file_location
+        if use_import_hook
+        else importlib.util.spec_from_file_location
+    )
+    spec = spec_from_file_location("_uzoncalc_script", script_path)
 
     if spec is None or spec.loader is None:
         raise ImportError(f"无法加载脚本模块: {script_path}")
 
     module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)  # type: ignore[union-attr]
+    finder = (
+        import_hook.install_import_hook([os.path.dirname(script_path)])
+        if use_import_hook
+        else None
+    )
+    try:
+        spec.loader.exec_module(module)  # type: ignore[union-attr]
+    finally:
+        if finder is not None:
+            import_hook.uninstall_import_hook(finder)
     return module
 
 
@@ -74,6 +97,10 @@ def _save_ctx(ctx, output_path: str | None, script_path: str) -> str:
 
     # 渲染 HTML
     html_output = _render_ctx_html(ctx)
+    if ctx.options.asset_mode == "external":
+        html_output = externalize_to_directory(
+            html_output, filename, ctx.options.asset_dir
+        )
 
     os.makedirs(os.path.dirname(filename), exist_ok=True)
     with open(filename, "w", encoding="utf-8") as f:
@@ -123,6 +150,9 @@ def _render_script_html(script_path: str) -> str:
     for ctx in contexts:
         # 服务模式只保留内存结果，多个入口时预览最后一个结果
         html_output = _render_ctx_html(ctx)
+        if ctx.options.asset_mode == "external":
+            # 图片由预览服务单独提供，重新加载时浏览器直接使用缓存
+            html_output = externalize_data_urls(html_output, _PREVIEW_ASSETS.put)
     return html_output
 
 
@@ -147,6 +177,7 @@ def _serve_html(
         script_path,
         render_script_html=_render_script_html,
         preferred_port=preferred_port,
+        assets=_PREVIEW_ASSETS,
     )
 
 
@@ -288,6 +319,11 @@ def _build_legacy_parser() -> argparse.ArgumentParser:
         action="store_true",
         help=f"启动本地 HTTP 预览服务（默认端口 {DEFAULT_SERVER_PORT}，占用时自动递增）",
     )
+    parser.add_argument(
+        "--import-hook",
+        action="store_true",
+        help="加载时对脚本及同目录模块整体插桩，每个模块只解析一次",
+    )
     return parser
 
 
@@ -320,6 +356,9 @@ def main(argv: list[str] | None = None) -> int:
 
     output_path = os.path.abspath(args.output) if args.output else None
 
+    if args.import_hook:
+        os.environ[import_hook.IMPORT_HOOK_ENV] = "1"
+
     # 将脚本所在目录加入 sys.path，支持同目录 import
     script_dir = os.path.dirname(script_path)
     if script_dir not in sys.path:
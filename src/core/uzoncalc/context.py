@@ -1,18 +1,60 @@
 """Calculation context state and user-facing document operations."""
 
-from typing import Any, Callable, Optional
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, Mapping, Optional, Sequence
+import base64
 import os
+import re
+import uuid
 
+import lxml.etree as etree
+
+from .assets import externalize_to_directory
 from .template.utils import render_html_template
 from .context_options import ContextOptions
-from .cache.json_db import JsonDB
+from .cache.figure_cache import (
+    FIGURE_PLACEHOLDER_PREFIX,
+    figure_key,
+    get_cached_figure,
+    png_data_url,
+    save_figure_png,
+    store_cached_figure,
+    submit_figure,
+)
+from .cache.sqlite_db import SqliteDB
 from .interaction import InteractionState
-from .exporting import DocumentExporter, HtmlDocumentExporter
+from .exporting import ContentSink, DocumentExporter, HtmlDocumentExporter
+from .globals import _calc_instance
+from .recorded_entry import (
+    RecordedInline,
+    RecordedStep,
+    RenderableStep,
+    snapshot_captured,
+)
 from .handcalc.post_handlers.dom_utils import (
+    FRAGMENT_CACHE_ATTR,
+    FRAGMENT_MARK_TAG,
+    FRAGMENT_ROOT_TAG,
     PostHandlerNode,
+    collect_marked_nodes,
+    mark_fragment,
     parse_html_fragment,
     serialize_html_fragment,
+    serialize_mark_content,
 )
+from .handcalc.post_handlers.math_notation import ProcessedFragment
+from .handcalc.post_handlers.output_cache import (
+    get_cached_output,
+    make_cache_key,
+    store_cached_output,
+)
+
+
+# 流式输出时每批写出的记录条数
+DEFAULT_SINK_BATCH_SIZE = 256
+
+_FIGURE_PLACEHOLDER_RE = re.compile(re.escape(FIGURE_PLACEHOLDER_PREFIX) + r"(\w+)")
 
 
 class CalcContext:
@@ -24,6 +66,7 @@ class CalcContext:
         name: str | None = None,
         file_path: str | None = None,
         is_silent: bool = True,
+        is_headless: bool = False,
         ctx_hook_created: Optional[Callable[["CalcContext"], Any]] = None,
         document_exporter: DocumentExporter | None = None,
     ) -> None:
@@ -33,6 +76,8 @@ class CalcContext:
             name: Optional display name for the context.
             file_path: Source calculation file used for relative storage.
             is_silent: Whether UI calls should return defaults immediately.
+            is_headless: Whether to run without recording any content, only
+                collecting final variables.
             ctx_hook_created: Callback invoked after context initialization.
             document_exporter: Export strategy used by :meth:`save`.
 
@@ -51,17 +96,45 @@ class CalcContext:
         # 静默执行
         self.is_silent = is_silent
 
+        # 无记录执行：不记录任何内容，只采集计算函数的最终变量
+        self.is_headless = is_headless
+        self.headless_values: dict[str, Any] = {}
+
         self.options = ContextOptions()
 
         # 记录结果
-        self.__contents = []
+        # 延迟渲染时可能包含尚未渲染的记录项
+        self.__contents: list[str | RecordedStep | RecordedInline] = []
+        self.__has_pending = False
+
+        # 文档级后处理模式下，已标记片段引用的选项快照
+        self.__option_snapshots: list[ContextOptions] = []
+        self.__has_marked = False
+        # 文档级后处理完成后需要写入缓存的片段，键为标记中的缓存槽位
+        self.__marked_cache_keys: dict[int, Hashable] = {}
+        self.__next_cache_slot = 0
+
+        # 后处理结果缓存的命中统计
+        self.post_process_cache_hits = 0
+        self.post_process_cache_misses = 0
+
+        # 流式输出：记录内容按批写入 sink，不再保留在内存中
+        self._content_sink: ContentSink | None = None
+        self._sink_batch_size = DEFAULT_SINK_BATCH_SIZE
 
         # 记录行内内容的临时存储
-        self.__inline_values: list[str] | None = None
+        self.__inline_values: list[str | RecordedStep] | None = None
         self.__inline_separator: str = " "
 
+        # 正在采集记录内容的列表，供 uzon_calc_func 缓存回放
+        self.__fragment_taps: list[list[tuple[Any, ...]]] = []
+
+        # 后台导出中的图形，键为文档中占位 src 的编号
+        # 值为 (图形缓存键, 导出任务)，读取 contents 时替换为 data URL
+        self.pending_figures: dict[str, tuple[str | None, Future[bytes]]] = {}
+
         # ctx 使用的 json 缓存数据库
-        self.json_db: None | JsonDB = None
+        self.json_db: None | SqliteDB = None
 
         # 默认值存储
         # 每个 tile 中的上下文单独维护，以支持不同 tile 之间的默认值隔离
@@ -79,15 +152,23 @@ class CalcContext:
             ctx_hook_created(self)
 
     @property
-    def contents(self):
-        return self.__contents
+    def contents(self) -> list[str]:
+        self.render_pending()
+        self.run_document_pass()
+        if self.pending_figures:
+            self._resolve_pending_figures()
+        return self.__contents  # type: ignore[return-value]
 
     # region content recording
-    def append_content(self, content: str):
-        if self.options.skip_content:
+    def append_content(self, content: str, *, post_process: bool = True):
+        if self.is_headless or self.options.skip_content:
             return
 
-        content = self._post_process_content(content)
+        for tap in self.__fragment_taps:
+            tap.append(("content", content, post_process))
+
+        if post_process:
+            content = self._post_process_content(content)
 
         # 若有 row_values，则添加到 row_values 中
         # 在其它地方将其转换成一行内容
@@ -96,18 +177,257 @@ class CalcContext:
             return
 
         self.__contents.append(content)
+        self._flush_full_batch()
+
+    def append_deferred(
+        self,
+        step: RenderableStep,
+        *,
+        locals_map: Mapping[str, Any],
+        value: Any = None,
+    ) -> None:
+        """Record a step without rendering it.
+
+        The step is rendered by :meth:`render_pending` with the options in
+        effect at this point. Captured values are snapshotted, so later
+        mutations do not change the rendered output.
+
+        Args:
+            step: Step able to render its HTML fragment.
+            locals_map: Values captured for the step.
+            value: Result value of the recorded expression.
+
+        Returns:
+            None.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        if self.is_headless or self.options.skip_content:
+            return
+
+        # 立即复制可变值，渲染时展示记录时的状态
+        locals_map, value = snapshot_captured(locals_map, value)
+        for tap in self.__fragment_taps:
+            tap.append(("step", step, locals_map, value))
+
+        entry = RecordedStep(
+            step=step,
+            locals_map=locals_map,
+            value=value,
+            options=self.options.snapshot(),
+            tag="span" if self.is_inline_mode else "p",
+        )
+        self.__has_pending = True
+        if self.__inline_values is not None:
+            self.__inline_values.append(entry)
+            return
+
+        self.__contents.append(entry)
+        self._flush_full_batch()
+
+    def render_pending(self) -> None:
+        """Render all deferred entries in place, in recording order.
+
+        Entries whose step renders nothing are dropped.
+
+        Returns:
+            None.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        if not self.__has_pending:
+            return
+        self.__has_pending = False
+
+        rendered: list[str | RecordedStep | RecordedInline] = []
+        for item in self.__contents:
+            content = self._render_entry(item)
+            if content is not None:
+                rendered.append(content)
+        self.__contents[:] = rendered
+
+    def _render_entry(self, item: str | RecordedStep | RecordedInline) -> str | None:
+        if isinstance(item, str):
+            return item
+        if isinstance(item, RecordedInline):
+            values = [self._render_entry(value) for value in item.values]
+            combined = item.separator.join(v for v in values if v is not None)
+            return f"<p>{combined}</p>" if combined else None
+
+        # 渲染期间还原记录时的选项，并将自身设为当前上下文
+        # 以便渲染器读取精度等配置
+        options = self.options
+        self.options = item.options
+        token = _calc_instance.set(self)
+        try:
+            content = item.step.render(
+                self, locals_map=item.locals_map, value=item.value
+            )
+            if content is None:
+                return None
+            wrapped = f"<{item.tag}>{content}</{item.tag}>"
+            if isinstance(content, ProcessedFragment):
+                return wrapped
+            return self._post_process_content(wrapped)
+        finally:
+            _calc_instance.reset(token)
+            self.options = options
 
     def _post_process_content(self, content: str) -> str:
-        """Parse content once and let each post handler mutate DOM nodes."""
-        if not self.options.post_handlers:
-            return content
+        """Parse content once and let each post handler mutate DOM nodes.
 
+        Handlers before the first one whose ``may_apply`` prefilter reports a
+        possible match are skipped. Handlers after it always run, since a
+        handler can produce text that a later handler rewrites (e.g. an alias
+        expanding to ``alpha_1``). When no handler may apply, the DOM walk is
+        skipped but the content is still parsed and serialized, so its bytes
+        match the output of a full pass.
+
+        With ``enable_post_process_cache``, output is looked up by the content
+        and the ``cache_key`` of those handlers, and stored after processing.
+        """
+        handlers = self.options.post_handlers
+        if not handlers:
+            return content
+        first_handler = next(
+            (
+                index
+                for index, handler in enumerate(handlers)
+                if handler.may_apply(content, self)
+            ),
+            # 没有处理器需要运行时仍经过 lxml 规范化（如 <br /> 写作 <br>、
+            # 属性统一使用双引号），与完整处理的输出保持一致
+            len(handlers),
+        )
+
+        cache_key = None
+        if self.options.enable_post_process_cache:
+            cache_key = make_cache_key(content, handlers[first_handler:], self)
+        if cache_key is not None:
+            cached = get_cached_output(cache_key)
+            if cached is not None:
+                self.post_process_cache_hits += 1
+                return cached
+            self.post_process_cache_misses += 1
+
+        if self.options.post_process_mode == "document":
+            return self._mark_for_document_pass(content, first_handler, cache_key)
+
+        handlers = handlers[first_handler:]
         root = parse_html_fragment(content)
-        for node in list(root.iter()):
-            post_node = PostHandlerNode(node)
-            for handler in self.options.post_handlers:
-                handler.handle(post_node, ctx=self)
-        return serialize_html_fragment(root)
+        if handlers:
+            for node in list(root.iter()):
+                post_node = PostHandlerNode(node)
+                for handler in handlers:
+                    handler.handle(post_node, ctx=self)
+        output = serialize_html_fragment(root)
+        if cache_key is not None:
+            store_cached_output(cache_key, output)
+        return output
+
+    def _mark_for_document_pass(
+        self,
+        content: str,
+        first_handler: int,
+        cache_key: Hashable | None = None,
+    ) -> str:
+        """Tag content with a snapshot of the current options for a later pass."""
+        snapshots = self.__option_snapshots
+        if not snapshots or snapshots[-1] != self.options:
+            snapshots.append(self.options.snapshot())
+        self.__has_marked = True
+
+        cache_slot = None
+        if cache_key is not None:
+            cache_slot = self.__next_cache_slot
+            self.__next_cache_slot += 1
+            self.__marked_cache_keys[cache_slot] = cache_key
+        return mark_fragment(content, len(snapshots) - 1, first_handler, cache_slot)
+
+    def run_document_pass(self) -> None:
+        """Post-process all marked fragments with one parse and one tree walk.
+
+        Each recorded entry holding marked fragments is parsed as part of a
+        single document. Handlers see, per fragment, the options in effect
+        when it was appended, after which every entry is serialized back.
+
+        Returns:
+            None.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        if not self.__has_marked:
+            return
+        # inline 模式中尚未合并的片段留待下一次处理
+        self.__has_marked = self.__inline_values is not None
+
+        contents = self.__contents
+        indices = [
+            index
+            for index, item in enumerate(contents)
+            if isinstance(item, str) and FRAGMENT_MARK_TAG in item
+        ]
+        if not indices:
+            return
+
+        root = parse_html_fragment(
+            "".join(
+                f"<{FRAGMENT_ROOT_TAG}>{contents[index]}</{FRAGMENT_ROOT_TAG}>"
+                for index in indices
+            )
+        )
+        entries = list(root)
+        if len(entries) != len(indices):
+            # 条目结构被解析器改变时，退回逐条解析
+            entries = [parse_html_fragment(contents[index]) for index in indices]
+
+        for entry in entries:
+            self._handle_marked_nodes(entry)
+        for index, entry in zip(indices, entries):
+            contents[index] = serialize_html_fragment(entry)
+
+    def _handle_marked_nodes(self, root: etree._Element) -> None:
+        marked_nodes = collect_marked_nodes(root)
+        marks = [
+            post_node.node
+            for post_node, _ in marked_nodes
+            if post_node.node.tag == FRAGMENT_MARK_TAG
+        ]
+        # 标记的尾随文本不属于片段本身，处理期间暂时移除
+        tails = [mark.tail for mark in marks]
+        for mark in marks:
+            mark.tail = None
+
+        options = self.options
+        try:
+            for post_node, (options_id, first_handler) in marked_nodes:
+                self.options = self.__option_snapshots[options_id]
+                for handler in self.options.post_handlers[first_handler:]:
+                    handler.handle(post_node, ctx=self)
+        finally:
+            self.options = options
+
+        for mark in marks:
+            self._store_marked_output(mark)
+        for mark, tail in zip(marks, tails):
+            mark.tail = tail
+        etree.strip_tags(root, FRAGMENT_MARK_TAG)
+
+    def _store_marked_output(self, mark: etree._Element) -> None:
+        """Cache the processed content of a mark that recorded a cache key."""
+        cache_slot = mark.get(FRAGMENT_CACHE_ATTR)
+        if cache_slot is None:
+            return
+        cache_key = self.__marked_cache_keys.pop(int(cache_slot), None)
+        if cache_key is None:
+            return
+        output = serialize_mark_content(mark)
+        # 嵌套的标记在片段外层处理完成前仍未展开，其输出不能复用
+        if FRAGMENT_MARK_TAG not in output:
+            store_cached_output(cache_key, output)
 
     def start_inline(self, separator: str = " "):
         """Start collecting subsequent content into one paragraph.
@@ -141,21 +461,245 @@ class CalcContext:
 
         inline_values = self.__inline_values
         self.__inline_values = None
+        if any(isinstance(value, RecordedStep) for value in inline_values):
+            self.__contents.append(
+                RecordedInline(values=inline_values, separator=self.__inline_separator)
+            )
+            self._flush_full_batch()
+            return
         if inline_values:
             combined = self.__inline_separator.join(inline_values)
             # Inline fragments are already post-processed when appended.
             self.__contents.append(f"<p>{combined}</p>")
+            self._flush_full_batch()
 
     @property
     def is_inline_mode(self) -> bool:
         """检查是否处于 inline 模式"""
         return self.__inline_values is not None
 
+    @property
+    def is_recording(self) -> bool:
+        """检查当前是否会记录内容"""
+        return not (self.is_headless or self.options.skip_content)
+
+    @contextmanager
+    def capture_fragments(self) -> Iterator[list[tuple[Any, ...]]]:
+        """Collect everything recorded inside the block for later replay.
+
+        Yields:
+            The list receiving the captured fragments, complete once the
+            block exits. Captures may be nested.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        fragments: list[tuple[Any, ...]] = []
+        self.__fragment_taps.append(fragments)
+        try:
+            yield fragments
+        finally:
+            self.__fragment_taps.remove(fragments)
+
+    def replay_fragments(self, fragments: Sequence[tuple[Any, ...]]) -> None:
+        """Record fragments captured by :meth:`capture_fragments` again.
+
+        Steps are rendered again and content is post-processed again with
+        the current options. Content captured with ``post_process=False`` is
+        appended verbatim; this includes equations already post-processed in
+        IR, which keep the aliases and handler state in effect at capture
+        time. Callers replaying across runs must therefore key the fragments
+        on that state, as the call cache does with the handlers' cache keys.
+
+        Args:
+            fragments: Fragments returned by :meth:`capture_fragments`.
+
+        Returns:
+            None.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        for fragment in fragments:
+            if fragment[0] == "step":
+                _, step, locals_map, value = fragment
+                self.append_deferred(step, locals_map=locals_map, value=value)
+            else:
+                _, content, post_process = fragment
+                self.append_content(content, post_process=post_process)
+
+    # endregion
+
+    # region streaming output
+    def stream_contents(
+        self, sink: ContentSink, *, batch_size: int = DEFAULT_SINK_BATCH_SIZE
+    ) -> None:
+        """Write recorded content to a sink instead of keeping it in memory.
+
+        Content already recorded is written first. Afterwards entries are
+        rendered, post-processed and written every ``batch_size`` records, so
+        ``contents`` and ``html_content()`` only hold entries not yet written.
+
+        Args:
+            sink: Destination of the post-processed fragments.
+            batch_size: Number of recorded entries kept before writing them.
+
+        Returns:
+            None.
+
+        Raises:
+            ValueError: If a sink is already attached or batch_size < 1.
+        """
+        if self._content_sink is not None:
+            raise ValueError("a content sink is already attached")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self._content_sink = sink
+        self._sink_batch_size = batch_size
+        self.flush_contents()
+
+    def flush_contents(self) -> None:
+        """Write all finished entries to the attached sink and drop them.
+
+        Content collected in an open inline paragraph stays until the
+        paragraph ends. Does nothing without a sink.
+
+        Returns:
+            None.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        sink = self._content_sink
+        if sink is None:
+            return
+
+        for content in self.contents:
+            sink.write(content)
+        self.__contents.clear()
+        if not self.__has_marked:
+            # 已写出的片段不再引用选项快照
+            self.__option_snapshots.clear()
+
+    def close_content_sink(self) -> None:
+        """Flush remaining content, let the sink finish the document and detach it.
+
+        Returns:
+            None.
+
+        Raises:
+            OSError: If the sink cannot write its destination.
+        """
+        sink = self._content_sink
+        if sink is None:
+            return
+        self.flush_contents()
+        self._content_sink = None
+        sink.close(self)
+
+    def _flush_full_batch(self) -> None:
+        if (
+            self._content_sink is not None
+            and len(self.__contents) >= self._sink_batch_size
+        ):
+            self.flush_contents()
+
+    # endregion
+
+    # region figures
+    def figure_src(self, fig: Any, *, cache_key: Hashable | None = None) -> str:
+        """Return the ``img`` src of a figure exported as PNG.
+
+        Exports with a ``cache_key`` are looked up in the figure cache
+        selected by ``options.figure_cache``; figures without one are
+        exported every time.
+        With ``options.figure_render_mode`` set to ``"thread"`` or
+        ``"process"``, a cache miss exports a snapshot of the figure in the
+        background and returns a placeholder that is replaced once
+        ``contents`` is read.
+
+        Args:
+            fig: Object implementing ``savefig``, usually a Matplotlib figure.
+            cache_key: Key identifying the figure's image in the cache.
+
+        Returns:
+            A PNG data URL, or a placeholder for a pending export.
+
+        Raises:
+            Exception: Any error raised by ``fig.savefig`` in a synchronous
+                export.
+        """
+        options = self.options
+        key = None
+        if options.figure_cache != "off":
+            key = figure_key(fig, cache_key)
+        if key is not None:
+            data = self._get_cached_figure(key)
+            if data is not None:
+                return png_data_url(data)
+            if key in self.pending_figures:
+                return FIGURE_PLACEHOLDER_PREFIX + key
+
+        # 采集回放的片段不能引用本次运行的导出任务
+        if options.figure_render_mode != "sync" and not self.__fragment_taps:
+            future = submit_figure(fig, options.figure_render_mode)
+            if future is not None:
+                placeholder_id = key or uuid.uuid4().hex
+                self.pending_figures[placeholder_id] = (key, future)
+                return FIGURE_PLACEHOLDER_PREFIX + placeholder_id
+
+        data = save_figure_png(fig)
+        if key is not None:
+            self._store_cached_figure(key, data)
+        return png_data_url(data)
+
+    def _get_cached_figure(self, key: str) -> bytes | None:
+        data = get_cached_figure(key)
+        if data is None and self.options.figure_cache == "persistent":
+            encoded = self.get_json_db().get(("figure", key))
+            if encoded is not None:
+                data = base64.b64decode(encoded)
+                store_cached_figure(key, data)
+        return data
+
+    def _store_cached_figure(self, key: str, data: bytes) -> None:
+        store_cached_figure(key, data)
+        if self.options.figure_cache == "persistent":
+            self.get_json_db().set(
+                ("figure", key), base64.b64encode(data).decode("ascii")
+            )
+
+    def _resolve_pending_figures(self) -> None:
+        """等待已写入正文的后台导出完成，将占位 src 替换为 data URL"""
+        resolved: dict[str, str] = {}
+
+        def replace(match: re.Match[str]) -> str:
+            placeholder_id = match.group(1)
+            if placeholder_id not in resolved:
+                pending = self.pending_figures.get(placeholder_id)
+                if pending is None:
+                    return match.group(0)
+                key, future = pending
+                data = future.result()
+                if key is not None:
+                    self._store_cached_figure(key, data)
+                resolved[placeholder_id] = png_data_url(data)
+            return resolved[placeholder_id]
+
+        contents = self.__contents
+        for index, content in enumerate(contents):
+            if isinstance(content, str) and FIGURE_PLACEHOLDER_PREFIX in content:
+                contents[index] = _FIGURE_PLACEHOLDER_RE.sub(replace, content)
+
+        # 仍在行内段落等未写入正文位置的导出继续保留
+        for placeholder_id in resolved:
+            del self.pending_figures[placeholder_id]
+
     # endregion
 
     # region result generation
     def html_content(self) -> str:
-        html_content = "\n".join(self.__contents)
+        html_content = "\n".join(self.contents)
         for handler in self.options.context_result_handlers:
             html_content = handler.handle(html_content, ctx=self)
         return html_content
@@ -177,13 +721,38 @@ class CalcContext:
         Returns:
             None.
 
+        With ``options.asset_mode == "external"``, embedded images are written
+        to ``options.asset_dir`` next to the document and referenced by
+        relative URL.
+
         Raises:
-            OSError: If the destination cannot be written.
+            OSError: If the destination or an asset cannot be written.
             ImportError: If ToC placeholders require unavailable dependencies.
         """
-        self._document_exporter.export(self.html(), path)
+        html = self.html()
+        if self.options.asset_mode == "external":
+            html = externalize_to_directory(html, path, self.options.asset_dir)
+        self._document_exporter.export(html, path)
         print(f"Document saved to (open with browser): file:///{path}")
 
+    def values(self) -> dict[str, dict[str, Any]]:
+        """Return the final variables and UI inputs of a headless run.
+
+        Returns:
+            ``{"values": {...}, "inputs": {...}}`` where ``values`` maps the
+            names assigned in the calculation entry to their final values and
+            ``inputs`` maps each UI window title to its ``{field: value}``.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        inputs: dict[str, Any] = {}
+        for window in self.ui_windows:
+            fields = inputs.setdefault(window.title, {})
+            for field in window.fields:
+                fields[field.name] = field.value
+        return {"values": dict(self.headless_values), "inputs": inputs}
+
     # endregion
 
     def get_location_dir(self) -> str:
@@ -195,24 +764,28 @@ class CalcContext:
             return os.path.dirname(os.path.abspath(self.file_path))
         return os.getcwd()
 
-    def get_json_db(self) -> JsonDB:
+    def get_json_db(self) -> SqliteDB:
         """
-        获取 SQLite 游标
-        若尚未创建数据库连接，则创建一个内存数据库连接
+        获取上下文使用的键值数据库
+        若尚未创建，则在计算文件所在目录的 data/db.sqlite3 中打开，
+        并导入旧版的 data/db.json
         """
         if self.json_db is not None:
             return self.json_db
 
-        dir = self.get_location_dir()
-
-        # 开始连接
-        self.json_db = JsonDB(os.path.join(dir, f"data/db.json"))
+        data_dir = os.path.join(self.get_location_dir(), "data")
+        self.json_db = SqliteDB(
+            os.path.join(data_dir, "db.sqlite3"),
+            json_path=os.path.join(data_dir, "db.json"),
+        )
         return self.json_db
 
     def exit(self):
-        """退出上下文，关闭数据库连接等"""
+        """退出上下文，关闭数据库连接、完成流式输出等"""
         if self.json_db is not None:
-            self.json_db.save()
+            self.json_db.close()
+            self.json_db = None
+        self.close_content_sink()
 
     def get_serial_number(self) -> int:
         """获取当前上下文的序列号"""
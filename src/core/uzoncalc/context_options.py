@@ -1,4 +1,5 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from typing import Literal
 
 from .context_result_handler.base_context_result_handler import BaseContextResultHandler
 from .context_result_handler.post_pipeline import get_default_context_result_handlers
@@ -87,6 +88,29 @@ class PrefixSettings:
     table_prefix: str = "表"
 
 
+@dataclass
+class LoopRecordPolicy:
+    """循环体记录策略：只记录部分迭代，其余迭代走未插桩的快速路径。"""
+
+    # 记录前 N 次迭代
+    first: int = 1
+
+    # 每隔 k 次迭代记录一次（按 0 起始的迭代序号取模），0 表示不启用
+    every: int = 0
+
+    # 是否记录最后一次迭代
+    # 仅对可获取长度的 for 循环生效（如 list、range），while 循环无法预知最后一次
+    last: bool = True
+
+    def should_record(self, index: int, length: int | None) -> bool:
+        """判断第 index 次迭代（0 起始）是否需要记录。"""
+        if index < self.first:
+            return True
+        if self.every > 0 and index % self.every == 0:
+            return True
+        return self.last and length is not None and index == length - 1
+
+
 @dataclass
 class ContextOptions:
     # 是否启用调试模式，记录更多步骤信息
@@ -119,12 +143,75 @@ class ContextOptions:
     # 因此，建议仅在根上下文调用 hide()
     skip_content: bool = False
 
+    # 循环体记录策略
+    # 为 None 时记录所有迭代；否则按策略只记录部分迭代
+    # 通过 ContextOptions 或 with loop_record(...) 配置
+    loop_record: LoopRecordPolicy | None = None
+
+    # 是否延迟渲染
+    # 若为 True，记录步骤时仅保存步骤引用、捕获的变量值和选项快照，
+    # 在调用 html_content()/html() 或访问 contents 时再统一渲染
+    # 快照包含别名、后处理器列表与图表编号前缀，见 snapshot()
+    # 适用于交互暂停、只关心计算结果等不一定需要渲染内容的场景
+    defer_rendering: bool = False
+
+    # 后处理器的执行方式
+    # "fragment": 每次追加内容时立即解析并执行后处理器
+    # "document": 追加时只标记片段及当时的选项快照，
+    #   在读取 contents 或生成 HTML 时一次性解析全部片段、遍历一次后再序列化，
+    #   适用于片段数量很多的长文档
+    post_process_mode: Literal["fragment", "document"] = "fragment"
+
+    # 是否缓存后处理结果
+    # 相同片段在相同的处理器状态下直接复用上一次的输出，跳过解析与序列化
+    # 包含未提供 cache_key 的自定义处理器时，该片段始终重新处理
+    enable_post_process_cache: bool = True
+
+    # 是否在 IR 阶段完成公式的后处理
+    # 若为 True，公式步骤在生成 MathML 前由各后处理器的 transform_math_leaf 改写变量名，
+    # 输出不再经过 DOM 解析；任一后处理器不支持时，该公式仍走 DOM 后处理
+    post_process_math_in_ir: bool = True
+
+    # plot()/Plot() 导出的 PNG 缓存
+    # 仅对传入 cache_key 的图形生效，以 cache_key 为键；未传入时每次都重新导出
+    # "off": 不缓存，每次都重新导出
+    # "memory": 缓存在当前进程内，同一进程中的重复运行直接复用
+    # "persistent": 同时写入 ctx.get_json_db()，跨进程、跨运行复用
+    # 不根据图形内容推导键：Matplotlib 的状态无法可靠地完整指纹化，误命中会复用旧图片
+    figure_cache: Literal["off", "memory", "persistent"] = "memory"
+
+    # plot()/Plot() 的导出方式
+    # "sync": 调用时立即导出
+    # "thread"/"process": 对图形做快照后在后台线程/进程中导出，计算继续执行，
+    #   文档中先写入占位 src，在读取 contents 或生成 HTML 时替换为导出结果
+    #   "process" 模式下图形需可 pickle，否则退回同步导出
+    figure_render_mode: Literal["sync", "thread", "process"] = "sync"
+
+    # 图片资源的输出方式
+    # "inline": 以 base64 data URL 内嵌在 HTML 中
+    # "external": 保存文档（save()/CLI）时写入文档旁的 asset_dir 目录，
+    #   文件名为内容的哈希，多次运行间自动去重，HTML 中以相对路径引用；
+    #   CLI 预览服务则在内存中保存并以长期缓存响应提供
+    asset_mode: Literal["inline", "external"] = "inline"
+
+    # 外部资源目录，相对于保存的 HTML 文件所在目录
+    asset_dir: str = "assets"
+
     # 别名映射
     aliases: dict[str, str] = field(default_factory=dict)
 
     # 小数显示精度（小数位数），默认为 3 位
     float_precision: int = 3
 
+    # 数组省略显示阈值
+    # 元素总数超过该值时，每个维度只显示首尾各 array_edge_items 项，中间以省略号代替
+    # 为 None 时始终完整显示
+    # 注意：默认值 1000 会改变已有计算书中超大列表/数组的输出，需完整显示时设为 None
+    array_threshold: int | None = 1000
+
+    # 省略显示时每个维度首尾保留的项数
+    array_edge_items: int = 3
+
     # 自定义的后处理器列表
     post_handlers: list[BasePostHandler] = field(
         default_factory=get_default_post_handlers
@@ -149,3 +236,17 @@ class ContextOptions:
 
     # Figure/Table prefix
     prefix_settings: PrefixSettings = field(default_factory=PrefixSettings)
+
+    def snapshot(self) -> "ContextOptions":
+        """复制当前选项，供延迟渲染时还原记录时刻的渲染配置。
+
+        影响片段渲染的可变字段（别名字典、后处理器列表、图表编号前缀）会被复制，
+        处理器对象本身仍与原选项共享；页面信息、样式、头部内容等整篇文档级的字段
+        在生成 HTML 时读取当前选项，不随快照保存。
+        """
+        return replace(
+            self,
+            aliases=dict(self.aliases),
+            post_handlers=list(self.post_handlers),
+            prefix_settings=replace(self.prefix_settings),
+        )
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+
 from ..handler_protocols import HandlerContext
 
 
@@ -12,3 +14,13 @@ class BaseContextResultHandler(ABC):
     @abstractmethod
     def handle(self, html: str, ctx: HandlerContext | None = None) -> str:
         """处理完整 HTML 正文片段。"""
+
+    def handle_stream(
+        self, chunks: Iterable[str], ctx: HandlerContext | None = None
+    ) -> Iterator[str]:
+        """流式处理正文，输出拼接后应与 `handle` 的结果相同。
+
+        默认合并全部分块后调用 `handle`；需要在流式输出时保持内存占用恒定的处理器
+        应覆盖该方法。
+        """
+        yield self.handle("".join(chunks), ctx)
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 import html
 from html.parser import HTMLParser
+from typing import IO
 
 from .base_context_result_handler import BaseContextResultHandler
 from ..service.toc_page_numbers import render_heading_marker
+from ..utils_core.text_spool import iter_text_chunks, open_text_spool
 
 _HEADING_TAGS = {"h2", "h3", "h4", "h5", "h6"}
 _MIN_HEADING_LEVEL = 2
 _MAX_COUNTER_COUNT = 5
 _TOC_INJECTION_MARK = "\x00UZONCALC_TOC_INJECTION\x00"
+_TOC_CONTAINER_ID = "toc-container"
 
 
 @dataclass
@@ -168,6 +172,22 @@ class _TocHtmlParser(HTMLParser):
             for part in self.output_parts
         )
 
+    def drain_to(
+        self, output: IO[str], injection_offsets: list[int], written: int
+    ) -> int:
+        """将已生成的输出写入文件并清空缓冲。
+
+        目录注入点以字符偏移记录在 injection_offsets 中，返回写入后的总字符数。
+        """
+        for part in self.output_parts:
+            if part == _TOC_INJECTION_MARK:
+                injection_offsets.append(written)
+            else:
+                output.write(part)
+                written += len(part)
+        self.output_parts.clear()
+        return written
+
     def _append_heading_item(self, open_heading: _OpenHeading):
         """根据标题层级更新章节编号并记录目录项。"""
         indent_level = int(open_heading.tag[1:]) - _MIN_HEADING_LEVEL
@@ -256,7 +276,7 @@ class TocContextResultHandler(BaseContextResultHandler):
     priority = 50
 
     def handle(self, html: str, ctx=None) -> str:
-        if "toc-container" not in html:
+        if _TOC_CONTAINER_ID not in html:
             return html
 
         parser = _TocHtmlParser()
@@ -265,3 +285,47 @@ class TocContextResultHandler(BaseContextResultHandler):
         if not parser.has_toc_injection_mark:
             return html
         return parser.render()
+
+    def handle_stream(self, chunks: Iterable[str], ctx=None) -> Iterator[str]:
+        """流式生成目录：正文与输出均暂存在临时文件中，内存占用与文档大小无关。
+
+        目录内容依赖全部标题，因此先完整扫描一遍正文，再回放输出并在注入点写入目录。
+        """
+        with open_text_spool() as source:
+            has_container = False
+            overlap = ""
+            for chunk in chunks:
+                source.write(chunk)
+                if not has_container:
+                    window = overlap + chunk
+                    has_container = _TOC_CONTAINER_ID in window
+                    overlap = window[-(len(_TOC_CONTAINER_ID) - 1) :]
+
+            source.seek(0)
+            if not has_container:
+                yield from iter_text_chunks(source)
+                return
+
+            parser = _TocHtmlParser()
+            with open_text_spool() as output:
+                injection_offsets: list[int] = []
+                written = 0
+                for chunk in iter_text_chunks(source):
+                    parser.feed(chunk)
+                    written = parser.drain_to(output, injection_offsets, written)
+                parser.close()
+                parser.drain_to(output, injection_offsets, written)
+
+                if not parser.has_toc_injection_mark:
+                    source.seek(0)
+                    yield from iter_text_chunks(source)
+                    return
+
+                toc_html = parser._render_toc_html()
+                output.seek(0)
+                position = 0
+                for offset in injection_offsets:
+                    yield from iter_text_chunks(output, offset - position)
+                    yield toc_html
+                    position = offset
+                yield from iter_text_chunks(output)
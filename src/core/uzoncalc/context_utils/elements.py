@@ -4,8 +4,7 @@ import base64
 from dataclasses import replace
 import html
 import inspect
-import io
-from typing import Any, List, Protocol
+from typing import Any, Hashable, List, Protocol
 
 from ..globals import get_current_instance
 from .element_models import AutoLabel, HtmlFragment, ISavefig, LabelKind, Props
@@ -419,12 +418,21 @@ def LaTex(content: str):
     laTex(content, persist=True)
 
 
-def plot(fig: ISavefig, width=None, persist: bool = False):
+def plot(
+    fig: ISavefig,
+    width=None,
+    persist: bool = False,
+    *,
+    cache_key: Hashable | None = None,
+):
     """
     将 Matplotlib 图形渲染为内嵌 PNG 图片。
+
+    传入 cache_key 且启用 options.figure_cache 时，导出结果按 cache_key 缓存；
+    后台导出方式由 options.figure_render_mode 配置。
     """
-    image_base64 = base64.b64encode(_save_plot_to_bytes(fig)).decode("ascii")
-    return img(f"data:image/png;base64,{image_base64}", width=width, persist=persist)
+    src = get_current_instance().figure_src(fig, cache_key=cache_key)
+    return img(src, width=width, persist=persist)
 
 
 def Plot(
@@ -432,6 +440,7 @@ def Plot(
     *,
     width=None,
     caption: str = "",
+    cache_key: Hashable | None = None,
 ):
     """
     将 Matplotlib 图形或 PNG 二进制内容追加到当前文档。
@@ -440,20 +449,10 @@ def Plot(
         # 二进制内容直接编码为 data URL，避免误传给 Figure 渲染逻辑。
         image_base64 = base64.b64encode(fig).decode("ascii")
         return Img(f"data:image/png;base64,{image_base64}", width=width)
-    image_base64 = base64.b64encode(_save_plot_to_bytes(fig)).decode("ascii")
-    return Img(
-        f"data:image/png;base64,{image_base64}",
-        width=width,
-        alt=caption,
-    )
-
-
-def _save_plot_to_bytes(fig: ISavefig) -> bytes:
-    """将 Matplotlib 图形保存为 PNG 二进制内容。"""
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    return buf.getvalue()
+    ctx = get_current_instance()
+    # 不记录内容时只保留图号，跳过导出
+    src = ctx.figure_src(fig, cache_key=cache_key) if ctx.is_recording else ""
+    return Img(src, width=width, alt=caption)
 
 
 def _merge_classes(element_props: Props | None, classes: str | None) -> Props | None:
@@ -1,4 +1,6 @@
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator
+from ..context_options import LoopRecordPolicy
 from ..globals import get_current_instance
 
 # region show/hide content recording
@@ -122,6 +124,17 @@ def decimal(float_precision: int):
     ctx.options.float_precision = float_precision
 
 
+def array_display(threshold: int | None = 1000, edge_items: int = 3):
+    """
+    set how large arrays are displayed
+    :param threshold: elide arrays with more elements than this, None to show all
+    :param edge_items: leading and trailing items kept per axis when eliding, default is 3
+    """
+    ctx = get_current_instance()
+    ctx.options.array_threshold = threshold
+    ctx.options.array_edge_items = edge_items
+
+
 # endregion
 
 
@@ -147,8 +160,30 @@ def table_prefix(prefix: str = "Table"):
 # endregion
 
 
+# region loop recording
+@contextmanager
+def loop_record(first: int = 1, every: int = 0, last: bool = True) -> Iterator[None]:
+    """
+    limit which loop iterations are recorded inside the block
+    :param first: record the first N iterations, default is 1
+    :param every: additionally record every k-th iteration, 0 to disable
+    :param last: record the last iteration of sized iterables, default is True
+    """
+    ctx = get_current_instance()
+    previous = ctx.options.loop_record
+    ctx.options.loop_record = LoopRecordPolicy(first=first, every=every, last=last)
+    try:
+        yield
+    finally:
+        ctx.options.loop_record = previous
+
+
+# endregion
+
+
 __all__ = [
     "alias",
+    "array_display",
     "decimal",
     "disable_formula_expression",
     "disable_fstring_equation",
@@ -160,6 +195,7 @@ __all__ = [
     "figure_prefix",
     "hide",
     "inline",
+    "loop_record",
     "show",
     "table_prefix",
 ]
@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
+import os
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Protocol
+from typing import IO, Protocol
+
+from .handler_protocols import HandlerContext
+from .template.utils import render_html_template_parts
+from .utils_core.text_spool import iter_text_chunks, open_text_spool
 
 
 class TocPageNumberResolver(Protocol):
@@ -108,9 +114,126 @@ class HtmlDocumentExporter:
         )
 
 
+class ContentSink(Protocol):
+    """Receive recorded content fragments instead of keeping them in memory."""
+
+    def write(self, fragment: str) -> None:
+        """Accept one post-processed content fragment, in recording order.
+
+        Args:
+            fragment: HTML fragment that would otherwise be kept in contents.
+
+        Returns:
+            None.
+        """
+        ...
+
+    def close(self, ctx: HandlerContext) -> None:
+        """Finish the output after the last fragment.
+
+        Args:
+            ctx: Context whose options describe the finished document.
+
+        Returns:
+            None.
+        """
+        ...
+
+
+class HtmlStreamSink:
+    """Stream recorded fragments into an HTML document with constant memory.
+
+    Fragments are appended to a temporary spool file as they arrive. On close
+    the template header is rendered with the final options, the body is passed
+    through each context result handler's ``handle_stream`` in chunks, and the
+    footer is written after it. The header is written last because options
+    such as the title or custom heads may still change while recording.
+    ToC page-number placeholders are left unresolved, since resolving them
+    requires rendering the complete document in a browser.
+    """
+
+    def __init__(
+        self,
+        target: str | os.PathLike[str] | IO[str],
+        *,
+        full_document: bool = True,
+    ) -> None:
+        """Initialize the sink.
+
+        Args:
+            target: Destination path, or a text stream that stays open.
+            full_document: Whether to wrap the body in the HTML template;
+                when False only the body, as from ``html_content()``, is written.
+
+        Returns:
+            None.
+
+        Raises:
+            No exceptions are intentionally raised.
+        """
+        self._target = target
+        self._full_document = full_document
+        self._spool: IO[str] | None = open_text_spool()
+        self._has_fragments = False
+
+    def write(self, fragment: str) -> None:
+        """Append a fragment to the spool, separated like ``html_content()``."""
+        if self._spool is None:
+            raise ValueError("write to a closed content sink")
+        if self._has_fragments:
+            self._spool.write("\n")
+        self._spool.write(fragment)
+        self._has_fragments = True
+
+    def close(self, ctx: HandlerContext) -> None:
+        """Write the document to the target and remove the spool.
+
+        Args:
+            ctx: Context providing the template options and result handlers.
+
+        Returns:
+            None.
+
+        Raises:
+            OSError: If the destination cannot be written.
+        """
+        spool = self._spool
+        if spool is None:
+            return
+        self._spool = None
+
+        with spool:
+            spool.seek(0)
+            chunks = iter_text_chunks(spool)
+            for handler in ctx.options.context_result_handlers:
+                chunks = handler.handle_stream(chunks, ctx=ctx)
+
+            header, footer = (
+                render_html_template_parts(ctx.options)
+                if self._full_document
+                else ("", "")
+            )
+            if isinstance(self._target, (str, os.PathLike)):
+                with open(self._target, "w", encoding="utf-8") as output:
+                    self._write_document(output, header, chunks, footer)
+            else:
+                self._write_document(self._target, header, chunks, footer)
+
+    @staticmethod
+    def _write_document(
+        output: IO[str], header: str, chunks: Iterable[str], footer: str
+    ) -> None:
+        output.write(header)
+        for chunk in chunks:
+            output.write(chunk)
+        output.write(footer)
+
+
 __all__ = [
+    "ContentSink",
     "DefaultTocPageNumberResolver",
     "DocumentExporter",
     "HtmlDocumentExporter",
+    "HtmlStreamSink",
     "TocPageNumberResolver",
 ]
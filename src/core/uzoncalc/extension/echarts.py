@@ -1,10 +1,72 @@
+from array import array
 from uuid import uuid4
 
 from ..context_utils.doc import head
 from ..context_utils.elements import LabelKind, create_auto_label, h
 from ..globals import get_current_instance
+import base64
 import itertools
 import json
+import math
+import sys
+from typing import Literal
+
+# 紧凑编码时，元素数量不少于该值的数值数组才编码为 typed array
+TYPED_ARRAY_MIN_LENGTH = 64
+
+# typed array 的标记键，由图表脚本中的解码函数识别
+_TYPED_ARRAY_KEY = "__uzoncalc_typed__"
+
+_TYPED_CODES = {"float64": "d", "float32": "f"}
+
+# 将 typed array 标记还原为普通数组；只遍历普通对象与数组，
+# 不改动 Javascript 片段生成的函数、渐变等对象
+_DECODE_TYPED_JS = """
+            window.__uzoncalcDecodeTyped = window.__uzoncalcDecodeTyped || function decode(value) {
+                if (Array.isArray(value)) {
+                    return value.map(decode);
+                }
+                if (
+                    value === null
+                    || typeof value !== "object"
+                    || Object.getPrototypeOf(value) !== Object.prototype
+                ) {
+                    return value;
+                }
+                if (!("__uzoncalc_typed__" in value)) {
+                    const result = {};
+                    for (const key in value) {
+                        result[key] = decode(value[key]);
+                    }
+                    return result;
+                }
+                const binary = atob(value.data);
+                const bytes = new Uint8Array(binary.length);
+                for (let i = 0; i < binary.length; i++) {
+                    bytes[i] = binary.charCodeAt(i);
+                }
+                const flat = value.__uzoncalc_typed__ === "float32"
+                    ? new Float32Array(bytes.buffer)
+                    : new Float64Array(bytes.buffer);
+                // NaN 表示缺失值，还原为 null
+                const item = (i) => (Number.isNaN(flat[i]) ? null : flat[i]);
+                const width = value.shape.length > 1 ? value.shape[1] : 0;
+                const result = new Array(value.shape[0]);
+                for (let row = 0; row < value.shape[0]; row++) {
+                    if (width === 0) {
+                        result[row] = item(row);
+                        continue;
+                    }
+                    const values = new Array(width);
+                    for (let col = 0; col < width; col++) {
+                        values[col] = item(row * width + col);
+                    }
+                    result[row] = values;
+                }
+                return result;
+            };
+            const decodeTyped = window.__uzoncalcDecodeTyped;
+"""
 
 
 class Javascript:
@@ -14,6 +76,225 @@ class Javascript:
         self.code = code
 
 
+def _ndarray_type():
+    # numpy 为可选依赖，仅在已导入时识别 ndarray
+    numpy = sys.modules.get("numpy")
+    return None if numpy is None else numpy.ndarray
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _encode_numpy(value):
+    """将 numpy 数组与标量转换为可 JSON 序列化的值，非 numpy 对象返回 None。"""
+    numpy = sys.modules.get("numpy")
+    if numpy is None:
+        return None
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    return None
+
+
+def _typed_marker(values, encoding: str, shape: list[int]) -> dict:
+    buffer = array(_TYPED_CODES[encoding], values)
+    # JS typed array 使用小端字节序
+    if sys.byteorder == "big":
+        buffer.byteswap()
+    return {
+        _TYPED_ARRAY_KEY: encoding,
+        "shape": shape,
+        "data": base64.b64encode(buffer.tobytes()).decode("ascii"),
+    }
+
+
+def _typed_array(value, encoding: str) -> dict | None:
+    """将一维数值数组或等宽的二维数值数组编码为 typed array 标记。
+
+    缺失值（None）编码为 NaN；不满足条件时返回 None。
+    """
+    ndarray = _ndarray_type()
+    if ndarray is not None and isinstance(value, ndarray):
+        if (
+            value.dtype.kind not in "iuf"
+            or value.ndim not in (1, 2)
+            or value.size < TYPED_ARRAY_MIN_LENGTH
+        ):
+            return None
+        dtype = "<f8" if encoding == "float64" else "<f4"
+        data = value.astype(dtype, copy=False).tobytes()
+        return {
+            _TYPED_ARRAY_KEY: encoding,
+            "shape": list(value.shape),
+            "data": base64.b64encode(data).decode("ascii"),
+        }
+
+    if not value:
+        return None
+
+    first = value[0]
+    if first is None or _is_number(first):
+        if len(value) < TYPED_ARRAY_MIN_LENGTH:
+            return None
+        if not all(item is None or _is_number(item) for item in value):
+            return None
+        flat = [math.nan if item is None else item for item in value]
+        return _typed_marker(flat, encoding, [len(value)])
+
+    if not isinstance(first, (list, tuple)) or not first:
+        return None
+    width = len(first)
+    if len(value) * width < TYPED_ARRAY_MIN_LENGTH:
+        return None
+    flat = []
+    for row in value:
+        if not isinstance(row, (list, tuple)) or len(row) != width:
+            return None
+        for item in row:
+            if item is None:
+                flat.append(math.nan)
+            elif _is_number(item):
+                flat.append(item)
+            else:
+                return None
+    return _typed_marker(flat, encoding, [len(value), width])
+
+
+def _compact_options(value, encoding: str):
+    """返回将数值数组替换为 typed array 标记后的配置项副本。"""
+    if isinstance(value, dict):
+        return {key: _compact_options(item, encoding) for key, item in value.items()}
+
+    ndarray = _ndarray_type()
+    is_ndarray = ndarray is not None and isinstance(value, ndarray)
+    if isinstance(value, (list, tuple)) or is_ndarray:
+        encoded = _typed_array(value, encoding)
+        if encoded is not None:
+            return encoded
+        if is_ndarray:
+            value = value.tolist()
+        return [_compact_options(item, encoding) for item in value]
+
+    return value
+
+
+def lttb_indices(xs: list[float], ys: list[float], threshold: int) -> list[int]:
+    """
+    使用 Largest-Triangle-Three-Buckets 算法选取降采样后保留的点
+
+    首尾两点始终保留，其余点分为 threshold - 2 个桶，
+    每个桶中保留与前一个保留点、下一桶均值点构成三角形面积最大的点；
+    NaN 等非有限值视为缺失，不参与均值与选点
+
+    Args:
+        xs: 各点的 x 坐标
+        ys: 各点的 y 坐标
+        threshold: 保留的点数
+
+    Returns:
+        按顺序排列的保留点下标
+    """
+    length = len(xs)
+    if threshold >= length or threshold < 3:
+        return list(range(length))
+
+    # 缺失值（NaN）与无穷值不参与均值计算与选点，也不会作为下一桶的锚点
+    valid = [math.isfinite(x) and math.isfinite(y) for x, y in zip(xs, ys)]
+    indices = [0]
+    bucket_size = (length - 2) / (threshold - 2)
+    selected = 0 if valid[0] else next((i for i in range(length) if valid[i]), 0)
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # 下一个桶的均值点，最后一个桶以末点代替
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+        if next_start >= next_end:
+            next_start, next_end = length - 1, length
+        ax, ay = xs[selected], ys[selected]
+        next_points = [i for i in range(next_start, next_end) if valid[i]]
+        if next_points:
+            avg_x = sum(xs[i] for i in next_points) / len(next_points)
+            avg_y = sum(ys[i] for i in next_points) / len(next_points)
+        else:
+            # 下一桶全为缺失值时，以锚点高度的水平线代替
+            avg_x, avg_y = xs[next_end - 1], ay
+
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            if not valid[index]:
+                continue
+            area = abs(
+                (ax - avg_x) * (ys[index] - ay) - (ax - xs[index]) * (avg_y - ay)
+            )
+            if area > best_area:
+                best, best_area = index, area
+        # 整个桶都是缺失值时保留首个点作为断点，锚点保持不变
+        if best_area >= 0:
+            selected = best
+        indices.append(best)
+
+    indices.append(length - 1)
+    return indices
+
+
+def _downsample_data(data, max_points: int):
+    """对 [x, y, ...] 形式的数值序列数据做 LTTB 降采样，不适用时原样返回。"""
+    ndarray = _ndarray_type()
+    is_ndarray = ndarray is not None and isinstance(data, ndarray)
+    if is_ndarray:
+        if data.ndim != 2 or data.shape[1] < 2 or data.dtype.kind not in "iuf":
+            return data
+        if len(data) <= max_points:
+            return data
+        xs = data[:, 0].astype(float).tolist()
+        ys = data[:, 1].astype(float).tolist()
+    else:
+        if not isinstance(data, (list, tuple)) or len(data) <= max_points:
+            return data
+        xs, ys = [], []
+        for row in data:
+            if (
+                not isinstance(row, (list, tuple))
+                or len(row) < 2
+                or not _is_number(row[0])
+                or not (row[1] is None or _is_number(row[1]))
+            ):
+                return data
+            xs.append(row[0])
+            # 缺失值记为 NaN，由 lttb_indices 排除在选点之外
+            ys.append(math.nan if row[1] is None else row[1])
+
+    indices = lttb_indices(xs, ys, max_points)
+    if is_ndarray:
+        return data[indices]
+    return [data[index] for index in indices]
+
+
+def _downsample_options(options: dict, max_points: int) -> dict:
+    """返回对 series[*].data 降采样后的配置项浅拷贝。"""
+    series = options.get("series")
+    if series is None:
+        return options
+
+    def downsample(item):
+        if not isinstance(item, dict) or "data" not in item:
+            return item
+        data = _downsample_data(item["data"], max_points)
+        if data is item["data"]:
+            return item
+        return {**item, "data": data}
+
+    if isinstance(series, dict):
+        series = downsample(series)
+    else:
+        series = [downsample(item) for item in series]
+    return {**options, "series": series}
+
+
 def use_echarts():
     """
     添加 ECharts 支持
@@ -43,14 +324,25 @@ def echart(
     width: str = "100%",
     height: str = "400px",
     use_gl: bool = False,
+    *,
+    encoding: Literal["json", "float64", "float32"] = "json",
+    max_points: int | None = None,
 ) -> str:
     """
     生成 ECharts 图表的 HTML 代码
 
     Args:
-        options: ECharts 配置项，字典形式
+        options: ECharts 配置项，字典形式，数据可以是列表或 numpy 数组
         width: 图表宽度，默认为 "100%"
         height: 图表高度，默认为 "400px"
+        encoding: 数据的编码方式
+            "json": 按普通 JSON 输出
+            "float64"/"float32": 数值数组以 base64 编码的 typed array 输出，
+                由图表脚本在浏览器端解码，可显著减小大数据量图表的 HTML 体积；
+                "float32" 体积更小，但精度约为 7 位有效数字
+        max_points: series[*].data 为 [x, y, ...] 数值点列时，
+            超过该点数则使用 LTTB 算法降采样到该点数，首尾点始终保留；
+            一维数据没有 x 坐标，不做处理（可使用 ECharts 的 sampling: "lttb"）
 
     Returns:
         包含 ECharts 图表的 HTML 字符串
@@ -61,6 +353,15 @@ def echart(
     if use_gl:
         use_echarts_gl()
 
+    if encoding not in ("json", *_TYPED_CODES):
+        raise ValueError(f"Unsupported encoding: {encoding!r}")
+
+    if max_points is not None:
+        options = _downsample_options(options, max_points)
+
+    if encoding != "json":
+        options = _compact_options(options, encoding)
+
     raw_js_placeholders: dict[str, str] = {}
     # 从 1 开始的计数器，用于生成唯一的占位符
     raw_js_counter = itertools.count(1)
@@ -71,6 +372,10 @@ def echart(
             raw_js_placeholders[json.dumps(token)] = value.code
             return token
 
+        encoded = _encode_numpy(value)
+        if encoded is not None:
+            return encoded
+
         raise TypeError(
             f"Object of type {type(value).__name__} is not JSON serializable"
         )
@@ -85,10 +390,16 @@ def echart(
     # 随机唯一 ID，确保多个图表不会冲突
     container_id = f"echart-container-{uuid4().hex[:8]}"
 
+    decoder_js = ""
+    set_option_arg = options_json
+    if encoding != "json":
+        decoder_js = _DECODE_TYPED_JS
+        set_option_arg = f"decodeTyped({options_json})"
+
     return f"""
 <figure id="{container_id}" style="width: {width}; height: {height};" class="break-inside-avoid">
     <script>
-        (function() {{
+        (function() {{{decoder_js}
             const dom = document.getElementById("{container_id}");
             let chart = null;
             let resizeObserver = null;
@@ -107,7 +418,7 @@ def echart(
                     chart = echarts.init(dom);
                 }}
 
-                chart.setOption({options_json});
+                chart.setOption({set_option_arg});
 
                 if (typeof ResizeObserver !== 'undefined' && !resizeObserver) {{
                     resizeObserver = new ResizeObserver(function () {{
@@ -132,6 +443,9 @@ def EChart(
     height: str = "400px",
     use_gl: bool = False,
     caption: str = "",
+    *,
+    encoding: Literal["json", "float64", "float32"] = "json",
+    max_points: int | None = None,
 ) -> str:
     """
     生成 ECharts 图表的 HTML 代码，作为新版本的接口
@@ -140,6 +454,8 @@ def EChart(
         options: ECharts 配置项，字典形式
         width: 图表宽度，默认为 "100%"
         height: 图表高度，默认为 "400px"
+        encoding: 数据的编码方式，见 echart()
+        max_points: 降采样保留的最大点数，见 echart()
 
     Returns:
         返回图表的引用 HTML 字符串
@@ -150,7 +466,14 @@ def EChart(
         h(
             "figure",
             [
-                echart(options, width, height, use_gl=use_gl),
+                echart(
+                    options,
+                    width,
+                    height,
+                    use_gl=use_gl,
+                    encoding=encoding,
+                    max_points=max_points,
+                ),
                 h(
                     "figcaption",
                     [label.source_html(), caption],
@@ -1,7 +1,17 @@
-from typing import Any, Optional
+import bisect
+import os
+import threading
+from typing import Any, Iterable, Literal, Mapping, NamedTuple, Optional
 
+from ..cache.lru import BoundedLRUCache
 from ..optional_dependencies import missing_optional_dependency
 from ..startup import get_current_instance
+from .excel_formula import FormulaModel, UnsupportedFormulaError
+
+# 同一进程中最多保持打开的工作簿数量，超出时关闭最久未使用的工作簿
+DEFAULT_WORKBOOK_CACHE_SIZE = 8
+
+_MERGE_CELL_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}mergeCell"
 
 
 def get_excel_table(
@@ -9,6 +19,8 @@ def get_excel_table(
     range: str,
     values: dict[str, Any] | None = None,
     cache: bool = True,
+    include_styles: bool = True,
+    engine: Literal["auto", "python", "excel"] = "auto",
 ) -> str:
     """
     截取 Excel 表格的指定范围并转换为 HTML
@@ -17,6 +29,11 @@ def get_excel_table(
         excel_path: Excel 文件路径
         values: 要更新的值，字典格式 {'A1': value1, 'Sheet1!B2': value2}
         range: 要截取的范围，支持 'A1:E10' 或 'Sheet1!A1:E10' 格式
+        cache: 是否把结果保存到上下文数据库供后续运行复用，文件变化后自动失效
+        include_styles: 是否包含样式；为 False 时以只读流式方式加载工作簿
+        engine: 传入 values 时的重算方式。"python" 在进程内重算公式，不修改原文件；
+            "excel" 通过 xlwings 写入文件并由 Excel 重算；
+            "auto" 优先使用 "python"，遇到不支持的公式时改用 "excel"
 
     Returns:
         HTML table 字符串
@@ -28,56 +45,64 @@ def get_excel_table(
         ...     'Sheet2!A1:C10'
         ... )
     """
+    if engine not in ("auto", "python", "excel"):
+        raise ValueError(f"Unknown engine: {engine!r}")
 
     ctx = get_current_instance()
     json_db = ctx.get_json_db()
 
-    key_obj = (excel_path, range, values)
+    def cache_key() -> tuple:
+        # 传入 values 时结果取决于重算引擎，两种引擎的结果不能互相复用
+        return (
+            excel_path,
+            range,
+            values,
+            include_styles,
+            engine if values else None,
+            _file_signature(excel_path),
+        )
+
+    key_obj = cache_key()
     if cache:
         # 判断是否有缓存
         cached_html = json_db.get(key_obj, None)
         if cached_html is not None:
             return cached_html
 
-    # 使用 xlwings 更新值并计算公式
-    if values:
-        try:
-            import xlwings as xw
-        except ImportError as exc:
-            raise missing_optional_dependency("excel", exc) from exc
-
-        # Linux 等无 Excel 引擎环境中，xlwings 无法创建 App。
-        if xw.engines.active is None:
-            return "No Excel/xlwings engine available. Please install Excel/xlwings and try again."
+    # 解析导出范围，提取工作表名称
+    sheet_name = None
+    range_address = range
+    if "!" in range:
+        sheet_name, range_address = range.split("!", 1)
 
-        app = xw.App(visible=False)
-        try:
-            wb = app.books.open(excel_path)
-            # 更新值
-            for cell_address, value in values.items():
-                # 解析单元格地址，支持 'Sheet1!A1' 格式
-                if "!" in cell_address:
-                    sheet_name_val, cell_ref = cell_address.split("!", 1)
-                    wb.sheets[sheet_name_val].range(cell_ref).value = value
-                else:
-                    wb.sheets[0].range(cell_address).value = value
-            # 保存并关闭（会自动计算公式）
-            wb.save()
-            wb.close()
-        finally:
-            app.quit()
+    overrides = None
+    if values:
+        if engine != "excel":
+            try:
+                recalculation = _load_formula_model(excel_path).recalculate(values)
+                overrides = recalculation.values_in(sheet_name, range_address)
+            except UnsupportedFormulaError:
+                if engine == "python":
+                    raise
+
+        if overrides is None:
+            # 使用 xlwings 更新值并计算公式
+            error = _recalculate_with_excel(excel_path, values)
+            if error is not None:
+                return error
+
+            # 写入后文件已变化，按新文件保存结果
+            key_obj = cache_key()
 
     # 使用 openpyxl 读取计算后的值并转换为 HTML
     processor = ExcelProcessor(excel_path)
     try:
-        # 解析导出范围，提取工作表名称
-        sheet_name = None
-        range_address = range
-        if "!" in range:
-            sheet_name, range_address = range.split("!", 1)
-
-        processor.load(sheet_name=sheet_name, data_only=True)
-        html = processor.range_to_html(range_address, include_styles=True)
+        processor.load(
+            sheet_name=sheet_name, data_only=True, read_only=not include_styles
+        )
+        html = processor.range_to_html(
+            range_address, include_styles=include_styles, overrides=overrides
+        )
 
         # 将结果保存到缓存
         if cache:
@@ -88,6 +113,248 @@ def get_excel_table(
         processor.close()
 
 
+def _recalculate_with_excel(excel_path: str, values: dict[str, Any]) -> Optional[str]:
+    """
+    通过 xlwings 写入值并由 Excel 重算、保存
+
+    Returns:
+        没有可用的 Excel 引擎时返回提示信息，否则返回 None
+    """
+    try:
+        import xlwings as xw
+    except ImportError as exc:
+        raise missing_optional_dependency("excel", exc) from exc
+
+    # Linux 等无 Excel 引擎环境中，xlwings 无法创建 App。
+    if xw.engines.active is None:
+        return "No Excel/xlwings engine available. Please install Excel/xlwings and try again."
+
+    # 写入前关闭缓存中的工作簿，释放文件句柄
+    _discard_workbooks(excel_path)
+
+    app = xw.App(visible=False)
+    try:
+        wb = app.books.open(excel_path)
+        # 更新值
+        for cell_address, value in values.items():
+            # 解析单元格地址，支持 'Sheet1!A1' 格式
+            if "!" in cell_address:
+                sheet_name_val, cell_ref = cell_address.split("!", 1)
+                wb.sheets[sheet_name_val].range(cell_ref).value = value
+            else:
+                wb.sheets[0].range(cell_address).value = value
+        # 保存并关闭（会自动计算公式）
+        wb.save()
+        wb.close()
+    finally:
+        app.quit()
+    return None
+
+
+class MergedRange(NamedTuple):
+    """合并区域的行列边界（均包含）"""
+
+    min_row: int
+    min_col: int
+    max_row: int
+    max_col: int
+
+
+class MergedRangeIndex:
+    """
+    合并区域的区间索引
+
+    按起始行排序保存合并区域，查询时只检查可能与目标范围相交的区域，
+    并只展开目标范围内的单元格。
+    """
+
+    def __init__(self, ranges: Iterable[MergedRange]):
+        self._ranges = sorted(ranges)
+        self._min_rows = [merged.min_row for merged in self._ranges]
+        # 前缀最大结束行：其值小于目标起始行的区域都在目标范围之上
+        self._max_rows: list[int] = []
+        max_row = 0
+        for merged in self._ranges:
+            max_row = max(max_row, merged.max_row)
+            self._max_rows.append(max_row)
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def cells_in(
+        self, min_row: int, min_col: int, max_row: int, max_col: int
+    ) -> dict[tuple[int, int], dict[str, Any]]:
+        """
+        获取目标范围内合并单元格的映射
+
+        Returns:
+            与 ExcelProcessor.get_merged_cells_map 格式相同的字典，只包含目标范围内的单元格
+        """
+        merged_map: dict[tuple[int, int], dict[str, Any]] = {}
+        # 起始行在目标范围之下的区域不可能相交
+        end = bisect.bisect_right(self._min_rows, max_row)
+        start = bisect.bisect_left(self._max_rows, min_row, 0, end)
+        for merged in self._ranges[start:end]:
+            if (
+                merged.max_row < min_row
+                or merged.max_col < min_col
+                or merged.min_col > max_col
+            ):
+                continue
+
+            main_cell = (merged.min_row, merged.min_col)
+            rowspan = merged.max_row - merged.min_row + 1
+            colspan = merged.max_col - merged.min_col + 1
+            for row in range(
+                max(merged.min_row, min_row), min(merged.max_row, max_row) + 1
+            ):
+                for col in range(
+                    max(merged.min_col, min_col), min(merged.max_col, max_col) + 1
+                ):
+                    merged_map[(row, col)] = {
+                        "main_cell": main_cell,
+                        "rowspan": rowspan,
+                        "colspan": colspan,
+                        "is_main": (row, col) == main_cell,
+                    }
+        return merged_map
+
+
+class _CachedWorkbook:
+    """缓存的工作簿及其各工作表的合并区域索引"""
+
+    def __init__(self, workbook: Any, read_only: bool):
+        self.workbook = workbook
+        self.read_only = read_only
+        self._merged_indexes: dict[str, MergedRangeIndex] = {}
+        self._lock = threading.Lock()
+
+    def merged_index(self, worksheet: Any) -> MergedRangeIndex:
+        with self._lock:
+            index = self._merged_indexes.get(worksheet.title)
+            if index is None:
+                index = MergedRangeIndex(_read_merged_ranges(worksheet, self.read_only))
+                self._merged_indexes[worksheet.title] = index
+            return index
+
+
+def _close_cached_workbook(key: tuple, entry: _CachedWorkbook) -> None:
+    entry.workbook.close()
+
+
+# 已加载工作簿的 LRU 缓存，进程内所有上下文共享
+# 键包含文件的绝对路径、修改时间与大小，文件变化后不会命中旧的工作簿，
+# 因此保存新版本时立即关闭同一文件的旧版本（见 _cache_workbook）。
+# 只缓存完整加载的工作簿：它们读入内存后即关闭文件，
+# 只读工作簿在关闭前一直占用文件句柄（Windows 上会阻止 Excel 保存该文件）。
+_WORKBOOK_CACHE: BoundedLRUCache[tuple, _CachedWorkbook] = BoundedLRUCache(
+    DEFAULT_WORKBOOK_CACHE_SIZE, on_evict=_close_cached_workbook
+)
+
+# 已解析的公式依赖图，与工作簿缓存使用相同的键与数量上限
+_FORMULA_MODELS: BoundedLRUCache[tuple, FormulaModel] = BoundedLRUCache(
+    DEFAULT_WORKBOOK_CACHE_SIZE
+)
+
+
+def clear_workbook_cache() -> None:
+    """关闭并移除所有缓存的工作簿及其公式依赖图"""
+    _WORKBOOK_CACHE.clear()
+    _FORMULA_MODELS.clear()
+
+
+def set_workbook_cache_size(maxsize: int) -> None:
+    """设置最多缓存的工作簿数量，0 表示不缓存"""
+    _WORKBOOK_CACHE.resize(maxsize)
+    _FORMULA_MODELS.resize(maxsize)
+
+
+def _cache_workbook(key: tuple, entry: _CachedWorkbook) -> bool:
+    """保存工作簿并关闭同一文件的旧版本；缓存被禁用时返回 False，由调用方负责关闭"""
+    _WORKBOOK_CACHE.remove_if(lambda k: k[0] == key[0] and k[1] != key[1])
+    return _WORKBOOK_CACHE.put(key, entry)
+
+
+def _discard_workbooks(excel_path: str) -> None:
+    """关闭并移除指定文件的所有工作簿及其公式依赖图"""
+    path = os.path.abspath(excel_path)
+    _WORKBOOK_CACHE.remove_if(lambda key: key[0] == path)
+    _FORMULA_MODELS.remove_if(lambda key: key[0] == path)
+
+
+def _load_formula_model(excel_path: str) -> FormulaModel:
+    """获取工作簿的公式依赖图，文件未变化时复用"""
+    key = (os.path.abspath(excel_path), _file_signature(excel_path))
+    model = _FORMULA_MODELS.get(key)
+    if model is None:
+        model = FormulaModel.from_file(excel_path)
+        # 文件变化后旧版本的依赖图不会再命中
+        _FORMULA_MODELS.remove_if(lambda k: k[0] == key[0] and k != key)
+        _FORMULA_MODELS.put(key, model)
+    return model
+
+
+def _file_signature(excel_path: str) -> Optional[tuple[int, int]]:
+    """文件的修改时间与大小，文件不存在时返回 None"""
+    try:
+        stat = os.stat(excel_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_merged_ranges(worksheet: Any, read_only: bool) -> list[MergedRange]:
+    """读取工作表的全部合并区域"""
+    if not read_only:
+        return [
+            MergedRange(r.min_row, r.min_col, r.max_row, r.max_col)
+            for r in worksheet.merged_cells.ranges
+        ]
+
+    # 只读工作表不解析合并区域，直接从工作表 XML 中流式读取 mergeCell 元素
+    from lxml import etree
+    from openpyxl.utils import range_boundaries
+
+    ranges = []
+    source = worksheet._get_source()
+    try:
+        for _, element in etree.iterparse(source, tag=_MERGE_CELL_TAG):
+            min_col, min_row, max_col, max_row = range_boundaries(element.get("ref"))
+            ranges.append(MergedRange(min_row, min_col, max_row, max_col))
+            element.clear()
+    finally:
+        source.close()
+    return ranges
+
+
+def _cell_style_parts(cell) -> list[str]:
+    """提取单元格的对齐方式、字体与背景色样式"""
+    style_parts = []
+    # 添加对齐方式
+    if cell.alignment:
+        if cell.alignment.horizontal:
+            style_parts.append(f"text-align: {cell.alignment.horizontal}")
+        if cell.alignment.vertical:
+            style_parts.append(f"vertical-align: {cell.alignment.vertical}")
+
+    # 添加字体样式
+    if cell.font:
+        if cell.font.bold:
+            style_parts.append("font-weight: bold")
+        if cell.font.italic:
+            style_parts.append("font-style: italic")
+        if cell.font.color and cell.font.color.rgb:
+            rgb = str(cell.font.color.rgb)
+            style_parts.append(f"color: #{rgb[2:]}")
+
+    # 添加背景色
+    if cell.fill and cell.fill.start_color and cell.fill.start_color.rgb:
+        rgb = str(cell.fill.start_color.rgb)
+        if rgb != "00000000":  # 不是默认颜色
+            style_parts.append(f"background-color: #{rgb[2:]}")
+    return style_parts
+
+
 class ExcelProcessor:
     """
     Excel 处理器，用于读取 Excel 并转换为 HTML table，支持合并单元格和样式
@@ -103,62 +370,96 @@ class ExcelProcessor:
         self.excel_path = excel_path
         self.workbook = None
         self.worksheet = None
-
-    def load(self, sheet_name: Optional[str] = None, data_only: bool = True):
+        self._cached: Optional[_CachedWorkbook] = None
+
+    def load(
+        self,
+        sheet_name: Optional[str] = None,
+        data_only: bool = True,
+        read_only: bool = False,
+    ):
         """
-        加载 Excel 文件
+        加载 Excel 文件，文件未变化时复用已加载的工作簿
 
         Args:
             sheet_name: 工作表名称，如果为 None 则使用第一个工作表
             data_only: 如果为 True，则读取公式的计算值；如果为 False，则读取公式本身
+            read_only: 如果为 True，则以只读流式方式加载，不读取样式；
+                只读工作簿不进入进程级缓存，在 close() 时关闭并释放文件
         """
         try:
             from openpyxl import load_workbook
         except ImportError as exc:
             raise missing_optional_dependency("excel", exc) from exc
 
-        self.workbook = load_workbook(self.excel_path, data_only=data_only)
+        key = (
+            os.path.abspath(self.excel_path),
+            _file_signature(self.excel_path),
+            data_only,
+            read_only,
+        )
+        cached = None if read_only else _WORKBOOK_CACHE.get(key)
+        if cached is None:
+            workbook = load_workbook(
+                self.excel_path, data_only=data_only, read_only=read_only
+            )
+            cached = _CachedWorkbook(workbook, read_only)
+            if read_only or not _cache_workbook(key, cached):
+                # 只读或缓存被禁用，工作簿由本处理器持有并在 close() 时关闭
+                cached = None
+                self.workbook = workbook
+
+        if cached is not None:
+            self._cached = cached
+            self.workbook = cached.workbook
+
         if sheet_name:
             self.worksheet = self.workbook[sheet_name]
         else:
             self.worksheet = self.workbook.active
         return self
 
-    def get_merged_cells_map(self):
+    def get_merged_cells_map(
+        self, bounds: Optional[tuple[int, int, int, int]] = None
+    ):
         """
         获取合并单元格的映射
 
+        Args:
+            bounds: (min_row, min_col, max_row, max_col)，只返回该范围内的单元格；
+                为 None 时返回整个工作表
+
         Returns:
             字典，键为合并单元格中的每个单元格坐标，值为合并区域的主单元格坐标
         """
         if not self.worksheet:
             raise ValueError("请先调用 load() 方法加载工作表")
 
-        merged_map = {}
-        for merged_range in self.worksheet.merged_cells.ranges:
-            # 获取合并区域的主单元格（左上角单元格）
-            min_row, min_col = merged_range.min_row, merged_range.min_col
-            main_cell = (min_row, min_col)
-
-            # 将合并区域内的所有单元格都映射到主单元格
-            for row in range(merged_range.min_row, merged_range.max_row + 1):
-                for col in range(merged_range.min_col, merged_range.max_col + 1):
-                    merged_map[(row, col)] = {
-                        "main_cell": main_cell,
-                        "rowspan": merged_range.max_row - merged_range.min_row + 1,
-                        "colspan": merged_range.max_col - merged_range.min_col + 1,
-                        "is_main": (row == min_row and col == min_col),
-                    }
-
-        return merged_map
-
-    def range_to_html(self, range_address: str, include_styles: bool = True) -> str:
+        if self._cached is not None:
+            index = self._cached.merged_index(self.worksheet)
+        else:
+            index = MergedRangeIndex(
+                _read_merged_ranges(self.worksheet, self.workbook.read_only)
+            )
+
+        if bounds is None:
+            # Excel 的最大行数与列数
+            bounds = (1, 1, 1048576, 16384)
+        return index.cells_in(*bounds)
+
+    def range_to_html(
+        self,
+        range_address: str,
+        include_styles: bool = True,
+        overrides: Optional[Mapping[tuple[int, int], Any]] = None,
+    ) -> str:
         """
         将指定范围转换为 HTML table
 
         Args:
             range_address: 范围地址，如 'A1:E10'
             include_styles: 是否包含样式（边框、对齐等）
+            overrides: 替换单元格的值，键为 (行, 列)，如重算后的结果
 
         Returns:
             HTML table 字符串
@@ -166,17 +467,22 @@ class ExcelProcessor:
         if not self.worksheet:
             raise ValueError("请先调用 load() 方法加载工作表")
 
+        from openpyxl.utils import range_boundaries
+
         # 解析范围
-        cell_range = self.worksheet[range_address]
+        min_col, min_row, max_col, max_row = range_boundaries(range_address)
 
-        # 获取合并单元格映射
-        merged_map = self.get_merged_cells_map()
+        # 只获取目标范围内的合并单元格映射
+        merged_map = self.get_merged_cells_map((min_row, min_col, max_row, max_col))
 
         # 开始构建 HTML
         html_parts = ['<table border="1" style="border-collapse: collapse;">']
 
-        # 遍历范围内的行
-        for row_idx, row in enumerate(cell_range):
+        # 遍历范围内的行；只读模式下的空单元格没有坐标，按位置计算
+        rows = self.worksheet.iter_rows(
+            min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col
+        )
+        for row_idx, row in enumerate(rows):
             html_parts.append("  <tr>")
 
             # 遍历行中的单元格
@@ -184,8 +490,9 @@ class ExcelProcessor:
                 if cell is None:
                     continue
 
-                cell_coord = (cell.row, cell.column)
+                cell_coord = (min_row + row_idx, min_col + col_idx)
 
+                rowspan_attr = colspan_attr = ""
                 # 检查是否是合并单元格
                 if cell_coord in merged_map:
                     merge_info = merged_map[cell_coord]
@@ -197,90 +504,21 @@ class ExcelProcessor:
                     # 如果是主单元格，添加 rowspan 和 colspan
                     rowspan = merge_info["rowspan"]
                     colspan = merge_info["colspan"]
-
-                    style_parts = []
-                    if include_styles:
-                        # 添加对齐方式
-                        if cell.alignment:
-                            if cell.alignment.horizontal:
-                                style_parts.append(
-                                    f"text-align: {cell.alignment.horizontal}"
-                                )
-                            if cell.alignment.vertical:
-                                style_parts.append(
-                                    f"vertical-align: {cell.alignment.vertical}"
-                                )
-
-                        # 添加字体样式
-                        if cell.font:
-                            if cell.font.bold:
-                                style_parts.append("font-weight: bold")
-                            if cell.font.italic:
-                                style_parts.append("font-style: italic")
-                            if cell.font.color and cell.font.color.rgb:
-                                rgb = str(cell.font.color.rgb)
-                                style_parts.append(f"color: #{rgb[2:]}")
-
-                        # 添加背景色
-                        if (
-                            cell.fill
-                            and cell.fill.start_color
-                            and cell.fill.start_color.rgb
-                        ):
-                            rgb = str(cell.fill.start_color.rgb)
-                            if rgb != "00000000":  # 不是默认颜色
-                                style_parts.append(f"background-color: #{rgb[2:]}")
-
-                    style_attr = (
-                        f' style="{"; ".join(style_parts)}"' if style_parts else ""
-                    )
                     rowspan_attr = f' rowspan="{rowspan}"' if rowspan > 1 else ""
                     colspan_attr = f' colspan="{colspan}"' if colspan > 1 else ""
 
-                    value = cell.value if cell.value is not None else ""
-                    html_parts.append(
-                        f"    <td{rowspan_attr}{colspan_attr}{style_attr}>{value}</td>"
-                    )
-                else:
-                    # 普通单元格
-                    style_parts = []
-                    if include_styles:
-                        # 添加对齐方式
-                        if cell.alignment:
-                            if cell.alignment.horizontal:
-                                style_parts.append(
-                                    f"text-align: {cell.alignment.horizontal}"
-                                )
-                            if cell.alignment.vertical:
-                                style_parts.append(
-                                    f"vertical-align: {cell.alignment.vertical}"
-                                )
-
-                        # 添加字体样式
-                        if cell.font:
-                            if cell.font.bold:
-                                style_parts.append("font-weight: bold")
-                            if cell.font.italic:
-                                style_parts.append("font-style: italic")
-                            if cell.font.color and cell.font.color.rgb:
-                                rgb = str(cell.font.color.rgb)
-                                style_parts.append(f"color: #{rgb[2:]}")
-
-                        # 添加背景色
-                        if (
-                            cell.fill
-                            and cell.fill.start_color
-                            and cell.fill.start_color.rgb
-                        ):
-                            rgb = str(cell.fill.start_color.rgb)
-                            if rgb != "00000000":  # 不是默认颜色
-                                style_parts.append(f"background-color: #{rgb[2:]}")
-
-                    style_attr = (
-                        f' style="{"; ".join(style_parts)}"' if style_parts else ""
-                    )
-                    value = cell.value if cell.value is not None else ""
-                    html_parts.append(f"    <td{style_attr}>{value}</td>")
+                style_parts = _cell_style_parts(cell) if include_styles else []
+                style_attr = (
+                    f' style="{"; ".join(style_parts)}"' if style_parts else ""
+                )
+                value = cell.value
+                if overrides and cell_coord in overrides:
+                    value = overrides[cell_coord]
+                if value is None:
+                    value = ""
+                html_parts.append(
+                    f"    <td{rowspan_attr}{colspan_attr}{style_attr}>{value}</td>"
+                )
 
             html_parts.append("  </tr>")
 
@@ -288,8 +526,9 @@ class ExcelProcessor:
         return "\n".join(html_parts)
 
     def close(self):
-        """关闭工作簿"""
-        if self.workbook:
+        """关闭工作簿；缓存中的工作簿保持打开，供后续加载复用"""
+        if self.workbook and self._cached is None:
             self.workbook.close()
-            self.workbook = None
-            self.worksheet = None
+        self.workbook = None
+        self.worksheet = None
+        self._cached = None
@@ -0,0 +1,1224 @@
+"""
+Excel 公式的纯 Python 重算引擎
+
+从工作簿中解析公式并建立依赖图，修改输入值后只按依赖顺序重算受影响的单元格，
+不需要 Excel 应用，也不会修改原文件。仅支持常用的运算符与函数，
+遇到不支持的公式时抛出 UnsupportedFormulaError。
+"""
+
+import math
+import numbers
+import re
+from collections import deque
+from itertools import chain
+from datetime import date, datetime, time, timedelta
+from decimal import ROUND_DOWN, ROUND_HALF_UP, ROUND_UP, Decimal
+from inspect import signature
+from typing import Any, Callable, Iterable, Iterator, Mapping, NamedTuple, Optional
+
+from ..optional_dependencies import missing_optional_dependency
+
+# Excel 工作表的最大行数与列数
+MAX_ROW = 1048576
+MAX_COL = 16384
+
+# 跨越列数不超过该值的区域按列建立依赖索引，更宽的区域逐个检查
+_COLUMN_BUCKET_LIMIT = 64
+
+_REFERENCE_PATTERN = re.compile(
+    r"[A-Z]{1,3}[0-9]+(:[A-Z]{1,3}[0-9]+)?|[A-Z]{1,3}:[A-Z]{1,3}|[0-9]+:[0-9]+",
+    re.IGNORECASE,
+)
+
+CellKey = tuple[str, int, int]
+
+
+class UnsupportedFormulaError(ValueError):
+    """工作簿中的公式无法由纯 Python 引擎重算"""
+
+
+class ExcelError(str):
+    """Excel 错误值，如 #DIV/0!，作为单元格的值参与计算"""
+
+    __slots__ = ()
+
+
+DIV0 = ExcelError("#DIV/0!")
+NA = ExcelError("#N/A")
+NUM = ExcelError("#NUM!")
+REF = ExcelError("#REF!")
+VALUE = ExcelError("#VALUE!")
+
+
+class _Propagate(Exception):
+    """计算中遇到错误值，沿公式向外传递"""
+
+    def __init__(self, error: ExcelError):
+        super().__init__(error)
+        self.error = error
+
+
+class _Ref(NamedTuple):
+    sheet: str
+    min_row: int
+    min_col: int
+    max_row: int
+    max_col: int
+
+    def contains(self, sheet: str, row: int, col: int) -> bool:
+        return (
+            sheet == self.sheet
+            and self.min_row <= row <= self.max_row
+            and self.min_col <= col <= self.max_col
+        )
+
+
+class _Range:
+    """区域引用的值，按行保存"""
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: list[list[Any]]):
+        self.rows = rows
+
+    def values(self) -> Iterator[Any]:
+        return chain.from_iterable(self.rows)
+
+
+class _Formula:
+    """编译后的公式；无法编译时 evaluate 为 None，error 记录原因"""
+
+    __slots__ = ("text", "evaluate", "refs", "error", "volatile")
+
+    def __init__(
+        self,
+        text: str,
+        evaluate: Optional[Callable[["Recalculation"], Any]],
+        refs: list[_Ref],
+        error: Optional[str] = None,
+        volatile: bool = False,
+    ):
+        self.text = text
+        self.evaluate = evaluate
+        self.refs = refs
+        self.error = error
+        # 引用无法确定时，任何输入变化都视为可能影响该公式
+        self.volatile = volatile
+
+
+# region 值的转换
+
+
+def _num(value: Any) -> float | int:
+    """按 Excel 规则把值转换为数字"""
+    if isinstance(value, ExcelError):
+        raise _Propagate(value)
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            raise _Propagate(VALUE) from None
+    if isinstance(value, (datetime, date, time, timedelta)):
+        from openpyxl.utils.datetime import to_excel
+
+        return to_excel(value)
+    raise _Propagate(VALUE)
+
+
+def _int(value: Any) -> int:
+    return math.trunc(_num(value))
+
+
+def _text(value: Any) -> str:
+    """按 Excel 规则把值转换为文本"""
+    if isinstance(value, ExcelError):
+        raise _Propagate(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, str):
+        return value
+    if isinstance(value, numbers.Real):
+        number = _cell_result(value)
+        return str(number)
+    if isinstance(value, _Range):
+        raise _Propagate(VALUE)
+    return str(value)
+
+
+def _bool(value: Any) -> bool:
+    """按 Excel 规则把值转换为逻辑值"""
+    if isinstance(value, ExcelError):
+        raise _Propagate(value)
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, numbers.Real):
+        return value != 0
+    if isinstance(value, str):
+        upper = value.upper()
+        if upper in ("TRUE", "FALSE"):
+            return upper == "TRUE"
+    raise _Propagate(VALUE)
+
+
+def _type_rank(value: Any) -> int:
+    # Excel 比较不同类型时：数字 < 文本 < 逻辑值
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def _compare(left: Any, right: Any) -> int:
+    """比较两个值，返回 -1、0 或 1"""
+    for value in (left, right):
+        if isinstance(value, ExcelError):
+            raise _Propagate(value)
+        if isinstance(value, _Range):
+            raise _Propagate(VALUE)
+
+    # 空单元格按另一侧的类型取空值
+    if left is None:
+        left = _blank_like(right)
+    if right is None:
+        right = _blank_like(left)
+
+    left_rank, right_rank = _type_rank(left), _type_rank(right)
+    if left_rank != right_rank:
+        return -1 if left_rank < right_rank else 1
+    if left_rank == 1:
+        left, right = left.casefold(), right.casefold()
+    elif left_rank == 0:
+        left, right = _num(left), _num(right)
+    return (left > right) - (left < right)
+
+
+def _blank_like(value: Any) -> Any:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, str):
+        return ""
+    return 0
+
+
+def _cell_result(value: Any) -> Any:
+    """规范化公式结果，数字按 Excel 保留 15 位有效数字"""
+    if value is None:
+        return 0
+    if isinstance(value, _Range):
+        return VALUE
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+
+    value = float(value)
+    if math.isnan(value) or math.isinf(value):
+        return NUM
+    value = float(f"{value:.15g}")
+    if value.is_integer() and abs(value) < 2**53:
+        return int(value)
+    return value
+
+
+def _range_rows(value: Any) -> list[list[Any]]:
+    if isinstance(value, _Range):
+        return value.rows
+    return [[value]]
+
+
+# endregion
+
+
+# region 函数
+
+
+_FUNCTIONS: dict[str, Callable[..., Any]] = {}
+_LAZY_FUNCTIONS: dict[str, Callable[..., Any]] = {}
+
+
+def _function(*names: str, lazy: bool = False):
+    """注册函数；lazy 函数接收重算对象与未求值的参数"""
+
+    def decorator(func):
+        for name in names:
+            (_LAZY_FUNCTIONS if lazy else _FUNCTIONS)[name] = func
+        return func
+
+    return decorator
+
+
+def _numbers(args: tuple[Any, ...]) -> Iterator[float | int]:
+    """聚合函数的数字参数：区域中只取数字，直接给出的参数按数字转换"""
+    for arg in args:
+        if isinstance(arg, _Range):
+            for value in arg.values():
+                # 绝大多数单元格是 int 或 float，先按精确类型判断
+                value_type = type(value)
+                if value_type is float or value_type is int:
+                    yield value
+                elif value is None or value_type is bool:
+                    continue
+                elif isinstance(value, ExcelError):
+                    raise _Propagate(value)
+                elif isinstance(value, (datetime, date, time, timedelta)):
+                    yield _num(value)
+                elif isinstance(value, numbers.Real):
+                    yield value
+        else:
+            yield _num(arg)
+
+
+@_function("SUM")
+def _sum(*args):
+    return math.fsum(_numbers(args))
+
+
+@_function("PRODUCT")
+def _product(*args):
+    return math.prod(_numbers(args))
+
+
+@_function("AVERAGE")
+def _average(*args):
+    values = list(_numbers(args))
+    if not values:
+        return DIV0
+    return math.fsum(values) / len(values)
+
+
+@_function("MIN")
+def _min(*args):
+    return min(_numbers(args), default=0)
+
+
+@_function("MAX")
+def _max(*args):
+    return max(_numbers(args), default=0)
+
+
+@_function("COUNT")
+def _count(*args):
+    count = 0
+    for arg in args:
+        values = arg.values() if isinstance(arg, _Range) else (arg,)
+        for value in values:
+            if isinstance(value, bool) and isinstance(arg, _Range):
+                continue
+            if isinstance(value, (numbers.Real, datetime, date, time, timedelta)):
+                count += 1
+    return count
+
+
+@_function("COUNTA")
+def _counta(*args):
+    count = 0
+    for arg in args:
+        values = arg.values() if isinstance(arg, _Range) else (arg,)
+        count += sum(1 for value in values if value is not None)
+    return count
+
+
+@_function("SUMPRODUCT")
+def _sumproduct(*args):
+    tables = [_range_rows(arg) for arg in args]
+    shape = (len(tables[0]), len(tables[0][0]))
+    if any((len(t), len(t[0])) != shape for t in tables):
+        return VALUE
+
+    total = 0.0
+    for row in range(shape[0]):
+        for col in range(shape[1]):
+            product = 1.0
+            for table in tables:
+                value = table[row][col]
+                if isinstance(value, ExcelError):
+                    raise _Propagate(value)
+                is_number = isinstance(value, numbers.Real)
+                product *= value if is_number and not isinstance(value, bool) else 0
+            total += product
+    return total
+
+
+def _math(func: Callable[..., float]) -> Callable[..., float]:
+    """包装数学函数，定义域错误返回 #NUM!"""
+
+    def wrapper(*args):
+        try:
+            return func(*(_num(arg) for arg in args))
+        except (ValueError, OverflowError):
+            return NUM
+        except ZeroDivisionError:
+            return DIV0
+
+    return wrapper
+
+
+for _name, _func in {
+    "ABS": abs,
+    "SQRT": math.sqrt,
+    "EXP": math.exp,
+    "LN": math.log,
+    "LOG10": math.log10,
+    "SIN": math.sin,
+    "COS": math.cos,
+    "TAN": math.tan,
+    "ASIN": math.asin,
+    "ACOS": math.acos,
+    "ATAN": math.atan,
+    "RADIANS": math.radians,
+    "DEGREES": math.degrees,
+    "INT": math.floor,
+    "POWER": math.pow,
+    # Excel 的 ATAN2 参数顺序为 (x, y)
+    "ATAN2": lambda x, y: math.atan2(y, x),
+    "LOG": lambda x, base=10: math.log(x, base),
+    "SIGN": lambda x: (x > 0) - (x < 0),
+    "MOD": lambda x, y: x - y * math.floor(x / y),
+    "CEILING": lambda x, step=1: 0 if step == 0 else math.ceil(x / step) * step,
+    "FLOOR": lambda x, step=1: 0 if step == 0 else math.floor(x / step) * step,
+}.items():
+    _FUNCTIONS[_name] = _math(_func)
+
+
+@_function("PI")
+def _pi():
+    return math.pi
+
+
+def _rounder(mode: str) -> Callable[..., float]:
+    def round_number(value, digits=0):
+        number = Decimal(repr(float(_num(value))))
+        quantum = Decimal(1).scaleb(-_int(digits))
+        return float(number.quantize(quantum, rounding=mode))
+
+    return round_number
+
+
+_FUNCTIONS["ROUND"] = _rounder(ROUND_HALF_UP)
+_FUNCTIONS["ROUNDUP"] = _rounder(ROUND_UP)
+_FUNCTIONS["ROUNDDOWN"] = _FUNCTIONS["TRUNC"] = _rounder(ROUND_DOWN)
+
+
+@_function("IF", lazy=True)
+def _if(calc, condition, if_true=None, if_false=None):
+    if _bool(condition(calc)):
+        return if_true(calc) if if_true is not None else True
+    return if_false(calc) if if_false is not None else False
+
+
+@_function("IFERROR", lazy=True)
+def _iferror(calc, value, fallback):
+    try:
+        result = value(calc)
+    except _Propagate:
+        return fallback(calc)
+    if isinstance(result, ExcelError):
+        return fallback(calc)
+    return result
+
+
+def _logical_values(args: tuple[Any, ...]) -> Iterator[bool]:
+    for arg in args:
+        if isinstance(arg, _Range):
+            for value in arg.values():
+                if isinstance(value, ExcelError):
+                    raise _Propagate(value)
+                if isinstance(value, (bool, numbers.Real)):
+                    yield bool(value)
+        else:
+            yield _bool(arg)
+
+
+@_function("AND")
+def _and(*args):
+    values = list(_logical_values(args))
+    return all(values) if values else VALUE
+
+
+@_function("OR")
+def _or(*args):
+    values = list(_logical_values(args))
+    return any(values) if values else VALUE
+
+
+@_function("NOT")
+def _not(value):
+    return not _bool(value)
+
+
+@_function("TRUE")
+def _true():
+    return True
+
+
+@_function("FALSE")
+def _false():
+    return False
+
+
+@_function("CONCATENATE", "CONCAT")
+def _concat(*args):
+    parts = []
+    for arg in args:
+        values = arg.values() if isinstance(arg, _Range) else (arg,)
+        parts.extend(_text(value) for value in values)
+    return "".join(parts)
+
+
+@_function("LEN")
+def _len(value):
+    return len(_text(value))
+
+
+@_function("UPPER")
+def _upper(value):
+    return _text(value).upper()
+
+
+@_function("LOWER")
+def _lower(value):
+    return _text(value).lower()
+
+
+@_function("TRIM")
+def _trim(value):
+    return " ".join(part for part in _text(value).split(" ") if part)
+
+
+@_function("LEFT")
+def _left(value, count=1):
+    return _text(value)[: max(_int(count), 0)]
+
+
+@_function("RIGHT")
+def _right(value, count=1):
+    count = max(_int(count), 0)
+    return _text(value)[-count:] if count else ""
+
+
+@_function("MID")
+def _mid(value, start, count):
+    start, count = _int(start), _int(count)
+    if start < 1 or count < 0:
+        return VALUE
+    return _text(value)[start - 1 : start - 1 + count]
+
+
+@_function("ISBLANK")
+def _isblank(value):
+    return value is None
+
+
+@_function("ISNUMBER")
+def _isnumber(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+@_function("ISTEXT")
+def _istext(value):
+    return isinstance(value, str) and not isinstance(value, ExcelError)
+
+
+@_function("ISERROR")
+def _iserror(value):
+    return isinstance(value, ExcelError)
+
+
+@_function("ISNA")
+def _isna(value):
+    return value == NA
+
+
+@_function("NA")
+def _na():
+    return NA
+
+
+@_function("CHOOSE")
+def _choose(index, *options):
+    index = _int(index)
+    if not 1 <= index <= len(options):
+        return VALUE
+    return options[index - 1]
+
+
+def _lookup_position(value: Any, items: list[Any], match_type: int) -> int | None:
+    """在一维序列中查找值的位置（从 0 开始），对应 MATCH 的匹配方式"""
+    found = None
+    for position, item in enumerate(items):
+        if item is None or isinstance(item, ExcelError):
+            continue
+        if _type_rank(item) != _type_rank(value):
+            continue
+        order = _compare(item, value)
+        if match_type == 0:
+            if order == 0:
+                return position
+        elif match_type > 0:
+            # 升序序列中不大于查找值的最后一个
+            if order > 0:
+                break
+            found = position
+        else:
+            # 降序序列中不小于查找值的最后一个
+            if order < 0:
+                break
+            found = position
+    return found
+
+
+@_function("MATCH")
+def _match(value, lookup, match_type=1):
+    rows = _range_rows(lookup)
+    if len(rows) == 1:
+        items = rows[0]
+    elif all(len(row) == 1 for row in rows):
+        items = [row[0] for row in rows]
+    else:
+        return NA
+    position = _lookup_position(value, items, _int(match_type))
+    return NA if position is None else position + 1
+
+
+@_function("INDEX")
+def _index(table, row, col=None):
+    rows = _range_rows(table)
+    row = _int(row)
+    if col is None:
+        # 单行区域的第二个参数表示列号
+        row, col = (1, row) if len(rows) == 1 else (row, 1)
+    col = _int(col)
+    if row < 1 or col < 1:
+        return VALUE
+    if row > len(rows) or col > len(rows[0]):
+        return REF
+    return rows[row - 1][col - 1]
+
+
+def _lookup_table(value, rows, index, approximate):
+    index = _int(index)
+    if index < 1:
+        return VALUE
+    if index > len(rows[0]):
+        return REF
+    position = _lookup_position(
+        value, [row[0] for row in rows], 1 if _bool(approximate) else 0
+    )
+    return NA if position is None else rows[position][index - 1]
+
+
+@_function("VLOOKUP")
+def _vlookup(value, table, index, approximate=True):
+    return _lookup_table(value, _range_rows(table), index, approximate)
+
+
+@_function("HLOOKUP")
+def _hlookup(value, table, index, approximate=True):
+    columns = [list(column) for column in zip(*_range_rows(table))]
+    return _lookup_table(value, columns, index, approximate)
+
+
+SUPPORTED_FUNCTIONS = frozenset(_FUNCTIONS) | frozenset(_LAZY_FUNCTIONS)
+
+
+# endregion
+
+
+# region 运算符
+
+
+def _arithmetic(operator: str, left: Any, right: Any) -> Any:
+    left, right = _num(left), _num(right)
+    try:
+        if operator == "+":
+            return left + right
+        if operator == "-":
+            return left - right
+        if operator == "*":
+            return left * right
+        if operator == "/":
+            return left / right
+        if left == 0 and right < 0:
+            return DIV0
+        result = left**right
+    except ZeroDivisionError:
+        return DIV0
+    except OverflowError:
+        return NUM
+    # 负数的非整数次幂
+    return NUM if isinstance(result, complex) else result
+
+
+_COMPARISONS: dict[str, Callable[[int], bool]] = {
+    "=": lambda order: order == 0,
+    "<>": lambda order: order != 0,
+    "<": lambda order: order < 0,
+    ">": lambda order: order > 0,
+    "<=": lambda order: order <= 0,
+    ">=": lambda order: order >= 0,
+}
+
+# 中缀运算符的优先级，数值越大结合越紧；一元负号高于乘方
+_INFIX_POWER = {
+    **dict.fromkeys(_COMPARISONS, 1),
+    "&": 2,
+    "+": 3,
+    "-": 3,
+    "*": 4,
+    "/": 4,
+    "^": 5,
+}
+_PREFIX_POWER = 6
+
+
+def _percent(operand):
+    return lambda calc: _num(operand(calc)) / 100
+
+
+def _binary(operator: str, left, right):
+    if operator in _COMPARISONS:
+        test = _COMPARISONS[operator]
+        return lambda calc: test(_compare(left(calc), right(calc)))
+    if operator == "&":
+        return lambda calc: _text(left(calc)) + _text(right(calc))
+    return lambda calc: _arithmetic(operator, left(calc), right(calc))
+
+
+# endregion
+
+
+# region 解析
+
+
+class _Parser:
+    """把 openpyxl 分词后的公式编译为闭包，并收集其中的引用"""
+
+    def __init__(
+        self,
+        formula: str,
+        sheet: str,
+        resolve_sheet: Callable[[str], Optional[str]],
+    ):
+        from openpyxl.formula.tokenizer import Token, Tokenizer
+
+        self._token = Token
+        self._tokens = [
+            token
+            for token in Tokenizer(formula).items
+            if token.type != Token.WSPACE
+        ]
+        self._pos = 0
+        self._sheet = sheet
+        self._resolve_sheet = resolve_sheet
+        self.refs: list[_Ref] = []
+
+    def parse(self) -> Callable[["Recalculation"], Any]:
+        node = self._expression(0)
+        if self._pos != len(self._tokens):
+            raise UnsupportedFormulaError(
+                f"Unexpected token {self._tokens[self._pos].value!r}"
+            )
+        return node
+
+    def _peek(self):
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos]
+        return None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise UnsupportedFormulaError("Unexpected end of formula")
+        self._pos += 1
+        return token
+
+    def _expression(self, min_power: int):
+        Token = self._token
+        left = self._prefix()
+        while (token := self._peek()) is not None:
+            if token.type == Token.OP_POST and token.value == "%":
+                self._pos += 1
+                left = _percent(left)
+                continue
+            if token.type != Token.OP_IN:
+                break
+            power = _INFIX_POWER.get(token.value)
+            if power is None:
+                raise UnsupportedFormulaError(f"Unsupported operator {token.value!r}")
+            if power <= min_power:
+                break
+            self._pos += 1
+            left = _binary(token.value, left, self._expression(power))
+        return left
+
+    def _prefix(self):
+        Token = self._token
+        token = self._next()
+
+        if token.type == Token.OPERAND:
+            return self._operand(token)
+
+        if token.type == Token.OP_PRE:
+            operand = self._expression(_PREFIX_POWER)
+            if token.value == "-":
+                return lambda calc: -_num(operand(calc))
+            return operand
+
+        if token.type == Token.PAREN and token.subtype == Token.OPEN:
+            node = self._expression(0)
+            closing = self._next()
+            if closing.type != Token.PAREN or closing.subtype != Token.CLOSE:
+                raise UnsupportedFormulaError("Unbalanced parentheses")
+            return node
+
+        if token.type == Token.FUNC and token.subtype == Token.OPEN:
+            return self._call(token.value[:-1])
+
+        raise UnsupportedFormulaError(f"Unsupported token {token.value!r}")
+
+    def _operand(self, token):
+        Token = self._token
+        text = token.value
+        if token.subtype == Token.NUMBER:
+            number = float(text)
+            value = int(number) if number.is_integer() else number
+            return lambda calc: value
+        if token.subtype == Token.TEXT:
+            value = text[1:-1].replace('""', '"')
+            return lambda calc: value
+        if token.subtype == Token.LOGICAL:
+            value = text.upper() == "TRUE"
+            return lambda calc: value
+        if token.subtype == Token.ERROR:
+            value = ExcelError(text.upper())
+            return lambda calc: value
+        return self._reference(text)
+
+    def _reference(self, text: str):
+        ref = _parse_reference(text, self._sheet, self._resolve_sheet)
+        if ref is None:
+            return lambda calc: REF
+        self.refs.append(ref)
+        if ref.min_row == ref.max_row and ref.min_col == ref.max_col:
+            key = (ref.sheet, ref.min_row, ref.min_col)
+            return lambda calc: calc.value(key)
+        return lambda calc: calc.range(ref)
+
+    def _call(self, name: str):
+        Token = self._token
+        name = name.upper()
+        if name.startswith("_XLFN."):
+            name = name[len("_XLFN.") :]
+
+        args = []
+        if (token := self._peek()) is not None and token.type == Token.FUNC and (
+            token.subtype == Token.CLOSE
+        ):
+            self._pos += 1
+        else:
+            while True:
+                token = self._peek()
+                # 省略的参数按空值处理
+                if token is not None and (
+                    token.type == Token.SEP
+                    or (token.type == Token.FUNC and token.subtype == Token.CLOSE)
+                ):
+                    args.append(lambda calc: None)
+                else:
+                    args.append(self._expression(0))
+                token = self._next()
+                if token.type == Token.SEP and token.subtype == Token.ARG:
+                    continue
+                if token.type == Token.FUNC and token.subtype == Token.CLOSE:
+                    break
+                raise UnsupportedFormulaError(f"Unexpected token {token.value!r}")
+
+        lazy = name in _LAZY_FUNCTIONS
+        func = _LAZY_FUNCTIONS.get(name) or _FUNCTIONS.get(name)
+        if func is None:
+            raise UnsupportedFormulaError(f"Unsupported function {name}")
+        try:
+            signature(func).bind(*([None] if lazy else []), *args)
+        except TypeError:
+            raise UnsupportedFormulaError(
+                f"Wrong number of arguments for {name}"
+            ) from None
+
+        if lazy:
+            return lambda calc: func(calc, *args)
+        return lambda calc: func(*(arg(calc) for arg in args))
+
+
+def _parse_reference(
+    text: str, sheet: str, resolve_sheet: Callable[[str], Optional[str]]
+) -> Optional[_Ref]:
+    """解析单元格或区域引用；工作表不存在时返回 None"""
+    from openpyxl.utils import range_boundaries
+
+    if "!" in text:
+        sheet_part, text = text.rsplit("!", 1)
+        if sheet_part.startswith("'") and sheet_part.endswith("'"):
+            sheet_part = sheet_part[1:-1].replace("''", "'")
+        if sheet_part.startswith("["):
+            raise UnsupportedFormulaError(f"External reference {sheet_part}!{text}")
+        resolved = resolve_sheet(sheet_part)
+        if resolved is None:
+            return None
+        sheet = resolved
+
+    address = text.replace("$", "")
+    if not _REFERENCE_PATTERN.fullmatch(address):
+        # 定义名称、结构化引用等
+        raise UnsupportedFormulaError(f"Unsupported reference {text}")
+
+    min_col, min_row, max_col, max_row = range_boundaries(address)
+    return _Ref(
+        sheet,
+        min_row or 1,
+        min_col or 1,
+        max_row or MAX_ROW,
+        max_col or MAX_COL,
+    )
+
+
+# endregion
+
+
+class FormulaModel:
+    """
+    工作簿的公式依赖图
+
+    保存各单元格的缓存值与编译后的公式，可反复基于不同的输入值重算，
+    本身不持有打开的工作簿。
+    """
+
+    def __init__(
+        self,
+        sheets: list[str],
+        active_sheet: str,
+        values: dict[CellKey, Any],
+        formulas: dict[str, dict[CellKey, str]],
+    ):
+        """
+        Args:
+            sheets: 工作表名称，按工作簿中的顺序
+            active_sheet: 活动工作表名称
+            values: 单元格的缓存值，公式单元格为上次保存时的计算结果
+            formulas: 每个工作表中公式单元格的公式文本
+        """
+        self.sheets = sheets
+        self.active_sheet = active_sheet
+        self.values = values
+        self._sheet_names = {name.casefold(): name for name in sheets}
+        self.formulas: dict[CellKey, _Formula] = {}
+        self._sheet_formulas: dict[str, list[CellKey]] = {name: [] for name in sheets}
+
+        # 反向依赖索引
+        self._cell_dependents: dict[CellKey, list[CellKey]] = {}
+        self._column_dependents: dict[tuple[str, int], list[tuple[_Ref, CellKey]]] = {}
+        self._wide_dependents: dict[str, list[tuple[_Ref, CellKey]]] = {}
+        self._volatile: list[CellKey] = []
+
+        for sheet, sheet_formulas in formulas.items():
+            for key, text in sheet_formulas.items():
+                formula = self._compile(sheet, text)
+                self.formulas[key] = formula
+                self._sheet_formulas[sheet].append(key)
+                self._index(key, formula)
+
+        # 各工作表已使用区域的右下角，用于裁剪整行、整列引用
+        self._dimensions: dict[str, tuple[int, int]] = {name: (0, 0) for name in sheets}
+        for sheet, row, col in list(values) + list(self.formulas):
+            max_row, max_col = self._dimensions[sheet]
+            self._dimensions[sheet] = (max(max_row, row), max(max_col, col))
+
+    @classmethod
+    def from_file(cls, excel_path: str) -> "FormulaModel":
+        """以只读流式方式读取工作簿的公式与缓存值"""
+        try:
+            from openpyxl import load_workbook
+            from openpyxl.utils import range_boundaries
+        except ImportError as exc:
+            raise missing_optional_dependency("excel", exc) from exc
+
+        values: dict[CellKey, Any] = {}
+        formulas: dict[str, dict[CellKey, Any]] = {}
+
+        workbook = load_workbook(excel_path, read_only=True, data_only=True)
+        try:
+            sheets = list(workbook.sheetnames)
+            active_sheet = workbook.active.title
+            for worksheet in workbook.worksheets:
+                title = worksheet.title
+                for row in worksheet.iter_rows():
+                    for cell in row:
+                        if cell.value is not None:
+                            values[(title, cell.row, cell.column)] = cell.value
+        finally:
+            workbook.close()
+
+        workbook = load_workbook(excel_path, read_only=True, data_only=False)
+        try:
+            for worksheet in workbook.worksheets:
+                title = worksheet.title
+                sheet_formulas = formulas.setdefault(title, {})
+                for row in worksheet.iter_rows():
+                    for cell in row:
+                        if cell.data_type != "f":
+                            continue
+                        sheet_formulas[(title, cell.row, cell.column)] = cell.value
+                        # 数组公式的结果区域中，其它单元格同样由该公式计算
+                        array_ref = getattr(cell.value, "ref", None)
+                        if isinstance(array_ref, str):
+                            min_col, min_row, max_col, max_row = range_boundaries(
+                                array_ref
+                            )
+                            for r in range(min_row, max_row + 1):
+                                for c in range(min_col, max_col + 1):
+                                    sheet_formulas[(title, r, c)] = cell.value
+        finally:
+            workbook.close()
+
+        return cls(sheets, active_sheet, values, formulas)
+
+    def resolve_sheet(self, name: str) -> Optional[str]:
+        """按 Excel 规则（不区分大小写）查找工作表名称"""
+        return self._sheet_names.get(name.casefold())
+
+    def recalculate(self, changes: Mapping[str, Any]) -> "Recalculation":
+        """
+        修改输入值后重算
+
+        Args:
+            changes: 要修改的值，字典格式 {'A1': value1, 'Sheet1!B2': value2}，
+                未指定工作表时为第一个工作表
+
+        Returns:
+            重算结果
+        """
+        inputs: dict[CellKey, Any] = {}
+        for address, value in changes.items():
+            ref = _parse_reference(address, self.sheets[0], self.resolve_sheet)
+            if ref is None:
+                raise ValueError(f"Unknown sheet in {address!r}")
+            if ref.min_row != ref.max_row or ref.min_col != ref.max_col:
+                raise ValueError(f"Expected a single cell, got {address!r}")
+            inputs[(ref.sheet, ref.min_row, ref.min_col)] = value
+        return Recalculation(self, inputs)
+
+    def dependents(self, key: CellKey) -> Iterator[CellKey]:
+        """直接引用该单元格的公式单元格"""
+        sheet, row, col = key
+        yield from self._cell_dependents.get(key, ())
+        for ref, dependent in self._column_dependents.get((sheet, col), ()):
+            if ref.min_row <= row <= ref.max_row:
+                yield dependent
+        for ref, dependent in self._wide_dependents.get(sheet, ()):
+            if ref.contains(sheet, row, col):
+                yield dependent
+
+    def affected_cells(self, inputs: Iterable[CellKey]) -> list[CellKey]:
+        """
+        受输入影响、需要重算的公式单元格，按依赖顺序排列
+
+        Raises:
+            UnsupportedFormulaError: 受影响的单元格存在循环引用
+        """
+        inputs = set(inputs)
+        edges: dict[CellKey, set[CellKey]] = {}
+        affected: set[CellKey] = set()
+        queue = deque(inputs)
+        if inputs:
+            queue.extend(self._volatile)
+            affected.update(key for key in self._volatile if key not in inputs)
+
+        while queue:
+            key = queue.popleft()
+            for dependent in self.dependents(key):
+                # 被直接赋值的单元格不再由公式计算
+                if dependent in inputs:
+                    continue
+                edges.setdefault(key, set()).add(dependent)
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+
+        # 只统计受影响单元格之间的依赖，按拓扑顺序排列
+        in_degree = dict.fromkeys(affected, 0)
+        for key, targets in edges.items():
+            if key in affected:
+                for target in targets:
+                    in_degree[target] += 1
+
+        order = []
+        ready = deque(key for key, degree in in_degree.items() if degree == 0)
+        while ready:
+            key = ready.popleft()
+            order.append(key)
+            for target in edges.get(key, ()):
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    ready.append(target)
+
+        if len(order) != len(affected):
+            cycle = sorted(key for key, degree in in_degree.items() if degree > 0)
+            raise UnsupportedFormulaError(
+                f"Circular reference involving {_format_key(cycle[0])}"
+            )
+        return order
+
+    def _compile(self, sheet: str, text: Any) -> _Formula:
+        # 数组公式只记录引用，不参与重算
+        source = text if isinstance(text, str) else getattr(text, "text", None)
+        if not isinstance(source, str) or not source.startswith("="):
+            return _Formula(str(text), None, [], "Unsupported formula type", True)
+        if source is not text:
+            return self._opaque(sheet, source, "Array formulas are not supported")
+
+        try:
+            parser = _Parser(source, sheet, self.resolve_sheet)
+            evaluate = parser.parse()
+        except UnsupportedFormulaError as exc:
+            return self._opaque(sheet, source, str(exc))
+        except Exception as exc:
+            return self._opaque(sheet, source, f"Cannot parse formula: {exc}")
+        return _Formula(source, evaluate, parser.refs)
+
+    def _opaque(self, sheet: str, text: str, error: str) -> _Formula:
+        """
+        无法重算的公式：尽量找出全部引用，使其只在引用变化时报错；
+        找不到全部引用时视为受任何输入影响
+        """
+        from openpyxl.formula.tokenizer import Token, Tokenizer
+
+        refs = []
+        try:
+            for token in Tokenizer(text).items:
+                if token.type == Token.OPERAND and token.subtype == Token.RANGE:
+                    ref = _parse_reference(token.value, sheet, self.resolve_sheet)
+                    if ref is not None:
+                        refs.append(ref)
+        except Exception:
+            return _Formula(text, None, [], error, volatile=True)
+        return _Formula(text, None, refs, error)
+
+    def _index(self, key: CellKey, formula: _Formula) -> None:
+        if formula.volatile:
+            self._volatile.append(key)
+        for ref in formula.refs:
+            if ref.min_row == ref.max_row and ref.min_col == ref.max_col:
+                cell = (ref.sheet, ref.min_row, ref.min_col)
+                self._cell_dependents.setdefault(cell, []).append(key)
+            elif ref.max_col - ref.min_col < _COLUMN_BUCKET_LIMIT:
+                for col in range(ref.min_col, ref.max_col + 1):
+                    bucket = self._column_dependents.setdefault((ref.sheet, col), [])
+                    bucket.append((ref, key))
+            else:
+                self._wide_dependents.setdefault(ref.sheet, []).append((ref, key))
+
+
+class Recalculation:
+    """
+    一次重算的结果
+
+    受输入影响的单元格在创建时按依赖顺序重算；其余单元格沿用缓存值，
+    没有缓存值的公式单元格在读取时计算。
+    """
+
+    def __init__(self, model: FormulaModel, inputs: dict[CellKey, Any]):
+        self.model = model
+        self.inputs = inputs
+        self._results: dict[CellKey, Any] = dict(inputs)
+        self._evaluating: set[CellKey] = set()
+        self.changed = model.affected_cells(inputs)
+        self._pending = set(self.changed)
+        for key in self.changed:
+            self.value(key)
+
+    def value(self, key: CellKey) -> Any:
+        """获取单元格的值"""
+        try:
+            return self._results[key]
+        except KeyError:
+            pass
+
+        formula = self.model.formulas.get(key)
+        if formula is None:
+            return self.model.values.get(key)
+        if key not in self._pending and key in self.model.values:
+            return self.model.values[key]
+        return self._evaluate(key, formula)
+
+    def range(self, ref: _Ref) -> _Range:
+        """获取区域的值，整行、整列引用裁剪到已使用区域"""
+        max_row, max_col = self.model._dimensions.get(ref.sheet, (0, 0))
+        rows = range(ref.min_row, min(ref.max_row, max(max_row, ref.min_row)) + 1)
+        cols = range(ref.min_col, min(ref.max_col, max(max_col, ref.min_col)) + 1)
+        return _Range([[self.value((ref.sheet, r, c)) for c in cols] for r in rows])
+
+    def values_in(
+        self, sheet_name: Optional[str], range_address: str
+    ) -> dict[tuple[int, int], Any]:
+        """
+        获取范围内输入与公式单元格的值
+
+        Args:
+            sheet_name: 工作表名称，为 None 时为活动工作表
+            range_address: 范围地址，如 'A1:E10'
+
+        Returns:
+            字典，键为 (行, 列)，可作为 ExcelProcessor.range_to_html 的 overrides
+        """
+        sheet = self.model.active_sheet
+        if sheet_name is not None:
+            sheet = self.model.resolve_sheet(sheet_name)
+            if sheet is None:
+                raise ValueError(f"Unknown sheet {sheet_name!r}")
+        bounds = _parse_reference(range_address, sheet, self.model.resolve_sheet)
+
+        keys = [key for key in self.inputs if key[0] == sheet]
+        keys.extend(self.model._sheet_formulas.get(sheet, ()))
+        return {
+            (row, col): self.value(key)
+            for key in keys
+            if bounds.contains(*key)
+            for _, row, col in (key,)
+        }
+
+    def _evaluate(self, key: CellKey, formula: _Formula) -> Any:
+        if formula.evaluate is None:
+            raise UnsupportedFormulaError(
+                f"{_format_key(key)} ({formula.text}): {formula.error}"
+            )
+        if key in self._evaluating:
+            raise UnsupportedFormulaError(
+                f"Circular reference involving {_format_key(key)}"
+            )
+
+        self._evaluating.add(key)
+        try:
+            result = _cell_result(formula.evaluate(self))
+        except _Propagate as exc:
+            result = exc.error
+        finally:
+            self._evaluating.discard(key)
+        self._results[key] = result
+        return result
+
+
+def _format_key(key: CellKey) -> str:
+    from openpyxl.utils import get_column_letter
+
+    sheet, row, col = key
+    return f"{sheet}!{get_column_letter(col)}{row}"
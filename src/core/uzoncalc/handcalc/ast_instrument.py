@@ -1,11 +1,13 @@
 import ast
 import inspect
+import os
 import textwrap
-from types import FunctionType
+from types import CodeType, FunctionType
 from typing import Any, Callable, Dict
 
 from .ast_visitor import AstNodeVisitor
 from .field_names import FieldNames
+from .code_cache import PersistentCodeCache
 from .instrument_cache import InstrumentCache
 from .exceptions import InstrumentationError
 from .ast_validator import validate_ast
@@ -66,6 +68,71 @@ def instrument_function(func: Callable[..., Any]) -> FunctionType:
     # 获取源码并去除非必要缩进
     try:
         src = textwrap.dedent(inspect.getsource(func))
+    except Exception as e:
+        raise InstrumentationError(
+            f"Failed to parse source of function {func.__name__}: {e}"
+        ) from e
+
+    # 编译插桩后的代码，使用原始源文件路径以便调试器正确显示
+    source_file = inspect.getsourcefile(func)
+    filename = os.path.abspath(source_file) if source_file else "<instrumented>"
+
+    # 持久化缓存：跨进程复用编译结果，避免重复解析、插桩和编译
+    code_cache = PersistentCodeCache.get_instance()
+    cache_key = code_cache.make_key(
+        source=src,
+        qualname=func.__qualname__,
+        filename=filename,
+        first_lineno=func.__code__.co_firstlineno,
+    )
+    codes = code_cache.load(cache_key)
+    if codes is None:
+        codes = _compile_instrumented(func, src, filename)
+        code_cache.store(cache_key, codes)
+    code, step_pool_code = codes
+
+    # 每个插桩函数拥有独立的 globals 副本，因此 Step 常量池天然按函数隔离
+    glb: Dict[str, Any] = dict(func.__globals__)
+    glb.update(__get_inject_globals())
+
+    loc: Dict[str, Any] = {}
+    # 真正执行编译后的代码：先在 globals 副本中构建 Step 常量池，
+    # 再运行模块级语句，通常会把被插桩后的函数定义放进 loc
+    try:
+        exec(step_pool_code, glb)
+        exec(code, glb, loc)
+    except Exception as e:
+        raise InstrumentationError(
+            f"Failed to execute instrumented code for {func.__name__}: {e}"
+        ) from e
+
+    new_func = loc.get(func.__name__)
+    if not isinstance(new_func, FunctionType):
+        raise InstrumentationError(
+            f"instrument_function: failed to rebuild function {func.__name__}"
+        )
+
+    # 打标记：避免对"插桩后的函数"重复插桩
+    try:
+        setattr(new_func, FieldNames.uzon_instrumented, True)
+    except Exception:
+        # 某些情况下无法设置属性，忽略
+        pass
+
+    # 缓存并返回
+    cache.set(func, new_func)
+    return new_func
+
+
+def _compile_instrumented(
+    func: Callable[..., Any], src: str, filename: str
+) -> tuple[CodeType, CodeType]:
+    """
+    解析、插桩并编译函数源码。
+
+    返回 (函数定义代码, Step 常量池构建代码)，二者均可被 marshal 序列化。
+    """
+    try:
         mod = ast.parse(src)
     except Exception as e:
         raise InstrumentationError(
@@ -114,59 +181,38 @@ def instrument_function(func: Callable[..., Any]) -> FunctionType:
             # 偏移计算失败时继续使用原始行号
             pass
 
-    # 编译插桩后的代码，使用原始源文件路径以便调试器正确显示
-    import os
-    source_file = inspect.getsourcefile(func)
-    filename = os.path.abspath(source_file) if source_file else "<instrumented>"
-    
+    # Step 常量池以构建代码的形式编译，使结果可以持久化缓存
+    step_pool_mod = ast.Module(
+        body=[ast_visitor.build_step_pool_assign()], type_ignores=[]
+    )
+    ast.fix_missing_locations(step_pool_mod)
+
     try:
         code = compile(mod, filename=filename, mode="exec")
+        step_pool_code = compile(step_pool_mod, filename=filename, mode="exec")
     except Exception as e:
         raise InstrumentationError(
             f"Failed to compile instrumented function {func.__name__}: {e}"
         ) from e
-
-    glb: Dict[str, Any] = dict(func.__globals__)
-    glb.update(__get_inject_globals())
-
-    loc: Dict[str, Any] = {}
-    # 真正执行编译后的代码：这一步会运行模块级语句，通常会把被插桩后的函数定义放进 loc
-    try:
-        exec(code, glb, loc)
-    except Exception as e:
-        raise InstrumentationError(
-            f"Failed to execute instrumented code for {func.__name__}: {e}"
-        ) from e
-
-    new_func = loc.get(func.__name__)
-    if not isinstance(new_func, FunctionType):
-        raise InstrumentationError(
-            f"instrument_function: failed to rebuild function {func.__name__}"
-        )
-
-    # 打标记：避免对"插桩后的函数"重复插桩
-    try:
-        setattr(new_func, FieldNames.uzon_instrumented, True)
-    except Exception:
-        # 某些情况下无法设置属性，忽略
-        pass
-
-    # 缓存并返回
-    cache.set(func, new_func)
-    return new_func
+    return code, step_pool_code
 
 
 def __get_inject_globals():
     """
     获取插桩时需要注入的全局变量表。
+
+    Step 常量池由插桩生成的构建代码在 globals 副本中创建，
+    记录调用通过下标引用，运行期不再重复构造 Step/IR。
     """
     # 注入记录步骤的函数
     from . import recorder
     from . import ir as uzon_ir
     from . import steps as uzon_steps
+    from .loop_recording import LoopTracker
 
     return {
         FieldNames.uzon_record_step: recorder.record_step,
+        FieldNames.uzon_loop_tracker: LoopTracker,
         FieldNames.uzon_ir: uzon_ir,
         FieldNames.uzon_steps: uzon_steps,
     }
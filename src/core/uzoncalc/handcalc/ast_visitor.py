@@ -1,4 +1,5 @@
 import ast
+import copy
 from typing import Optional
 
 from .field_names import FieldNames
@@ -7,6 +8,7 @@ from .ast_to_step_converter import AstToStepConverter
 from .recording_injector import RecordingInjector
 from .call_filters import CallFilterRegistry, get_call_filter_registry
 from . import ir
+from . import steps
 
 # description:
 # 本模块定义了一个 AST 访问器类，用于遍历和修改 AST 树，
@@ -14,11 +16,18 @@ from . import ir
 
 
 class AstNodeVisitor(ast.NodeTransformer):
-    def __init__(self, call_filter_registry: CallFilterRegistry | None = None) -> None:
+    def __init__(
+        self,
+        call_filter_registry: CallFilterRegistry | None = None,
+        *,
+        step_pool_name: str = FieldNames.uzon_step_pool,
+    ) -> None:
         """Initialize an AST visitor with a stable call-filter snapshot.
 
         Args:
             call_filter_registry: Optional registry to snapshot for this traversal.
+            step_pool_name: Global name through which generated record calls
+                reference the prebuilt step constant pool.
 
         Returns:
             None.
@@ -29,10 +38,20 @@ class AstNodeVisitor(ast.NodeTransformer):
         super().__init__()
         self._state = RecordingState()
         self._converter = AstToStepConverter()
-        self._injector = RecordingInjector()
+        self._injector = RecordingInjector(step_pool_name)
+        self._loop_counter = 0
         registry = call_filter_registry or get_call_filter_registry()
         self._call_filter_registry = registry.snapshot()
 
+    @property
+    def step_pool(self) -> tuple[steps.Step, ...]:
+        """Return prebuilt steps referenced by index from generated record calls."""
+        return self._injector.step_pool
+
+    def build_step_pool_assign(self) -> ast.Assign:
+        """Return a statement that rebuilds the step pool from generated source."""
+        return self._injector.build_step_pool_assign()
+
     def _visit_body_scope(self, node: ast.AST, body_attr: str = "body") -> ast.AST:
         """通用的作用域访问方法，处理带有 body 的节点"""
         body = getattr(node, body_attr)
@@ -57,7 +76,9 @@ class AstNodeVisitor(ast.NodeTransformer):
     def visit_ClassDef(self, node: ast.ClassDef) -> ast.AST:
         return self._visit_body_scope(node)
 
-    def _visit_loop(self, node: ast.For | ast.AsyncFor | ast.While) -> ast.AST:
+    def _visit_loop(
+        self, node: ast.For | ast.AsyncFor | ast.While
+    ) -> ast.AST | list[ast.stmt]:
         """通用循环访问方法"""
         if hasattr(node, "target"):
             node.target = self.visit(node.target)  # type: ignore[assignment]
@@ -66,12 +87,75 @@ class AstNodeVisitor(ast.NodeTransformer):
         if hasattr(node, "test"):
             node.test = self.visit(node.test)  # type: ignore[assignment]
 
+        # 保留原始循环体作为未插桩的快速路径
+        original_body = copy.deepcopy(node.body)
+        step_count = self._injector.step_count
         node.body = self._transform_stmt_block(node.body)
+        has_recording = self._injector.step_count != step_count
 
         if node.orelse:
             node.orelse = self._transform_stmt_block(node.orelse)
 
-        return node
+        if not has_recording:
+            return node
+        return self._apply_loop_record_policy(node, original_body)
+
+    def _apply_loop_record_policy(
+        self,
+        node: ast.For | ast.AsyncFor | ast.While,
+        original_body: list[ast.stmt],
+    ) -> list[ast.stmt]:
+        """按运行期循环记录策略在插桩循环体和原始循环体之间分派。
+
+        生成的代码形如::
+
+            __uzon_loop_0__ = __uzon_loop_tracker__()
+            for item in __uzon_loop_0__.iterate(items):
+                if __uzon_loop_0__.advance():
+                    ...  # 插桩后的循环体
+                else:
+                    ...  # 原始循环体
+        """
+        tracker_name = f"{FieldNames.uzon_loop_prefix}{self._loop_counter}__"
+        self._loop_counter += 1
+
+        tracker_assign = ast.Assign(
+            targets=[ast.Name(id=tracker_name, ctx=ast.Store())],
+            value=ast.Call(
+                func=ast.Name(id=FieldNames.uzon_loop_tracker, ctx=ast.Load()),
+                args=[],
+                keywords=[],
+            ),
+        )
+        ast.copy_location(tracker_assign, node)
+
+        # async for 的迭代对象无法预知长度，不做包装
+        if isinstance(node, ast.For):
+            node.iter = ast.copy_location(
+                ast.Call(
+                    func=self._tracker_method(tracker_name, "iterate"),
+                    args=[node.iter],
+                    keywords=[],
+                ),
+                node.iter,
+            )
+
+        advance_call = ast.Call(
+            func=self._tracker_method(tracker_name, "advance"),
+            args=[],
+            keywords=[],
+        )
+        branch = ast.If(test=advance_call, body=node.body, orelse=original_body)
+        ast.copy_location(branch, node.body[0])
+        node.body = [branch]
+        return [tracker_assign, node]
+
+    def _tracker_method(self, tracker_name: str, method: str) -> ast.Attribute:
+        return ast.Attribute(
+            value=ast.Name(id=tracker_name, ctx=ast.Load()),
+            attr=method,
+            ctx=ast.Load(),
+        )
 
     def visit_If(self, node: ast.If) -> ast.AST:
         node.test = self.visit(node.test)  # type: ignore[assignment]
@@ -10,6 +10,8 @@ from __future__ import annotations
 import ast
 from typing import Callable, Optional, Set
 
+from ..cache.fingerprint import callable_fingerprint
+
 # 函数调用过滤器类型定义
 # 返回 True 表示应该隐藏该函数调用
 CallFilterFunction = Callable[[ast.Call], bool]
@@ -139,6 +141,20 @@ class CallFilterRegistry:
         snapshot._advanced_filters = list(self._advanced_filters)
         return snapshot
 
+    def fingerprint(self) -> str:
+        """Describe the registered filters as a stable string.
+
+        Used as part of persistent instrumentation cache keys, so it only
+        relies on filter names that are identical across processes.
+
+        Returns:
+            Sorted simple filter names followed by the qualified names and
+            code digests of advanced filters.
+        """
+        simple = ",".join(sorted(self._simple_filters))
+        advanced = ",".join(callable_fingerprint(f) for f in self._advanced_filters)
+        return f"{simple}|{advanced}"
+
 
 # 全局函数调用过滤器注册表实例
 _global_call_filter_registry: Optional[CallFilterRegistry] = None
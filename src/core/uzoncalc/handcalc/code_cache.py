@@ -0,0 +1,234 @@
+"""插桩结果的持久化磁盘缓存，跨进程复用编译后的代码对象"""
+
+import hashlib
+import marshal
+import os
+import sys
+import threading
+from pathlib import Path
+from types import CodeType
+from typing import Optional
+
+from .call_filters import get_call_filter_registry
+from .preinstrument import INSTRUMENTATION_FORMAT_VERSION
+from .special_functions import get_special_function_registry
+
+# 设置为 "0" 时禁用持久化缓存
+CACHE_ENABLED_ENV = "UZONCALC_INSTRUMENT_CACHE"
+
+# 自定义缓存目录
+CACHE_DIR_ENV = "UZONCALC_CACHE_DIR"
+
+# 缓存目录总大小上限，超出时按最近使用时间淘汰
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_CACHE_FILE_SUFFIX = ".code"
+
+# (函数代码, 常量池构建代码)
+InstrumentedCode = tuple[CodeType, CodeType]
+
+
+def get_user_cache_dir() -> Path:
+    """获取 uzoncalc 的用户缓存目录。
+
+    优先使用 ``UZONCALC_CACHE_DIR`` 环境变量，否则使用各平台的惯用位置。
+    """
+    custom = os.environ.get(CACHE_DIR_ENV)
+    if custom:
+        return Path(custom)
+
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = str(Path.home() / "Library" / "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "uzoncalc"
+
+
+class PersistentCodeCache:
+    """以 marshal 格式缓存插桩后代码对象的单例类
+
+    缓存键由函数源码、限定名、源文件位置、插桩格式版本、调用过滤器与特殊函数
+    注册表快照、插桩模块自身的指纹以及 Python 版本共同决定，任一变化都会
+    生成新的键，旧条目随后被大小上限淘汰。
+    """
+
+    _instance: Optional["PersistentCodeCache"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool | None = None,
+    ) -> None:
+        self.directory = (
+            Path(directory) if directory is not None else get_user_cache_dir()
+        ) / "instrument"
+        self.max_bytes = max_bytes
+        if enabled is None:
+            enabled = os.environ.get(CACHE_ENABLED_ENV, "1") != "0"
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._module_fingerprint: str | None = None
+
+    @classmethod
+    def get_instance(cls) -> "PersistentCodeCache":
+        """获取单例实例"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """重置单例实例（主要用于测试）"""
+        with cls._instance_lock:
+            cls._instance = None
+
+    def make_key(
+        self,
+        *,
+        source: str,
+        qualname: str,
+        filename: str,
+        first_lineno: int,
+    ) -> str:
+        """计算插桩结果的缓存键。
+
+        代码对象中包含文件名和行号，因此它们也是键的一部分。
+        """
+        parts = (
+            str(INSTRUMENTATION_FORMAT_VERSION),
+            sys.version,
+            sys.implementation.cache_tag or "",
+            self._get_module_fingerprint(),
+            get_call_filter_registry().fingerprint(),
+            get_special_function_registry().fingerprint(),
+            qualname,
+            filename,
+            str(first_lineno),
+            source,
+        )
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def load(self, key: str) -> InstrumentedCode | None:
+        """读取缓存的代码对象，不存在或已损坏时返回 None。"""
+        if not self.enabled:
+            return None
+
+        path = self._path_for(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+
+        try:
+            codes = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            self._remove(path)
+            return None
+        if not (
+            isinstance(codes, tuple)
+            and len(codes) == 2
+            and all(isinstance(code, CodeType) for code in codes)
+        ):
+            self._remove(path)
+            return None
+
+        # 刷新修改时间，淘汰时视为最近使用
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return codes
+
+    def store(self, key: str, codes: InstrumentedCode) -> None:
+        """写入代码对象，写入失败（如只读目录）时静默忽略。"""
+        if not self.enabled:
+            return
+
+        path = self._path_for(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(marshal.dumps(codes))
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def clear(self) -> None:
+        """删除全部缓存文件"""
+        with self._lock:
+            for path in self._iter_entries():
+                self._remove(path)
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / f"{key}{_CACHE_FILE_SUFFIX}"
+
+    def _iter_entries(self) -> list[Path]:
+        try:
+            return [
+                entry
+                for entry in self.directory.iterdir()
+                if entry.suffix == _CACHE_FILE_SUFFIX
+            ]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        """总大小超过上限时，从最久未使用的条目开始删除。"""
+        with self._lock:
+            entries: list[tuple[float, int, Path]] = []
+            total = 0
+            for path in self._iter_entries():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort(key=lambda entry: entry[0])
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def _get_module_fingerprint(self) -> str:
+        """插桩相关模块的指纹，开发时修改插桩逻辑不会命中旧缓存。"""
+        if self._module_fingerprint is None:
+            package_dir = Path(__file__).parent
+            digest = hashlib.sha256()
+            for path in sorted(package_dir.rglob("*.py")):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                digest.update(
+                    f"{path.relative_to(package_dir)}:{stat.st_size}:"
+                    f"{stat.st_mtime_ns}\0".encode()
+                )
+            self._module_fingerprint = digest.hexdigest()
+        return self._module_fingerprint
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -6,6 +6,9 @@ class FieldNames:
     get_current_instance = "get_current_instance"
     uzon_ir = "__uzon_ir__"
     uzon_steps = "__uzon_steps__"
+    uzon_step_pool = "__uzon_step_pool__"
+    uzon_loop_tracker = "__uzon_loop_tracker__"
+    uzon_loop_prefix = "__uzon_loop_"
     value = "value"
     unit = "unit"
     
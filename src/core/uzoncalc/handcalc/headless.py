@@ -0,0 +1,166 @@
+"""无记录执行：编译只采集最终变量的计算函数
+
+无记录模式下计算函数按原始代码执行，不注入任何记录调用；函数体被包进
+try/finally，退出时读取一次局部变量并交给采集回调。
+"""
+
+import ast
+import inspect
+import os
+import textwrap
+import threading
+import weakref
+from types import FunctionType
+from typing import Any, Callable, Mapping
+
+from ..globals import _calc_instance
+from .ast_instrument import _calculate_line_offset
+from .exceptions import InstrumentationError
+
+_CAPTURE_NAME = "__uzon_capture_values__"
+_LOCALS_NAME = "locals"
+# 插桩生成的临时变量不属于计算结果
+_INTERNAL_PREFIXES = ("__uzon_", "__fstring_val_")
+
+_HEADLESS_CACHE: "weakref.WeakKeyDictionary[Callable[..., Any], FunctionType]" = (
+    weakref.WeakKeyDictionary()
+)
+_HEADLESS_LOCK = threading.Lock()
+
+
+def headless_function(func: Callable[..., Any]) -> FunctionType:
+    """
+    返回无记录版本的计算函数。
+
+    函数返回前把函数体内赋值的变量写入当前上下文的 headless_values；
+    同一个原函数对象只编译一次。
+    """
+    with _HEADLESS_LOCK:
+        cached = _HEADLESS_CACHE.get(func)
+    if cached is not None:
+        return cached
+
+    try:
+        src = textwrap.dedent(inspect.getsource(func))
+        mod = ast.parse(src)
+    except Exception as e:
+        raise InstrumentationError(
+            f"Failed to parse source of function {func.__name__}: {e}"
+        ) from e
+
+    func_def = next(
+        (
+            node
+            for node in mod.body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            and node.name == func.__name__
+        ),
+        None,
+    )
+    if func_def is None:
+        raise InstrumentationError(
+            f"headless_function: failed to locate function {func.__name__}"
+        )
+
+    # 与插桩相同：移除装饰器并修正行号，保证异常堆栈指向源文件
+    func_def.decorator_list = []
+    names = assigned_names(func_def.body)
+    func_def.body = [_wrap_with_capture(func_def.body, names)]
+    mod.body = [func_def]
+    ast.fix_missing_locations(mod)
+    lineno_offset = _calculate_line_offset(
+        func.__code__.co_firstlineno, func_def.lineno
+    )
+    if lineno_offset != 0:
+        ast.increment_lineno(mod, lineno_offset)
+
+    source_file = inspect.getsourcefile(func)
+    filename = os.path.abspath(source_file) if source_file else "<headless>"
+
+    glb: dict[str, Any] = dict(func.__globals__)
+    glb[_CAPTURE_NAME] = _capture_values
+    loc: dict[str, Any] = {}
+    try:
+        exec(compile(mod, filename=filename, mode="exec"), glb, loc)
+    except Exception as e:
+        raise InstrumentationError(
+            f"Failed to compile headless function {func.__name__}: {e}"
+        ) from e
+
+    new_func = loc.get(func.__name__)
+    if not isinstance(new_func, FunctionType):
+        raise InstrumentationError(
+            f"headless_function: failed to rebuild function {func.__name__}"
+        )
+
+    with _HEADLESS_LOCK:
+        _HEADLESS_CACHE[func] = new_func
+    return new_func
+
+
+def _capture_values(frame_locals: Mapping[str, Any], names: tuple[str, ...]) -> None:
+    """把已绑定的赋值变量写入当前上下文"""
+    ctx = _calc_instance.get()
+    if ctx is None:
+        return
+    ctx.headless_values = {
+        name: frame_locals[name] for name in names if name in frame_locals
+    }
+
+
+def assigned_names(body: list[ast.stmt]) -> tuple[str, ...]:
+    """按出现顺序返回函数作用域内赋值语句绑定的变量名（不含嵌套作用域）"""
+    names: dict[str, None] = {}
+
+    def add_target(target: ast.expr) -> None:
+        for node in ast.walk(target):
+            if isinstance(node, ast.Name) and not node.id.startswith(
+                _INTERNAL_PREFIXES
+            ):
+                names.setdefault(node.id, None)
+
+    def visit(node: ast.AST) -> None:
+        if isinstance(
+            node,
+            (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda),
+        ):
+            return
+        if isinstance(
+            node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+        ):
+            return
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                add_target(target)
+        elif isinstance(node, (ast.AugAssign, ast.AnnAssign)):
+            if not isinstance(node, ast.AnnAssign) or node.value is not None:
+                add_target(node.target)
+        elif isinstance(node, ast.NamedExpr):
+            add_target(node.target)
+        for child in ast.iter_child_nodes(node):
+            visit(child)
+
+    for stmt in body:
+        visit(stmt)
+    return tuple(names)
+
+
+def _wrap_with_capture(body: list[ast.stmt], names: tuple[str, ...]) -> ast.Try:
+    """生成 try: <body> finally: __uzon_capture_values__(locals(), names)"""
+    capture_call = ast.Expr(
+        value=ast.Call(
+            func=ast.Name(id=_CAPTURE_NAME, ctx=ast.Load()),
+            args=[
+                ast.Call(
+                    func=ast.Name(id=_LOCALS_NAME, ctx=ast.Load()),
+                    args=[],
+                    keywords=[],
+                ),
+                ast.Constant(value=names),
+            ],
+            keywords=[],
+        )
+    )
+    try_node = ast.Try(body=body, handlers=[], orelse=[], finalbody=[capture_call])
+    ast.copy_location(try_node, body[0])
+    return try_node
@@ -0,0 +1,137 @@
+"""模块级插桩导入钩子：每个模块只解析一次，所有计算函数在一次遍历中完成插桩
+
+默认不启用。启用后，被加载的模块在编译前就完成插桩，
+运行期装饰器检测到插桩标记后不再逐个函数调用 inspect.getsource 与 ast.parse。
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import os
+import sys
+from collections.abc import Iterable
+from types import CodeType
+from typing import Any
+
+from .preinstrument import _MARKER_NAME, instrument_module_ast
+
+# 设置为 "1" 时，CLI 与沙箱加载脚本时启用导入钩子
+IMPORT_HOOK_ENV = "UZONCALC_IMPORT_HOOK"
+
+# 源码中不包含该标识时，无需解析即可判定模块没有计算函数
+_DECORATOR_HINT = "uzon_calc"
+
+
+def is_import_hook_enabled() -> bool:
+    """检查是否通过环境变量启用了导入钩子"""
+    return os.environ.get(IMPORT_HOOK_ENV) == "1"
+
+
+def compile_instrumented_module(source: str | bytes, path: str) -> CodeType:
+    """解析模块源码一次，插桩全部计算函数后编译为单个代码对象。
+
+    已由构建服务预插桩的源码与不含计算装饰器的源码按原样编译。
+    插桩在原 AST 上进行，代码对象中的行号与源文件保持一致。
+    """
+    if isinstance(source, bytes):
+        source = importlib.util.decode_source(source)
+
+    if _DECORATOR_HINT not in source or _MARKER_NAME in source:
+        return compile(source, path, "exec", dont_inherit=True)
+
+    tree = ast.parse(source, filename=path)
+    instrument_module_ast(tree)
+    ast.fix_missing_locations(tree)
+    return compile(tree, path, "exec", dont_inherit=True)
+
+
+class InstrumentingLoader(importlib.machinery.SourceFileLoader):
+    """在编译阶段完成插桩的源码加载器
+
+    插桩后的代码不写入、也不读取 __pycache__，避免与普通导入的字节码混用。
+    """
+
+    def get_code(self, fullname: str) -> CodeType:
+        path = self.get_filename(fullname)
+        return self.source_to_code(self.get_data(path), path)
+
+    def source_to_code(  # type: ignore[override]
+        self, data: Any, path: Any, *, _optimize: int = -1
+    ) -> CodeType:
+        return compile_instrumented_module(data, str(path))
+
+
+class InstrumentingFinder(importlib.abc.MetaPathFinder):
+    """为指定目录下的源码模块提供插桩加载器的 meta path finder"""
+
+    def __init__(self, roots: Iterable[str]) -> None:
+        self._roots = tuple(
+            os.path.normcase(os.path.abspath(root)) for root in roots if root
+        )
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Any = None,
+        target: Any = None,
+    ) -> importlib.machinery.ModuleSpec | None:
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path, target)
+        if spec is None or spec.origin is None:
+            return None
+        if not isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+            return None
+        if not self._is_under_roots(spec.origin):
+            return None
+
+        spec.loader = InstrumentingLoader(fullname, spec.origin)
+        return spec
+
+    def _is_under_roots(self, origin: str) -> bool:
+        origin = os.path.normcase(os.path.abspath(origin))
+        for root in self._roots:
+            try:
+                if os.path.commonpath((origin, root)) == root:
+                    return True
+            except ValueError:
+                # 不同盘符等无法比较的路径
+                continue
+        return False
+
+
+def install_import_hook(roots: Iterable[str]) -> InstrumentingFinder:
+    """安装导入钩子，仅对 roots 目录下的模块生效，返回 finder 以便卸载"""
+    finder = InstrumentingFinder(roots)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def uninstall_import_hook(finder: InstrumentingFinder) -> None:
+    """卸载 install_import_hook 安装的 finder"""
+    try:
+        sys.meta_path.remove(finder)
+    except ValueError:
+        pass
+
+
+def spec_from_file_location(
+    name: str, location: str, **kwargs: Any
+) -> importlib.machinery.ModuleSpec | None:
+    """与 importlib.util.spec_from_file_location 相同，但使用插桩加载器"""
+    return importlib.util.spec_from_file_location(
+        name, location, loader=InstrumentingLoader(name, location), **kwargs
+    )
+
+
+__all__ = [
+    "IMPORT_HOOK_ENV",
+    "InstrumentingFinder",
+    "InstrumentingLoader",
+    "compile_instrumented_module",
+    "install_import_hook",
+    "is_import_hook_enabled",
+    "spec_from_file_location",
+    "uninstall_import_hook",
+]
@@ -2,12 +2,26 @@ from __future__ import annotations
 
 import ast
 from dataclasses import dataclass, fields, is_dataclass
-from typing import Any, ClassVar, List
+from typing import (
+    Any,
+    ClassVar,
+    Hashable,
+    List,
+    NamedTuple,
+    TypeVar,
+    get_origin,
+    get_type_hints,
+)
+import weakref
 import xml.etree.ElementTree as ET
 
+from ..cache.lru import BoundedLRUCache
+
 
 _FACTORY_NAME_OVERRIDES: dict[type, str] = {}
 _POWER_EXPONENT_SPACE_WIDTH = "0.2em"
+_MATH_OPEN = '<math xmlns="http://www.w3.org/1998/Math/MathML">'
+_MATH_CLOSE = "</math>"
 
 
 # MathNode IR(means Intermediate Representation) node definitions
@@ -18,7 +32,7 @@ _POWER_EXPONENT_SPACE_WIDTH = "0.2em"
 # ============================
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class MathNode:
     """Base type for MathNode IR nodes."""
 
@@ -33,38 +47,66 @@ class MathNode:
         Render this node into a MathML Element (without <math> root).
         Most nodes map directly to a MathML tag like <mi>, <mrow>, etc.
         """
+        out: list[str] = []
+        self._write_mathml(out)
+        return ET.fromstring("".join(out))
 
-        if not is_dataclass(self):
-            e = ET.Element(MText.tag)
-            e.text = str(self)
-            return e
+    def to_mathml_xml(self) -> str:
+        """Render this node into a <math>...</math> XML string."""
+        out = [_MATH_OPEN]
+        _write_row(self, out)
+        out.append(_MATH_CLOSE)
+        return "".join(out)
 
-        tag = self.tag
+    def _mathml_tag(self) -> str:
+        """Return the tag of the element this node renders as."""
+        return self.tag
 
-        # Per-class default MathML attributes (e.g. units).
-        attrib: dict[str, str] = dict(getattr(type(self), "mathml_attrib", {}) or {})
+    def _write_mathml(self, out: list[str], leading: str = "") -> None:
+        """
+        Append this node's MathML (without <math> root) to ``out``.
 
-        node_fields = list(fields(self))
+        Composite subtrees go through the shared fragment cache so the same
+        node object is only serialized once.
+        """
+        if leading or type(self).single_primitive_payload:
+            self._emit_mathml(out, leading)
+            return
+        _MATHML_FRAGMENT_CACHE.write(self, out)
+
+    def _emit_mathml(self, out: list[str], leading: str = "") -> None:
+        """
+        Serialize this node's MathML (without <math> root) into ``out``.
+
+        Output matches ElementTree serialization byte for byte: class-level
+        tag/attribute templates are precomputed, then primitive fields become
+        attributes and node fields become children.
+        ``leading`` is raw markup inserted before the first child.
+        """
+        template = _get_mathml_template(type(self))
 
-        # Leaf nodes: single primitive payload => element.text.
+        # Leaf nodes: single primitive payload => element text.
         # This must not trigger for nodes like MSqrt(body) which also have 1 field.
-        if type(self).single_primitive_payload:
-            if len(node_fields) != 1:
+        if template.is_leaf:
+            if len(template.field_names) != 1:
                 # Defensive: keep structure consistent.
-                e = ET.Element(tag, attrib=attrib)
-                e.text = str(self)
-                return e
-            payload = getattr(self, node_fields[0].name)
-            e = ET.Element(tag, attrib=attrib)
-            e.text = str(payload)
-            return e
+                text = str(self)
+            else:
+                text = str(getattr(self, template.field_names[0]))
+            if text:
+                out.append(
+                    f"{template.start}>{_escape_text(text)}</{template.tag}>"
+                )
+            else:
+                out.append(f"{template.start} />")
+            return
 
         # Collect children vs primitive fields.
-        primitive_attrib: dict[str, str] = {}
-        child_values: list[Any] = []
+        start = template.start
+        child_values: list[MathNode] = []
 
-        for f in node_fields:
-            v = getattr(self, f.name)
+        for name in template.field_names:
+            v = getattr(self, name)
 
             if isinstance(v, MathNode):
                 child_values.append(v)
@@ -77,30 +119,20 @@ class MathNode:
             if v is None:
                 continue
 
-            primitive_attrib[f.name] = str(v)
-
-        attrib.update(primitive_attrib)
-
-        e = ET.Element(tag, attrib=attrib)
-
-        # For stable composition, certain containers wrap child atoms into <mrow>.
-        wrap_child = tag in {MFrac.tag, MSup.tag, MSub.tag, MSqrt.tag, MFenced.tag}
-
-        for ch in child_values:
-            if wrap_child:
-                e.append(_wrap_row(ch))
-            else:
-                e.append(ch.to_mathml_element())
-
-        return e
+            start += f' {name}="{_escape_attrib(str(v))}"'
 
-    def to_mathml_xml(self) -> str:
-        """Render this node into a <math>...</math> XML string."""
+        if not child_values and not leading:
+            out.append(f"{start} />")
+            return
 
-        ET.register_namespace("", self._MATHML_NS)
-        math = ET.Element("math", attrib={"xmlns": self._MATHML_NS})
-        math.append(_wrap_row(self))
-        return ET.tostring(math, encoding="unicode", method="xml")
+        out.append(f"{start}>{leading}")
+        if template.wrap_children:
+            for ch in child_values:
+                _write_row(ch, out)
+        else:
+            for ch in child_values:
+                ch._write_mathml(out)
+        out.append(f"</{template.tag}>")
 
     def to_python_ast(self, *, ir_var_name: str) -> ast.expr:
         """Convert this node into Python AST that reconstructs it at runtime."""
@@ -166,11 +198,13 @@ class MMath(MathNode):
 
     def to_mathml_xml(self) -> str:
         # Override: render children directly under <math> with correct xmlns.
-        ET.register_namespace("", self._MATHML_NS)
-        math = ET.Element("math", attrib={"xmlns": self._MATHML_NS})
+        if not self.children:
+            return f"{_MATH_OPEN[:-1]} />"
+        out = [_MATH_OPEN]
         for ch in self.children:
-            math.append(ch.to_mathml_element())
-        return ET.tostring(math, encoding="unicode", method="xml")
+            ch._write_mathml(out)
+        out.append(_MATH_CLOSE)
+        return "".join(out)
 
 
 @dataclass(frozen=True, slots=True)
@@ -298,59 +332,64 @@ class MSup(MathNode):
     exponent: MathNode
     tag: ClassVar[str] = "msup"
 
-    def to_mathml_element(self) -> ET.Element:
-        function_power_el = self._try_render_function_power()
-        if function_power_el is not None:
-            return function_power_el
+    def _mathml_tag(self) -> str:
+        if self._function_power_index() is not None:
+            return MRow.tag
+        return self.tag
+
+    def _emit_mathml(self, out: list[str], leading: str = "") -> None:
+        function_power_index = self._function_power_index()
+        if function_power_index is not None:
+            self._write_function_power(out, function_power_index, leading)
+            return
 
-        e = ET.Element(self.tag)
+        out.append(f"<{self.tag}>{leading}")
 
         base_needs_parentheses = self._needs_parentheses_for_power_base(self.base)
-        base_el = _wrap_row(self.base)
         if base_needs_parentheses:
-            base_el = self._parenthesize(base_el)
+            out.append(f"<{MRow.tag}><{Mo.tag}>(</{Mo.tag}>")
+            _write_row(self.base, out)
+            out.append(f"<{Mo.tag}>)</{Mo.tag}></{MRow.tag}>")
+        else:
+            _write_row(self.base, out)
 
-        e.append(base_el)
-        e.append(self._wrap_exponent_with_spacing(not base_needs_parentheses))
-        return e
+        self._write_exponent_with_spacing(out, not base_needs_parentheses)
+        out.append(f"</{self.tag}>")
 
-    def _wrap_exponent_with_spacing(self, add_spacing: bool) -> ET.Element:
+    def _write_exponent_with_spacing(self, out: list[str], add_spacing: bool) -> None:
         """按底数类型为幂标添加 MathML 原生间距。"""
         # 原子底数需要轻微间距；括号底数已有右括号边界，不再额外加宽。
-        exponent_row = _wrap_row(self.exponent)
         if not add_spacing:
-            return exponent_row
-
-        leading_space = ET.Element(
-            "mspace", attrib={"width": _POWER_EXPONENT_SPACE_WIDTH}
+            _write_row(self.exponent, out)
+            return
+        _write_row(
+            self.exponent,
+            out,
+            leading=f'<mspace width="{_POWER_EXPONENT_SPACE_WIDTH}" />',
         )
-        exponent_row.insert(0, leading_space)
-        return exponent_row
 
-    def _try_render_function_power(self) -> ET.Element | None:
-        """将函数调用平方渲染为函数名右上角幂标。"""
+    def _function_power_index(self) -> int | None:
+        """函数调用幂次时返回函数名位置，否则返回 None。"""
         # 函数调用由 call_rendering 构造成 MRow，只有该结构适合移动幂标位置。
         if not isinstance(self.base, MRow):
             return None
+        return self._find_powered_function_name_index(self.base.children)
 
-        function_name_index = self._find_powered_function_name_index(self.base.children)
-        if function_name_index is None:
-            return None
-
-        row = ET.Element(MRow.tag)
-        for idx, child in enumerate(self.base.children):
+    def _write_function_power(
+        self, out: list[str], function_name_index: int, leading: str
+    ) -> None:
+        """将函数调用平方渲染为函数名右上角幂标。"""
+        out.append(f"<{MRow.tag}>{leading}")
+        for idx, child in enumerate(self.base.children):  # type: ignore[attr-defined]
             if idx == function_name_index:
-                row.append(self._render_function_name_power(child))
+                # 构造不带额外间距的函数名幂标节点。
+                out.append(f"<{self.tag}>")
+                _write_row(child, out)
+                _write_row(self.exponent, out)
+                out.append(f"</{self.tag}>")
                 continue
-            row.append(child.to_mathml_element())
-        return row
-
-    def _render_function_name_power(self, function_name: MathNode) -> ET.Element:
-        """构造不带额外间距的函数名幂标节点。"""
-        power_el = ET.Element(self.tag)
-        power_el.append(_wrap_row(function_name))
-        power_el.append(_wrap_row(self.exponent))
-        return power_el
+            child._write_mathml(out)
+        out.append(f"</{MRow.tag}>")
 
     @staticmethod
     def _find_powered_function_name_index(children: list[MathNode]) -> int | None:
@@ -375,27 +414,14 @@ class MSup(MathNode):
         last atom (e.g. `5 m^2`). Adding parentheses makes intent unambiguous.
         """
 
-        # Atomic bases don't need parentheses: x^2, 5^2, m^2.
+        # Atomic bases don't need parentheses: x^2, 5^2, m^2, x_1^2.
         # power is mrow
-        if node.single_primitive_payload:
+        if node.single_primitive_payload or isinstance(node, MScript):
             return False
 
         # Composite bases should be parenthesized: (a+b)^2, (5 m)^2, (a/b)^2.
         return True
 
-    @staticmethod
-    def _parenthesize(base_el: ET.Element) -> ET.Element:
-        row = ET.Element(MRow.tag)
-        left = ET.Element(Mo.tag)
-        left.text = "("
-        right = ET.Element(Mo.tag)
-        right.text = ")"
-
-        row.append(left)
-        row.append(base_el)
-        row.append(right)
-        return row
-
 
 @dataclass(frozen=True, slots=True)
 class MSub(MathNode):
@@ -418,6 +444,34 @@ class MFenced(MathNode):
     tag: ClassVar[str] = "mfenced"
 
 
+@dataclass(frozen=True, slots=True)
+class MScript(MathNode):
+    """Identifier written with script notation, such as ``a_b`` or ``x_i^2``.
+
+    ``kind`` is the rendered tag: msub, msup or msubsup. Children are written
+    directly, without <mrow> wrappers, and the node counts as an atom when
+    used as a power base, like the identifier it was written as.
+    """
+
+    children: List[MathNode]
+    kind: str
+
+    def _mathml_tag(self) -> str:
+        return self.kind
+
+    def _emit_mathml(self, out: list[str], leading: str = "") -> None:
+        out.append(f"<{self.kind}>{leading}")
+        for ch in self.children:
+            ch._write_mathml(out)
+        out.append(f"</{self.kind}>")
+
+
+# For stable composition, these containers wrap child atoms into <mrow>.
+_ROW_WRAPPED_CHILD_TAGS = frozenset(
+    {MFrac.tag, MSup.tag, MSub.tag, MSqrt.tag, MFenced.tag}
+)
+
+
 @dataclass(frozen=True, slots=True)
 class Equation(MathNode):
     """Pseudo-node representing an equation line rendered as <math><mrow>...</mrow></math>."""
@@ -425,28 +479,212 @@ class Equation(MathNode):
     parts: List[MathNode]
 
     def to_mathml_xml(self) -> str:
-        ET.register_namespace("", self._MATHML_NS)
-        math = ET.Element("math", attrib={"xmlns": self._MATHML_NS})
-        row = ET.Element(MRow.tag)
+        if not self.parts:
+            return f"{_MATH_OPEN}<{MRow.tag} />{_MATH_CLOSE}"
 
+        out = [_MATH_OPEN, f"<{MRow.tag}>"]
         for idx, part in enumerate(self.parts):
             if idx:
-                eq = ET.Element(Mo.tag)
-                eq.text = "="
-                row.append(eq)
-            row.append(_wrap_row(part))
+                out.append(f"<{Mo.tag}>=</{Mo.tag}>")
+            _write_row(part, out)
+        out.append(f"</{MRow.tag}>{_MATH_CLOSE}")
+        return "".join(out)
+
+
+def _write_row(node: MathNode, out: list[str], leading: str = "") -> None:
+    """Append ``node`` as an <mrow> element, wrapping it unless it already is one."""
+    if node._mathml_tag() == MRow.tag:
+        node._write_mathml(out, leading)
+        return
+    out.append(f"<{MRow.tag}>{leading}")
+    node._write_mathml(out)
+    out.append(f"</{MRow.tag}>")
+
+
+class MathMLCacheInfo(NamedTuple):
+    """Statistics of the MathML fragment cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class _MathMLFragmentCache:
+    """Bounded LRU cache of serialized composite subtrees.
+
+    IR nodes are frozen but may hold lists and are therefore unhashable, so
+    entries are keyed on node identity. Each entry keeps a reference to its
+    node, which guarantees the id is not reused while the entry exists.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._entries: BoundedLRUCache[int, tuple[MathNode, str]] = (
+            BoundedLRUCache(maxsize)
+        )
+
+    def write(self, node: MathNode, out: list[str]) -> None:
+        if self._entries.maxsize <= 0:
+            node._emit_mathml(out)
+            return
+
+        key = id(node)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is node:
+            out.append(entry[1])
+            return
+
+        fragment_out: list[str] = []
+        node._emit_mathml(fragment_out)
+        fragment = "".join(fragment_out)
+        out.append(fragment)
+        self._entries.put(key, (node, fragment))
+
+    def resize(self, maxsize: int) -> None:
+        self._entries.resize(maxsize)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def info(self) -> MathMLCacheInfo:
+        stats = self._entries.stats()
+        return MathMLCacheInfo(
+            hits=stats.hits,
+            misses=stats.misses,
+            evictions=stats.evictions,
+            maxsize=stats.maxsize,
+            currsize=stats.currsize,
+        )
+
+
+_DEFAULT_MATHML_CACHE_SIZE = 4096
+_MATHML_FRAGMENT_CACHE = _MathMLFragmentCache(_DEFAULT_MATHML_CACHE_SIZE)
+
+
+def mathml_cache_info() -> MathMLCacheInfo:
+    """Return hit/miss statistics of the MathML fragment cache."""
+    return _MATHML_FRAGMENT_CACHE.info()
+
+
+def clear_mathml_cache() -> None:
+    """Drop all cached MathML fragments and reset statistics."""
+    _MATHML_FRAGMENT_CACHE.clear()
+
+
+def set_mathml_cache_size(maxsize: int) -> None:
+    """Set the maximum number of cached fragments; 0 disables the cache."""
+    _MATHML_FRAGMENT_CACHE.resize(maxsize)
+
+
+@dataclass(frozen=True, slots=True)
+class _MathMLTemplate:
+    """Precomputed per-class MathML serialization data."""
+
+    tag: str
+    # 开始标签（不含结尾的 ">"），已包含类级别的默认属性
+    start: str
+    field_names: tuple[str, ...]
+    is_leaf: bool
+    wrap_children: bool
+
+
+_MATHML_TEMPLATES: dict[type, _MathMLTemplate] = {}
+
+
+def _get_mathml_template(cls: type[MathNode]) -> _MathMLTemplate:
+    template = _MATHML_TEMPLATES.get(cls)
+    if template is None:
+        template = _build_mathml_template(cls)
+        _MATHML_TEMPLATES[cls] = template
+    return template
 
-        math.append(row)
-        return ET.tostring(math, encoding="unicode", method="xml")
 
+def _build_mathml_template(cls: type[MathNode]) -> _MathMLTemplate:
+    tag = cls.tag
+    start = f"<{tag}" + "".join(
+        f' {name}="{_escape_attrib(str(value))}"'
+        for name, value in (getattr(cls, "mathml_attrib", {}) or {}).items()
+    )
+    return _MathMLTemplate(
+        tag=tag,
+        start=start,
+        field_names=tuple(f.name for f in fields(cls)),
+        is_leaf=cls.single_primitive_payload,
+        wrap_children=tag in _ROW_WRAPPED_CHILD_TAGS,
+    )
 
-def _wrap_row(node: MathNode) -> ET.Element:
-    e = node.to_mathml_element()
-    if e.tag == MRow.tag:
-        return e
-    w = ET.Element(MRow.tag)
-    w.append(e)
-    return w
+
+class ChildField(NamedTuple):
+    """A dataclass field of an IR node that holds child nodes."""
+
+    index: int
+    name: str
+    is_list: bool
+
+
+@dataclass(frozen=True, slots=True)
+class NodeLayout:
+    """Per-class field layout used by IR traversals.
+
+    ``field_names`` lists every dataclass field in constructor order, so a
+    node can be rebuilt positionally; ``child_fields`` lists only the fields
+    that hold a child node or a list of child nodes.
+    """
+
+    field_names: tuple[str, ...]
+    child_fields: tuple[ChildField, ...]
+
+
+_NODE_LAYOUTS: dict[type, NodeLayout] = {}
+
+
+def node_layout(cls: type[MathNode]) -> NodeLayout:
+    """Return the cached field layout of an IR node class."""
+    layout = _NODE_LAYOUTS.get(cls)
+    if layout is None:
+        layout = _build_node_layout(cls)
+        _NODE_LAYOUTS[cls] = layout
+    return layout
+
+
+def _build_node_layout(cls: type[MathNode]) -> NodeLayout:
+    hints = get_type_hints(cls)
+    field_names: list[str] = []
+    child_fields: list[ChildField] = []
+    for index, f in enumerate(fields(cls)):
+        field_names.append(f.name)
+        hint = hints.get(f.name)
+        if get_origin(hint) is list:
+            child_fields.append(ChildField(index, f.name, True))
+        elif isinstance(hint, type) and issubclass(hint, MathNode):
+            child_fields.append(ChildField(index, f.name, False))
+    return NodeLayout(tuple(field_names), tuple(child_fields))
+
+
+def _escape_text(text: str) -> str:
+    """Escape element text the way ElementTree does."""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_attrib(text: str) -> str:
+    """Escape an attribute value the way ElementTree does."""
+    text = _escape_text(text)
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
 
 
 def _is_operator_node(node: MathNode, symbol: str) -> bool:
@@ -455,81 +693,153 @@ def _is_operator_node(node: MathNode, symbol: str) -> bool:
     return isinstance(node, Mo) and node.symbol == symbol
 
 
+TNode = TypeVar("TNode", bound=MathNode)
+
+# 结构相同的节点共享同一个对象，节点不再被引用时自动移除
+_INTERNED: "weakref.WeakValueDictionary[tuple[Hashable, ...], MathNode]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def intern_node(node: TNode) -> TNode:
+    """
+    Return the canonical instance structurally equal to ``node``.
+
+    Child nodes are keyed by identity, so trees built bottom-up from interned
+    nodes intern in O(fields) and structurally equal trees end up as the same
+    object. Nodes with unhashable primitive fields are returned unchanged.
+    """
+    key = _intern_key(node)
+    if key is None:
+        return node
+    existing = _INTERNED.get(key)
+    if existing is not None:
+        return existing  # type: ignore[return-value]
+    return _INTERNED.setdefault(key, node)  # type: ignore[return-value]
+
+
+def _intern_key(node: MathNode) -> tuple[Hashable, ...] | None:
+    # 被驻留的节点持有其子节点，子节点 id 在条目存活期间不会被复用
+    key: list[Hashable] = [type(node)]
+    for name in _get_mathml_template(type(node)).field_names:
+        v = getattr(node, name)
+        if isinstance(v, MathNode):
+            key.append(id(v))
+        elif isinstance(v, list):
+            if not all(isinstance(ch, MathNode) for ch in v):
+                return None
+            key.append(tuple(map(id, v)))
+        elif v is None or isinstance(v, str):
+            key.append(v)
+        else:
+            try:
+                hash(v)
+            except TypeError:
+                return None
+            key.append((type(v), v))
+    return tuple(key)
+
+
+def _intern_leaf(cls: type[TNode], payload: str) -> TNode:
+    existing = _INTERNED.get((cls, payload))
+    if existing is not None:
+        return existing  # type: ignore[return-value]
+    return _INTERNED.setdefault((cls, payload), cls(payload))  # type: ignore[return-value]
+
+
 def mi(name: str) -> Mi:
-    return Mi(name=name)
+    return _intern_leaf(Mi, name)
 
 
 def mi_array(name: str) -> MiArray:
-    return MiArray(name=name)
+    return _intern_leaf(MiArray, name)
 
 
 def mu(name: str) -> Mu:
-    return Mu(name=name)
+    return _intern_leaf(Mu, name)
 
 
 def mn(value: Any) -> Mn:
-    return Mn(value=str(value))
+    return _intern_leaf(Mn, str(value))
 
 
 def mo(symbol: str) -> Mo:
-    return Mo(symbol=symbol)
+    return _intern_leaf(Mo, symbol)
 
 
 def mtext(text: str) -> MText:
-    return MText(text=text)
+    return _intern_leaf(MText, text)
 
 
 def mfunction_name(text: str) -> MFunctionName:
     """构造函数名文本节点，避免函数名颜色逻辑散落在渲染器中。"""
-    return MFunctionName(text=text)
+    return _intern_leaf(MFunctionName, text)
 
 
+# 列表参数会被复制，调用方之后修改原列表不会影响共享节点
 def mrow(children: List[MathNode]) -> MRow:
-    return MRow(children=children)
+    return intern_node(MRow(children=list(children)))
 
 
 def mrow_array(children: List[MathNode]) -> MRowArray:
-    return MRowArray(children=children)
+    return intern_node(MRowArray(children=list(children)))
 
 
 def mcall(children: List[MathNode]) -> MCall:
     """Construct a function or method call row."""
-    return MCall(children=children)
+    return intern_node(MCall(children=list(children)))
 
 
 def mtd(children: List[MathNode]) -> MTd:
     """Construct a matrix table cell."""
-    return MTd(children=children)
+    return intern_node(MTd(children=list(children)))
 
 
 def mtr(children: List[MTd]) -> MTr:
     """Construct a matrix table row."""
-    return MTr(children=children)
+    return intern_node(MTr(children=list(children)))
 
 
 def mtable(rows: List[MTr]) -> MTable:
     """Construct a matrix table."""
-    return MTable(rows=rows)
+    return intern_node(MTable(rows=list(rows)))
 
 
 def mfrac(num: MathNode, den: MathNode) -> MFrac:
-    return MFrac(numerator=num, denominator=den)
+    return intern_node(MFrac(numerator=num, denominator=den))
 
 
 def msup(base: MathNode, exp: MathNode) -> MSup:
-    return MSup(base=base, exponent=exp)
+    return intern_node(MSup(base=base, exponent=exp))
 
 
 def msub(base: MathNode, sub: MathNode) -> MSub:
-    return MSub(base=base, subscript=sub)
+    return intern_node(MSub(base=base, subscript=sub))
 
 
 def msqrt(body: MathNode) -> MSqrt:
-    return MSqrt(body=body)
+    return intern_node(MSqrt(body=body))
 
 
 def mfenced(body: MathNode, *, open: str = "(", close: str = ")") -> MFenced:
-    return MFenced(body=body, open=open, close=close)
+    return intern_node(MFenced(body=body, open=open, close=close))
+
+
+def mscript(children: List[MathNode], kind: str) -> MScript:
+    """Construct a script-notation identifier rendered as ``kind``."""
+    return intern_node(MScript(children=list(children), kind=kind))
+
+
+def leaf_text(node: MathNode) -> str:
+    """Return the text payload of a leaf node."""
+    return getattr(node, _get_mathml_template(type(node)).field_names[0])
+
+
+def with_leaf_text(node: TNode, text: str) -> TNode:
+    """Return the leaf node of the same type carrying ``text``."""
+    if text == leaf_text(node):
+        return node
+    return _intern_leaf(type(node), text)
 
 
 def mmath(children: List[MathNode]) -> MMath:
@@ -0,0 +1,54 @@
+"""循环记录策略的运行期跟踪器"""
+
+from __future__ import annotations
+
+from typing import Any, TypeVar
+
+from ..globals import _calc_instance
+
+T = TypeVar("T")
+
+
+class LoopTracker:
+    """跟踪单个循环的迭代序号，决定本次迭代走插桩分支还是快速路径。
+
+    插桩后的循环形如::
+
+        __uzon_loop_0__ = __uzon_loop_tracker__()
+        for item in __uzon_loop_0__.iterate(items):
+            if __uzon_loop_0__.advance():
+                ...  # 插桩后的循环体
+            else:
+                ...  # 原始循环体
+
+    策略在循环开始时从当前上下文读取，循环执行期间保持不变。
+    """
+
+    __slots__ = ("_policy", "_index", "_length")
+
+    def __init__(self) -> None:
+        ctx = _calc_instance.get()
+        self._policy = ctx.options.loop_record if ctx is not None else None
+        self._index = -1
+        self._length: int | None = None
+
+    def iterate(self, iterable: T) -> T:
+        """记录可迭代对象的长度（若策略需要），原样返回以保持循环语义。"""
+        if self._policy is not None and self._policy.last:
+            self._length = _try_len(iterable)
+        return iterable
+
+    def advance(self) -> bool:
+        """进入下一次迭代，返回本次迭代是否需要记录。"""
+        self._index += 1
+        if self._policy is None:
+            return True
+        return self._policy.should_record(self._index, self._length)
+
+
+def _try_len(iterable: Any) -> int | None:
+    """获取可迭代对象长度，不支持时返回 None。"""
+    try:
+        return len(iterable)
+    except TypeError:
+        return None
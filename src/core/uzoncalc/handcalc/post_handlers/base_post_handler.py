@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Hashable
 
 from ...handler_protocols import HandlerContext
 
 if TYPE_CHECKING:
+    from .. import ir
     from .dom_utils import PostHandlerNode
 
 
@@ -13,11 +14,40 @@ class BasePostHandler:
 
     - `priority` 越小越先执行
     - `handle` 原地修改传入封装节点
+    - `may_apply` 是解析前的快速预判，返回 False 表示该片段中不存在可处理的内容
+    - `cache_key` 描述影响处理结果的状态，用于缓存后处理结果
+    - `transform_math_leaf` 在生成 MathML 前对公式 IR 执行等价处理
     """
 
     priority: int = 100
 
+    def may_apply(self, content: str, ctx: HandlerContext | None = None) -> bool:
+        """判断处理器是否可能修改该 HTML 片段。
+
+        只允许误报、不允许漏报；默认返回 True，即总是解析并执行 `handle`。
+        可借助 `fragment_text(content)` 获取片段的文本视图。
+        """
+        return True
+
     def handle(
         self, post_node: "PostHandlerNode", ctx: HandlerContext | None = None
     ) -> None:
         raise NotImplementedError()
+
+    def cache_key(self, ctx: HandlerContext | None = None) -> Hashable | None:
+        """返回决定处理结果的状态，相同片段在相同状态下输出相同。
+
+        默认返回 None，表示结果可能依赖其它状态，包含该处理器的管道不缓存。
+        仅依赖片段内容的处理器返回 ``()`` 即可。
+        """
+        return None
+
+    def transform_math_leaf(
+        self, node: "ir.MathNode", ctx: HandlerContext | None = None
+    ) -> "ir.MathNode | None":
+        """在 IR 阶段对公式叶节点执行与 `handle` 等价的处理。
+
+        返回处理后的节点，未变化时返回原节点；返回 None 表示无法在 IR 阶段处理，
+        公式仍以 MathML 形式交由 `handle` 处理。默认不支持。
+        """
+        return None
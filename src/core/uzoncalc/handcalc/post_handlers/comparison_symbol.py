@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+from .. import ir
 from .base_post_handler import BasePostHandler
-from .dom_utils import PostHandlerNode
+from .dom_utils import PostHandlerNode, fragment_text
 
 
 class ComparisonSymbol(BasePostHandler):
@@ -19,6 +20,15 @@ class ComparisonSymbol(BasePostHandler):
     }
     _SKIP_TEXT_TAGS = {"code", "pre", "script", "style", "latex"}
 
+    def cache_key(self, ctx=None) -> tuple[()]:
+        """处理结果只取决于片段内容。"""
+        return ()
+
+    def may_apply(self, content: str, ctx=None) -> bool:
+        """仅当文本中出现比较运算符时才需要处理。"""
+        text = fragment_text(content)
+        return any(source in text for source in self._REPLACEMENTS)
+
     def handle(self, post_node: PostHandlerNode, ctx=None) -> None:
         """转换当前节点可见文本中的比较运算符。"""
         post_node.replace_text(
@@ -28,6 +38,13 @@ class ComparisonSymbol(BasePostHandler):
             self._replace_comparison_symbols, skip_tags=self._SKIP_TEXT_TAGS
         )
 
+    def transform_math_leaf(self, node: ir.MathNode, ctx=None) -> ir.MathNode:
+        """转换公式叶节点文本中的比较运算符。"""
+        text = ir.leaf_text(node)
+        if not text:
+            return node
+        return ir.with_leaf_text(node, self._replace_comparison_symbols(text))
+
     def _replace_comparison_symbols(self, text: str) -> str:
         """转换普通文本中的比较运算符。"""
         for source, target in self._REPLACEMENTS.items():
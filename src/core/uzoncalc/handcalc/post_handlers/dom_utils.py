@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import html
+import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Callable, Iterable, TypeAlias
 
 import lxml.etree as etree
@@ -11,6 +14,18 @@ import lxml.html as lxml_html
 HtmlPart: TypeAlias = str | etree._Element
 FRAGMENT_ROOT_TAG = "uzoncalc-post-root"
 
+# 文档级后处理模式下包裹待处理片段的标签
+# 属性记录片段追加时的选项快照编号，以及需要执行的第一个后处理器的下标
+FRAGMENT_MARK_TAG = "uzoncalc-post-fragment"
+FRAGMENT_OPTIONS_ATTR = "data-options"
+FRAGMENT_HANDLERS_ATTR = "data-handlers"
+FRAGMENT_CACHE_ATTR = "data-cache"
+
+# 标签、注释与声明；与 HTML 解析器相比只会多保留文本，不会漏掉文本
+_MARKUP_PATTERN = re.compile(r"<[A-Za-z/!?][^>]*>")
+# 替换标签的分隔符，使不同文本节点在文本视图中不会首尾相连
+TEXT_NODE_SEPARATOR = "\x00"
+
 
 @dataclass
 class PostHandlerNode:
@@ -292,6 +307,20 @@ class PostHandlerNode:
         return node.tag.rsplit("}", 1)[-1].lower()
 
 
+@lru_cache(maxsize=8)
+def fragment_text(content: str) -> str:
+    """Return a cheap approximation of the text nodes of an HTML fragment.
+
+    Markup is replaced with ``TEXT_NODE_SEPARATOR`` and entities are decoded,
+    without building a DOM. The result is a superset of the text the parser
+    would produce, so post handlers can use it to rule out a match before the
+    fragment is parsed. Results are cached because every handler's
+    ``may_apply`` inspects the same fragment.
+    """
+    text = _MARKUP_PATTERN.sub(TEXT_NODE_SEPARATOR, content)
+    return html.unescape(text) if "&" in text else text
+
+
 def parse_html_fragment(content: str) -> etree._Element:
     """Parse an HTML fragment or plain text into a temporary root element."""
     if content == "":
@@ -322,3 +351,75 @@ def serialize_html_fragment(root: etree._Element) -> str:
     ):
         return serialized_root[len(open_wrapper) : -len(close_wrapper)]
     return serialized_root
+
+
+def mark_fragment(
+    content: str,
+    options_id: int,
+    first_handler: int = 0,
+    cache_slot: int | None = None,
+) -> str:
+    """Wrap a fragment awaiting the document-level post-handler pass.
+
+    ``cache_slot`` identifies the fragment whose output should be stored in
+    the post-process cache once the pass has run.
+    """
+    cache_attr = (
+        f' {FRAGMENT_CACHE_ATTR}="{cache_slot}"' if cache_slot is not None else ""
+    )
+    return (
+        f'<{FRAGMENT_MARK_TAG} {FRAGMENT_OPTIONS_ATTR}="{options_id}" '
+        f'{FRAGMENT_HANDLERS_ATTR}="{first_handler}"{cache_attr}>'
+        f"{content}</{FRAGMENT_MARK_TAG}>"
+    )
+
+
+def serialize_mark_content(mark: etree._Element) -> str:
+    """Serialize the children and text of a fragment mark, without the mark."""
+    serialized = etree.tostring(
+        mark, encoding="unicode", method="html", with_tail=False
+    )
+    start = serialized.index(">") + 1
+    end = serialized.rindex(f"</{FRAGMENT_MARK_TAG}>")
+    return serialized[start:end]
+
+
+def collect_marked_nodes(
+    root: etree._Element,
+) -> list[tuple[PostHandlerNode, tuple[int, int]]]:
+    """List nodes inside fragment marks in document order.
+
+    Each node is paired with the ``(options id, first handler)`` of its
+    nearest enclosing mark.
+    Marks themselves are included so their leading text is visited, matching
+    the temporary root of a separately parsed fragment; nodes outside any mark
+    are skipped. Tag contexts are filled in top-down during the walk instead
+    of being looked up through the ancestors of every node.
+    """
+    result: list[tuple[PostHandlerNode, tuple[int, int]]] = []
+
+    def _visit(
+        parent: etree._Element,
+        parent_context: tuple[str, ...],
+        mark: tuple[int, int] | None,
+    ) -> None:
+        for child in parent:
+            child_id = mark
+            if child.tag == FRAGMENT_MARK_TAG:
+                child_id = (
+                    int(child.get(FRAGMENT_OPTIONS_ATTR, "0")),
+                    int(child.get(FRAGMENT_HANDLERS_ATTR, "0")),
+                )
+
+            post_node = PostHandlerNode(child)
+            tag_name = post_node._get_element_tag_name(child)
+            context = (tag_name, *parent_context) if tag_name else parent_context
+            post_node._tag_name = tag_name
+            post_node._text_context_tag_names = context
+            if child_id is not None:
+                result.append((post_node, child_id))
+            _visit(child, context, child_id)
+
+    root_tag_name = PostHandlerNode(root).tag_name
+    _visit(root, (root_tag_name,) if root_tag_name else (), None)
+    return result
@@ -4,10 +4,12 @@ import re
 
 import lxml.etree as etree
 
+from .. import ir
 from .base_post_handler import BasePostHandler
 from .dom_utils import (
     HtmlPart,
     PostHandlerNode,
+    fragment_text,
 )
 
 
@@ -25,6 +27,15 @@ class FormatUrl(BasePostHandler):
     )
     _TRAILING_PUNCTUATION = ",.;:!?)]}"
 
+    def cache_key(self, ctx=None) -> tuple[()]:
+        """处理结果只取决于片段内容。"""
+        return ()
+
+    def may_apply(self, content: str, ctx=None) -> bool:
+        """与 `_format_url_text_parts` 使用相同的快速判断。"""
+        text = fragment_text(content)
+        return "http://" in text or "https://" in text or "www." in text
+
     def handle(self, post_node: PostHandlerNode, ctx=None) -> None:
         """将当前节点可见文本中的 URL 转换为链接。"""
         if post_node.node.text and not post_node.is_text_in_tag_context(
@@ -40,6 +51,13 @@ class FormatUrl(BasePostHandler):
                 self._format_url_text_parts(post_node.node.tail)
             )
 
+    def transform_math_leaf(self, node: ir.MathNode, ctx=None) -> ir.MathNode | None:
+        """公式中的网址需要生成 a 标签，IR 无法表示，交由 DOM 后处理。"""
+        text = ir.leaf_text(node)
+        if "http://" in text or "https://" in text or "www." in text:
+            return None
+        return node
+
     def _format_url_text_parts(self, text: str) -> list[HtmlPart]:
         """将单个文本片段中的 URL 转换为 a 标签片段。"""
         if "http://" not in text and "https://" not in text and "www." not in text:
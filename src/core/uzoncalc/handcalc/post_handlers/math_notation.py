@@ -0,0 +1,147 @@
+"""公式的 IR 阶段后处理：生成 MathML 之前完成别名、希腊字母与上下标转换
+
+公式中的变量名在构建 IR 时即已确定，由各后处理器的 `transform_math_leaf`
+直接改写叶节点，得到的 MathML 无需再经过 DOM 解析与遍历。
+"""
+
+from __future__ import annotations
+
+from typing import Hashable, Sequence
+
+from ...cache.lru import BoundedLRUCache
+from ...handler_protocols import HandlerContext
+from .. import ir
+from ..transformers import transform_ir
+from .base_post_handler import BasePostHandler
+
+
+class ProcessedFragment(str):
+    """已完成全部后处理的 HTML 片段，写入上下文时不再经过后处理器。"""
+
+    __slots__ = ()
+
+
+class _Unsupported(Exception):
+    """某个后处理器无法在 IR 阶段处理当前公式。"""
+
+
+# 公式序列化时额外输出、不属于 IR 叶节点的文本，后处理器改写它们时只能走 DOM 后处理
+_SYNTHETIC_LEAVES = ("=", "(", ")")
+
+_DEFAULT_NOTATION_CACHE_SIZE = 4096
+
+
+class _NotationCache:
+    """Bounded LRU cache of notated IR trees.
+
+    Entries are keyed on node identity plus the state of the handler
+    pipeline, so a formula is transformed once per alias configuration. Each
+    entry keeps its source node alive, which guarantees the id is not reused.
+    A cached result of None records that the pipeline cannot run in IR.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._entries: BoundedLRUCache[
+            tuple[int, Hashable], tuple[ir.MathNode, ir.MathNode | None]
+        ] = BoundedLRUCache(maxsize)
+
+    def get(
+        self, node: ir.MathNode, state: Hashable
+    ) -> tuple[bool, ir.MathNode | None]:
+        entry = self._entries.get((id(node), state))
+        if entry is None or entry[0] is not node:
+            return False, None
+        return True, entry[1]
+
+    def put(
+        self, node: ir.MathNode, state: Hashable, result: ir.MathNode | None
+    ) -> None:
+        self._entries.put((id(node), state), (node, result))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_NOTATION_CACHE = _NotationCache(_DEFAULT_NOTATION_CACHE_SIZE)
+
+
+def clear_notation_cache() -> None:
+    """Drop all cached notated formulas."""
+    _NOTATION_CACHE.clear()
+
+
+def notate_equation_parts(
+    parts: Sequence[ir.MathNode], ctx: HandlerContext
+) -> list[ir.MathNode] | None:
+    """Apply the context's post handlers to equation parts at IR level.
+
+    Every handler rewrites leaf nodes in pipeline order, the way ``handle``
+    rewrites element text; once a handler turns a leaf into a structure, later
+    handlers leave it alone, as they do with replaced DOM elements.
+
+    Returns:
+        The notated parts, or None when some handler cannot run in IR, in
+        which case the MathML must go through DOM post-processing.
+    """
+    handlers = ctx.options.post_handlers
+    state = _pipeline_state(handlers, ctx)
+
+    for symbol in _SYNTHETIC_LEAVES:
+        leaf = ir.mo(symbol)
+        if _notate(leaf, handlers, ctx, state) is not leaf:
+            return None
+
+    notated: list[ir.MathNode] = []
+    for part in parts:
+        result = _notate(part, handlers, ctx, state)
+        if result is None:
+            return None
+        notated.append(result)
+    return notated
+
+
+def _pipeline_state(
+    handlers: Sequence[BasePostHandler], ctx: HandlerContext
+) -> Hashable | None:
+    """组合各处理器的 cache_key；任一处理器没有缓存键时不缓存。"""
+    keys: list[Hashable] = []
+    for handler in handlers:
+        key = handler.cache_key(ctx)
+        if key is None:
+            return None
+        keys.append((type(handler), key))
+    return tuple(keys)
+
+
+def _notate(
+    node: ir.MathNode,
+    handlers: Sequence[BasePostHandler],
+    ctx: HandlerContext,
+    state: Hashable | None,
+) -> ir.MathNode | None:
+    if state is not None:
+        found, cached = _NOTATION_CACHE.get(node, state)
+        if found:
+            return cached
+
+    def _transform_leaf(n: ir.MathNode) -> ir.MathNode | None:
+        if not type(n).single_primitive_payload:
+            return None
+        result = n
+        for handler in handlers:
+            if not type(result).single_primitive_payload:
+                break
+            transformed = handler.transform_math_leaf(result, ctx)
+            if transformed is None:
+                raise _Unsupported
+            result = transformed
+        return result
+
+    try:
+        result: ir.MathNode | None = transform_ir(node, _transform_leaf)
+    except _Unsupported:
+        result = None
+
+    if state is not None:
+        _NOTATION_CACHE.put(node, state, result)
+    return result
@@ -0,0 +1,85 @@
+"""后处理结果缓存：相同片段在相同处理器状态下只解析一次"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Hashable, NamedTuple, Sequence
+
+from ...cache.lru import BoundedLRUCache
+from ...handler_protocols import HandlerContext
+
+if TYPE_CHECKING:
+    from .base_post_handler import BasePostHandler
+
+# 超过该长度的片段不缓存，避免少量大片段占满内存
+MAX_CACHED_CONTENT_LENGTH = 64 * 1024
+
+
+class PostProcessCacheInfo(NamedTuple):
+    """Statistics of the post-handler output cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+_DEFAULT_POST_PROCESS_CACHE_SIZE = 2048
+# 键由片段字符串与流水线中各处理器的类及 cache_key 组成，
+# 处理器状态相同的上下文共享条目；含无缓存键处理器的流水线不缓存
+_POST_PROCESS_CACHE: BoundedLRUCache[Hashable, str] = BoundedLRUCache(
+    _DEFAULT_POST_PROCESS_CACHE_SIZE
+)
+
+
+def make_cache_key(
+    content: str,
+    handlers: Sequence[BasePostHandler],
+    ctx: HandlerContext | None,
+) -> Hashable | None:
+    """Build the cache key of a fragment, or None when it must not be cached."""
+    if len(content) > MAX_CACHED_CONTENT_LENGTH:
+        return None
+
+    handler_keys: list[Hashable] = []
+    for handler in handlers:
+        handler_key = handler.cache_key(ctx)
+        if handler_key is None:
+            return None
+        handler_keys.append((type(handler), handler_key))
+    return content, tuple(handler_keys)
+
+
+def get_cached_output(key: Hashable) -> str | None:
+    """Return the cached post-processed fragment for a key."""
+    if _POST_PROCESS_CACHE.maxsize <= 0:
+        return None
+    return _POST_PROCESS_CACHE.get(key)
+
+
+def store_cached_output(key: Hashable, output: str) -> None:
+    """Store a post-processed fragment."""
+    _POST_PROCESS_CACHE.put(key, output)
+
+
+def post_process_cache_info() -> PostProcessCacheInfo:
+    """Return process-wide statistics of the post-handler output cache."""
+    stats = _POST_PROCESS_CACHE.stats()
+    return PostProcessCacheInfo(
+        hits=stats.hits,
+        misses=stats.misses,
+        evictions=stats.evictions,
+        maxsize=stats.maxsize,
+        currsize=stats.currsize,
+    )
+
+
+def clear_post_process_cache() -> None:
+    """Drop all cached fragments and reset statistics."""
+    _POST_PROCESS_CACHE.clear()
+
+
+def set_post_process_cache_size(maxsize: int) -> None:
+    """Set the maximum number of cached fragments; 0 disables the cache."""
+    _POST_PROCESS_CACHE.resize(maxsize)
+
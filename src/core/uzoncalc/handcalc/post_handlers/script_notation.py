@@ -4,10 +4,12 @@ from typing import Callable
 
 import lxml.etree as etree
 
+from .. import ir
 from .base_post_handler import BasePostHandler
 from .dom_utils import (
     HtmlPart,
     PostHandlerNode,
+    fragment_text,
 )
 
 
@@ -59,6 +61,15 @@ class ScriptNotation(BasePostHandler):
     )
     _skip_text_tags = {"code", "pre", "script", "style", "math", "latex"}
 
+    def cache_key(self, ctx=None) -> tuple[()]:
+        """处理结果只取决于片段内容。"""
+        return ()
+
+    def may_apply(self, content: str, ctx=None) -> bool:
+        """上下标均以 _ 或 ^ 标记，文本中没有这两个符号时无需处理。"""
+        text = fragment_text(content)
+        return "_" in text or "^" in text
+
     def handle(self, post_node: PostHandlerNode, ctx=None) -> None:
         """执行上下标后处理，统一修正公式与普通 HTML 文本。"""
         self._render_mathml_mi_node(post_node)
@@ -80,6 +91,23 @@ class ScriptNotation(BasePostHandler):
             return
         post_node.replace_with_element(self._build_mathml_script(node, parsed))
 
+    def transform_math_leaf(self, node: ir.MathNode, ctx=None) -> ir.MathNode:
+        """将 mi 叶节点中的上下标变量转换为 IR 脚标结构，输出与 MathML 后处理一致。"""
+        if type(node).tag != "mi":
+            return node
+        text = ir.leaf_text(node)
+        if "_" not in text and "^" not in text:
+            return node
+
+        parsed = self._parse_single_script_notation(text)
+        if parsed is None:
+            return node
+        if parsed.is_escaped_base:
+            return ir.with_leaf_text(
+                node, parsed.base + self._plain_script_suffix(parsed)
+            )
+        return self._build_ir_script(node, parsed)
+
     def _render_html_text_node(self, post_node: PostHandlerNode) -> None:
         """仅转换 HTML 文本节点，避免误改标签属性。"""
         node = post_node.node
@@ -386,6 +414,27 @@ class ScriptNotation(BasePostHandler):
             return self._wrap_mathml_script("msup", base_xml, sup_xml_list[0])
         return base_xml
 
+    def _build_ir_script(
+        self, source_node: ir.MathNode, parsed: ScriptParseResult
+    ) -> ir.MathNode:
+        """构造与 `_build_mathml_script` 结构相同的 IR 上下标节点。"""
+        base: ir.MathNode = ir.with_leaf_text(source_node, parsed.base)
+        sub_nodes: list[ir.MathNode] = [ir.mtext(s) for s in parsed.subscripts]
+        sup_nodes: list[ir.MathNode] = [ir.mtext(s) for s in parsed.superscripts]
+
+        while len(sub_nodes) > 1:
+            base = ir.mscript([base, sub_nodes.pop(0)], "msub")
+        while len(sup_nodes) > 1:
+            base = ir.mscript([base, sup_nodes.pop(0)], "msup")
+
+        if sub_nodes and sup_nodes:
+            return ir.mscript([base, sub_nodes[0], sup_nodes[0]], "msubsup")
+        if sub_nodes:
+            return ir.mscript([base, sub_nodes[0]], "msub")
+        if sup_nodes:
+            return ir.mscript([base, sup_nodes[0]], "msup")
+        return base
+
     def _create_mtext(self, text: str, *, style: str | None = None) -> etree._Element:
         """Create an mtext element for a parsed MathML script operand."""
         element = etree.Element("mtext")
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 from ...handler_protocols import HandlerContext
+from .. import ir
 from .base_post_handler import BasePostHandler
-from .dom_utils import PostHandlerNode
+from .dom_utils import PostHandlerNode, fragment_text
 
 
 class SwapAlias(BasePostHandler):
@@ -18,15 +19,48 @@ class SwapAlias(BasePostHandler):
 
     priority = 10
 
+    def may_apply(
+        self, content: str, ctx: HandlerContext | None = None
+    ) -> bool:
+        """仅当文本中包含某个别名时才需要处理。"""
+        replacements = self._get_replacements(ctx)
+        if not replacements:
+            return False
+        text = fragment_text(content)
+        return any(key in text for key in replacements)
+
+    def cache_key(
+        self, ctx: HandlerContext | None = None
+    ) -> tuple[tuple[str, str], ...]:
+        """处理结果取决于生效的别名替换表。"""
+        return tuple(self._get_replacements(ctx).items())
+
     def handle(
         self, post_node: PostHandlerNode, ctx: HandlerContext | None = None
     ) -> None:
-        if ctx is None:
+        replacements = self._get_replacements(ctx)
+        if not replacements:
             return
 
+        post_node.replace_text(lambda text: replacements.get(text, text))
+        post_node.replace_tail(lambda text: replacements.get(text, text))
+
+    def transform_math_leaf(
+        self, node: ir.MathNode, ctx: HandlerContext | None = None
+    ) -> ir.MathNode:
+        """与 `handle` 相同，替换与别名完全匹配的叶节点文本。"""
+        text = ir.leaf_text(node)
+        if not text:
+            return node
+        return ir.with_leaf_text(node, self._get_replacements(ctx).get(text, text))
+
+    def _get_replacements(self, ctx: HandlerContext | None) -> dict[str, str]:
+        if ctx is None:
+            return {}
+
         aliases = ctx.options.aliases
         if not aliases:
-            return
+            return {}
 
         # 过滤无效项：空 key、key/value 非字符串等
         replacements: dict[str, str] = {}
@@ -38,9 +72,4 @@ class SwapAlias(BasePostHandler):
             if key == value:
                 continue
             replacements[key] = value
-
-        if not replacements:
-            return
-
-        post_node.replace_text(lambda text: replacements.get(text, text))
-        post_node.replace_tail(lambda text: replacements.get(text, text))
+        return replacements
@@ -2,8 +2,9 @@
 
 import re
 
+from .. import ir
 from .base_post_handler import BasePostHandler
-from .dom_utils import PostHandlerNode
+from .dom_utils import PostHandlerNode, fragment_text
 
 
 class SwapSymbol(BasePostHandler):
@@ -73,6 +74,14 @@ class SwapSymbol(BasePostHandler):
     )
     _skip_text_tags = {"code", "pre", "script", "style", "latex"}
 
+    def cache_key(self, ctx=None) -> tuple[()]:
+        """处理结果只取决于片段内容。"""
+        return ()
+
+    def may_apply(self, content: str, ctx=None) -> bool:
+        """仅当文本中出现希腊字母英文名称时才需要处理。"""
+        return self._GREEK_PATTERN.search(fragment_text(content)) is not None
+
     def handle(self, post_node: PostHandlerNode, ctx=None) -> None:
         """转换希腊字母英文名称，并移除转义用反斜杠。"""
         post_node.replace_text(
@@ -82,6 +91,13 @@ class SwapSymbol(BasePostHandler):
             self._replace_plain_text_greek_words, skip_tags=self._skip_text_tags
         )
 
+    def transform_math_leaf(self, node: ir.MathNode, ctx=None) -> ir.MathNode:
+        """转换公式叶节点文本中的希腊字母英文名称。"""
+        text = ir.leaf_text(node)
+        if not text:
+            return node
+        return ir.with_leaf_text(node, self._replace_plain_text_greek_words(text))
+
     def _replace_plain_text_greek_words(self, text: str) -> str:
         """转换普通文本中的希腊字母英文名称。"""
 
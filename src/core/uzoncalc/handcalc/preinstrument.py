@@ -15,9 +15,10 @@ from .ast_validator import validate_ast
 from .ast_visitor import AstNodeVisitor
 from .field_names import FieldNames
 
-INSTRUMENTATION_FORMAT_VERSION = 2
+INSTRUMENTATION_FORMAT_VERSION = 5
 _RESERVED_PREFIX = "__uzon_"
 _MARKER_NAME = "__uzon_mark_preinstrumented__"
+_STEP_POOL_NAME_TEMPLATE = "__uzon_step_pool_{index}__"
 
 
 @dataclass(frozen=True)
@@ -78,32 +79,75 @@ def preinstrument_source(
         import_roots=workspace_import_roots,
     )
     tree = _CalcdepsImportRewriter(scope_key, dependency_defaults).visit(tree)
+    instrumented = _instrument_calc_functions(tree, decorator_names, module_aliases)
+    ast.fix_missing_locations(tree)
+    generated = ast.unparse(tree) + "\n"
+    compile(generated, filename, "exec")
+    source_map = _build_function_source_map(generated, instrumented)
+    return PreinstrumentResult(
+        source=generated,
+        source_map=source_map,
+        instrumented_functions=[name for name, _, _ in instrumented],
+    )
+
+
+def instrument_module_ast(tree: ast.Module) -> list[str]:
+    """Instrument top-level calculation functions of a parsed module in place.
+
+    Step pools and runtime imports are inserted into the module so the tree
+    compiles to one code object; original line numbers are kept.
+
+    Args:
+        tree: Parsed module AST, modified in place.
+
+    Returns:
+        Names of the transformed functions.
+
+    Raises:
+        ValidationError: If existing instrumentation rejects the function AST.
+    """
+    decorator_names, module_aliases = _discover_uzoncalc_imports(tree)
+    instrumented = _instrument_calc_functions(tree, decorator_names, module_aliases)
+    return [name for name, _, _ in instrumented]
+
+
+def _instrument_calc_functions(
+    tree: ast.Module, decorator_names: set[str], module_aliases: set[str]
+) -> list[tuple[str, int, int]]:
+    """Transform decorated top-level functions and insert their step pools."""
     instrumented: list[tuple[str, int, int]] = []
+    step_pools: list[tuple[int, ast.Assign]] = []
     for index, node in enumerate(tree.body):
         if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
             continue
         if not _has_calc_decorator(node, decorator_names, module_aliases):
             continue
         transformed = copy.deepcopy(node)
-        transformed = AstNodeVisitor().visit(transformed)
+        visitor = AstNodeVisitor(
+            step_pool_name=_STEP_POOL_NAME_TEMPLATE.format(index=len(instrumented))
+        )
+        transformed = visitor.visit(transformed)
         transformed.decorator_list.append(ast.Name(id=_MARKER_NAME, ctx=ast.Load()))
         ast.copy_location(transformed.decorator_list[-1], node)
-        validate_ast(ast.Module(body=[copy.deepcopy(transformed)], type_ignores=[]))
+        step_pool = visitor.build_step_pool_assign()
+        ast.copy_location(step_pool, node)
+        validate_ast(
+            ast.Module(
+                body=[copy.deepcopy(step_pool), copy.deepcopy(transformed)],
+                type_ignores=[],
+            )
+        )
         tree.body[index] = transformed
+        step_pools.append((index, step_pool))
         instrumented.append(
             (node.name, node.lineno, getattr(node, "end_lineno", node.lineno))
         )
+    # Step 常量池在模块加载时构建一次，放在对应函数定义之前。
+    for index, step_pool in reversed(step_pools):
+        tree.body.insert(index, step_pool)
     if instrumented:
         _inject_runtime_imports(tree)
-    ast.fix_missing_locations(tree)
-    generated = ast.unparse(tree) + "\n"
-    compile(generated, filename, "exec")
-    source_map = _build_function_source_map(generated, instrumented)
-    return PreinstrumentResult(
-        source=generated,
-        source_map=source_map,
-        instrumented_functions=[name for name, _, _ in instrumented],
-    )
+    return instrumented
 
 
 def _reject_reserved_names(tree: ast.Module) -> None:
@@ -165,6 +209,8 @@ def _inject_runtime_imports(tree: ast.Module) -> None:
         "from uzoncalc.handcalc.preinstrument import "
         "mark_preinstrumented as __uzon_mark_preinstrumented__\n"
         "from uzoncalc.handcalc.recorder import record_step as __uzon_record_step__\n"
+        "from uzoncalc.handcalc.loop_recording import "
+        "LoopTracker as __uzon_loop_tracker__\n"
         "from uzoncalc.handcalc import ir as __uzon_ir__\n"
         "from uzoncalc.handcalc import steps as __uzon_steps__\n"
     ).body
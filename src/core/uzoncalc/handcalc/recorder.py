@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import sys
+from types import FrameType
 from typing import Any, Mapping
 
-from ..globals import get_current_instance
+from ..globals import _calc_instance
 from .steps import Step
 
 
@@ -10,12 +12,41 @@ def record_step(
     *,
     step: Step,
     locals_map: Mapping[str, Any] | None = None,
+    local_names: tuple[str, ...] | None = None,
     value: Any = None,
 ) -> None:
     """Record a structured step.
 
     This is the runtime entry point injected by AST instrumentation.
     The actual behavior lives on the Step subclasses.
+
+    ``local_names`` lists the variables the step references (computed at
+    instrumentation time); only those are read from the calling frame, and
+    only when the step is actually going to be recorded.
+
+    Outside a calculation context (e.g. a pre-instrumented helper called
+    directly) or in a headless run there is nothing to record into, so the
+    call is a no-op.
     """
-    ctx = get_current_instance()
+    ctx = _calc_instance.get()
+    if ctx is None or ctx.is_headless or ctx.options.skip_content:
+        return
+    if locals_map is None and local_names is not None:
+        locals_map = capture_locals(sys._getframe(1), local_names)
     step.record(ctx, locals_map=locals_map, value=value)
+
+
+def capture_locals(frame: FrameType, names: tuple[str, ...]) -> dict[str, Any]:
+    """Read the named variables from a frame, skipping unbound or global names.
+
+    Mirrors the subset of ``locals()`` the step would have looked up, without
+    snapshotting the whole frame namespace.
+    """
+    frame_locals = frame.f_locals
+    captured: dict[str, Any] = {}
+    for name in names:
+        try:
+            captured[name] = frame_locals[name]
+        except KeyError:
+            continue
+    return captured
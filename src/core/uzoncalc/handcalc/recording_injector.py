@@ -6,10 +6,38 @@ from typing import Optional
 from . import ir
 from . import steps
 from .field_names import FieldNames
+from .transformers import collect_variable_names
 
 
 class RecordingInjector:
-    """负责生成和注入记录调用的 AST 节点"""
+    """负责生成和注入记录调用的 AST 节点
+
+    Step 在插桩阶段即已确定且不可变，因此统一收集到每个函数独立的常量池中，
+    运行期记录调用只通过下标引用预构建的 Step，避免每次执行都重建 Step/IR 树。
+    """
+
+    def __init__(self, step_pool_name: str = FieldNames.uzon_step_pool) -> None:
+        self.step_pool_name = step_pool_name
+        self._step_pool: list[steps.Step] = []
+
+    @property
+    def step_pool(self) -> tuple[steps.Step, ...]:
+        """返回按下标排列的预构建 Step 常量池"""
+        return tuple(self._step_pool)
+
+    @property
+    def step_count(self) -> int:
+        """返回已注入的记录调用数量"""
+        return len(self._step_pool)
+
+    def build_step_pool_assign(self) -> ast.Assign:
+        """生成在源码中构造常量池的赋值语句（用于源码到源码的预插桩）"""
+        target = ast.Name(id=self.step_pool_name, ctx=ast.Store())
+        pool = ast.Tuple(
+            elts=[self._step_to_ast(step) for step in self._step_pool],
+            ctx=ast.Load(),
+        )
+        return ast.Assign(targets=[target], value=pool)
 
     def make_record_call(
         self,
@@ -20,7 +48,7 @@ class RecordingInjector:
         include_locals: bool = True,
     ) -> ast.Expr:
         """创建记录调用的 AST 表达式"""
-        step_expr = self._step_to_ast(step)
+        step_expr = self._step_ref_to_ast(step)
         ast.copy_location(step_expr, original_node)
         
         keywords: list[ast.keyword] = [
@@ -28,18 +56,14 @@ class RecordingInjector:
         ]
 
         if include_locals:
-            locals_func = ast.Name(id="locals", ctx=ast.Load())
-            ast.copy_location(locals_func, original_node)
-            locals_call = ast.Call(
-                func=locals_func,
-                args=[],
-                keywords=[],
-            )
-            ast.copy_location(locals_call, original_node)
+            # 只传递 Step 实际引用的变量名（编译期常量元组），
+            # 运行期按需从调用帧读取，避免每次记录都复制整个 locals()
+            local_names = ast.Constant(value=self._collect_local_names(step))
+            ast.copy_location(local_names, original_node)
             keywords.append(
                 ast.keyword(
-                    arg="locals_map",
-                    value=locals_call,
+                    arg="local_names",
+                    value=local_names,
                 )
             )
 
@@ -60,6 +84,34 @@ class RecordingInjector:
         ast.copy_location(record_call, original_node)
         return record_call
 
+    def _collect_local_names(self, step: steps.Step) -> tuple[str, ...]:
+        """计算 Step 渲染时需要从 locals 中查找的变量名"""
+        names: dict[str, None] = {}
+        nodes: list[ir.MathNode | None] = []
+
+        if isinstance(step, steps.ExprStep):
+            nodes.append(step.expr)
+        elif isinstance(step, steps.EquationStep):
+            nodes.extend([step.lhs, step.rhs])
+        elif isinstance(step, steps.FStringStep):
+            for segment in step.segments:
+                if segment.value_var:
+                    names.setdefault(segment.value_var, None)
+                nodes.extend([segment.expr, segment.lhs, segment.rhs])
+
+        for node in nodes:
+            if isinstance(node, ir.MathNode):
+                for name in collect_variable_names(node):
+                    names.setdefault(name, None)
+        return tuple(names)
+
+    def _step_ref_to_ast(self, step: steps.Step) -> ast.expr:
+        """将 Step 放入常量池，并返回按下标引用它的 AST 表达式"""
+        index = len(self._step_pool)
+        self._step_pool.append(step)
+        pool = ast.Name(id=self.step_pool_name, ctx=ast.Load())
+        return ast.Subscript(value=pool, slice=ast.Constant(value=index), ctx=ast.Load())
+
     def _step_to_ast(self, step: steps.Step) -> ast.expr:
         """将 Step 对象转换为构造它的 AST 表达式"""
         steps_mod = ast.Name(id=FieldNames.uzon_steps, ctx=ast.Load())
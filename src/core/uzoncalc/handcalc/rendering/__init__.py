@@ -4,6 +4,7 @@ from .equation_renderer import (
     build_equation_parts,
     build_equation_parts_for_assignment,
     prepare_lhs,
+    render_equation,
     style_array_vars,
     substitute_vars,
 )
@@ -28,6 +29,7 @@ __all__ = [
     "format_number",
     "is_array_value",
     "prepare_lhs",
+    "render_equation",
     "render_fstring_segments",
     "render_html",
     "render_value_fragment",
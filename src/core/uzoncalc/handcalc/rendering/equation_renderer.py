@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import re
 from typing import Any, Mapping
 
+from ...handler_protocols import HandlerContext
 from .. import ir
+from ..post_handlers.math_notation import ProcessedFragment, notate_equation_parts
 from ..transformers import transform_ir
 from .value_renderer import is_array_value, should_render_runtime_value, value_to_ir
 
@@ -11,6 +14,9 @@ SYMBOL_COMMA = ","
 SYMBOL_ATTRIBUTE_SEPARATOR = "."
 _UNRESOLVED = object()
 
+# 空元素，如 <mo /> 或 <mspace width="0.2em" />；属性值中的 < > 已转义
+_EMPTY_ELEMENT_RE = re.compile(r"<([a-z]+)([^<>]*?) />")
+
 
 def build_equation_parts(
     expr_node: ir.MathNode,
@@ -21,28 +27,56 @@ def build_equation_parts(
     enable_substitution: bool = True,
 ) -> list[ir.MathNode]:
     """构建方程的各部分（表达式、替换值、结果值）。"""
-    expr_node = style_array_vars(expr_node, locals_map)
-    parts: list[ir.MathNode] = []
-    if enable_formula_expression:
-        parts.append(expr_node)
-
+    substituted: ir.MathNode | None = None
     if enable_substitution:
         # 仅替换公式中的变量节点，不直接展示复杂运行期对象 repr。
-        substituted = substitute_vars(
+        # 数组样式与变量替换在同一次遍历中完成。
+        expr_node, substituted = style_and_substitute_vars(
             expr_node,
             locals_map,
             resolve_subscript_values=not should_render_runtime_value(value),
         )
-        if substituted != expr_node and substituted not in parts:
-            parts.append(substituted)
+    else:
+        expr_node = style_array_vars(expr_node, locals_map)
+
+    parts: list[ir.MathNode] = []
+    if enable_formula_expression:
+        parts.append(expr_node)
+
+    if (
+        substituted is not None
+        and substituted is not expr_node
+        and not _contains_node(parts, substituted)
+    ):
+        parts.append(substituted)
 
     if should_render_runtime_value(value):
         value_ir = value_to_ir(value)
-        if value_ir not in parts:
+        if not _contains_node(parts, value_ir):
             parts.append(value_ir)
     return parts
 
 
+def render_equation(parts: list[ir.MathNode], ctx: HandlerContext) -> str:
+    """将方程各部分渲染为 MathML。
+
+    启用 `post_process_math_in_ir` 且后处理器均支持 IR 阶段时，先在 IR 上完成后处理，
+    返回的 `ProcessedFragment` 写入上下文时不再经过 DOM 后处理，
+    空元素按 DOM 后处理的 HTML 序列化方式写作 `<mo></mo>`，使两条路径输出一致。
+    """
+    if ctx.options.post_process_math_in_ir:
+        notated = notate_equation_parts(parts, ctx)
+        if notated is not None:
+            xml = ir.equation(notated).to_mathml_xml()
+            return ProcessedFragment(_EMPTY_ELEMENT_RE.sub(r"<\1\2></\1>", xml))
+    return ir.equation(parts).to_mathml_xml()
+
+
+def _contains_node(parts: list[ir.MathNode], node: ir.MathNode) -> bool:
+    # IR 节点经工厂函数驻留，结构相同即为同一对象，无需逐层比较
+    return any(part is node for part in parts)
+
+
 def prepare_lhs(
     lhs: ir.MathNode, value: Any, locals_map: Mapping[str, Any]
 ) -> ir.MathNode:
@@ -66,10 +100,9 @@ def build_equation_parts_for_assignment(
     """为赋值语句构建方程各部分。"""
     parts: list[ir.MathNode] = [lhs]
     if rhs is not None:
-        rhs_styled = style_array_vars(rhs, locals_map)
         parts.extend(
             build_equation_parts(
-                rhs_styled,
+                rhs,
                 locals_map,
                 value,
                 enable_formula_expression=enable_formula_expression,
@@ -101,52 +134,148 @@ def substitute_vars(
     Raises:
         No exceptions are intentionally raised; unsafe substitutions are skipped.
     """
-
-    def _repl(n: ir.MathNode) -> ir.MathNode | None:
-        resolved = (
-            _try_resolve_subscript(n, locals_map)
-            if resolve_subscript_values
-            else None
-        )
-        if resolved is not None:
-            return resolved
-
-        if isinstance(n, ir.Mi) and n.name in locals_map:
-            value = locals_map[n.name]
-            if should_render_runtime_value(value):
-                return value_to_ir(value)
-            return None
-
-        if isinstance(n, ir.Mi):
-            attribute_value = _try_resolve_attribute_path(n.name, locals_map)
-            if (
-                attribute_value is not _UNRESOLVED
-                and should_render_runtime_value(attribute_value)
-            ):
-                return value_to_ir(attribute_value)
-
-        return None
-
     return transform_ir(
         node,
-        _repl,
-        should_descend=lambda parent, field_name: not (
-            isinstance(parent, ir.MSub) and field_name == "base"
+        lambda n: _substitution_replacement(
+            n, locals_map, resolve_subscript_values=resolve_subscript_values
         ),
+        should_descend=_should_descend_substitution,
         should_descend_child=_should_descend_substitution_child,
     )
 
 
 def style_array_vars(node: ir.MathNode, locals_map: Mapping[str, Any]) -> ir.MathNode:
     """将数组变量渲染为数组样式 MathIR。"""
+    return transform_ir(node, lambda n: _array_style_replacement(n, locals_map))
+
+
+def style_and_substitute_vars(
+    node: ir.MathNode,
+    locals_map: Mapping[str, Any],
+    *,
+    resolve_subscript_values: bool = True,
+) -> tuple[ir.MathNode, ir.MathNode]:
+    """Apply array styling and value substitution in a single traversal.
+
+    Args:
+        node: MathIR expression to transform.
+        locals_map: Runtime local variables captured from the calculation frame.
+        resolve_subscript_values: Whether a whole subscript expression may be
+            evaluated to its final runtime element.
+
+    Returns:
+        ``(styled, substituted)``, equal to ``style_array_vars(node, ...)`` and
+        ``substitute_vars(style_array_vars(node, ...), ...)``.
+
+    Raises:
+        No exceptions are intentionally raised; unsafe substitutions are skipped.
+    """
+
+    def _visit(n: ir.MathNode, substitute: bool) -> tuple[ir.MathNode, ir.MathNode]:
+        styled = _array_style_replacement(n, locals_map)
+        substituted_children: dict[int, Any] | None = None
+        if styled is None:
+            styled, substituted_children = _visit_children(n, substitute)
+        if not substitute:
+            return styled, styled
+
+        replaced = _substitution_replacement(
+            styled, locals_map, resolve_subscript_values=resolve_subscript_values
+        )
+        if replaced is not None:
+            return styled, replaced
+        if not substituted_children:
+            return styled, styled
+        return styled, _rebuild(styled, substituted_children)
+
+    def _visit_children(
+        n: ir.MathNode, substitute: bool
+    ) -> tuple[ir.MathNode, dict[int, Any] | None]:
+        # 样式化结果相对原节点、替换结果相对样式化节点分别记录变化的字段
+        styled_changes: dict[int, Any] = {}
+        substituted_changes: dict[int, Any] = {}
+        for child_field in ir.node_layout(type(n)).child_fields:
+            name = child_field.name
+            v = getattr(n, name)
+            descend = substitute and _should_descend_substitution(n, name)
+            if not child_field.is_list:
+                styled_v, substituted_v = _visit(v, descend)
+                if styled_v is not v:
+                    styled_changes[child_field.index] = styled_v
+                if substituted_v is not styled_v:
+                    substituted_changes[child_field.index] = substituted_v
+                continue
+
+            styled_list: list[ir.MathNode] = []
+            substituted_list: list[ir.MathNode] = []
+            for child_index, child in enumerate(v):
+                styled_child, substituted_child = _visit(
+                    child,
+                    descend
+                    and _should_descend_substitution_child(
+                        n, name, child, child_index
+                    ),
+                )
+                styled_list.append(styled_child)
+                substituted_list.append(substituted_child)
+            if any(new is not old for new, old in zip(styled_list, v)):
+                styled_changes[child_field.index] = styled_list
+            if any(new is not old for new, old in zip(substituted_list, styled_list)):
+                substituted_changes[child_field.index] = substituted_list
+
+        styled = _rebuild(n, styled_changes) if styled_changes else n
+        return styled, substituted_changes or None
+
+    return _visit(node, True)
+
+
+def _rebuild(node: ir.MathNode, changes: Mapping[int, Any]) -> ir.MathNode:
+    """Rebuild ``node`` with the given field values replaced, by field index."""
+    values = [getattr(node, name) for name in ir.node_layout(type(node)).field_names]
+    for index, value in changes.items():
+        values[index] = value
+    try:
+        return ir.intern_node(type(node)(*values))
+    except Exception:
+        return node
+
 
-    def _repl(n: ir.MathNode) -> ir.MathNode | None:
-        if isinstance(n, ir.Mi) and not isinstance(n, ir.MiArray):
-            if is_array_value(locals_map.get(n.name)):
-                return ir.mi_array(n.name)
+def _array_style_replacement(
+    node: ir.MathNode, locals_map: Mapping[str, Any]
+) -> ir.MathNode | None:
+    if isinstance(node, ir.Mi) and not isinstance(node, ir.MiArray):
+        if is_array_value(locals_map.get(node.name)):
+            return ir.mi_array(node.name)
+    return None
+
+
+def _substitution_replacement(
+    node: ir.MathNode,
+    locals_map: Mapping[str, Any],
+    *,
+    resolve_subscript_values: bool,
+) -> ir.MathNode | None:
+    resolved = (
+        _try_resolve_subscript(node, locals_map) if resolve_subscript_values else None
+    )
+    if resolved is not None:
+        return resolved
+
+    if isinstance(node, ir.Mi) and node.name in locals_map:
+        value = locals_map[node.name]
+        if should_render_runtime_value(value):
+            return value_to_ir(value)
         return None
 
-    return transform_ir(node, _repl)
+    if isinstance(node, ir.Mi):
+        attribute_value = _try_resolve_attribute_path(node.name, locals_map)
+        if (
+            attribute_value is not _UNRESOLVED
+            and should_render_runtime_value(attribute_value)
+        ):
+            return value_to_ir(attribute_value)
+
+    return None
 
 
 def is_private_lhs(lhs: Any) -> bool:
@@ -201,6 +330,11 @@ def _try_resolve_subscript(
     return value_to_ir(value)
 
 
+def _should_descend_substitution(parent: ir.MathNode, field_name: str) -> bool:
+    """Subscript bases stay symbolic; the whole subscript may be resolved instead."""
+    return not (isinstance(parent, ir.MSub) and field_name == "base")
+
+
 def _should_descend_substitution_child(
     parent: ir.MathNode, field_name: str, child: ir.MathNode, child_index: int
 ) -> bool:
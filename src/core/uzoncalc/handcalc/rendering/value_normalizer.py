@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import numbers
+import sys
 from typing import Any
 
 import pint
@@ -48,6 +49,10 @@ def normalize_renderable_value(value: Any) -> Any | None:
     if isinstance(value, (list, tuple)):
         return _normalize_sequence(value)
 
+    # 数值型 NumPy 数组保持原样，由渲染层按需切片与格式化，避免整体 tolist()
+    if as_numeric_ndarray(value) is not None:
+        return value
+
     sequence_value = _try_convert_to_sequence(value)
     if sequence_value is not _UNNORMALIZED:
         return normalize_renderable_value(sequence_value)
@@ -55,6 +60,27 @@ def normalize_renderable_value(value: Any) -> Any | None:
     return None
 
 
+def as_numeric_ndarray(value: Any) -> Any | None:
+    """Return ``value`` if it is a real-valued one- or two-dimensional NumPy array.
+
+    Args:
+        value: Runtime value that might be a NumPy array.
+
+    Returns:
+        The array itself, or ``None`` for any other value. NumPy is never
+        imported here; if it is not loaded yet, no value can be an ndarray.
+
+    Raises:
+        No exceptions are raised.
+    """
+    np = sys.modules.get("numpy")
+    if np is None or not isinstance(value, np.ndarray):
+        return None
+    if value.ndim not in (1, 2) or value.dtype.kind not in "iuf":
+        return None
+    return value
+
+
 def _normalize_sequence(value: list[Any] | tuple[Any, ...]) -> list[Any] | None:
     """Normalize every element in a runtime sequence.
 
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
 import html
+import math
+import sys
 from dataclasses import dataclass
 from typing import Any
 
 import pint
 
-from ...globals import get_current_instance
+from ...globals import _calc_instance, get_current_instance
 from ...context_utils.element_models import HtmlFragment
 from .. import ir
-from .value_normalizer import normalize_renderable_value
+from .value_normalizer import as_numeric_ndarray, normalize_renderable_value
 
 FLOAT_PRECISION = 12  # 浮点数清理精度（消除浮点误差）
 SYMBOL_COMMA = ","
 SYMBOL_LEFT_BRACKET = "["
 SYMBOL_RIGHT_BRACKET = "]"
+SYMBOL_HORIZONTAL_ELLIPSIS = "\u22ef"
+SYMBOL_VERTICAL_ELLIPSIS = "\u22ee"
+SYMBOL_DIAGONAL_ELLIPSIS = "\u22f1"
 
 
 @dataclass(frozen=True, slots=True)
@@ -35,7 +40,10 @@ def should_render_runtime_value(value: Any) -> bool:
 def is_array_value(value: Any) -> bool:
     """判断运行期值是否应按数组样式展示。"""
     normalized_value = normalize_renderable_value(value)
-    return isinstance(normalized_value, list)
+    return (
+        isinstance(normalized_value, list)
+        or as_numeric_ndarray(normalized_value) is not None
+    )
 
 
 def value_to_ir(value: Any) -> ir.MathNode:
@@ -62,6 +70,9 @@ def value_to_ir(value: Any) -> ir.MathNode:
     if isinstance(value, list):
         return _array_to_ir(value)
 
+    if as_numeric_ndarray(value) is not None:
+        return _ndarray_to_ir(value)
+
     if isinstance(value, pint.Quantity):
         # 使用 format_number 处理浮点数精度问题
         magnitude = value.magnitude
@@ -88,6 +99,8 @@ def render_value_text(value: Any) -> str:
     normalized_value = normalize_renderable_value(value)
     if normalized_value is not None:
         value = normalized_value
+    if as_numeric_ndarray(value) is not None:
+        value = value.tolist()
     if isinstance(value, str):
         return value
 
@@ -156,16 +169,98 @@ def _quantity_to_ir(magnitude: str, units: str) -> ir.MathNode:
 def _array_to_ir(value: list[Any] | tuple[Any, ...]) -> ir.MathNode:
     """Render a Python sequence as a one-dimensional array or matrix."""
     if _is_rectangular_two_dimensional_array(value):
-        return _matrix_array_to_ir(value)
-
-    items: list[ir.MathNode] = []
-    for idx, item in enumerate(value):
+        edge_items = _array_edge_items(len(value) * len(value[0]))
+        rows, row_gap = _visible_axis(len(value), edge_items)
+        cols, col_gap = _visible_axis(len(value[0]), edge_items)
+        cells = [[value_to_ir(value[r][c]) for c in cols] for r in rows]
+        return _matrix_array_to_ir(cells, row_gap, col_gap)
+
+    indices, gap = _visible_axis(len(value), _array_edge_items(len(value)))
+    return _vector_array_to_ir([value_to_ir(value[i]) for i in indices], gap)
+
+
+def _ndarray_to_ir(value: Any) -> ir.MathNode:
+    """Render a numeric NumPy array, formatting only the displayed elements."""
+    edge_items = _array_edge_items(value.size)
+    if value.ndim == 2 and value.shape[0]:
+        rows, row_gap = _visible_axis(value.shape[0], edge_items)
+        cols, col_gap = _visible_axis(value.shape[1], edge_items)
+        # 仅取出需要显示的子块再转换为 Python 数值
+        block = value[rows][:, cols] if (row_gap, col_gap) != (None, None) else value
+        texts = _format_array_numbers(block)
+        cells = [[ir.mn(text) for text in row] for row in texts]
+        return _matrix_array_to_ir(cells, row_gap, col_gap)
+
+    if value.ndim == 2:
+        # 形如 (0, n) 的空数组与空列表一致
+        return _vector_array_to_ir([], None)
+
+    indices, gap = _visible_axis(value.shape[0], edge_items)
+    block = value[indices] if gap is not None else value
+    items = [ir.mn(text) for text in _format_array_numbers(block)]
+    return _vector_array_to_ir(items, gap)
+
+
+def _format_array_numbers(block: Any) -> list[Any]:
+    """Format every number of a numeric array block as nested lists of strings.
+
+    The block is formatted with ``np.char`` string operations and yields the
+    same text as :func:`format_number` for each element: ``"%.Nf"`` rounds the
+    exact binary value just like the built-in ``round``, so parsing it back
+    reproduces :func:`clean_float` without a Python-level loop.
+    """
+    np = sys.modules["numpy"]
+    if block.dtype.kind != "f":
+        return block.astype(str).tolist()
+
+    # 精度只读取一次，避免逐元素查询当前上下文
+    display_precision = get_float_precision()
+    values = block.astype(np.float64)
+    finite = np.isfinite(values)
+    cleaned = np.where(finite, values, 0.0)
+    cleaned_precision = max(display_precision, FLOAT_PRECISION)
+    cleaned = np.char.mod(f"%.{cleaned_precision}f", cleaned).astype(np.float64)
+    # 加 0.0 将 -0.0 归一为 0.0，与 str(int(-0.0)) 保持一致
+    integral = np.char.mod("%.0f", cleaned + 0.0)
+    texts = np.char.mod(f"%.{display_precision}f", cleaned)
+    if display_precision > 0:
+        texts = np.char.rstrip(np.char.rstrip(texts, "0"), ".")
+    texts = np.where(cleaned == np.trunc(cleaned), integral, texts)
+    return np.where(finite, texts, values.astype(str)).tolist()
+
+
+def _array_edge_items(size: int) -> int | None:
+    """Return the leading/trailing items kept per axis, or None to show all."""
+    ctx = _calc_instance.get()
+    if ctx is None:
+        return None
+    threshold = ctx.options.array_threshold
+    if threshold is None or size <= threshold:
+        return None
+    return max(0, ctx.options.array_edge_items)
+
+
+def _visible_axis(
+    length: int, edge_items: int | None
+) -> tuple[list[int], int | None]:
+    """Return the displayed indices of an axis and where the ellipsis goes."""
+    if edge_items is None or length <= 2 * edge_items:
+        return list(range(length)), None
+    return [*range(edge_items), *range(length - edge_items, length)], edge_items
+
+
+def _vector_array_to_ir(items: list[ir.MathNode], gap: int | None) -> ir.MathNode:
+    """Render displayed items as ``[a, b, ⋯, y, z]``."""
+    if gap is not None:
+        items = [*items[:gap], ir.mo(SYMBOL_HORIZONTAL_ELLIPSIS), *items[gap:]]
+
+    children: list[ir.MathNode] = [ir.mo(SYMBOL_LEFT_BRACKET)]
+    for idx, item in enumerate(items):
         if idx:
-            items.append(ir.mo(SYMBOL_COMMA))
-        items.append(value_to_ir(item))
-    return ir.mrow_array(
-        [ir.mo(SYMBOL_LEFT_BRACKET), *items, ir.mo(SYMBOL_RIGHT_BRACKET)]
-    )
+            children.append(ir.mo(SYMBOL_COMMA))
+        children.append(item)
+    children.append(ir.mo(SYMBOL_RIGHT_BRACKET))
+    return ir.mrow_array(children)
 
 
 def _is_rectangular_two_dimensional_array(value: list[Any] | tuple[Any, ...]) -> bool:
@@ -184,11 +279,31 @@ def _is_rectangular_two_dimensional_array(value: list[Any] | tuple[Any, ...]) ->
     return True
 
 
-def _matrix_array_to_ir(value: list[Any] | tuple[Any, ...]) -> ir.MathNode:
-    """Render a rectangular two-dimensional sequence with MathML table rows."""
-    rows = [ir.mtr([ir.mtd([value_to_ir(cell)]) for cell in row]) for row in value]
+def _matrix_array_to_ir(
+    cells: list[list[ir.MathNode]], row_gap: int | None, col_gap: int | None
+) -> ir.MathNode:
+    """Render displayed matrix cells with MathML table rows.
+
+    ``row_gap``/``col_gap`` give the position of the elided rows/columns, which
+    are shown as a row or column of ellipses.
+    """
+    rows: list[list[ir.MathNode]] = [[ir.mtd([cell]) for cell in row] for row in cells]
+    if col_gap is not None:
+        for row in rows:
+            row.insert(col_gap, ir.mtd([ir.mo(SYMBOL_HORIZONTAL_ELLIPSIS)]))
+    if row_gap is not None:
+        width = len(cells[0]) if cells else 0
+        gap_row = [ir.mtd([ir.mo(SYMBOL_VERTICAL_ELLIPSIS)]) for _ in range(width)]
+        if col_gap is not None:
+            gap_row.insert(col_gap, ir.mtd([ir.mo(SYMBOL_DIAGONAL_ELLIPSIS)]))
+        rows.insert(row_gap, gap_row)
+
     return ir.mrow_array(
-        [ir.mo(SYMBOL_LEFT_BRACKET), ir.mtable(rows), ir.mo(SYMBOL_RIGHT_BRACKET)]
+        [
+            ir.mo(SYMBOL_LEFT_BRACKET),
+            ir.mtable([ir.mtr(row) for row in rows]),
+            ir.mo(SYMBOL_RIGHT_BRACKET),
+        ]
     )
 
 
@@ -234,6 +349,13 @@ def format_number(value: float | int, float_precision: int | None = None) -> str
     display_precision = (
         get_float_precision() if float_precision is None else max(0, float_precision)
     )
+    return _format_float(value, display_precision)
+
+
+def _format_float(value: float, display_precision: int) -> str:
+    """按给定的显示精度格式化浮点数，并移除多余尾零。"""
+    if not math.isfinite(value):
+        return str(value)
 
     # 先做一次足够精细的浮点清理，再按当前显示精度四舍五入
     cleaned = clean_float(value, max(display_precision, FLOAT_PRECISION))
@@ -9,6 +9,8 @@ from __future__ import annotations
 
 import ast
 from typing import Callable, Optional, Sequence
+
+from ..cache.fingerprint import callable_fingerprint
 from . import ir
 
 # 特殊函数格式化器类型定义
@@ -112,6 +114,18 @@ class SpecialFunctionRegistry:
         """
         return list(self._formatters.keys())
 
+    def fingerprint(self) -> str:
+        """
+        以稳定字符串描述已注册的特殊函数，用于持久化插桩缓存的键
+
+        Returns:
+            按名称排序的 "函数名=格式化器限定名与代码摘要" 列表
+        """
+        return ",".join(
+            f"{name}={callable_fingerprint(f)}"
+            for name, f in sorted(self._formatters.items())
+        )
+
 
 # 全局特殊函数注册表实例
 _global_registry: Optional[SpecialFunctionRegistry] = None
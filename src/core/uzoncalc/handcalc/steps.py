@@ -11,6 +11,7 @@ from .rendering import (
     build_equation_parts_for_assignment,
     prepare_lhs,
     render_fstring_segments,
+    render_equation,
     render_html,
     substitute_vars,
     value_to_ir,
@@ -28,6 +29,31 @@ class Step(Protocol):
         value: Any = None,
     ) -> None: ...
 
+    def render(
+        self,
+        ctx: CalcContext,
+        *,
+        locals_map: Mapping[str, Any],
+        value: Any = None,
+    ) -> str | None: ...
+
+
+def _record_rendered(
+    step: Step,
+    ctx: CalcContext,
+    locals_map: Mapping[str, Any] | None,
+    value: Any,
+) -> None:
+    """立即渲染并写入步骤内容；启用延迟渲染时只保存记录项。"""
+    if ctx.is_headless or ctx.options.skip_content:
+        return
+    if ctx.options.defer_rendering:
+        ctx.append_deferred(step, locals_map=locals_map or {}, value=value)
+        return
+    content = step.render(ctx, locals_map=locals_map or {}, value=value)
+    if content is not None:
+        render_html(ctx, content)
+
 
 @dataclass(frozen=True, slots=True)
 class TextStep:
@@ -42,11 +68,17 @@ class TextStep:
         locals_map: Mapping[str, Any] | None = None,
         value: Any = None,
     ) -> None:
-        if ctx.options.skip_content:
-            return
+        _record_rendered(self, ctx, locals_map, value)
 
+    def render(
+        self,
+        ctx: CalcContext,
+        *,
+        locals_map: Mapping[str, Any],
+        value: Any = None,
+    ) -> str | None:
         content = str(value if value is not None else self.text)
-        render_html(ctx, html.escape(content))
+        return html.escape(content)
 
 
 @dataclass(frozen=True, slots=True)
@@ -62,18 +94,25 @@ class ExprStep:
         locals_map: Mapping[str, Any] | None = None,
         value: Any = None,
     ) -> None:
-        if ctx.options.skip_content:
-            return
+        _record_rendered(self, ctx, locals_map, value)
+
+    def render(
+        self,
+        ctx: CalcContext,
+        *,
+        locals_map: Mapping[str, Any],
+        value: Any = None,
+    ) -> str | None:
         parts = build_equation_parts(
             self.expr or ir.mtext(""),
-            locals_map or {},
+            locals_map,
             value,
             enable_formula_expression=ctx.options.enable_formula_expression,
             enable_substitution=ctx.options.enable_substitution,
         )
         if not parts:
-            return
-        render_html(ctx, ir.equation(parts).to_mathml_xml())
+            return None
+        return render_equation(parts, ctx)
 
 
 @dataclass(frozen=True, slots=True)
@@ -90,13 +129,19 @@ class EquationStep:
         locals_map: Mapping[str, Any] | None = None,
         value: Any = None,
     ) -> None:
-        if ctx.options.skip_content:
-            return
-        locals_map = locals_map or {}
+        _record_rendered(self, ctx, locals_map, value)
+
+    def render(
+        self,
+        ctx: CalcContext,
+        *,
+        locals_map: Mapping[str, Any],
+        value: Any = None,
+    ) -> str | None:
         lhs = prepare_lhs(self.lhs, value, locals_map)
 
         if is_private_lhs(lhs) and ctx.options.suppress_private_assignments:
-            return
+            return None
 
         parts = build_equation_parts_for_assignment(
             lhs,
@@ -107,8 +152,8 @@ class EquationStep:
             enable_substitution=ctx.options.enable_substitution,
         )
         if len(parts) <= 1:
-            return
-        render_html(ctx, ir.equation(parts).to_mathml_xml())
+            return None
+        return render_equation(parts, ctx)
 
 
 @dataclass(frozen=True, slots=True)
@@ -145,10 +190,16 @@ class FStringStep:
         locals_map: Mapping[str, Any] | None = None,
         value: Any = None,
     ) -> None:
-        if ctx.options.skip_content:
-            return
-        content = render_fstring_segments(self.segments, ctx, locals_map or {})
-        render_html(ctx, content)
+        _record_rendered(self, ctx, locals_map, value)
+
+    def render(
+        self,
+        ctx: CalcContext,
+        *,
+        locals_map: Mapping[str, Any],
+        value: Any = None,
+    ) -> str | None:
+        return render_fstring_segments(self.segments, ctx, locals_map)
 
 
 __all__ = [
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from dataclasses import fields, is_dataclass, replace
 from typing import Any, Callable, TypeVar
 
 from . import ir
@@ -23,6 +22,10 @@ def transform_ir(
     - Calls `transformer` on each node (pre-order).
     - If transformer returns a non-None value, that value replaces the node.
     - Otherwise, recursively transforms children and reconstructs the dataclass.
+      Child fields come from the per-class ``ir.node_layout`` table, so no
+      dataclass introspection happens per node.
+    - Unchanged subtrees are returned as-is; rebuilt nodes are interned, so
+      structurally equal results are the same object.
 
     This keeps node-specific recursion out of business logic (e.g. substitution).
     """
@@ -31,61 +34,80 @@ def transform_ir(
     if replaced is not None:
         return replaced  # type: ignore[return-value]
 
-    if not is_dataclass(node):
+    layout = ir.node_layout(type(node))
+    if not layout.child_fields:
         return node
 
-    updated: dict[str, Any] = {}
-    changed = False
-
-    for f in fields(node):
-        v = getattr(node, f.name)
+    values: list[Any] | None = None
+    for child_field in layout.child_fields:
+        name = child_field.name
+        if should_descend is not None and not should_descend(node, name):
+            continue
 
-        if isinstance(v, ir.MathNode):
-            new_v = (
-                transform_ir(
-                    v,
+        v = getattr(node, name)
+        if child_field.is_list:
+            new_v: Any = v
+            for child_index, child in enumerate(v):
+                if should_descend_child is not None and not should_descend_child(
+                    node, name, child, child_index
+                ):
+                    continue
+                new_child = transform_ir(
+                    child,
                     transformer,
                     should_descend=should_descend,
                     should_descend_child=should_descend_child,
                 )
-                if should_descend is None or should_descend(node, f.name)
-                else v
+                if new_child is not child:
+                    if new_v is v:
+                        new_v = list(v)
+                    new_v[child_index] = new_child
+        else:
+            new_v = transform_ir(
+                v,
+                transformer,
+                should_descend=should_descend,
+                should_descend_child=should_descend_child,
             )
-            updated[f.name] = new_v
-            changed = changed or (new_v is not v)
-            continue
 
-        if isinstance(v, list) and all(isinstance(ch, ir.MathNode) for ch in v):
-            if should_descend is None or should_descend(node, f.name):
-                new_list = []
-                for child_index, child in enumerate(v):
-                    if should_descend_child is not None and not should_descend_child(
-                        node, f.name, child, child_index
-                    ):
-                        new_list.append(child)
-                        continue
-
-                    new_list.append(
-                        transform_ir(
-                            child,
-                            transformer,
-                            should_descend=should_descend,
-                            should_descend_child=should_descend_child,
-                        )
-                    )
-            else:
-                new_list = v
-            updated[f.name] = new_list
-            changed = changed or any(n is not o for n, o in zip(new_list, v))
-            continue
-
-        updated[f.name] = v
+        if new_v is not v:
+            if values is None:
+                values = [getattr(node, field_name) for field_name in layout.field_names]
+            values[child_field.index] = new_v
 
-    if not changed:
+    if values is None:
         return node
 
     try:
-        return replace(node, **updated)  # type: ignore[return-value]
+        return ir.intern_node(type(node)(*values))  # type: ignore[return-value]
     except Exception:
         # Fallback: if reconstruction fails, return original to avoid breaking.
         return node
+
+
+def collect_variable_names(node: ir.MathNode) -> list[str]:
+    """
+    Collect runtime lookup roots referenced by ``Mi`` nodes (pre-order, unique).
+
+    Attribute paths such as ``section.area`` contribute their root object name,
+    matching how substitution resolves them against captured locals.
+    """
+    names: dict[str, None] = {}
+
+    def _visit(n: ir.MathNode) -> None:
+        if isinstance(n, ir.Mi):
+            root_name = n.name.split(".", 1)[0]
+            if root_name:
+                names.setdefault(root_name, None)
+            return
+
+        for child_field in ir.node_layout(type(n)).child_fields:
+            v = getattr(n, child_field.name)
+            if child_field.is_list:
+                for ch in v:
+                    _visit(ch)
+            else:
+                _visit(v)
+
+    _visit(node)
+    return list(names)
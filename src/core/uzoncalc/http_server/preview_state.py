@@ -2,13 +2,19 @@
 
 import threading
 
+from ..assets import MemoryAssetStore
+
 
 class HtmlPreviewState:
     """保存可更新 HTML，供监听线程和 HTTP 线程共享。"""
 
-    def __init__(self, html_output: str):
-        """初始化当前 HTML 内容和线程锁。"""
+    def __init__(self, html_output: str, assets: MemoryAssetStore | None = None):
+        """初始化当前 HTML 内容和线程锁。
+
+        assets 为外部资源模式下 HTML 引用的图片存储，由预览服务按 /assets/ 路径提供。
+        """
         self._html_output = html_output
+        self._assets = assets
         self._lock = threading.Lock()
 
     def get_html(self) -> str:
@@ -17,18 +23,33 @@ class HtmlPreviewState:
             return self._html_output
 
     def update_html(self, html_output: str):
-        """更新当前 HTML 内容。"""
+        """更新当前 HTML 内容，并释放新内容不再引用的资源。"""
         with self._lock:
             self._html_output = html_output
+        if self._assets is not None:
+            self._assets.retain(html_output)
+
+    def get_asset(self, name: str) -> bytes | None:
+        """读取当前 HTML 引用的资源内容。"""
+        if self._assets is None:
+            return None
+        return self._assets.get(name)
 
 
 class StaticHtmlPreviewState:
     """保存静态 HTML，供 HTTP 处理器读取。"""
 
-    def __init__(self, html_output: str):
+    def __init__(self, html_output: str, assets: MemoryAssetStore | None = None):
         """初始化静态 HTML 内容。"""
         self._html_output = html_output
+        self._assets = assets
 
     def get_html(self) -> str:
         """读取静态 HTML 内容。"""
         return self._html_output
+
+    def get_asset(self, name: str) -> bytes | None:
+        """读取 HTML 引用的资源内容。"""
+        if self._assets is None:
+            return None
+        return self._assets.get(name)
@@ -4,6 +4,7 @@ import json
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
 
+from ..assets import ASSET_ROUTE, MIME_TYPES
 from ..service.toc_page_numbers import (
     TOC_PAGE_NUMBERS_ROUTE,
     calculate_toc_page_numbers_sync,
@@ -22,7 +23,11 @@ def create_html_request_handler(preview_state):
         """处理 HTML 预览请求。"""
 
         def do_GET(self):
-            """返回 HTML 内容，未知路径返回 404。"""
+            """返回 HTML 内容或其引用的资源，未知路径返回 404。"""
+            if self.path.startswith(ASSET_ROUTE):
+                self._send_asset(self.path[len(ASSET_ROUTE) :])
+                return
+
             # 仅开放预览入口，避免误作为静态文件服务使用
             if self.path not in ("/", "/index.html"):
                 self.send_error(HTTPStatus.NOT_FOUND)
@@ -36,6 +41,29 @@ def create_html_request_handler(preview_state):
             self.end_headers()
             self.wfile.write(html_bytes)
 
+        def _send_asset(self, name: str):
+            """返回内存中的资源；文件名即内容哈希，可长期缓存。"""
+            data = preview_state.get_asset(name)
+            mime_type = MIME_TYPES.get(name.rpartition(".")[2])
+            if data is None or mime_type is None:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+
+            etag = f'"{name}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", mime_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(data)
+
         def do_POST(self):
             """处理本地预览服务的 JSON 请求。"""
             if self.path != TOC_PAGE_NUMBERS_ROUTE:
@@ -3,6 +3,7 @@
 import errno
 from http.server import ThreadingHTTPServer
 
+from ..assets import MemoryAssetStore
 from .constants import DEFAULT_SERVER_PORT, SERVER_HOST
 from .preview_state import StaticHtmlPreviewState
 from .request_handler import create_html_request_handler
@@ -31,10 +32,11 @@ def create_html_server(
 def serve_static_html(
     html_output: str,
     preferred_port: int = DEFAULT_SERVER_PORT,
+    assets: MemoryAssetStore | None = None,
 ):
     """启动无文件监听的本地 HTTP 预览服务，并阻塞直到用户中断。"""
     # 静态预览只服务当前这次计算得到的 HTML
-    preview_state = StaticHtmlPreviewState(html_output)
+    preview_state = StaticHtmlPreviewState(html_output, assets)
     server, selected_port = create_html_server(preview_state, preferred_port)
     print(f"Serving document at: http://{SERVER_HOST}:{selected_port}/")
 
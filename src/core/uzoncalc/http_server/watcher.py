@@ -6,6 +6,7 @@ import threading
 import traceback
 from typing import Callable
 
+from ..assets import MemoryAssetStore
 from .constants import DEFAULT_SERVER_PORT, SERVER_HOST, WATCH_POLL_INTERVAL_SECONDS
 from .preview_state import HtmlPreviewState
 from .server import create_html_server
@@ -65,9 +66,13 @@ def serve_reloadable_html(
     script_path: str,
     render_script_html: Callable[[str], str],
     preferred_port: int = DEFAULT_SERVER_PORT,
+    assets: MemoryAssetStore | None = None,
 ):
-    """启动本地 HTTP 服务和文件监听，并阻塞直到用户中断。"""
-    preview_state = HtmlPreviewState(html_output)
+    """启动本地 HTTP 服务和文件监听，并阻塞直到用户中断。
+
+    assets 为渲染回调写入外部资源的存储，随 HTML 一同提供。
+    """
+    preview_state = HtmlPreviewState(html_output, assets)
     server, selected_port = create_html_server(preview_state, preferred_port)
     stop_event = threading.Event()
     watch_thread = threading.Thread(
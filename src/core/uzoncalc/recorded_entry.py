@@ -0,0 +1,86 @@
+"""Lightweight recorded entries rendered lazily by a calculation context."""
+
+from __future__ import annotations
+
+import copy
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Mapping, Protocol
+
+if TYPE_CHECKING:
+    from .context import CalcContext
+    from .context_options import ContextOptions
+
+
+class RenderableStep(Protocol):
+    """Step that can render its HTML fragment without recording it."""
+
+    def render(
+        self,
+        ctx: CalcContext,
+        *,
+        locals_map: Mapping[str, Any],
+        value: Any = None,
+    ) -> str | None: ...
+
+
+@dataclass(frozen=True, slots=True)
+class RecordedStep:
+    """A step recorded without rendering.
+
+    Holds the step reference, the captured values and the options in effect
+    when the step was recorded, so rendering later produces the same output.
+    Mutable captured values are snapshotted by :func:`snapshot_captured`, so
+    objects mutated after recording still render with their recorded state.
+    """
+
+    step: RenderableStep
+    locals_map: Mapping[str, Any]
+    value: Any
+    options: ContextOptions
+
+    # 记录时所处的 HTML 标签（段落 p 或 inline 模式下的 span）
+    tag: str
+
+
+# 不可变的常见标量直接复用，无需复制
+_IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+
+def snapshot_captured(
+    locals_map: Mapping[str, Any], value: Any
+) -> tuple[dict[str, Any], Any]:
+    """Copy the values captured for a step so later mutations do not leak in.
+
+    NumPy arrays are copied with ``ndarray.copy()``, other mutable objects with
+    :func:`copy.deepcopy` sharing one memo, so aliases within a step stay
+    aliases. Objects that cannot be copied are kept by reference.
+    """
+    memo: dict[int, Any] = {}
+    snapshot = {name: _snapshot_value(item, memo) for name, item in locals_map.items()}
+    return snapshot, _snapshot_value(value, memo)
+
+
+def _snapshot_value(value: Any, memo: dict[int, Any]) -> Any:
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    np = sys.modules.get("numpy")
+    if np is not None and type(value) is np.ndarray:
+        copied = memo.get(id(value))
+        if copied is None:
+            copied = memo[id(value)] = value.copy()
+        return copied
+    try:
+        return copy.deepcopy(value, memo)
+    except Exception:
+        # 模块、生成器等无法复制的对象保持引用
+        return value
+
+
+@dataclass(slots=True)
+class RecordedInline:
+    """An inline paragraph whose fragments may still be pending."""
+
+    values: list[str | RecordedStep] = field(default_factory=list)
+    separator: str = " "
+
@@ -1,12 +1,22 @@
 import asyncio
 from collections.abc import Awaitable, Callable
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 from functools import wraps
 import inspect
+import os
 from typing import Any, ParamSpec, TypeVar, cast, overload
 
+from .cache.call_cache import (
+    CallCacheEntry,
+    DiskCallCache,
+    get_cached_call,
+    make_call_key,
+    store_cached_call,
+)
 from .context import CalcContext
 from .handcalc.ast_instrument import instrument_function
+from .handcalc.code_cache import PersistentCodeCache
+from .handcalc.headless import headless_function
 from .globals import _calc_instance, get_current_instance
 
 from .units import unit
@@ -26,12 +36,14 @@ async def uzon_calc_core(
     file_path: str | None = None,
     is_silent: bool = True,
     ctx_hook_created: Callable[[CalcContext], Any] | None = None,
+    is_headless: bool = False,
 ):
     # 生成一个上下文实例
     inst = CalcContext(
         name=ctx_name,
         file_path=file_path,
         is_silent=is_silent,
+        is_headless=is_headless,
         ctx_hook_created=ctx_hook_created,
     )
     token = _calc_instance.set(inst)
@@ -281,6 +293,7 @@ def uzon_calc(
             *args: _P.args, **kwargs: _P.kwargs
         ) -> CalcContext | _R:
             is_silent = cast(bool, kwargs.pop("is_silent", True))
+            is_headless = cast(bool, kwargs.pop("is_headless", False))
             ctx_hook_created = cast(
                 Callable[[CalcContext], Any] | None,
                 kwargs.pop("ctx_hook_created", None),
@@ -288,8 +301,9 @@ def uzon_calc(
 
             current_ctx = _get_current_instance_or_none()
             if current_ctx is not None:
+                # 无记录执行时嵌套入口按原始代码运行
                 return await _call_contextual_async(
-                    instrumented_fn,
+                    fn if current_ctx.is_headless else instrumented_fn,
                     args,
                     kwargs,
                     current_ctx,
@@ -301,11 +315,13 @@ def uzon_calc(
             async with uzon_calc_core(
                 name,
                 file_path,
-                is_silent=is_silent,
+                is_silent=is_silent or is_headless,
                 ctx_hook_created=ctx_hook_created,
+                is_headless=is_headless,
             ) as ctx:
+                # 无记录执行：运行不含记录调用的版本，退出时采集最终变量
                 await _call_contextual_async(
-                    instrumented_fn,
+                    headless_function(fn) if is_headless else instrumented_fn,
                     args,
                     kwargs,
                     ctx,
@@ -320,6 +336,91 @@ def uzon_calc(
     return deco
 
 
+class _CallMemo:
+    """缓存 helper 的调用结果，命中时把当时记录的内容回放到当前上下文。"""
+
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        sig: inspect.Signature,
+        cache_dir: str | os.PathLike[str] | None,
+    ) -> None:
+        self._fn = fn
+        self._sig = sig
+        self._disk = DiskCallCache(cache_dir) if cache_dir is not None else None
+        self._function_key: str | None = None
+
+    def make_key(
+        self, args: tuple[Any, ...], kwargs: dict[str, Any], ctx: CalcContext
+    ) -> str | None:
+        """计算调用的缓存键；参数无法绑定或没有稳定指纹时返回 None。"""
+        try:
+            bound = self._sig.bind_partial(*args, **kwargs)
+        except TypeError:
+            return None
+        bound.apply_defaults()
+        arguments = {
+            name: value
+            for name, value in bound.arguments.items()
+            if name not in (_PARAM_CTX, _PARAM_UNIT)
+        }
+        return make_call_key(self._get_function_key(), arguments, ctx)
+
+    def lookup(self, key: str) -> CallCacheEntry | None:
+        entry = get_cached_call(key)
+        if entry is None and self._disk is not None:
+            entry = self._disk.load(key)
+            if entry is not None:
+                store_cached_call(key, entry)
+        return entry
+
+    def store(self, key: str, entry: CallCacheEntry) -> None:
+        store_cached_call(key, entry)
+        if self._disk is not None:
+            self._disk.store(key, entry)
+
+    def _get_function_key(self) -> str:
+        # 复用插桩缓存的键：源码或插桩、渲染逻辑变化后，磁盘上的旧结果不再命中
+        if self._function_key is None:
+            fn = self._fn
+            self._function_key = PersistentCodeCache.get_instance().make_key(
+                source=inspect.getsource(fn),
+                qualname=fn.__qualname__,
+                filename=inspect.getsourcefile(fn) or "",
+                first_lineno=fn.__code__.co_firstlineno,
+            )
+        return self._function_key
+
+
+def _replay_cached_call(
+    memo: _CallMemo | None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    ctx: CalcContext,
+) -> tuple[str | None, CallCacheEntry | None]:
+    """查找缓存的调用结果，命中时回放记录的内容。
+
+    Returns:
+        (缓存键, 命中的条目)；未启用缓存或调用不可缓存时键为 None。
+    """
+    if memo is None:
+        return None, None
+    key = memo.make_key(args, kwargs, ctx)
+    if key is None:
+        return None, None
+    entry = memo.lookup(key)
+    if entry is not None and entry.fragments:
+        ctx.replay_fragments(entry.fragments)
+    return key, entry
+
+
+def _capture_for(key: str | None, ctx: CalcContext):
+    """只有可缓存的调用才需要采集记录内容。"""
+    if key is None:
+        return nullcontext([])
+    return ctx.capture_fragments()
+
+
 @overload
 def uzon_calc_func(func: Callable[_P, _R]) -> Callable[_P, _R]: ...
 
@@ -327,24 +428,40 @@ def uzon_calc_func(func: Callable[_P, _R]) -> Callable[_P, _R]: ...
 @overload
 def uzon_calc_func(
     func: None = None,
+    *,
+    cache: bool = False,
+    cache_dir: str | os.PathLike[str] | None = None,
 ) -> Callable[[Callable[_P, _R]], Callable[_P, _R]]: ...
 
 
 def uzon_calc_func(
     func: Callable[..., Any] | None = None,
+    *,
+    cache: bool = False,
+    cache_dir: str | os.PathLike[str] | None = None,
 ) -> Callable[..., Any]:
     """装饰可在计算入口内部复用的纯插桩函数。
 
+    启用 cache 时，相同参数（按稳定指纹比较，支持 pint 量与 NumPy 数组）且
+    记录选项相同的调用直接返回上一次的结果，并回放当时记录的内容而不再执行；
+    返回值在调用间共享，不应被修改。带编号的图表等依赖上下文状态的内容
+    不适合缓存。
+
     Args:
         func: 可选的待装饰函数；为 None 时返回实际装饰器。
+        cache: 是否缓存调用结果。
+        cache_dir: 额外把调用结果保存到该目录，跨运行复用；需启用 cache。
 
     Returns:
         已插桩的 helper 包装函数，或等待函数参数的装饰器。
 
     Raises:
+        ValueError: 当指定 cache_dir 但未启用 cache 时抛出。
         TypeError: 当调用参数无法按原函数签名绑定时抛出。
         Exception: 原函数或插桩函数执行期间抛出的异常会原样透传。
     """
+    if cache_dir is not None and not cache:
+        raise ValueError("cache_dir requires cache=True")
 
     def deco(fn: Callable[..., Any]):
         """对 helper 函数执行一次插桩并返回包装函数。
@@ -361,6 +478,7 @@ def uzon_calc_func(
         """
         instrumented_fn, sig = _instrument_with_signature(fn)
         public_sig = inspect.signature(fn)
+        memo = _CallMemo(fn, public_sig, cache_dir) if cache else None
 
         if inspect.iscoroutinefunction(instrumented_fn):
 
@@ -383,15 +501,27 @@ def uzon_calc_func(
                 if current_ctx is None:
                     return await fn(*args, **kwargs)
 
-                return await _call_contextual_async(
-                    instrumented_fn,
-                    args,
-                    kwargs,
-                    current_ctx,
-                    sig,
-                    include_defaults=False,
-                    filter_unknown=False,
-                )
+                key, entry = _replay_cached_call(memo, args, kwargs, current_ctx)
+                if entry is not None:
+                    return entry.result
+
+                recording = current_ctx.is_recording
+                with _capture_for(key, current_ctx) as fragments:
+                    result = await _call_contextual_async(
+                        fn if current_ctx.is_headless else instrumented_fn,
+                        args,
+                        kwargs,
+                        current_ctx,
+                        sig,
+                        include_defaults=False,
+                        filter_unknown=False,
+                    )
+                if memo is not None and key is not None:
+                    memo.store(
+                        key,
+                        CallCacheEntry(result, tuple(fragments) if recording else None),
+                    )
+                return result
 
             async_func_wrapper.__signature__ = public_sig  # type: ignore[attr-defined]
             return _mark_as_calc_func(async_func_wrapper)
@@ -415,15 +545,27 @@ def uzon_calc_func(
             if current_ctx is None:
                 return fn(*args, **kwargs)
 
-            return _call_contextual_sync(
-                instrumented_fn,
-                args,
-                kwargs,
-                current_ctx,
-                sig,
-                include_defaults=False,
-                filter_unknown=False,
-            )
+            key, entry = _replay_cached_call(memo, args, kwargs, current_ctx)
+            if entry is not None:
+                return entry.result
+
+            # 无记录执行时直接运行原函数，仅注入上下文参数
+            recording = current_ctx.is_recording
+            with _capture_for(key, current_ctx) as fragments:
+                result = _call_contextual_sync(
+                    fn if current_ctx.is_headless else instrumented_fn,
+                    args,
+                    kwargs,
+                    current_ctx,
+                    sig,
+                    include_defaults=False,
+                    filter_unknown=False,
+                )
+            if memo is not None and key is not None:
+                memo.store(
+                    key, CallCacheEntry(result, tuple(fragments) if recording else None)
+                )
+            return result
 
         func_wrapper.__signature__ = public_sig  # type: ignore[attr-defined]
         return _mark_as_calc_func(func_wrapper)
@@ -439,6 +581,7 @@ async def run(
     defaults: dict[str, dict[str, Any]] | None = None,
     is_silent: bool = True,
     ctx_hook_created: Callable[[CalcContext], Any] | None = None,
+    is_headless: bool = False,
     **kwargs: Any,
 ) -> CalcContext:
     """
@@ -452,6 +595,7 @@ async def run(
         defaults: 默认值字典，格式为 {"title": {"field": value}}
                   会保存到 context.vars 中
         is_silent: 是否静默执行，True 表示静默执行（默认）
+        is_headless: 是否无记录执行，只采集最终变量，结果通过 ctx.values() 获取
         **kwargs: 关键字参数
 
     Returns:
@@ -462,6 +606,7 @@ async def run(
         kwargs["defaults"] = defaults
     kwargs["is_silent"] = is_silent
     kwargs["ctx_hook_created"] = ctx_hook_created
+    kwargs["is_headless"] = is_headless
 
     result = func(*args, **kwargs)
 
@@ -496,6 +641,33 @@ def run_sync(
     return asyncio.run(run(func, *args, defaults=defaults, is_silent=True, **kwargs))
 
 
+def run_values(
+    func: Callable[..., Any],
+    *args: Any,
+    defaults: dict[str, dict[str, Any]] | None = None,
+    **kwargs: Any,
+) -> dict[str, dict[str, Any]]:
+    """
+    无记录执行计算函数，只返回最终变量
+
+    不记录、渲染或后处理任何内容，UI 调用直接返回默认值；
+    异步调用方可使用 `(await run(func, is_headless=True)).values()`
+
+    Args:
+        func: 要执行的异步函数
+        *args: 位置参数
+        defaults: 默认值字典，格式同 run_sync
+        **kwargs: 关键字参数
+
+    Returns:
+        {"values": {变量名: 值}, "inputs": {UI 标题: {字段: 值}}}
+    """
+    ctx = asyncio.run(
+        run(func, *args, defaults=defaults, is_silent=True, is_headless=True, **kwargs)
+    )
+    return ctx.values()
+
+
 def view(
     func: Callable[..., Any],
     *args: Any,
@@ -503,6 +675,7 @@ def view(
     preferred_port: int = 0,
     **kwargs: Any,
 ) -> None:
+    from .assets import MemoryAssetStore, externalize_data_urls
     from .http_server import DEFAULT_SERVER_PORT, serve_static_html
     from .template.utils import render_html_template
 
@@ -512,4 +685,10 @@ def view(
     html_output = render_html_template(ctx.html_content(), ctx.options)
 
     # 预览服务会自动从首选端口开始查找可用端口
-    serve_static_html(html_output, preferred_port or DEFAULT_SERVER_PORT)
+    if ctx.options.asset_mode != "external":
+        serve_static_html(html_output, preferred_port or DEFAULT_SERVER_PORT)
+        return
+
+    assets = MemoryAssetStore()
+    html_output = externalize_data_urls(html_output, assets.put)
+    serve_static_html(html_output, preferred_port or DEFAULT_SERVER_PORT, assets)
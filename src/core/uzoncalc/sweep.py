@@ -0,0 +1,112 @@
+"""Parametric sweeps: run one calculation over many default sets in parallel."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Literal
+import multiprocessing
+import os
+
+from .startup import run_sync, run_values
+
+SweepMode = Literal["values", "html"]
+
+# 每个工作进程平均分到的任务批数，批次越少进程间通信越少
+_CHUNKS_PER_WORKER = 4
+
+
+@dataclass(slots=True)
+class SweepResult:
+    """Results of a parametric sweep, in the order of the default sets.
+
+    In ``values`` mode every case is the ``{"values": ..., "inputs": ...}``
+    dict returned by :func:`run_values`; in ``html`` mode it is the complete
+    HTML document of the case.
+    """
+
+    cases: list[Any]
+    summary: list[dict[str, Any]] | None = None
+
+
+def sweep(
+    func: Callable[..., Any],
+    defaults_list: Sequence[dict[str, dict[str, Any]]],
+    *,
+    workers: int | None = None,
+    mode: SweepMode = "values",
+    summary: Sequence[str] | None = None,
+) -> SweepResult:
+    """Run a calculation entry once per default set across a process pool.
+
+    Workers are started with the ``spawn`` method, which is safe from a
+    multi-threaded parent. Each worker process imports ``func``'s module
+    once, so the entry is instrumented once per worker and the instrumented code and unit registry
+    are reused by every case the worker runs.
+
+    Args:
+        func: Module-level ``@uzon_calc`` entry; it must be importable by
+            qualified name from the worker processes.
+        defaults_list: One ``defaults`` mapping per case, as for ``run_sync``.
+        workers: Number of worker processes; defaults to the CPU count.
+            With one worker, or a single case, cases run in this process.
+        mode: ``"values"`` runs headless and returns final variables;
+            ``"html"`` records the report and returns its HTML.
+        summary: Variable names collected into one row per case; only
+            available in ``values`` mode.
+
+    Returns:
+        The per-case results and, when requested, the summary rows.
+
+    Raises:
+        ValueError: If ``mode`` is unknown or ``summary`` is used in html mode.
+        Exception: The first failing case's exception is re-raised.
+    """
+    if mode not in ("values", "html"):
+        raise ValueError(f"Unknown sweep mode: {mode!r}")
+    if summary is not None and mode != "values":
+        raise ValueError("summary is only available in values mode")
+
+    cases = list(defaults_list)
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(cases))
+
+    if workers <= 1:
+        results = [_run_case(func, mode, defaults) for defaults in cases]
+    else:
+        chunksize = max(1, len(cases) // (workers * _CHUNKS_PER_WORKER))
+        # fork 在已有线程的进程中可能死锁，统一使用 spawn 启动工作进程
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            results = list(
+                executor.map(
+                    _run_case,
+                    [func] * len(cases),
+                    [mode] * len(cases),
+                    cases,
+                    chunksize=chunksize,
+                )
+            )
+
+    rows = None
+    if summary is not None:
+        rows = [
+            {name: result["values"].get(name) for name in summary}
+            for result in results
+        ]
+    return SweepResult(cases=results, summary=rows)
+
+
+def _run_case(
+    func: Callable[..., Any],
+    mode: SweepMode,
+    defaults: dict[str, dict[str, Any]],
+) -> Any:
+    """Run one sweep case; executed inside the worker processes."""
+    if mode == "values":
+        return run_values(func, defaults=defaults)
+    return run_sync(func, defaults=defaults).html()
+
+
+__all__ = ["SweepResult", "sweep"]
@@ -13,6 +13,7 @@ from ..context_options import ContextOptions
 
 _TEMPLATE_SCRIPT_SRC_ENV = "UZONCALC_TEMPLATE_SCRIPT_SRC"
 _DEFAULT_TEMPLATE_SCRIPT_SRC = "https://calc.uzoncloud.com/scripts/template.js"
+_CONTENT_PLACEHOLDER = "CALC_CONTENT"
 
 
 @lru_cache(maxsize=1)
@@ -153,6 +154,20 @@ def render_html_template(content: str, options: ContextOptions) -> str:
     Returns:
         完整的 HTML 字符串
     """
+    header, footer = render_html_template_parts(options)
+    return "".join((header, content, footer))
+
+
+def render_html_template_parts(options: ContextOptions) -> tuple[str, str]:
+    """
+    生成正文前后的模板内容，流式写出文档时正文无需拼接进模板字符串
+
+    Args:
+        options: 上下文选项,包含页面标题、尺寸、自定义样式等
+
+    Returns:
+        (正文之前的 HTML, 正文之后的 HTML)
+    """
     # 加载模板（使用缓存）
     template = load_template()
 
@@ -165,7 +180,6 @@ def render_html_template(content: str, options: ContextOptions) -> str:
     # 生成自定义样式
     custom_styles = generate_custom_styles(options.styles)
 
-    # 一次性替换所有占位符，避免多次字符串复制
     replacements = {
         "BODY_FONT_FAMILY": options.page_info.font_family,
         "PAGE_TITLE": options.doc_title,
@@ -174,14 +188,14 @@ def render_html_template(content: str, options: ContextOptions) -> str:
         "CUSTOM_STYLES": custom_styles,
         "CUSTOM_HEADS": custom_heads,
         "PAGE_MARGIN": options.page_info.margin,
-        "CALC_CONTENT": content,
     }
 
-    html_output = template
+    header, footer = template.split(_CONTENT_PLACEHOLDER, 1)
     for placeholder, value in replacements.items():
-        html_output = html_output.replace(placeholder, value)
+        header = header.replace(placeholder, value)
+        footer = footer.replace(placeholder, value)
 
-    return html_output
+    return header, footer
 
 
 def get_html_template(content: str) -> str:
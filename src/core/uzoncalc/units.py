@@ -1,5 +1,5 @@
 # 带单位
-from pint import UnitRegistry
+from pint import UnitRegistry, set_application_registry
 
 unit = UnitRegistry()
 unit.formatter.default_format = "~P"
@@ -8,3 +8,7 @@ unit.formatter.default_format = "~P"
 # https://github.com/hgrecco/pint/blob/master/pint/delegates/formatter/full.py
 unit.formatter.default_sort_func = None
 unit.auto_reduce_dimensions = True
+
+# 反序列化（如多进程返回结果）时 pint 使用应用注册表重建 Quantity，
+# 需与 unit 为同一注册表，否则无法与本进程中的量进行运算
+set_application_registry(unit)
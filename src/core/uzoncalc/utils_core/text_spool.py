@@ -0,0 +1,29 @@
+"""临时文本文件：流式输出时暂存大段 HTML，避免整篇文档驻留内存"""
+
+from __future__ import annotations
+
+import tempfile
+from collections.abc import Iterator
+from typing import IO
+
+# 每次从暂存文件读取的字符数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def open_text_spool() -> IO[str]:
+    """创建关闭后自动删除的 UTF-8 临时文本文件，不转换换行符"""
+    return tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+
+
+def iter_text_chunks(
+    file: IO[str], count: int | None = None, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[str]:
+    """从当前位置分块读取文本，count 为 None 时读到文件末尾"""
+    while count is None or count > 0:
+        size = chunk_size if count is None else min(chunk_size, count)
+        chunk = file.read(size)
+        if not chunk:
+            return
+        if count is not None:
+            count -= len(chunk)
+        yield chunk
@@ -0,0 +1,41 @@
+"""Shared pytest configuration."""
+
+import os
+import shutil
+import tempfile
+
+from uzoncalc.handcalc.code_cache import (
+    CACHE_DIR_ENV,
+    CACHE_ENABLED_ENV,
+    PersistentCodeCache,
+)
+
+_saved_environ: dict[str, str | None] = {}
+_cache_dir: str | None = None
+
+
+def pytest_configure(config) -> None:
+    """Keep the test suite out of the developer's user cache directory.
+
+    Test modules instrument calculation functions while they are collected,
+    so the environment is set before collection rather than in a fixture.
+    The persistent instrumentation cache is disabled; tests exercising it
+    opt in explicitly.
+    """
+    global _cache_dir
+    _cache_dir = tempfile.mkdtemp(prefix="uzoncalc-test-cache-")
+    for name, value in ((CACHE_DIR_ENV, _cache_dir), (CACHE_ENABLED_ENV, "0")):
+        _saved_environ[name] = os.environ.get(name)
+        os.environ[name] = value
+    PersistentCodeCache.reset_instance()
+
+
+def pytest_unconfigure(config) -> None:
+    for name, value in _saved_environ.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    PersistentCodeCache.reset_instance()
+    if _cache_dir is not None:
+        shutil.rmtree(_cache_dir, ignore_errors=True)
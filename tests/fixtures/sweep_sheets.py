@@ -0,0 +1,18 @@
+"""Calculation entries used by the parametric sweep tests."""
+
+from uzoncalc import UI, Field, FieldType, uzon_calc, unit
+
+
+@uzon_calc()
+async def beam_moment_sheet():
+    """Simply supported beam moment."""
+    inputs = await UI(
+        "Beam",
+        [
+            Field(name="span", label="Span", type=FieldType.number, value=6.0),
+            Field(name="load", label="Load", type=FieldType.number, value=10.0),
+        ],
+    )
+    L = inputs.span * unit.m
+    q = inputs.load * unit.kN / unit.m
+    M = q * L**2 / 8
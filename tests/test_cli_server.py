@@ -224,6 +224,8 @@ def test_server_render_script_html_does_not_save_file(tmp_path, monkeypatch):
     class FakeOptions:
         """模拟 CalcContext 的 options。"""
 
+        asset_mode = "inline"
+
     class FakeContext:
         """模拟 CalcContext 的 HTML 输出。"""
 
@@ -314,10 +316,15 @@ def test_startup_view_runs_function_and_serves_rendered_html(monkeypatch):
     """view() 应执行计算函数、渲染 HTML，并启动无监听预览服务。"""
     calls = []
 
+    class FakeOptions:
+        """模拟 CalcContext 的 options。"""
+
+        asset_mode = "inline"
+
     class FakeContext:
         """模拟计算上下文。"""
 
-        options = object()
+        options = FakeOptions()
 
         def html_content(self):
             """返回上下文正文 HTML。"""
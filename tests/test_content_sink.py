@@ -0,0 +1,138 @@
+"""Tests for streaming recorded content to a sink."""
+
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from uzoncalc import HtmlStreamSink
+from uzoncalc.context import CalcContext
+from uzoncalc.context_result_handler import TocContextResultHandler
+from uzoncalc.globals import _calc_instance
+from uzoncalc.handcalc import ir
+from uzoncalc.handcalc.steps import ExprStep
+
+_TOC_HTML = (
+    '<div id="toc" data-toc-title="Contents">'
+    "<div>Contents</div><div id='toc-container'></div></div>"
+)
+
+
+def _record(ctx: CalcContext) -> None:
+    ctx.append_content(_TOC_HTML)
+    for section in range(5):
+        ctx.append_content(f"<h2>Section alpha_{section}</h2>")
+        ctx.start_inline()
+        ctx.append_content("E_j")
+        ctx.append_content("<= 3")
+        ctx.end_inline()
+        for index in range(4):
+            ExprStep(ir.mi(f"x_{index}")).record(
+                ctx, locals_map={f"x_{index}": index}, value=index
+            )
+        ctx.append_content(f"<h3>Part {section}.1</h3>")
+    # 标题在记录结束时才确定，仍应写入模板头部
+    ctx.options.doc_title = "Streamed"
+
+
+@pytest.fixture
+def make_ctx():
+    tokens = []
+
+    def factory() -> CalcContext:
+        ctx = CalcContext()
+        tokens.append(_calc_instance.set(ctx))
+        return ctx
+
+    yield factory
+    for token in reversed(tokens):
+        _calc_instance.reset(token)
+
+
+@pytest.mark.parametrize("mode", ["fragment", "document"])
+@pytest.mark.parametrize("defer", [False, True])
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_streamed_document_matches_html(
+    make_ctx, tmp_path, mode, defer, batch_size
+) -> None:
+    expected_ctx = make_ctx()
+    expected_ctx.options.post_process_mode = mode
+    expected_ctx.options.defer_rendering = defer
+    _record(expected_ctx)
+
+    ctx = make_ctx()
+    ctx.options.post_process_mode = mode
+    ctx.options.defer_rendering = defer
+    path = tmp_path / "report.html"
+    ctx.stream_contents(HtmlStreamSink(path), batch_size=batch_size)
+    _record(ctx)
+    ctx.close_content_sink()
+
+    assert path.read_text(encoding="utf-8") == expected_ctx.html()
+
+
+def test_streamed_entries_are_not_kept(make_ctx) -> None:
+    ctx = make_ctx()
+    ctx.stream_contents(HtmlStreamSink(io.StringIO()), batch_size=4)
+    for index in range(10):
+        ctx.append_content(f"<p>{index}</p>")
+
+    assert ctx.contents == ["<p>8</p>", "<p>9</p>"]
+
+
+def test_content_recorded_before_streaming_is_written_first(make_ctx) -> None:
+    ctx = make_ctx()
+    ctx.append_content("<p>before</p>")
+    output = io.StringIO()
+    ctx.stream_contents(HtmlStreamSink(output, full_document=False))
+    ctx.append_content("<p>after</p>")
+
+    assert ctx.contents == ["<p>after</p>"]
+    ctx.close_content_sink()
+    assert output.getvalue() == "<p>before</p>\n<p>after</p>"
+
+
+def test_exit_finishes_the_stream(make_ctx) -> None:
+    ctx = make_ctx()
+    output = io.StringIO()
+    ctx.stream_contents(HtmlStreamSink(output, full_document=False))
+    ctx.append_content("<p>alpha</p>")
+
+    ctx.exit()
+
+    assert output.getvalue() == "<p>α</p>"
+    assert ctx.contents == []
+
+
+def test_stream_contents_rejects_invalid_arguments(make_ctx) -> None:
+    ctx = make_ctx()
+    with pytest.raises(ValueError):
+        ctx.stream_contents(HtmlStreamSink(io.StringIO()), batch_size=0)
+
+    ctx.stream_contents(HtmlStreamSink(io.StringIO()))
+    with pytest.raises(ValueError):
+        ctx.stream_contents(HtmlStreamSink(io.StringIO()))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_toc_stream_matches_whole_document(chunk_size) -> None:
+    body = "".join(
+        [
+            "<p>intro &amp; more</p>",
+            _TOC_HTML,
+            *(f"<h2>Title {index} &lt;x&gt;</h2><p>text</p>" for index in range(20)),
+            "<h3 id='custom'>Named</h3>",
+        ]
+    )
+    handler = TocContextResultHandler()
+    chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    assert "".join(handler.handle_stream(chunks)) == handler.handle(body)
+
+
+def test_toc_stream_passes_documents_without_toc_through() -> None:
+    body = "<h2>Title</h2>" * 3
+    chunks = [body[i : i + 4] for i in range(0, len(body), 4)]
+
+    assert "".join(TocContextResultHandler().handle_stream(chunks)) == body
@@ -1,3 +1,5 @@
+import pytest
+
 from uzoncalc.context import CalcContext
 from uzoncalc.handcalc.post_handlers.comparison_symbol import ComparisonSymbol
 from uzoncalc.handcalc.post_handlers.script_notation import ScriptNotation
@@ -34,3 +36,58 @@ def test_context_post_handlers_chain_alias_into_script_notation():
     ctx.append_content("stress")
 
     assert ctx.html_content() == "E<sub>j</sub>"
+
+
+class _RecordingHandler(ComparisonSymbol):
+    """记录 handle 调用次数的比较符号处理器。"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def handle(self, post_node, ctx=None) -> None:
+        self.calls += 1
+        super().handle(post_node, ctx)
+
+
+@pytest.mark.parametrize("mode", ["fragment", "document"])
+def test_context_skips_handlers_but_keeps_lxml_output(mode):
+    """没有处理器可能生效时不进入处理器遍历，但输出仍与完整处理逐字节一致。"""
+    handler = _RecordingHandler()
+    ctx = CalcContext()
+    ctx.options.post_handlers = [handler]
+    ctx.options.post_process_mode = mode
+    contents = [
+        '<p title="a &lt;= b"><math><mn>3</mn><mo>=</mo><mo /></math></p>',
+        "<p>a<br />b</p>",
+        "\n<div id='toc-container'></div>\n",
+    ]
+
+    for content in contents:
+        ctx.append_content(content)
+
+    assert handler.calls == 0
+    assert ctx.contents == [
+        '<p title="a &lt;= b"><math><mn>3</mn><mo>=</mo><mo></mo></math></p>',
+        "<p>a<br>b</p>",
+        '<div id="toc-container"></div>\n',
+    ]
+
+
+def test_default_handler_prefilters_only_inspect_text_nodes():
+    """预判只看文本节点，转义后的运算符同样会触发处理。"""
+    ctx = CalcContext()
+
+    assert not any(
+        handler.may_apply('<a href="http://x_y" title="alpha">3</a>', ctx)
+        for handler in ctx.options.post_handlers
+    )
+    assert ComparisonSymbol().may_apply("<p>a &lt;= b</p>", ctx)
+    assert SwapSymbol().may_apply("<mi>alpha</mi>", ctx)
+    assert not SwapSymbol().may_apply("<mi>alphabet</mi>", ctx)
+    assert ScriptNotation().may_apply("<mi>E_j</mi>", ctx)
+
+    ctx.options.aliases["stress"] = "E_j"
+    assert any(
+        handler.may_apply("<mi>stress</mi>", ctx)
+        for handler in ctx.options.post_handlers
+    )
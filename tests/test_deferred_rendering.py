@@ -0,0 +1,119 @@
+"""Tests for deferred rendering of recorded steps."""
+
+from uzoncalc import (
+    alias,
+    decimal,
+    end_inline,
+    figure_prefix,
+    inline,
+    run_sync,
+    uzon_calc,
+)
+from uzoncalc.context import CalcContext
+from uzoncalc.globals import _calc_instance
+from uzoncalc.handcalc import ir
+from uzoncalc.handcalc.post_handlers.base_post_handler import BasePostHandler
+from uzoncalc.handcalc.steps import EquationStep, ExprStep
+
+
+def _enable_deferred(ctx) -> None:
+    ctx.options.defer_rendering = True
+
+
+@uzon_calc()
+async def _mixed_sheet():
+    a = 1.23456
+    b = a * 2
+    decimal(1)
+    c = a + b
+    alias("c", "C")
+    d = c * 2
+    _hidden = d + 1
+    inline()
+    e = 1
+    f = 2
+    end_inline()
+    f"value {c}"
+
+
+def test_deferred_rendering_matches_immediate_output() -> None:
+    immediate = run_sync(_mixed_sheet)
+    deferred = run_sync(_mixed_sheet, ctx_hook_created=_enable_deferred)
+
+    assert deferred.contents == immediate.contents
+    assert deferred.html_content() == immediate.html_content()
+
+
+@uzon_calc()
+async def _mutating_sheet():
+    import numpy as np
+
+    a = [1, 2, 3]
+    b = a
+    a.append(99)
+    m = np.array([1.5, 2.5])
+    n = m * 2
+    m[0] = 7.0
+
+
+def test_deferred_rendering_snapshots_mutated_values() -> None:
+    immediate = run_sync(_mutating_sheet)
+    deferred = run_sync(_mutating_sheet, ctx_hook_created=_enable_deferred)
+
+    assert deferred.contents == immediate.contents
+    assert "<mn>99</mn>" not in deferred.contents[0]
+    assert "<mn>7</mn>" not in deferred.contents[-2]
+
+
+@uzon_calc()
+async def _equation_sheet():
+    a = 1
+    b = a + 1
+
+
+def test_deferred_steps_render_only_when_content_requested(monkeypatch) -> None:
+    calls = []
+    original_render = EquationStep.render
+
+    def counting_render(self, ctx, *, locals_map, value=None):
+        calls.append(value)
+        return original_render(self, ctx, locals_map=locals_map, value=value)
+
+    monkeypatch.setattr(EquationStep, "render", counting_render)
+
+    ctx = run_sync(_equation_sheet, ctx_hook_created=_enable_deferred)
+    assert calls == []
+
+    assert len(ctx.contents) == 2
+    assert calls == [1, 2]
+
+    ctx.html_content()
+    assert calls == [1, 2]
+
+
+class _TaggingHandler(BasePostHandler):
+    """Mark paragraphs processed after the handler was registered."""
+
+    def handle(self, post_node, ctx=None) -> None:
+        if post_node.tag_name == "p":
+            post_node.node.set("class", "tagged")
+
+
+def test_snapshot_keeps_options_as_recorded() -> None:
+    ctx = CalcContext()
+    ctx.options.defer_rendering = True
+    token = _calc_instance.set(ctx)
+    try:
+        ExprStep(ir.mi("x_1")).record(ctx, locals_map={"x_1": 1}, value=1)
+        snapshot = ctx.options.snapshot()
+        ctx.options.post_handlers.append(_TaggingHandler())
+        figure_prefix("Fig.")
+        ExprStep(ir.mi("x_1")).record(ctx, locals_map={"x_1": 1}, value=1)
+
+        contents = ctx.contents
+    finally:
+        _calc_instance.reset(token)
+
+    assert snapshot.prefix_settings.figure_prefix == "图"
+    assert not contents[0].startswith('<p class="tagged">')
+    assert contents[1].startswith('<p class="tagged">')
@@ -0,0 +1,80 @@
+"""Tests for the document-level post-handler pass."""
+
+from __future__ import annotations
+
+import pytest
+
+from uzoncalc import context as context_module
+from uzoncalc.context import CalcContext
+
+
+def _record(ctx: CalcContext) -> None:
+    ctx.append_content("<p>alpha_1 <= beta</p>")
+    ctx.options.aliases["stress"] = "sigma_x"
+    ctx.append_content("<p><math><mi>stress</mi><mo>=</mo><mn>3</mn></math></p>")
+    ctx.start_inline()
+    ctx.append_content("E_j")
+    ctx.append_content("see www.example.com")
+    ctx.end_inline()
+    ctx.options.aliases.clear()
+    ctx.append_content("<p>stress</p>")
+    ctx.append_content("plain 42")
+
+
+def _render(mode: str) -> tuple[list[str], str]:
+    ctx = CalcContext()
+    ctx.options.post_process_mode = mode  # type: ignore[assignment]
+    _record(ctx)
+    return list(ctx.contents), ctx.html_content()
+
+
+def test_document_pass_matches_per_fragment_processing() -> None:
+    assert _render("document") == _render("fragment")
+
+
+def test_document_pass_uses_options_active_at_append_time() -> None:
+    contents, _ = _render("document")
+
+    assert contents[1] == (
+        "<p><math><msub><mi>σ</mi><mtext>x</mtext></msub>"
+        "<mo>=</mo><mn>3</mn></math></p>"
+    )
+    assert contents[3] == "<p>stress</p>"
+
+
+def test_document_pass_parses_marked_entries_once(monkeypatch) -> None:
+    calls: list[str] = []
+    parse = context_module.parse_html_fragment
+
+    def counting_parse(content: str):
+        calls.append(content)
+        return parse(content)
+
+    monkeypatch.setattr(context_module, "parse_html_fragment", counting_parse)
+    ctx = CalcContext()
+    ctx.options.post_process_mode = "document"
+    for index in range(50):
+        ctx.append_content(f"<p>x_{index}</p>")
+
+    assert calls == []
+    contents = ctx.contents
+    assert len(calls) == 1
+    assert contents[7] == "<p>x<sub>7</sub></p>"
+
+    # 已处理的条目不会再次解析
+    ctx.append_content("<p>y_1</p>")
+    assert ctx.contents[-1] == "<p>y<sub>1</sub></p>"
+    assert len(calls) == 2
+    assert "x_" not in calls[1]
+
+
+@pytest.mark.parametrize("mode", ["fragment", "document"])
+def test_fragment_tails_are_not_post_processed(mode: str) -> None:
+    ctx = CalcContext()
+    ctx.options.post_process_mode = mode  # type: ignore[assignment]
+    ctx.start_inline(separator=" a_b ")
+    ctx.append_content("E_j")
+    ctx.append_content("E_k")
+    ctx.end_inline()
+
+    assert ctx.contents == ["<p>E<sub>j</sub> a_b E<sub>k</sub></p>"]
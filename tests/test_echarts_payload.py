@@ -0,0 +1,163 @@
+"""Tests for the compact ECharts payload encoding and LTTB downsampling."""
+
+from __future__ import annotations
+
+import base64
+import json
+import math
+import re
+from array import array
+
+import pytest
+
+from uzoncalc.context import CalcContext
+from uzoncalc.extension.echarts import Javascript, echart, lttb_indices
+from uzoncalc.globals import _calc_instance
+
+
+@pytest.fixture(autouse=True)
+def context():
+    ctx = CalcContext()
+    token = _calc_instance.set(ctx)
+    yield ctx
+    _calc_instance.reset(token)
+    ctx.exit()
+
+
+def _options_payload(html: str) -> dict:
+    match = re.search(r"chart\.setOption\((?:decodeTyped\()?(.*?)\)?\);", html, re.S)
+    assert match is not None
+    return json.loads(match.group(1))
+
+
+def _decode(value):
+    """Python counterpart of the decoder embedded in the chart script."""
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__uzoncalc_typed__" not in value:
+        return {key: _decode(item) for key, item in value.items()}
+    code = "f" if value["__uzoncalc_typed__"] == "float32" else "d"
+    flat = [
+        None if math.isnan(item) else item
+        for item in array(code, base64.b64decode(value["data"]))
+    ]
+    if len(value["shape"]) == 1:
+        return flat
+    width = value["shape"][1]
+    return [flat[index : index + width] for index in range(0, len(flat), width)]
+
+
+def _options(points: int = 200) -> dict:
+    return {
+        "xAxis": {"type": "value"},
+        "yAxis": {"type": "value"},
+        "series": [
+            {
+                "type": "line",
+                "data": [[x * 0.5, math.sin(x / 10)] for x in range(points)],
+            },
+            {"type": "bar", "data": [1, 2, None, 4]},
+        ],
+    }
+
+
+def test_default_encoding_is_plain_json() -> None:
+    options = _options()
+    html = echart(options)
+    assert "decodeTyped" not in html
+    assert _options_payload(html) == options
+
+
+def test_typed_encoding_round_trip() -> None:
+    options = _options()
+    options["series"][1]["data"] = [float(x) for x in range(100)]
+    options["series"][1]["data"][3] = None
+
+    html = echart(options, encoding="float64")
+    payload = _options_payload(html)
+    assert payload["series"][0]["data"]["shape"] == [200, 2]
+    assert payload["series"][1]["data"]["shape"] == [100]
+    assert _decode(payload) == options
+
+    large = _options(points=5000)
+    assert len(echart(large, encoding="float32")) < len(echart(large)) / 2
+
+
+def test_typed_encoding_keeps_raw_javascript() -> None:
+    options = _options()
+    options["series"][0]["label"] = {"formatter": Javascript("(p) => p.value")}
+    html = echart(options, encoding="float32")
+    assert '"formatter": (p) => p.value' in html
+    assert "chart.setOption(decodeTyped({" in html
+
+
+def test_short_and_mixed_arrays_stay_json() -> None:
+    options = {
+        "xAxis": {"data": [f"c{index}" for index in range(100)]},
+        "series": [{"data": [1, 2, 3]}, {"data": [[1, "a"]] * 100}],
+    }
+    payload = _options_payload(echart(options, encoding="float32"))
+    assert payload == options
+
+
+def test_lttb_keeps_endpoints_and_budget() -> None:
+    xs = [float(x) for x in range(1000)]
+    ys = [0.0] * 1000
+    ys[500] = 10.0
+    indices = lttb_indices(xs, ys, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert indices == sorted(indices)
+    # 峰值点被保留
+    assert 500 in indices
+    assert lttb_indices(xs[:10], ys[:10], 50) == list(range(10))
+
+
+def test_lttb_skips_missing_values() -> None:
+    xs = list(range(1000))
+    ys = [math.nan if x % 7 == 0 else math.sin(x / 25) for x in xs]
+    indices = lttb_indices(xs, ys, 20)
+    selected = [ys[index] for index in indices[1:-1]]
+    # 缺失值不会被选中，也不会让选点退化为每桶首点
+    assert all(math.isfinite(y) for y in selected)
+    assert all(abs(y) > 0.5 for y in selected)
+    assert max(selected) > 0.99 and min(selected) < -0.99
+
+    # 首点缺失时锚点取第一个有效点
+    ys = [math.nan] * 10 + [float(x % 5) for x in range(90)]
+    indices = lttb_indices(list(range(100)), ys, 10)
+    assert all(math.isfinite(ys[index]) for index in indices[1:])
+
+
+def test_max_points_downsamples_xy_series_only() -> None:
+    options = _options(points=1000)
+    options["series"].append({"type": "line", "data": list(range(1000))})
+
+    payload = _options_payload(echart(options, max_points=100))
+    xy = payload["series"][0]["data"]
+    assert len(xy) == 100
+    assert xy[0] == options["series"][0]["data"][0]
+    assert xy[-1] == options["series"][0]["data"][-1]
+    # 一维数据没有 x 坐标，保持不变
+    assert payload["series"][2]["data"] == list(range(1000))
+    # 不修改调用方的配置
+    assert len(options["series"][0]["data"]) == 1000
+
+
+def test_numpy_arrays() -> None:
+    numpy = pytest.importorskip("numpy")
+    x = numpy.linspace(0.0, 1.0, 500)
+    data = numpy.column_stack([x, x**2])
+    options = {"series": [{"data": data, "markLine": {"y": numpy.float64(0.5)}}]}
+
+    plain = _options_payload(echart(options))
+    assert plain["series"][0]["data"] == data.tolist()
+    assert plain["series"][0]["markLine"] == {"y": 0.5}
+
+    payload = _options_payload(echart(options, encoding="float32", max_points=64))
+    decoded = _decode(payload)["series"][0]["data"]
+    assert len(decoded) == 64
+    assert decoded[-1] == [1.0, 1.0]
+    assert numpy.allclose(decoded[0], data[0])
@@ -0,0 +1,208 @@
+"""Tests for the pure-Python Excel formula recalculation engine."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from uzoncalc.cache.sqlite_db import SqliteDB  # noqa: E402
+from uzoncalc.extension import excel  # noqa: E402
+from uzoncalc.extension.excel import (  # noqa: E402
+    clear_workbook_cache,
+    get_excel_table,
+)
+from uzoncalc.extension.excel_formula import (  # noqa: E402
+    FormulaModel,
+    UnsupportedFormulaError,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_workbook_cache():
+    clear_workbook_cache()
+    yield
+    clear_workbook_cache()
+
+
+def _model(cells: dict[str, object], cached: dict[str, object] | None = None):
+    """Build a one-sheet model from formulas and literals, without a file."""
+    values, formulas = {}, {}
+    for address, value in cells.items():
+        col, row = openpyxl.utils.cell.coordinate_from_string(address)
+        key = ("Sheet1", row, openpyxl.utils.column_index_from_string(col))
+        if isinstance(value, str) and value.startswith("="):
+            formulas[key] = value
+        else:
+            values[key] = value
+    for address, value in (cached or {}).items():
+        col, row = openpyxl.utils.cell.coordinate_from_string(address)
+        values[("Sheet1", row, openpyxl.utils.column_index_from_string(col))] = value
+    return FormulaModel(["Sheet1"], "Sheet1", values, {"Sheet1": formulas})
+
+
+def _value(model, address: str, changes=None):
+    return model.recalculate(changes or {}).values_in(None, address)
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ("=1+2*3", 7),
+        ("=-2^2", 4),
+        ("=2^3^2", 64),
+        ("=50%*4", 2),
+        ("=(A1+A2)/4", 2.5),
+        ("=0.1+0.2", 0.3),
+        ('="a"&A1&TRUE', "a4TRUE"),
+        ("=A1>=A2", False),
+        ('="abc"="ABC"', True),
+        ("=SUM(A1:A3,10)", 30),
+        ("=AVERAGE(A1:A3)", 20 / 3),
+        ("=MIN(A1:A3)+MAX(A1:A3)", 14),
+        ("=COUNT(A1:A4)+COUNTA(A1:A4)", 7),
+        ("=SUMPRODUCT(A1:A2,B1:B2)", 4 * 2 + 6 * 3),
+        ("=ROUND(2.345,2)+ROUND(-2.5,0)", 2.35 - 3),
+        ("=ROUNDUP(1.21,1)+ROUNDDOWN(1.29,1)", 2.5),
+        ("=MOD(-7,3)", 2),
+        ("=INT(-1.5)", -2),
+        ("=SQRT(16)*PI()/PI()", 4),
+        ("=IF(A1>3,A2,1/0)", 6),
+        ("=IF(A1<3,1)", False),
+        ("=IFERROR(1/0,-1)", -1),
+        ("=AND(A1>1,A2>1)+OR(FALSE,NOT(TRUE))", 1),
+        ("=1/0", "#DIV/0!"),
+        ("=SQRT(-1)", "#NUM!"),
+        ('=1+"x"', "#VALUE!"),
+        ("=A4+1", "#VALUE!"),
+        ("=ISBLANK(A9)", True),
+        ("=INDEX(A1:B3,2,2)", 3),
+        ("=MATCH(6,A1:A3,0)", 2),
+        ("=VLOOKUP(6,A1:B3,2,FALSE)", 3),
+        ("=VLOOKUP(7,A1:B3,2)", 3),
+        ("=MATCH(100,A1:A3,0)", "#N/A"),
+        ('=LEN(CONCATENATE("ab",A1))+LEN(TRIM("  a  b "))', 6),
+        ('=LEFT("beam",2)&MID("beam",2,2)&RIGHT("beam")', "beeam"),
+        ("=CHOOSE(2,A1,A2,A3)", 6),
+        ("=SUM(A:A)", 20),
+    ],
+)
+def test_formula_values(formula, expected) -> None:
+    model = _model(
+        {"A1": 4, "A2": 6, "A3": 10, "A4": "text", "B1": 2, "B2": 3, "B3": 5,
+         "D1": formula}
+    )
+    result = _value(model, "D1")[(1, 4)]
+    if isinstance(expected, float):
+        assert result == pytest.approx(expected)
+    else:
+        assert result == expected
+
+
+def test_only_downstream_cells_are_recalculated() -> None:
+    model = _model(
+        {"A1": 1, "A2": 2, "B1": "=A1*10", "B2": "=A2*10", "C1": "=B1+B2",
+         "C2": "=SUM(B1:B2)*2"},
+        # 缓存值故意与公式不一致，未受影响的单元格应沿用缓存值
+        cached={"B1": 10, "B2": 999, "C1": 1009, "C2": 2018},
+    )
+    recalculation = model.recalculate({"A1": 5})
+
+    assert recalculation.changed[0] == ("Sheet1", 1, 2)
+    assert set(recalculation.changed) == {
+        ("Sheet1", 1, 2),
+        ("Sheet1", 1, 3),
+        ("Sheet1", 2, 3),
+    }
+    assert recalculation.values_in("Sheet1", "A1:C2") == {
+        (1, 1): 5,
+        (1, 2): 50,
+        (2, 2): 999,
+        (1, 3): 1049,
+        (2, 3): 2098,
+    }
+
+
+def test_input_overrides_formula_cell() -> None:
+    model = _model({"A1": 1, "B1": "=A1+1", "C1": "=B1*2"})
+    assert _value(model, "C1", {"B1": 10}) == {(1, 3): 20}
+
+
+def test_unsupported_formula_only_fails_when_affected() -> None:
+    model = _model(
+        {"A1": 1, "A2": 2, "B1": "=A1+1", "B2": "=FANCY(A2)"}, cached={"B2": 7}
+    )
+    assert _value(model, "B1:B2", {"A1": 3}) == {(1, 2): 4, (2, 2): 7}
+    with pytest.raises(UnsupportedFormulaError, match="FANCY"):
+        model.recalculate({"A2": 3})
+
+
+def test_circular_reference_is_rejected() -> None:
+    model = _model({"A1": 1, "B1": "=A1+C1", "C1": "=B1"})
+    with pytest.raises(UnsupportedFormulaError, match="Circular"):
+        model.recalculate({"A1": 2})
+
+
+def _write_book(path) -> str:
+    wb = openpyxl.Workbook()
+    inputs = wb.active
+    inputs.title = "Inputs"
+    inputs["A1"] = "Span"
+    inputs["B1"] = 6
+    inputs["A2"] = "Load"
+    inputs["B2"] = 10
+    results = wb.create_sheet("Results")
+    results["A1"] = "Moment"
+    results["B1"] = "=Inputs!B2*Inputs!B1^2/8"
+    results["A2"] = "Shear"
+    results["B2"] = "='Inputs'!B2*Inputs!B1/2"
+    wb.save(path)
+    return str(path)
+
+
+def test_get_excel_table_recalculates_without_touching_file(
+    tmp_path, monkeypatch
+) -> None:
+    path = _write_book(tmp_path / "beam.xlsx")
+    original = (tmp_path / "beam.xlsx").read_bytes()
+    db = SqliteDB(str(tmp_path / "data" / "db.sqlite3"))
+    monkeypatch.setattr(
+        excel, "get_current_instance", lambda: SimpleNamespace(get_json_db=lambda: db)
+    )
+
+    html = get_excel_table(
+        path, "Results!A1:B2", values={"B1": 8}, engine="python"
+    )
+    assert ">80</td>" in html
+    assert ">40</td>" in html
+
+    html = get_excel_table(
+        path, "Results!A1:B2", values={"Inputs!B2": 5}, include_styles=False
+    )
+    assert "<td>22.5</td>" in html
+    assert "<td>15</td>" in html
+    assert (tmp_path / "beam.xlsx").read_bytes() == original
+    db.close()
+
+
+def test_get_excel_table_python_engine_reports_unsupported(
+    tmp_path, monkeypatch
+) -> None:
+    wb = openpyxl.Workbook()
+    wb.active["A1"] = 1
+    wb.active["B1"] = "=FANCY(A1)"
+    wb.save(tmp_path / "book.xlsx")
+    db = SqliteDB(str(tmp_path / "data" / "db.sqlite3"))
+    monkeypatch.setattr(
+        excel, "get_current_instance", lambda: SimpleNamespace(get_json_db=lambda: db)
+    )
+
+    with pytest.raises(UnsupportedFormulaError):
+        get_excel_table(
+            str(tmp_path / "book.xlsx"), "A1:B1", values={"A1": 2}, engine="python"
+        )
+    with pytest.raises(ValueError, match="engine"):
+        get_excel_table(str(tmp_path / "book.xlsx"), "A1:B1", engine="libre")
+    db.close()
@@ -0,0 +1,239 @@
+"""Tests for the workbook cache and merged-range index behind get_excel_table."""
+
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from openpyxl.styles import Alignment, Font  # noqa: E402
+
+from uzoncalc.cache.sqlite_db import SqliteDB  # noqa: E402
+from uzoncalc.extension import excel  # noqa: E402
+from uzoncalc.extension.excel import (  # noqa: E402
+    ExcelProcessor,
+    MergedRange,
+    MergedRangeIndex,
+    clear_workbook_cache,
+    get_excel_table,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_workbook_cache():
+    clear_workbook_cache()
+    yield
+    clear_workbook_cache()
+
+
+def _write_book(path, title: str = "Load table") -> str:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Loads"
+    ws["A1"] = title
+    ws["A1"].font = Font(bold=True)
+    ws["A1"].alignment = Alignment(horizontal="center")
+    ws.merge_cells("A1:C1")
+    for row in range(2, 6):
+        for col in range(1, 4):
+            ws.cell(row=row, column=col, value=row * 10 + col)
+    ws.merge_cells("B3:C4")
+    ws.merge_cells("A20:B40")
+    ws.merge_cells("E2:F30")
+    wb.save(path)
+    return str(path)
+
+
+def _full_map_clipped(path, bounds):
+    """Reference result: expand every merged range, then clip to the bounds."""
+    wb = openpyxl.load_workbook(path)
+    ws = wb.active
+    min_row, min_col, max_row, max_col = bounds
+    expected = {}
+    for merged in ws.merged_cells.ranges:
+        for row in range(merged.min_row, merged.max_row + 1):
+            for col in range(merged.min_col, merged.max_col + 1):
+                if min_row <= row <= max_row and min_col <= col <= max_col:
+                    expected[(row, col)] = {
+                        "main_cell": (merged.min_row, merged.min_col),
+                        "rowspan": merged.max_row - merged.min_row + 1,
+                        "colspan": merged.max_col - merged.min_col + 1,
+                        "is_main": (row, col) == (merged.min_row, merged.min_col),
+                    }
+    wb.close()
+    return expected
+
+
+@pytest.mark.parametrize(
+    "bounds", [(1, 1, 5, 3), (2, 2, 3, 3), (25, 1, 26, 6), (1, 1, 1048576, 16384)]
+)
+@pytest.mark.parametrize("read_only", [False, True])
+def test_merged_map_matches_full_expansion(tmp_path, bounds, read_only) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    processor = ExcelProcessor(path).load(read_only=read_only)
+    try:
+        assert processor.get_merged_cells_map(bounds) == _full_map_clipped(
+            path, bounds
+        )
+    finally:
+        processor.close()
+
+
+def test_index_skips_ranges_outside_rows() -> None:
+    index = MergedRangeIndex(
+        [MergedRange(1, 1, 100, 1), MergedRange(5, 2, 6, 3), MergedRange(50, 1, 51, 2)]
+    )
+    cells = index.cells_in(10, 1, 12, 3)
+    assert set(cells) == {(10, 1), (11, 1), (12, 1)}
+    assert cells[(10, 1)]["rowspan"] == 100
+    assert not cells[(10, 1)]["is_main"]
+
+
+def test_range_to_html_renders_merged_cells_and_styles(tmp_path) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    processor = ExcelProcessor(path).load()
+    try:
+        html = processor.range_to_html("A1:C4")
+    finally:
+        processor.close()
+
+    assert (
+        '<td colspan="3" style="text-align: center; font-weight: bold">'
+        "Load table</td>" in html
+    )
+    assert '<td rowspan="2" colspan="2" style=' in html
+    assert ">32</td>" in html
+    assert html.count("<tr>") == 4
+    assert html.count("<td") == 1 + 3 + 2 + 1
+
+
+def test_read_only_load_renders_same_values(tmp_path) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    full = ExcelProcessor(path).load()
+    streamed = ExcelProcessor(path).load(read_only=True)
+    try:
+        assert streamed.workbook.read_only
+        # 范围超出已写入的区域时，只读模式返回无坐标的空单元格
+        assert streamed.range_to_html(
+            "A1:D6", include_styles=False
+        ) == full.range_to_html("A1:D6", include_styles=False)
+        assert streamed.range_to_html("B2", include_styles=False) == (
+            full.range_to_html("B2", include_styles=False)
+        )
+    finally:
+        full.close()
+        streamed.close()
+
+
+def test_workbook_is_loaded_once_until_file_changes(tmp_path, monkeypatch) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    loads = []
+    load_workbook = openpyxl.load_workbook
+
+    def counting_load(*args, **kwargs):
+        loads.append(kwargs.get("read_only"))
+        return load_workbook(*args, **kwargs)
+
+    monkeypatch.setattr(openpyxl, "load_workbook", counting_load)
+
+    for _ in range(5):
+        processor = ExcelProcessor(path).load(sheet_name="Loads")
+        processor.range_to_html("A1:C5")
+        processor.close()
+    assert loads == [False]
+
+    _write_book(path, title="Changed")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    processor = ExcelProcessor(path).load()
+    try:
+        assert "Changed" in processor.range_to_html("A1:C1")
+    finally:
+        processor.close()
+    assert loads == [False, False]
+
+
+def test_read_only_workbooks_are_not_kept_open(tmp_path) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    processor = ExcelProcessor(path).load(read_only=True)
+    archive = processor.workbook._archive
+    assert "Load table" in processor.range_to_html("A1:C1", include_styles=False)
+    processor.close()
+
+    assert len(excel._WORKBOOK_CACHE) == 0
+    assert archive.fp is None
+
+
+def test_new_file_version_closes_stale_workbooks(tmp_path) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    ExcelProcessor(path).load().close()
+    assert len(excel._WORKBOOK_CACHE) == 1
+
+    _write_book(path, title="Changed")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    ExcelProcessor(path).load().close()
+    assert len(excel._WORKBOOK_CACHE) == 1
+
+
+def test_disabled_cache_closes_workbooks(tmp_path) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    excel.set_workbook_cache_size(0)
+    try:
+        processor = ExcelProcessor(path).load()
+        assert "Load table" in processor.range_to_html("A1:C1")
+        processor.close()
+        assert len(excel._WORKBOOK_CACHE) == 0
+    finally:
+        excel.set_workbook_cache_size(excel.DEFAULT_WORKBOOK_CACHE_SIZE)
+
+
+def test_get_excel_table_caches_html_per_file_version(tmp_path, monkeypatch) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    db = SqliteDB(str(tmp_path / "data" / "db.sqlite3"))
+    ctx = SimpleNamespace(get_json_db=lambda: db)
+    monkeypatch.setattr(excel, "get_current_instance", lambda: ctx)
+
+    html = get_excel_table(path, "Loads!A1:C5")
+    assert "Load table" in html
+    assert len(db) == 1
+    assert get_excel_table(path, "Loads!A1:C5") == html
+
+    plain = get_excel_table(path, "Loads!A1:C5", include_styles=False)
+    assert "style=" not in plain.replace('<table border="1" style=', "")
+    assert len(db) == 2
+
+    _write_book(path, title="Revised")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert "Revised" in get_excel_table(path, "Loads!A1:C5")
+    assert len(db) == 3
+    db.close()
+
+
+def test_get_excel_table_caches_html_per_engine(tmp_path, monkeypatch) -> None:
+    path = _write_book(tmp_path / "book.xlsx")
+    db = SqliteDB(str(tmp_path / "data" / "db.sqlite3"))
+    ctx = SimpleNamespace(get_json_db=lambda: db)
+    monkeypatch.setattr(excel, "get_current_instance", lambda: ctx)
+    excel_calls = []
+
+    def fake_excel(excel_path, values):
+        excel_calls.append(values)
+        return "recalculated by Excel"
+
+    monkeypatch.setattr(excel, "_recalculate_with_excel", fake_excel)
+
+    values = {"Loads!B2": 7}
+    html = get_excel_table(path, "Loads!A1:C5", values, engine="python")
+    assert ">7</td>" in html
+    # 进程内重算的结果不会被 Excel 引擎的调用复用
+    assert get_excel_table(path, "Loads!A1:C5", values, engine="excel") == (
+        "recalculated by Excel"
+    )
+    assert excel_calls == [values]
+    assert get_excel_table(path, "Loads!A1:C5", values, engine="python") == html
+    db.close()
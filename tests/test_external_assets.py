@@ -0,0 +1,145 @@
+"""Tests for writing embedded images as content-addressed external assets."""
+
+from __future__ import annotations
+
+import base64
+import threading
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from uzoncalc import cli
+from uzoncalc.assets import (
+    DirectoryAssetStore,
+    MemoryAssetStore,
+    asset_name,
+    externalize_data_urls,
+)
+from uzoncalc.context import CalcContext
+from uzoncalc.context_utils.elements import Plot
+from uzoncalc.globals import _calc_instance
+from uzoncalc.http_server import HtmlPreviewState, create_html_server
+
+PNG = b"\x89PNG\r\n\x1a\nfake-image"
+DATA_URL = "data:image/png;base64," + base64.b64encode(PNG).decode("ascii")
+
+
+class StubDocumentExporter:
+    """Capture exported documents without writing to the filesystem."""
+
+    def __init__(self) -> None:
+        self.exports: list[tuple[str, str]] = []
+
+    def export(self, html: str, path: str) -> None:
+        self.exports.append((html, path))
+
+
+def _context_with_plot(**options) -> tuple[CalcContext, StubDocumentExporter]:
+    exporter = StubDocumentExporter()
+    ctx = CalcContext(document_exporter=exporter)
+    for name, value in options.items():
+        setattr(ctx.options, name, value)
+    token = _calc_instance.set(ctx)
+    try:
+        Plot(PNG)
+        Plot(PNG)
+    finally:
+        _calc_instance.reset(token)
+    return ctx, exporter
+
+
+def test_externalize_data_urls_deduplicates_content() -> None:
+    stored: list[tuple[bytes, str]] = []
+
+    def put(data: bytes, extension: str) -> str:
+        stored.append((data, extension))
+        return f"assets/{len(stored)}.{extension}"
+
+    html = (
+        f'<img src="{DATA_URL}"><img src="{DATA_URL}">'
+        '<img src="data:image/png;base64,@@">'
+    )
+    assert externalize_data_urls(html, put) == (
+        '<img src="assets/1.png"><img src="assets/1.png">'
+        '<img src="data:image/png;base64,@@">'
+    )
+    assert stored == [(PNG, "png")]
+
+
+def test_save_writes_sidecar_assets(tmp_path) -> None:
+    ctx, exporter = _context_with_plot(asset_mode="external")
+    ctx.save(str(tmp_path / "report.html"))
+
+    html, _ = exporter.exports[0]
+    name = asset_name(PNG, "png")
+    assert "data:image/png" not in html
+    assert html.count(f'src="assets/{name}"') == 2
+    assert (tmp_path / "assets" / name).read_bytes() == PNG
+    assert [path.name for path in (tmp_path / "assets").iterdir()] == [name]
+
+
+def test_existing_assets_are_not_rewritten(tmp_path) -> None:
+    store = DirectoryAssetStore(tmp_path / "figures", "figures")
+    url = store.put(PNG, "png")
+    path = tmp_path / "figures" / asset_name(PNG, "png")
+    mtime = path.stat().st_mtime_ns
+
+    ctx, exporter = _context_with_plot(asset_mode="external", asset_dir="figures")
+    ctx.save(str(tmp_path / "report.html"))
+
+    assert f'src="{url}"' in exporter.exports[0][0]
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_inline_mode_keeps_data_urls(tmp_path) -> None:
+    ctx, exporter = _context_with_plot()
+    ctx.save(str(tmp_path / "report.html"))
+
+    assert exporter.exports[0][0].count(DATA_URL) == 2
+    assert not (tmp_path / "assets").exists()
+
+
+def test_cli_save_writes_assets_next_to_output(tmp_path) -> None:
+    ctx, _ = _context_with_plot(asset_mode="external")
+    html = cli._save_ctx(ctx, str(tmp_path / "out" / "report.html"), "calc.py")
+
+    name = asset_name(PNG, "png")
+    assert f'src="assets/{name}"' in html
+    assert (tmp_path / "out" / "assets" / name).read_bytes() == PNG
+
+
+def test_preview_server_serves_cacheable_assets() -> None:
+    assets = MemoryAssetStore()
+    html = externalize_data_urls(f'<img src="{DATA_URL}">', assets.put)
+    preview_state = HtmlPreviewState(html, assets)
+    server, port = create_html_server(preview_state, preferred_port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    url = f"http://127.0.0.1:{port}/assets/{asset_name(PNG, 'png')}"
+    try:
+        response = urlopen(url, timeout=3)
+        assert response.read() == PNG
+        assert response.headers["Content-Type"] == "image/png"
+        assert "immutable" in response.headers["Cache-Control"]
+
+        request = Request(url, headers={"If-None-Match": response.headers["ETag"]})
+        try:
+            urlopen(request, timeout=3)
+        except HTTPError as exc:
+            assert exc.code == 304
+        else:
+            raise AssertionError("matching ETag should return 304")
+
+        # 重新渲染后不再引用的资源被释放
+        preview_state.update_html("<html>new</html>")
+        assert len(assets) == 0
+        try:
+            urlopen(url, timeout=3)
+        except HTTPError as exc:
+            assert exc.code == 404
+        else:
+            raise AssertionError("released asset should return 404")
+    finally:
+        server.shutdown()
+        thread.join(timeout=3)
+        server.server_close()
@@ -0,0 +1,215 @@
+"""Tests for the figure cache and background figure export behind plot/Plot."""
+
+from __future__ import annotations
+
+import base64
+import threading
+import warnings
+
+import pytest
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+
+from matplotlib.figure import Figure  # noqa: E402
+
+from uzoncalc.cache.figure_cache import (  # noqa: E402
+    FIGURE_PLACEHOLDER_PREFIX,
+    clear_figure_cache,
+    figure_cache_info,
+    figure_key,
+    _shutdown_executors,
+    save_figure_png,
+    set_figure_cache_size,
+    submit_figure,
+)
+from uzoncalc.cache.sqlite_db import SqliteDB  # noqa: E402
+from uzoncalc.context import CalcContext  # noqa: E402
+from uzoncalc.context_utils.elements import Plot, plot  # noqa: E402
+from uzoncalc.globals import _calc_instance  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_figure_cache():
+    clear_figure_cache()
+    yield
+    clear_figure_cache()
+
+
+@pytest.fixture
+def context():
+    ctx = CalcContext()
+    token = _calc_instance.set(ctx)
+    yield ctx
+    _calc_instance.reset(token)
+    ctx.exit()
+
+
+def _figure(scale: float = 1.0, title: str = "Moment") -> Figure:
+    fig = Figure(figsize=(3, 2))
+    left, right = fig.subplots(1, 2)
+    left.plot([0, 1, 2], [0, scale, 0], label="M")
+    left.set_title(title)
+    left.legend()
+    image = right.imshow([[1, 2], [3, 4 * scale]])
+    fig.colorbar(image, ax=right)
+    return fig
+
+
+def _count_savefig(monkeypatch) -> list[Figure]:
+    calls: list[Figure] = []
+    savefig = Figure.savefig
+
+    def counting_savefig(self, *args, **kwargs):
+        calls.append(self)
+        return savefig(self, *args, **kwargs)
+
+    monkeypatch.setattr(Figure, "savefig", counting_savefig)
+    return calls
+
+
+def _png_in(html: str) -> bytes:
+    encoded = html.split("data:image/png;base64,", 1)[1].split('"', 1)[0]
+    return base64.b64decode(encoded)
+
+
+def test_figure_key_comes_only_from_cache_key() -> None:
+    class Savefig:
+        def savefig(self, buffer, *args, **kwargs):
+            buffer.write(b"png")
+
+    # 图形内容不参与键的推导
+    assert figure_key(_figure()) is None
+    assert figure_key(Savefig()) is None
+    assert figure_key(Savefig(), cache_key=("beam", 1)) == figure_key(
+        _figure(), cache_key=("beam", 1)
+    )
+    assert figure_key(_figure(), cache_key=("beam", 2)) != figure_key(
+        _figure(), cache_key=("beam", 1)
+    )
+    assert figure_key(Savefig(), cache_key=object()) is None
+
+
+def test_plot_reuses_cached_export(context, monkeypatch) -> None:
+    calls = _count_savefig(monkeypatch)
+
+    first = plot(_figure(), cache_key="moment")
+    second = plot(_figure(), cache_key="moment")
+    assert len(calls) == 1
+    assert first == second
+    assert figure_cache_info().hits == 1
+
+    plot(_figure(scale=3.0), cache_key="moment-3")
+    assert len(calls) == 2
+
+    context.options.figure_cache = "off"
+    plot(_figure(), cache_key="moment")
+    assert len(calls) == 3
+
+
+def test_figures_without_cache_key_are_exported_every_time(monkeypatch) -> None:
+    calls = _count_savefig(monkeypatch)
+    ctx = CalcContext()
+    assert ctx.options.figure_cache == "memory"
+    token = _calc_instance.set(ctx)
+    try:
+        first = plot(_figure())
+        second = plot(_figure(scale=2.0))
+    finally:
+        _calc_instance.reset(token)
+        ctx.exit()
+
+    assert len(calls) == 2
+    assert first != second
+    assert figure_cache_info().currbytes == 0
+
+
+def test_disabled_cache_size(context, monkeypatch) -> None:
+    calls = _count_savefig(monkeypatch)
+    set_figure_cache_size(0)
+    try:
+        plot(_figure(), cache_key="moment")
+        plot(_figure(), cache_key="moment")
+        assert len(calls) == 2
+        assert figure_cache_info().currbytes == 0
+    finally:
+        set_figure_cache_size(64 * 1024 * 1024)
+
+
+def test_persistent_cache_survives_process_cache(
+    context, tmp_path, monkeypatch
+) -> None:
+    db = SqliteDB(str(tmp_path / "data" / "db.sqlite3"))
+    context.json_db = db
+    context.options.figure_cache = "persistent"
+    calls = _count_savefig(monkeypatch)
+
+    html = plot(_figure(), cache_key="beam-diagram")
+    clear_figure_cache()
+    assert plot(_figure(scale=2.0), cache_key="beam-diagram") == html
+    assert len(calls) == 1
+    assert len(db) == 1
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_background_export_resolves_before_html(context, monkeypatch, mode) -> None:
+    context.options.figure_render_mode = mode
+    fig = _figure()
+    expected = save_figure_png(_figure())
+    clear_figure_cache()
+
+    placeholder = Plot(fig, caption="Bending moment", cache_key="moment")
+    assert 'data-uzoncalc-label-ref="figure-1"' in placeholder
+    assert context.pending_figures
+    # 导出的是调用时的快照
+    fig.axes[0].set_title("Changed")
+
+    html = context.html_content()
+    assert FIGURE_PLACEHOLDER_PREFIX not in html
+    assert _png_in(html) == expected
+    assert not context.pending_figures
+
+    # 后台导出的结果同样写入缓存
+    calls = _count_savefig(monkeypatch)
+    Plot(_figure(), cache_key="moment")
+    assert not calls
+    assert FIGURE_PLACEHOLDER_PREFIX not in context.contents[-1]
+
+
+def test_process_export_does_not_fork_threaded_process() -> None:
+    # 已有其它线程时 fork 会发出弃用警告（可能死锁），工作进程应以 spawn 启动
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            data = submit_figure(_figure(), "process").result()
+    finally:
+        stop.set()
+        thread.join()
+        _shutdown_executors()
+    assert data == save_figure_png(_figure())
+    assert not [w for w in caught if "fork" in str(w.message)]
+
+
+def test_captured_fragments_are_exported_synchronously(context) -> None:
+    context.options.figure_render_mode = "thread"
+    with context.capture_fragments() as fragments:
+        plot(_figure(), persist=True)
+
+    assert not context.pending_figures
+    assert FIGURE_PLACEHOLDER_PREFIX not in fragments[0][1]
+
+
+def test_headless_plot_skips_export(monkeypatch) -> None:
+    calls = _count_savefig(monkeypatch)
+    ctx = CalcContext(is_headless=True)
+    token = _calc_instance.set(ctx)
+    try:
+        placeholder = Plot(_figure())
+    finally:
+        _calc_instance.reset(token)
+
+    assert 'data-uzoncalc-label-ref="figure-1"' in placeholder
+    assert not calls
@@ -0,0 +1,84 @@
+"""Tests for the single-pass array styling and substitution of equations."""
+
+from __future__ import annotations
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from uzoncalc.handcalc import ir
+from uzoncalc.handcalc.rendering.equation_renderer import (
+    style_and_substitute_vars,
+    style_array_vars,
+    substitute_vars,
+)
+
+_LOCALS = {"a": 2, "b": [1, 2, 3], "i": 1, "s": "text"}
+
+_names = st.sampled_from(["a", "b", "i", "s", "z"])
+_leaves = st.one_of(
+    st.builds(ir.mi, _names),
+    st.builds(ir.mi_array, _names),
+    st.builds(ir.mn, st.sampled_from(["0", "1", "2.5"])),
+    st.builds(ir.mo, st.sampled_from(["+", ":", ","])),
+)
+_nodes = st.recursive(
+    _leaves,
+    lambda children: st.one_of(
+        st.builds(ir.mrow, st.lists(children, max_size=3)),
+        st.builds(ir.mcall, st.lists(children, min_size=1, max_size=3)),
+        st.builds(ir.mfrac, children, children),
+        st.builds(ir.msub, children, children),
+        st.builds(ir.mfenced, children),
+    ),
+    max_leaves=8,
+)
+
+
+@given(_nodes, st.booleans())
+def test_fused_pass_matches_separate_passes(node, resolve_subscript_values) -> None:
+    styled = style_array_vars(node, _LOCALS)
+    expected = substitute_vars(
+        styled, _LOCALS, resolve_subscript_values=resolve_subscript_values
+    )
+
+    fused_styled, fused_substituted = style_and_substitute_vars(
+        node, _LOCALS, resolve_subscript_values=resolve_subscript_values
+    )
+
+    assert fused_styled is styled
+    assert fused_substituted is expected
+
+
+def test_call_targets_and_subscript_bases_stay_symbolic() -> None:
+    node = ir.mrow(
+        [
+            ir.mcall([ir.mi("a"), ir.mi("a")]),
+            ir.msub(ir.mi("b"), ir.mi("z")),
+        ]
+    )
+
+    styled, substituted = style_and_substitute_vars(node, _LOCALS)
+
+    assert styled is ir.mrow(
+        [
+            ir.mcall([ir.mi("a"), ir.mi("a")]),
+            ir.msub(ir.mi_array("b"), ir.mi("z")),
+        ]
+    )
+    assert substituted is ir.mrow(
+        [
+            ir.mcall([ir.mi("a"), ir.mn(2)]),
+            ir.msub(ir.mi_array("b"), ir.mi("z")),
+        ]
+    )
+
+
+def test_node_layout_lists_child_fields_in_constructor_order() -> None:
+    layout = ir.node_layout(ir.MFenced)
+
+    assert layout.field_names == ("body", "open", "close")
+    assert layout.child_fields == (ir.ChildField(0, "body", False),)
+    assert ir.node_layout(ir.MRow).child_fields == (
+        ir.ChildField(0, "children", True),
+    )
+    assert ir.node_layout(ir.Mi).child_fields == ()
@@ -7,8 +7,14 @@ from pathlib import Path
 import numpy as np
 
 from uzoncalc import run_sync, unit, uzon_calc
+from uzoncalc.context import CalcContext
+from uzoncalc.globals import _calc_instance
 from uzoncalc.handcalc.ast_to_ir import expr_to_ir
-from uzoncalc.handcalc.rendering.value_renderer import value_to_ir
+from uzoncalc.handcalc.rendering.value_renderer import (
+    _format_array_numbers,
+    format_number,
+    value_to_ir,
+)
 
 MATHML_NAMESPACE = {"m": "http://www.w3.org/1998/Math/MathML"}
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -39,6 +45,18 @@ def _render_value_root(value):
     return ET.fromstring(value_to_ir(value).to_mathml_xml())
 
 
+def _render_value_xml_in_context(value, **options) -> str:
+    """Render a runtime value inside a context with the given options."""
+    context = CalcContext()
+    for name, option_value in options.items():
+        setattr(context.options, name, option_value)
+    token = _calc_instance.set(context)
+    try:
+        return value_to_ir(value).to_mathml_xml()
+    finally:
+        _calc_instance.reset(token)
+
+
 def _render_expression_root(expression: str):
     """Render a Python expression to a parsed MathML root."""
     expression_node = ast.parse(expression, mode="eval").body
@@ -116,6 +134,82 @@ def test_array_like_numeric_scalar_renders_number_node():
     assert root.find(".//m:mtext", MATHML_NAMESPACE) is None
 
 
+def test_numpy_arrays_render_like_equivalent_python_lists():
+    """numpy 数值数组与对应的 Python 列表渲染结果一致。"""
+    arrays = [
+        np.array([1, 2, 3]),
+        np.array([0.1 + 0.2, 2.0, -1.23456]),
+        np.array([[1.5, 2], [3, 4.25]]),
+        np.zeros((0,)),
+        np.zeros((0, 3)),
+        np.zeros((2, 0)),
+    ]
+    for array in arrays:
+        assert _render_value_xml_in_context(array) == _render_value_xml_in_context(
+            array.tolist()
+        )
+
+
+def test_vectorized_array_formatting_matches_scalar_format_number():
+    """向量化格式化与逐元素 format_number 的结果完全一致。"""
+    rng = np.random.default_rng(0)
+    values = np.concatenate(
+        [
+            rng.normal(0, 1e3, 2000),
+            rng.normal(0, 1e-6, 500),
+            np.arange(-40, 40) * 0.005,
+            [0.0, -0.0, -1e-4, 5e-13, -5e-13, 2.675, 1e300, np.nan, np.inf, -np.inf],
+        ]
+    )
+    for precision in (0, 2, 4, 15):
+        context = CalcContext()
+        context.options.float_precision = precision
+        token = _calc_instance.set(context)
+        try:
+            texts = _format_array_numbers(values)
+            expected = [format_number(value) for value in values.tolist()]
+        finally:
+            _calc_instance.reset(token)
+        assert texts == expected
+
+
+def test_large_one_dimensional_arrays_are_elided():
+    """超过阈值的数组只显示首尾元素。"""
+    for value in (np.arange(10_000), list(range(10_000))):
+        root = ET.fromstring(
+            _render_value_xml_in_context(value, array_threshold=100, array_edge_items=2)
+        )
+
+        numbers = [node.text for node in root.findall(".//m:mn", MATHML_NAMESPACE)]
+        symbols = [node.text for node in root.findall(".//m:mo", MATHML_NAMESPACE)]
+        assert numbers == ["0", "1", "9998", "9999"]
+        assert symbols.count("\u22ef") == 1
+
+
+def test_large_matrices_are_elided_on_both_axes():
+    """大矩阵按行列分别省略，并用省略号行列占位。"""
+    value = np.arange(200 * 50, dtype=float).reshape(200, 50) / 4
+    root = ET.fromstring(
+        _render_value_xml_in_context(value, array_threshold=100, array_edge_items=1)
+    )
+
+    rows = _find_matrix(root).findall("m:mtr", MATHML_NAMESPACE)
+    texts = [[cell.findtext(".//*") for cell in row] for row in rows]
+    assert texts == [
+        ["0", "\u22ef", "12.25"],
+        ["\u22ee", "\u22f1", "\u22ee"],
+        ["2487.5", "\u22ef", "2499.75"],
+    ]
+
+
+def test_array_threshold_none_disables_elision():
+    """阈值为 None 时始终完整显示。"""
+    xml = _render_value_xml_in_context(np.arange(2000), array_threshold=None)
+
+    assert "\u22ef" not in xml
+    assert xml.count("<mn>") == 2000
+
+
 def test_three_dimensional_array_renders_outer_array_with_matrix_slices():
     """三维数组保留外层数组结构，并将二维切片显示为矩阵。"""
     root = _render_value_root([[[1, 2], [3, 4]], [[5, 6], [7, 8]]])
@@ -0,0 +1,115 @@
+"""Tests for headless, values-only execution."""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+
+import pytest
+
+from uzoncalc import UI, Field, FieldType, hide, run, run_sync, run_values, show
+from uzoncalc import uzon_calc, uzon_calc_func
+from uzoncalc.handcalc import recorder
+from uzoncalc.handcalc.headless import assigned_names
+
+
+@uzon_calc_func
+def _section_area(width, height):
+    area = width * height
+    return area
+
+
+@uzon_calc()
+async def beam_sheet():
+    """Beam check"""
+    inputs = await UI(
+        "Beam",
+        [
+            Field(name="span", label="Span", type=FieldType.number, value=6.0),
+            Field(name="load", label="Load", type=FieldType.number, value=10.0),
+        ],
+    )
+    L = inputs.span
+    q = inputs.load
+    M = q * L**2 / 8
+    f"M = {M}"
+    A = _section_area(0.3, 0.5)
+    for index in range(3):
+        step_sum = index * 2
+    hide()
+    hidden = M / A
+    show()
+    if (ratio := M / 100) > 0.1:
+        status = "check"
+    return M
+
+
+@uzon_calc()
+async def failing_sheet():
+    first = 1
+    raise ValueError("boom")
+
+
+def test_run_values_returns_assignments_and_inputs() -> None:
+    result = run_values(beam_sheet)
+
+    values = result["values"]
+    assert values["M"] == pytest.approx(45.0)
+    assert values["A"] == pytest.approx(0.15)
+    assert values["hidden"] == pytest.approx(300.0)
+    assert values["ratio"] == pytest.approx(0.45)
+    assert values["status"] == "check"
+    assert values["step_sum"] == 4
+    assert "area" not in values
+    assert result["inputs"] == {"Beam": {"span": 6.0, "load": 10.0}}
+
+
+def test_run_values_matches_recorded_run() -> None:
+    defaults = {"Beam": {"span": 4.0, "load": 5.0}}
+    result = run_values(beam_sheet, defaults=defaults)
+
+    assert result["values"]["M"] == pytest.approx(10.0)
+    assert result["inputs"] == {"Beam": {"span": 4.0, "load": 5.0}}
+    assert run_sync(beam_sheet, defaults=defaults).contents != []
+
+
+def test_headless_run_records_nothing(monkeypatch) -> None:
+    calls: list[object] = []
+    monkeypatch.setattr(
+        recorder,
+        "capture_locals",
+        lambda *args: calls.append(args) or {},
+    )
+
+    ctx = asyncio.run(run(beam_sheet, is_headless=True))
+
+    assert ctx.is_headless
+    assert ctx.contents == []
+    assert calls == []
+
+
+def test_values_are_captured_when_the_sheet_raises() -> None:
+    ctx_holder = []
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            run(failing_sheet, is_headless=True, ctx_hook_created=ctx_holder.append)
+        )
+
+    assert ctx_holder[0].values()["values"] == {"first": 1}
+
+
+def test_assigned_names_skip_nested_scopes() -> None:
+    body = ast.parse(
+        "a = 1\n"
+        "b, (c, d) = 1, (2, 3)\n"
+        "e += 1\n"
+        "f: int\n"
+        "g: int = 2\n"
+        "def inner():\n    h = 1\n"
+        "items = [i for i in range(3)]\n"
+        "__uzon_loop_0__ = None\n"
+        "a = 2\n"
+    ).body
+
+    assert assigned_names(body) == ("a", "b", "c", "d", "e", "g", "items")
@@ -0,0 +1,118 @@
+"""Tests for the opt-in module-level instrumentation import hook."""
+
+import importlib
+import sys
+import textwrap
+import traceback
+
+import pytest
+
+from uzoncalc import cli, run_sync
+from uzoncalc.handcalc import ast_instrument, import_hook
+from uzoncalc.handcalc.field_names import FieldNames
+
+_HELPERS_SOURCE = textwrap.dedent(
+    """
+    from uzoncalc import uzon_calc_func
+
+
+    @uzon_calc_func
+    def area(width, height):
+        result = width * height
+        return result
+
+
+    @uzon_calc_func
+    def fail():
+        value = 1
+        raise ValueError("boom")
+    """
+)
+
+_SCRIPT_SOURCE = textwrap.dedent(
+    """
+    from uzoncalc import uzon_calc
+    from hooked_helpers import area
+
+
+    @uzon_calc()
+    async def sheet():
+        width = 2
+        total = area(width, 3)
+    """
+)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    (tmp_path / "hooked_helpers.py").write_text(_HELPERS_SOURCE, encoding="utf-8")
+    script = tmp_path / "hooked_script.py"
+    script.write_text(_SCRIPT_SOURCE, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield script
+    sys.modules.pop("hooked_helpers", None)
+
+
+def _fail_runtime_instrumentation(monkeypatch) -> None:
+    def fail_compile(func, *args, **kwargs):
+        raise AssertionError(f"{func.__name__} was instrumented at runtime")
+
+    monkeypatch.setattr(ast_instrument, "_compile_instrumented", fail_compile)
+
+
+def test_cli_import_hook_instruments_script_and_helpers(workspace, monkeypatch):
+    monkeypatch.setenv(import_hook.IMPORT_HOOK_ENV, "1")
+    _fail_runtime_instrumentation(monkeypatch)
+    meta_path = list(sys.meta_path)
+
+    module = cli._load_module_from_path(str(workspace))
+    ctx = run_sync(module.sheet)
+
+    assert sys.meta_path == meta_path
+    assert any('italic">result</mi>' in line for line in ctx.contents)
+    assert any('italic">total</mi>' in line for line in ctx.contents)
+
+
+def test_import_hook_output_matches_runtime_instrumentation(workspace, monkeypatch):
+    expected = run_sync(cli._load_module_from_path(str(workspace)).sheet).contents
+    sys.modules.pop("hooked_helpers", None)
+
+    monkeypatch.setenv(import_hook.IMPORT_HOOK_ENV, "1")
+    hooked = run_sync(cli._load_module_from_path(str(workspace)).sheet).contents
+
+    assert hooked == expected
+
+
+def test_import_hook_keeps_original_line_numbers(workspace, tmp_path):
+    finder = import_hook.install_import_hook([str(tmp_path)])
+    try:
+        helpers = importlib.import_module("hooked_helpers")
+    finally:
+        import_hook.uninstall_import_hook(finder)
+
+    assert isinstance(helpers.__loader__, import_hook.InstrumentingLoader)
+    assert getattr(helpers.area.__wrapped__, FieldNames.uzon_instrumented)
+
+    with pytest.raises(ValueError) as exc_info:
+        helpers.fail()
+    raise_line = _HELPERS_SOURCE.splitlines().index('    raise ValueError("boom")')
+    assert traceback.extract_tb(exc_info.tb)[-1].lineno == raise_line + 1
+
+
+def test_import_hook_ignores_modules_outside_roots(workspace, tmp_path):
+    finder = import_hook.install_import_hook([str(tmp_path / "elsewhere")])
+    try:
+        helpers = importlib.import_module("hooked_helpers")
+    finally:
+        import_hook.uninstall_import_hook(finder)
+
+    assert not isinstance(helpers.__loader__, import_hook.InstrumentingLoader)
+
+
+def test_modules_without_calc_functions_compile_unchanged():
+    code = import_hook.compile_instrumented_module(b"x = 1\n", "plain.py")
+
+    namespace: dict = {}
+    exec(code, namespace)
+    assert namespace["x"] == 1
+    assert "__uzon_record_step__" not in code.co_names
@@ -0,0 +1,76 @@
+"""Tests for hash-consed IR nodes built through the ``ir`` factories."""
+
+from uzoncalc.handcalc import ir
+from uzoncalc.handcalc.rendering.equation_renderer import build_equation_parts
+from uzoncalc.handcalc.transformers import transform_ir
+
+
+def _formula() -> ir.MathNode:
+    return ir.mfrac(
+        ir.mrow([ir.mi("a"), ir.mo("+"), ir.mi("b")]),
+        ir.msup(ir.mi("c"), ir.mn(2)),
+    )
+
+
+def test_structurally_equal_factory_nodes_are_the_same_object() -> None:
+    assert ir.mi("a") is ir.mi("a")
+    assert ir.mn(2) is ir.mn("2")
+    assert _formula() is _formula()
+    assert ir.mfenced(ir.mi("a"), open="[", close="]") is not ir.mfenced(ir.mi("a"))
+
+
+def test_leaf_classes_with_the_same_payload_stay_distinct() -> None:
+    assert ir.mi("x") is not ir.mi_array("x")
+    assert ir.mi("x") is not ir.mtext("x")
+
+
+def test_factories_copy_the_children_list() -> None:
+    children = [ir.mi("a"), ir.mo("+")]
+    row = ir.mrow(children)
+    children.append(ir.mi("b"))
+
+    assert row.children == [ir.mi("a"), ir.mo("+")]
+    assert ir.mrow([ir.mi("a"), ir.mo("+"), ir.mi("b")]) is not row
+
+
+def test_transform_ir_returns_interned_nodes() -> None:
+    formula = _formula()
+
+    def swap(node: ir.MathNode) -> ir.MathNode | None:
+        if isinstance(node, ir.Mi) and node.name == "a":
+            return ir.mn(1)
+        return None
+
+    expected = ir.mfrac(
+        ir.mrow([ir.mn(1), ir.mo("+"), ir.mi("b")]),
+        ir.msup(ir.mi("c"), ir.mn(2)),
+    )
+    result = transform_ir(formula, swap)
+    assert result is expected
+    # 未变化的子树原样复用
+    assert result.denominator is formula.denominator
+    assert transform_ir(formula, lambda _node: None) is formula
+
+
+def test_build_equation_parts_deduplicates_by_identity() -> None:
+    expr = ir.mrow([ir.mi("x"), ir.mo("+"), ir.mn(1)])
+
+    parts = build_equation_parts(expr, {"x": 2}, 3)
+
+    assert parts[0] is expr
+    assert parts[1] is ir.mrow([ir.mn(2), ir.mo("+"), ir.mn(1)])
+    assert len(parts) == 3
+
+    # 没有变量时替换结果与原式相同，不重复输出
+    constant = ir.mrow([ir.mn(2), ir.mo("+"), ir.mn(1)])
+    assert build_equation_parts(constant, {}, 3)[:2] == [constant, ir.mn(3)]
+
+
+def test_equal_formulas_share_mathml_fragment_cache_entries() -> None:
+    ir.clear_mathml_cache()
+    _formula().to_mathml_xml()
+    hits = ir.mathml_cache_info().hits
+
+    ir.equation([ir.mi("y"), _formula()]).to_mathml_xml()
+
+    assert ir.mathml_cache_info().hits == hits + 1
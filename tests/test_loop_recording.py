@@ -0,0 +1,88 @@
+"""Tests for opt-in loop recording policies."""
+
+from uzoncalc import loop_record, run_sync, uzon_calc
+from uzoncalc.context_options import LoopRecordPolicy
+from uzoncalc.handcalc.ast_instrument import instrument_function
+
+
+def _recorded_values(ctx, name: str) -> list[str]:
+    """返回以 ``name`` 为左值的方程行。"""
+    marker = f'italic">{name}</mi>'
+    return [
+        line
+        for line in ctx.contents
+        if marker in line and line.index(marker) < line.index("<mo>=</mo>")
+    ]
+
+
+@uzon_calc()
+async def _default_loop_sheet():
+    total = 0
+    for i in range(5):
+        total = total + i
+
+
+def test_loops_record_every_iteration_by_default() -> None:
+    ctx = run_sync(_default_loop_sheet)
+
+    # total = 0 与 5 次迭代
+    assert len(_recorded_values(ctx, "total")) == 6
+
+
+@uzon_calc()
+async def _limited_loop_sheet():
+    total = 0
+    with loop_record(first=2, last=True):
+        for i in range(10):
+            total = total + i
+    result = total
+
+
+def test_loop_record_limits_recorded_iterations() -> None:
+    ctx = run_sync(_limited_loop_sheet)
+
+    lines = _recorded_values(ctx, "total")
+    # total = 0, 迭代 0、1 与最后一次迭代
+    assert len(lines) == 4
+    assert "<mn>45</mn>" in lines[-1]
+    result_line = _recorded_values(ctx, "result")[0]
+    assert "<mn>45</mn>" in result_line
+    assert ctx.options.loop_record is None
+
+
+@uzon_calc()
+async def _while_loop_sheet():
+    count = 0
+    with loop_record(first=1, every=3):
+        while count < 7:
+            count = count + 1
+
+
+def test_loop_record_applies_to_while_loops() -> None:
+    ctx = run_sync(_while_loop_sheet)
+
+    # count = 0, 以及第 0、3、6 次迭代
+    lines = _recorded_values(ctx, "count")
+    assert len(lines) == 4
+    assert "<mn>7</mn>" in lines[-1]
+
+
+def test_loop_record_policy_selection() -> None:
+    policy = LoopRecordPolicy(first=2, every=4, last=True)
+
+    selected = [i for i in range(10) if policy.should_record(i, 10)]
+    assert selected == [0, 1, 4, 8, 9]
+    assert not policy.should_record(9, None)
+
+
+async def _plain_loop():
+    values = []
+    for i in range(3):
+        values.append(i)
+    return values
+
+
+def test_loops_without_recorded_steps_are_not_wrapped() -> None:
+    instrumented = instrument_function(_plain_loop)
+
+    assert "advance" not in instrumented.__code__.co_names
@@ -0,0 +1,71 @@
+"""Tests for the shared bounded LRU cache behind the process-wide caches."""
+
+from __future__ import annotations
+
+import threading
+
+from uzoncalc.cache.lru import BoundedLRUCache
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache: BoundedLRUCache[str, int] = BoundedLRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (3, 1, 1)
+    assert stats.currsize == 2
+
+
+def test_weighted_entries_are_bounded_by_total_weight() -> None:
+    cache: BoundedLRUCache[str, bytes] = BoundedLRUCache(10, weigh=len)
+    assert cache.put("a", b"12345")
+    assert cache.put("b", b"1234")
+    assert not cache.put("huge", b"x" * 11)
+    cache.put("c", b"123")
+
+    assert cache.get("a") is None
+    assert cache.stats().weight == 7
+
+    cache.resize(0)
+    assert len(cache) == 0
+    assert not cache.put("a", b"1")
+
+
+def test_removed_entries_are_released() -> None:
+    released: list[tuple[str, int]] = []
+    cache: BoundedLRUCache[str, int] = BoundedLRUCache(
+        2, on_evict=lambda key, value: released.append((key, value))
+    )
+    cache.put("a", 1)
+    cache.put("a", 2)
+    cache.put("b", 3)
+    cache.put("c", 4)
+    cache.remove_if(lambda key: key == "c")
+    cache.clear()
+
+    assert released == [("a", 1), ("a", 2), ("c", 4), ("b", 3)]
+    assert cache.stats().hits == 0
+
+
+def test_concurrent_hits_are_all_counted() -> None:
+    cache: BoundedLRUCache[int, int] = BoundedLRUCache(8)
+    for key in range(8):
+        cache.put(key, key)
+
+    def hit() -> None:
+        for _ in range(2000):
+            for key in range(8):
+                cache.get(key)
+
+    threads = [threading.Thread(target=hit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats().hits == 4 * 2000 * 8
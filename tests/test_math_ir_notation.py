@@ -0,0 +1,200 @@
+"""Tests for IR-level post-processing of equation steps."""
+
+from __future__ import annotations
+
+import pytest
+
+from uzoncalc import context as context_module
+from uzoncalc.context import CalcContext
+from uzoncalc.globals import _calc_instance
+from uzoncalc.handcalc import ir
+from uzoncalc.handcalc.post_handlers.base_post_handler import BasePostHandler
+from uzoncalc.handcalc.post_handlers.dom_utils import (
+    parse_html_fragment,
+    serialize_html_fragment,
+)
+from uzoncalc.handcalc.post_handlers.math_notation import notate_equation_parts
+from uzoncalc.handcalc.post_handlers.output_cache import clear_post_process_cache
+from uzoncalc.handcalc.steps import EquationStep, ExprStep
+
+
+@pytest.fixture
+def ctx():
+    clear_post_process_cache()
+    calc = CalcContext()
+    token = _calc_instance.set(calc)
+    yield calc
+    _calc_instance.reset(token)
+
+
+@pytest.fixture
+def parse_calls(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    parse = context_module.parse_html_fragment
+
+    def counting_parse(content: str):
+        calls.append(content)
+        return parse(content)
+
+    monkeypatch.setattr(context_module, "parse_html_fragment", counting_parse)
+    return calls
+
+
+def _normalize(content: str) -> str:
+    return serialize_html_fragment(parse_html_fragment(content))
+
+
+def _dom_processed(parts: list[ir.MathNode], ctx: CalcContext) -> str:
+    return ctx._post_process_content(f"<p>{ir.equation(parts).to_mathml_xml()}</p>")
+
+
+_NAMES = [
+    "alpha",
+    "sigma_x",
+    "x_i^2",
+    "a_1^b_2",
+    "E_{n+1}",
+    "a_b_c",
+    "\\beta_1",
+    "x\\_1",
+    "stress",
+    "Alpha_{i,j}",
+    "x_",
+    "a<=b",
+]
+
+
+@pytest.mark.parametrize("name", _NAMES)
+@pytest.mark.parametrize(
+    "build",
+    [ir.mi, ir.mi_array, ir.mtext, ir.mfunction_name, ir.mo],
+    ids=["mi", "mi_array", "mtext", "function", "mo"],
+)
+def test_notation_matches_dom_post_processing(ctx, name, build) -> None:
+    ctx.options.aliases["stress"] = "sigma_y"
+    ctx.options.enable_post_process_cache = False
+    parts = [
+        build(name),
+        ir.msup(ir.mi(name), ir.mn(2)),
+        ir.mfrac(ir.mrow([ir.mi(name), ir.mo("+"), ir.mn(1)]), ir.mi("A_s")),
+    ]
+
+    notated = notate_equation_parts(parts, ctx)
+
+    assert notated is not None
+    assert _normalize(
+        f"<p>{ir.equation(notated).to_mathml_xml()}</p>"
+    ) == _normalize(_dom_processed(parts, ctx))
+
+
+def _recorded_contents(in_ir: bool, record) -> list[str]:
+    clear_post_process_cache()
+    calc = CalcContext()
+    calc.options.post_process_math_in_ir = in_ir
+    calc.options.aliases["stress"] = "sigma_y"
+    token = _calc_instance.set(calc)
+    try:
+        record(calc)
+        return list(calc.contents)
+    finally:
+        _calc_instance.reset(token)
+
+
+_EQUATIONS = {
+    "aliased": lambda calc: EquationStep(
+        ir.mi("stress"), ir.mfrac(ir.mi("N_Ed"), ir.mi("A_s"))
+    ).record(calc, locals_map={"N_Ed": 6.0, "A_s": 3.0}, value=2.0),
+    "symbol": lambda calc: ExprStep(ir.mi("\\beta_1")).record(
+        calc, locals_map={"\\beta_1": 1.5}, value=1.5
+    ),
+    "script": lambda calc: EquationStep(
+        ir.mi("x_i^2"), ir.msup(ir.mi("alpha"), ir.mn(2))
+    ).record(calc, locals_map={"alpha": 2}, value=4),
+    "empty": lambda calc: EquationStep(
+        ir.mtext(""), ir.mrow([ir.mo(""), ir.mi("a_1")])
+    ).record(calc, locals_map={}, value=None),
+}
+
+
+@pytest.mark.parametrize("record", _EQUATIONS.values(), ids=_EQUATIONS.keys())
+def test_ir_and_dom_paths_produce_identical_html(record) -> None:
+    from_ir = _recorded_contents(True, record)
+    from_dom = _recorded_contents(False, record)
+
+    assert from_ir == from_dom
+    assert " />" not in from_ir[0]
+
+
+def test_script_notation_base_is_an_atom_in_powers() -> None:
+    base = ir.mscript([ir.mi("x"), ir.mtext("1")], "msub")
+
+    assert ir.msup(base, ir.mn(2)).to_mathml_xml() == (
+        '<math xmlns="http://www.w3.org/1998/Math/MathML"><mrow><msup><mrow>'
+        '<msub><mi mathvariant="italic">x</mi><mtext>1</mtext></msub></mrow>'
+        '<mrow><mspace width="0.2em" /><mn>2</mn></mrow></msup></mrow></math>'
+    )
+
+
+def test_equation_steps_skip_dom_post_processing(ctx, parse_calls) -> None:
+    step = EquationStep(ir.mi("sigma_x"), ir.mfrac(ir.mi("N_Ed"), ir.mi("A_s")))
+    step.record(ctx, locals_map={"N_Ed": 6.0, "A_s": 3.0}, value=2.0)
+    ExprStep(ir.mi("alpha_1")).record(ctx, locals_map={"alpha_1": 1.5}, value=1.5)
+
+    assert parse_calls == []
+    assert "<msub><mi mathvariant=\"italic\">σ</mi><mtext>x</mtext></msub>" in (
+        ctx.contents[0]
+    )
+    assert "<msub><mi mathvariant=\"italic\">α</mi><mtext>1</mtext></msub>" in (
+        ctx.contents[1]
+    )
+
+
+def test_deferred_equation_steps_skip_dom_post_processing(ctx, parse_calls) -> None:
+    ctx.options.defer_rendering = True
+    ExprStep(ir.mi("beta_2")).record(ctx, locals_map={"beta_2": 4}, value=4)
+
+    contents = ctx.contents
+
+    assert parse_calls == []
+    assert "<mtext>2</mtext>" in contents[0]
+
+
+def test_alias_changes_are_applied_per_step(ctx) -> None:
+    step = ExprStep(ir.mi("stress"))
+    ctx.options.aliases["stress"] = "sigma"
+    step.record(ctx, locals_map={"stress": 1}, value=1)
+    ctx.options.aliases["stress"] = "tau"
+    step.record(ctx, locals_map={"stress": 1}, value=1)
+
+    assert ">σ</mi>" in ctx.contents[0]
+    assert ">τ</mi>" in ctx.contents[1]
+
+
+class _TaggingHandler(BasePostHandler):
+    """Custom handler without an IR-level implementation."""
+
+    def handle(self, post_node, ctx=None) -> None:
+        if post_node.tag_name == "p":
+            post_node.node.set("class", "tagged")
+
+
+def test_handler_without_ir_support_falls_back_to_dom(ctx) -> None:
+    ctx.options.post_handlers = [*ctx.options.post_handlers, _TaggingHandler()]
+    ExprStep(ir.mi("x_1")).record(ctx, locals_map={"x_1": 1}, value=1)
+
+    assert ctx.contents[0].startswith('<p class="tagged">')
+    assert "<msub>" in ctx.contents[0]
+
+
+def test_urls_in_equations_fall_back_to_dom(ctx) -> None:
+    parts = [ir.mi("link"), ir.mtext("https://example.com")]
+
+    assert notate_equation_parts(parts, ctx) is None
+
+
+def test_ir_post_processing_can_be_disabled(ctx, parse_calls) -> None:
+    ctx.options.post_process_math_in_ir = False
+    ExprStep(ir.mi("x_1")).record(ctx, locals_map={"x_1": 1}, value=1)
+
+    assert len(parse_calls) == 1
+    assert "<msub>" in ctx.contents[0]
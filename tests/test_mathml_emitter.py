@@ -0,0 +1,85 @@
+"""Tests for the direct string MathML emitter of the IR."""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from uzoncalc.handcalc import ir
+
+_texts = st.text(alphabet='ab&<>"\n\t=(', max_size=4)
+_leaves = st.one_of(
+    st.builds(ir.mi, _texts),
+    st.builds(ir.mi_array, _texts),
+    st.builds(ir.mn, _texts),
+    st.builds(ir.mo, _texts),
+    st.builds(ir.mu, _texts),
+    st.builds(ir.mfunction_name, _texts),
+)
+_nodes = st.recursive(
+    _leaves,
+    lambda children: st.one_of(
+        st.builds(ir.mrow, st.lists(children, max_size=3)),
+        st.builds(ir.mrow_array, st.lists(children, max_size=3)),
+        st.builds(ir.mfrac, children, children),
+        st.builds(ir.msup, children, children),
+        st.builds(ir.msub, children, children),
+        st.builds(ir.msqrt, children),
+        st.builds(ir.mfenced, children, open=_texts, close=_texts),
+    ),
+    max_leaves=8,
+)
+
+
+def _canonical(xml: str) -> str:
+    """Round-trip through ElementTree, which defines the expected byte layout."""
+    ET.register_namespace("", ir.MathNode._MATHML_NS)
+    element = ET.fromstring(xml)
+    for node in element.iter():
+        node.tag = node.tag.split("}")[-1]
+    element.set("xmlns", ir.MathNode._MATHML_NS)
+    return ET.tostring(element, encoding="unicode", method="xml")
+
+
+@given(_nodes)
+def test_emitter_output_matches_element_tree_serialization(node) -> None:
+    rendered = node.to_mathml_xml()
+
+    assert rendered == _canonical(rendered)
+    assert ir.equation([node, node]).to_mathml_xml() == _canonical(
+        ir.equation([node, node]).to_mathml_xml()
+    )
+
+
+def test_leaf_escaping_and_empty_elements() -> None:
+    assert ir.mi("a<b").to_mathml_xml() == (
+        '<math xmlns="http://www.w3.org/1998/Math/MathML">'
+        '<mrow><mi mathvariant="italic">a&lt;b</mi></mrow></math>'
+    )
+    assert ir.mn("").to_mathml_xml() == (
+        '<math xmlns="http://www.w3.org/1998/Math/MathML"><mrow><mn /></mrow></math>'
+    )
+    assert ir.mfenced(ir.mi("x"), open='"').to_mathml_xml() == (
+        '<math xmlns="http://www.w3.org/1998/Math/MathML"><mrow><mfenced open="&quot;"'
+        ' close=")"><mrow><mi mathvariant="italic">x</mi></mrow></mfenced></mrow>'
+        "</math>"
+    )
+
+
+def test_power_spacing_is_inserted_into_row_exponents() -> None:
+    node = ir.msup(ir.mi("x"), ir.mrow_array([ir.mn("2")]))
+
+    assert node.to_mathml_xml() == (
+        '<math xmlns="http://www.w3.org/1998/Math/MathML"><mrow><msup><mrow>'
+        '<mi mathvariant="italic">x</mi></mrow><mrow class="array-value">'
+        '<mspace width="0.2em" /><mn>2</mn></mrow></msup></mrow></math>'
+    )
+
+
+def test_to_mathml_element_parses_emitted_markup() -> None:
+    element = ir.mfrac(ir.mi("a"), ir.mn("2")).to_mathml_element()
+
+    assert element.tag == "mfrac"
+    assert [child.tag for child in element] == ["mrow", "mrow"]
@@ -0,0 +1,57 @@
+"""Tests for the LRU cache of serialized MathML subtrees."""
+
+import pytest
+
+from uzoncalc.handcalc import ir
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    maxsize = ir.mathml_cache_info().maxsize
+    ir.clear_mathml_cache()
+    yield
+    ir.set_mathml_cache_size(maxsize)
+    ir.clear_mathml_cache()
+
+
+def _formula() -> ir.MathNode:
+    return ir.mfrac(
+        ir.mrow([ir.mi("a"), ir.mo("+"), ir.mi("b")]),
+        ir.msup(ir.mi("c"), ir.mn("2")),
+    )
+
+
+def test_repeated_subtrees_are_served_from_cache() -> None:
+    formula = _formula()
+    first = ir.equation([ir.mi("x"), formula]).to_mathml_xml()
+    misses = ir.mathml_cache_info().misses
+
+    second = ir.equation([ir.mi("y"), formula]).to_mathml_xml()
+
+    info = ir.mathml_cache_info()
+    assert second == first.replace(">x<", ">y<")
+    assert info.misses == misses
+    assert info.hits == 1
+
+
+def test_cached_output_matches_uncached_output() -> None:
+    formula = _formula()
+    cached = [formula.to_mathml_xml() for _ in range(3)]
+
+    ir.set_mathml_cache_size(0)
+    uncached = formula.to_mathml_xml()
+
+    assert cached == [uncached] * 3
+    assert ir.mathml_cache_info().currsize == 0
+
+
+def test_cache_size_is_bounded() -> None:
+    ir.set_mathml_cache_size(2)
+
+    nodes = [ir.mrow([ir.mn(i)]) for i in range(5)]
+    for node in nodes:
+        node.to_mathml_xml()
+
+    info = ir.mathml_cache_info()
+    assert info.currsize == 2
+    assert info.evictions == 3
@@ -0,0 +1,127 @@
+"""Tests for the persistent on-disk cache of instrumented code objects."""
+
+import pytest
+
+from uzoncalc import run_sync, uzon_calc
+from uzoncalc.handcalc import ast_instrument
+from uzoncalc.handcalc.call_filters import (
+    CallFilterRegistry,
+    get_call_filter_registry,
+)
+from uzoncalc.handcalc.code_cache import (
+    CACHE_DIR_ENV,
+    CACHE_ENABLED_ENV,
+    PersistentCodeCache,
+)
+from uzoncalc.handcalc.field_names import FieldNames
+from uzoncalc.handcalc.instrument_cache import InstrumentCache
+
+
+def _fresh_memory_cache(monkeypatch) -> None:
+    """Swap in an empty in-memory cache; the original is restored afterwards."""
+    monkeypatch.setattr(InstrumentCache, "_instance", InstrumentCache())
+
+
+@pytest.fixture
+def code_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    # 测试会话默认禁用持久化缓存，见 conftest.py
+    monkeypatch.setenv(CACHE_ENABLED_ENV, "1")
+    monkeypatch.setattr(PersistentCodeCache, "_instance", PersistentCodeCache())
+    _fresh_memory_cache(monkeypatch)
+    return PersistentCodeCache.get_instance()
+
+
+async def _cached_sheet():
+    width = 2
+    area = width * 3
+
+
+@uzon_calc()
+async def _cached_calc():
+    width = 2
+    area = width * 3
+
+
+def test_second_instrumentation_loads_code_from_disk(code_cache, monkeypatch) -> None:
+    first = ast_instrument.instrument_function(_cached_sheet)
+    assert list(code_cache.directory.iterdir())
+
+    _fresh_memory_cache(monkeypatch)
+
+    def fail_compile(*args, **kwargs):
+        raise AssertionError("expected a persistent cache hit")
+
+    monkeypatch.setattr(ast_instrument, "_compile_instrumented", fail_compile)
+    second = ast_instrument.instrument_function(_cached_sheet)
+
+    assert second is not first
+    assert second.__code__.co_code == first.__code__.co_code
+    assert (
+        second.__globals__[FieldNames.uzon_step_pool]
+        == first.__globals__[FieldNames.uzon_step_pool]
+    )
+
+
+def test_cached_code_renders_same_content(code_cache, monkeypatch) -> None:
+    expected = run_sync(_cached_calc).contents
+
+    _fresh_memory_cache(monkeypatch)
+    assert run_sync(_cached_calc).contents == expected
+
+
+def test_cache_key_tracks_call_filters(code_cache) -> None:
+    key_args = dict(source="x = 1", qualname="f", filename="f.py", first_lineno=1)
+    before = code_cache.make_key(**key_args)
+
+    registry = get_call_filter_registry()
+    registry.register_simple("_cache_key_probe")
+    try:
+        assert code_cache.make_key(**key_args) != before
+    finally:
+        registry.unregister_simple("_cache_key_probe")
+    assert code_cache.make_key(**key_args) == before
+
+
+def test_advanced_filter_fingerprint_tracks_code() -> None:
+    def fingerprint(filter_func) -> str:
+        registry = CallFilterRegistry()
+        registry.register_advanced(filter_func)
+        return registry.fingerprint()
+
+    hides_ui = fingerprint(lambda call: getattr(call.func, "id", None) == "ui")
+    hides_log = fingerprint(lambda call: getattr(call.func, "id", None) == "log")
+    assert hides_ui != hides_log
+    assert fingerprint(lambda call: getattr(call.func, "id", None) == "ui") == hides_ui
+
+
+def test_test_session_does_not_use_user_cache() -> None:
+    cache = PersistentCodeCache.get_instance()
+    assert not cache.enabled
+
+
+def test_corrupted_entries_are_discarded(code_cache) -> None:
+    code_cache.directory.mkdir(parents=True)
+    path = code_cache.directory / "broken.code"
+    path.write_bytes(b"not marshal data")
+
+    assert code_cache.load("broken") is None
+    assert not path.exists()
+
+
+def test_eviction_keeps_cache_under_size_limit(tmp_path) -> None:
+    cache = PersistentCodeCache(tmp_path, max_bytes=1, enabled=True)
+    codes = (compile("a = 1", "a.py", "exec"), compile("b = 2", "b.py", "exec"))
+
+    cache.store("first", codes)
+    cache.store("second", codes)
+
+    assert list(cache.directory.iterdir()) == []
+
+
+def test_disabled_cache_does_not_write(tmp_path) -> None:
+    cache = PersistentCodeCache(tmp_path, enabled=False)
+    cache.store("key", (compile("a = 1", "a.py", "exec"),) * 2)
+
+    assert cache.load("key") is None
+    assert not cache.directory.exists()
@@ -0,0 +1,145 @@
+"""Tests for the post-handler output cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from uzoncalc import context as context_module
+from uzoncalc.context import CalcContext
+from uzoncalc.handcalc.post_handlers.base_post_handler import BasePostHandler
+from uzoncalc.handcalc.post_handlers.output_cache import (
+    _DEFAULT_POST_PROCESS_CACHE_SIZE,
+    clear_post_process_cache,
+    post_process_cache_info,
+    set_post_process_cache_size,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_post_process_cache()
+    yield
+    set_post_process_cache_size(_DEFAULT_POST_PROCESS_CACHE_SIZE)
+    clear_post_process_cache()
+
+
+@pytest.fixture
+def parse_calls(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    parse = context_module.parse_html_fragment
+
+    def counting_parse(content: str):
+        calls.append(content)
+        return parse(content)
+
+    monkeypatch.setattr(context_module, "parse_html_fragment", counting_parse)
+    return calls
+
+
+class _TaggingHandler(BasePostHandler):
+    """Custom handler without a cache key."""
+
+    def handle(self, post_node, ctx=None) -> None:
+        if post_node.tag_name == "p":
+            post_node.node.set("class", "tagged")
+
+
+def test_repeated_fragment_is_parsed_once(parse_calls) -> None:
+    ctx = CalcContext()
+    for _ in range(3):
+        ctx.append_content("<p>alpha_1 <= beta</p>")
+
+    assert len(parse_calls) == 1
+    assert len(set(ctx.contents)) == 1
+    assert ctx.post_process_cache_misses == 1
+    assert ctx.post_process_cache_hits == 2
+
+
+def test_cache_is_shared_between_contexts(parse_calls) -> None:
+    first = CalcContext()
+    first.append_content("<p>beta_2</p>")
+    second = CalcContext()
+    second.append_content("<p>beta_2</p>")
+
+    assert len(parse_calls) == 1
+    assert second.contents == first.contents
+    assert second.post_process_cache_hits == 1
+    assert post_process_cache_info().currsize == 1
+
+
+def test_alias_changes_are_part_of_the_key() -> None:
+    ctx = CalcContext()
+    ctx.append_content("<p>stress</p>")
+    ctx.options.aliases["stress"] = "sigma"
+    ctx.append_content("<p>stress</p>")
+    ctx.options.aliases["stress"] = "tau"
+    ctx.append_content("<p>stress</p>")
+
+    assert ctx.contents == ["<p>stress</p>", "<p>σ</p>", "<p>τ</p>"]
+    assert ctx.post_process_cache_hits == 0
+
+
+def test_handler_without_cache_key_bypasses_cache(parse_calls) -> None:
+    ctx = CalcContext()
+    ctx.options.post_handlers = [*ctx.options.post_handlers, _TaggingHandler()]
+    ctx.append_content("<p>x</p>")
+    ctx.append_content("<p>x</p>")
+
+    assert len(parse_calls) == 2
+    assert ctx.contents == ['<p class="tagged">x</p>'] * 2
+    assert ctx.post_process_cache_hits == ctx.post_process_cache_misses == 0
+
+
+def test_cache_can_be_disabled(parse_calls) -> None:
+    ctx = CalcContext()
+    ctx.options.enable_post_process_cache = False
+    ctx.append_content("<p>x_1</p>")
+    ctx.append_content("<p>x_1</p>")
+
+    assert len(parse_calls) == 2
+    set_post_process_cache_size(0)
+    ctx.options.enable_post_process_cache = True
+    ctx.append_content("<p>x_1</p>")
+    assert len(parse_calls) == 3
+    assert post_process_cache_info().currsize == 0
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    set_post_process_cache_size(2)
+    ctx = CalcContext()
+    for content in ("<p>a_1</p>", "<p>a_2</p>", "<p>a_1</p>", "<p>a_3</p>"):
+        ctx.append_content(content)
+    ctx.append_content("<p>a_1</p>")
+
+    info = post_process_cache_info()
+    assert info.currsize == 2
+    assert info.evictions == 1
+    assert ctx.post_process_cache_hits == 2
+
+
+def test_document_pass_fills_and_uses_cache(parse_calls) -> None:
+    ctx = CalcContext()
+    ctx.options.post_process_mode = "document"
+    ctx.append_content("<p>alpha_1 <= beta</p>")
+    ctx.start_inline()
+    ctx.append_content("E_j")
+    ctx.end_inline()
+    first = list(ctx.contents)
+
+    fragment_ctx = CalcContext()
+    fragment_ctx.options.enable_post_process_cache = False
+    fragment_ctx.append_content("<p>alpha_1 <= beta</p>")
+    fragment_ctx.start_inline()
+    fragment_ctx.append_content("E_j")
+    fragment_ctx.end_inline()
+    assert first == fragment_ctx.contents
+
+    parse_calls.clear()
+    again = CalcContext()
+    again.options.post_process_mode = "document"
+    again.append_content("<p>alpha_1 <= beta</p>")
+    again.append_content("E_j")
+
+    assert again.contents == [first[0], "E<sub>j</sub>"]
+    assert parse_calls == []
+    assert again.post_process_cache_hits == 2
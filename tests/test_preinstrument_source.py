@@ -81,3 +81,51 @@ from utils.index import VALUE
     assert "from .utils import index as index_module" in result.source
     assert "from .utils.index import VALUE" in result.source
     assert "from . import utils" in result.source
+
+
+def test_preinstrument_builds_step_pool_once_per_function() -> None:
+    """Record calls should reference a module-level pool instead of rebuilding steps."""
+    source = """
+from uzoncalc import uzon_calc, uzon_calc_func
+
+@uzon_calc_func
+def helper(a):
+    b = a * 2
+    return b
+
+@uzon_calc()
+async def sheet():
+    total = 0
+    for i in range(3):
+        total = total + helper(i)
+"""
+    result = preinstrument_source(
+        source,
+        filename="src/main.py",
+        scope_key="scope_pool",
+        dependency_defaults={},
+    )
+
+    namespace: dict = {}
+    exec(compile(result.source, "src/main.py", "exec"), namespace)
+
+    helper_pool = namespace["__uzon_step_pool_0__"]
+    sheet_pool = namespace["__uzon_step_pool_1__"]
+    assert [type(step).__name__ for step in helper_pool] == ["EquationStep"]
+    assert len(sheet_pool) == 2
+    assert "__uzon_step_pool_1__[1]" in result.source
+    assert "__uzon_steps__.EquationStep" not in _function_source(
+        result.source, "sheet"
+    )
+
+
+def _function_source(source: str, function_name: str) -> str:
+    """Return the generated source for one top-level function definition."""
+    import ast
+
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.AsyncFunctionDef | ast.FunctionDef) and (
+            node.name == function_name
+        ):
+            return ast.unparse(node)
+    raise AssertionError(f"{function_name} not found")
@@ -12,16 +12,17 @@ import uzoncalc
 
 EXPECTED_PUBLIC_API = frozenset(
     """
-    AutoLabel Bold Br CalcContext Code Div DocumentExporter Field FieldType Figure
-    Green H H1 H2 H3 H4 H5 H6 HtmlDocumentExporter HtmlFragment ISavefig Img Info
-    Input Italic LaTex LabelKind Markdown P Plot Props Red Row Span Subtitle Table
+    AutoLabel Bold Br CalcContext Code ContentSink Div DocumentExporter Field FieldType
+    Figure Green H H1 H2 H3 H4 H5 H6 HtmlDocumentExporter HtmlFragment HtmlStreamSink
+    ISavefig Img Info
+    Input Italic LaTex LabelKind Markdown P Plot Props Red Row Span Subtitle SweepResult Table
     TableBodyRows TableCellValue TableHeaderRows Td Title TocPageNumberResolver Tr
-    UI UIPayloads Window Yellow alias bold br code decimal disable_formula_expression
+    UI UIPayloads Window Yellow alias array_display bold br code decimal disable_formula_expression
     disable_fstring_equation disable_substitution div doc_title
     enable_formula_expression enable_fstring_equation enable_substitution end_inline
     figure_prefix font_family get_current_instance green h h1 h2 h3 h4 h5 h6 head
-    hide img info inline input italic laTex markdown p page_size plot props red row run
-    run_sync show span style subtitle table table_prefix td th title toc tr unit
+    hide img info inline input italic laTex loop_record markdown p page_size plot props red row run
+    run_sync run_values show span style subtitle sweep table table_prefix td th title toc tr unit
     uzon_calc uzon_calc_core uzon_calc_func view yellow
     """.split()
 )
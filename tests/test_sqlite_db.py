@@ -0,0 +1,114 @@
+"""Tests for the SQLite-backed context key-value store."""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from uzoncalc.cache.json_db import JsonDB
+from uzoncalc.cache.sqlite_db import SqliteDB
+from uzoncalc.context import CalcContext
+
+
+@pytest.fixture
+def db(tmp_path):
+    store = SqliteDB(str(tmp_path / "data" / "db.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_values_round_trip_and_persist(tmp_path, db) -> None:
+    key = ("book.xlsx", "Sheet1!A1:C3", {"A1": 1})
+    db.set(key, "<table></table>")
+    db.set("count", {"n": [1, 2]})
+    db.close()
+
+    reopened = SqliteDB(db.db_path)
+    assert reopened.get(key) == "<table></table>"
+    assert reopened.get("count") == {"n": [1, 2]}
+    assert reopened.get("missing", "fallback") == "fallback"
+    reopened.close()
+
+
+def test_expired_entries_are_not_returned(tmp_path, monkeypatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr("uzoncalc.cache.sqlite_db.time.time", lambda: clock[0])
+    db = SqliteDB(str(tmp_path / "db.sqlite3"), ttl=60)
+    db.set("a", 1)
+
+    clock[0] += 30
+    assert db.get("a") == 1
+    clock[0] += 31
+    assert db.get("a") is None
+    assert len(db) == 0
+    db.close()
+
+
+def test_oldest_entries_are_evicted_beyond_the_size_limit(tmp_path, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("uzoncalc.cache.sqlite_db.time.time", lambda: clock[0])
+    db = SqliteDB(str(tmp_path / "db.sqlite3"), max_entries=3)
+    for index in range(5):
+        clock[0] += 1
+        db.set(index, index)
+
+    db.save()
+
+    assert len(db) == 3
+    assert [db.get(index) for index in range(5)] == [None, None, 2, 3, 4]
+    db.close()
+
+
+def test_json_file_is_migrated_once(tmp_path) -> None:
+    json_path = tmp_path / "db.json"
+    legacy = JsonDB(str(json_path))
+    legacy.set(("book.xlsx", "A1:B2", None), "<table>old</table>")
+    legacy.set("plain", 3)
+    legacy.save()
+
+    db = SqliteDB(str(tmp_path / "db.sqlite3"), json_path=str(json_path))
+    assert db.get(("book.xlsx", "A1:B2", None)) == "<table>old</table>"
+    db.set("plain", 4)
+    db.close()
+
+    # 已迁移过的 JSON 文件不会覆盖新写入的值
+    json_path.write_text(json.dumps({"plain": 5}), encoding="utf-8")
+    db = SqliteDB(str(tmp_path / "db.sqlite3"), json_path=str(json_path))
+    assert db.get("plain") == 4
+    db.close()
+
+
+def test_concurrent_writers_share_one_database(tmp_path) -> None:
+    path = str(tmp_path / "db.sqlite3")
+    stores = [SqliteDB(path) for _ in range(4)]
+
+    def write(store: SqliteDB, offset: int) -> None:
+        for index in range(50):
+            store.set(f"{offset}-{index}", index)
+
+    threads = [
+        threading.Thread(target=write, args=(store, offset))
+        for offset, store in enumerate(stores)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stores[0]) == 200
+    for store in stores:
+        store.close()
+
+
+def test_context_opens_and_closes_the_store(tmp_path) -> None:
+    ctx = CalcContext(file_path=str(tmp_path / "calc.py"))
+    ctx.get_json_db().set("key", "value")
+    ctx.exit()
+
+    assert ctx.json_db is None
+    assert (tmp_path / "data" / "db.sqlite3").exists()
+    reopened = CalcContext(file_path=str(tmp_path / "calc.py"))
+    assert reopened.get_json_db().get("key") == "value"
+    reopened.exit()
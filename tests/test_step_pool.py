@@ -0,0 +1,59 @@
+"""Tests for the prebuilt step constant pool used by runtime instrumentation."""
+
+from uzoncalc import run_sync, uzon_calc
+from uzoncalc.handcalc import steps
+from uzoncalc.handcalc.ast_instrument import instrument_function
+from uzoncalc.handcalc.field_names import FieldNames
+
+
+async def _loop_sheet():
+    total = 0
+    for index in range(4):
+        total = total + index
+    "done"
+
+
+def test_instrumented_function_references_prebuilt_steps() -> None:
+    """Generated code should look steps up by index instead of constructing them."""
+    instrumented = instrument_function(_loop_sheet)
+
+    step_pool = instrumented.__globals__[FieldNames.uzon_step_pool]
+    assert [type(step) for step in step_pool] == [
+        steps.EquationStep,
+        steps.EquationStep,
+        steps.TextStep,
+    ]
+    assert "EquationStep" not in instrumented.__code__.co_names
+    assert FieldNames.uzon_step_pool in instrumented.__code__.co_names
+
+
+def test_step_pool_is_isolated_per_function() -> None:
+    """Each instrumented function should own its own step pool."""
+
+    async def other_sheet():
+        value = 1
+
+    first = instrument_function(_loop_sheet)
+    second = instrument_function(other_sheet)
+
+    assert (
+        first.__globals__[FieldNames.uzon_step_pool]
+        is not second.__globals__[FieldNames.uzon_step_pool]
+    )
+    assert len(second.__globals__[FieldNames.uzon_step_pool]) == 1
+
+
+@uzon_calc()
+async def _pooled_loop_sheet():
+    total = 0
+    for index in range(3):
+        total = total + index
+
+
+def test_pooled_steps_render_every_iteration() -> None:
+    """Reusing one step object per statement should still record every execution."""
+    ctx = run_sync(_pooled_loop_sheet)
+
+    total_lines = [line for line in ctx.contents if ">total<" in line]
+    assert len(total_lines) == 4
+    assert "<mn>3</mn>" in total_lines[-1]
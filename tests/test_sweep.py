@@ -0,0 +1,65 @@
+"""Tests for parametric sweeps over default sets."""
+
+from __future__ import annotations
+
+import threading
+import warnings
+
+import pytest
+
+from uzoncalc import run_values, sweep, unit
+from tests.fixtures.sweep_sheets import beam_moment_sheet
+
+_DEFAULTS = [{"Beam": {"span": span, "load": 2.0}} for span in range(1, 9)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sweep_values_match_single_runs(workers) -> None:
+    result = sweep(beam_moment_sheet, _DEFAULTS, workers=workers, summary=["M"])
+
+    expected = [run_values(beam_moment_sheet, defaults=d) for d in _DEFAULTS]
+    assert [case["values"]["M"] for case in result.cases] == [
+        case["values"]["M"] for case in expected
+    ]
+    assert [case["inputs"] for case in result.cases] == [
+        case["inputs"] for case in expected
+    ]
+    assert result.summary == [{"M": case["values"]["M"]} for case in expected]
+
+
+def test_quantities_from_workers_share_the_unit_registry() -> None:
+    result = sweep(beam_moment_sheet, _DEFAULTS[:2], workers=2)
+
+    total = sum((case["values"]["M"] for case in result.cases), 0 * unit.kN * unit.m)
+    assert total.to("kN*m").magnitude == pytest.approx(0.25 + 1.0)
+
+
+def test_sweep_html_mode_returns_documents() -> None:
+    result = sweep(beam_moment_sheet, _DEFAULTS[:2], workers=2, mode="html")
+
+    assert len(result.cases) == 2
+    assert all(case.startswith("<!DOCTYPE html>") for case in result.cases)
+    assert result.summary is None
+
+
+def test_sweep_from_multi_threaded_process_does_not_fork() -> None:
+    # 已有其它线程时 fork 会发出弃用警告（可能死锁），工作进程应以 spawn 启动
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            result = sweep(beam_moment_sheet, _DEFAULTS[:2], workers=2)
+    finally:
+        stop.set()
+        thread.join()
+    assert len(result.cases) == 2
+    assert not [w for w in caught if "fork" in str(w.message)]
+
+
+def test_sweep_rejects_invalid_arguments() -> None:
+    with pytest.raises(ValueError):
+        sweep(beam_moment_sheet, _DEFAULTS, mode="pdf")  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        sweep(beam_moment_sheet, _DEFAULTS, mode="html", summary=["M"])
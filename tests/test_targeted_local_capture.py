@@ -0,0 +1,58 @@
+"""Tests for build-time computed local-variable capture of recorded steps."""
+
+from types import SimpleNamespace
+
+from uzoncalc import run_sync, uzon_calc
+from uzoncalc.handcalc import recorder
+from uzoncalc.handcalc.ast_instrument import instrument_function
+from uzoncalc.handcalc.field_names import FieldNames
+
+
+async def _capture_sheet():
+    unrelated = 123
+    section = SimpleNamespace(area=4)
+    width = 2
+    area = section.area * width
+    f"{width}"
+
+
+def test_record_calls_do_not_snapshot_locals() -> None:
+    """Instrumented code should pass constant name tuples instead of locals()."""
+    instrumented = instrument_function(_capture_sheet)
+
+    assert "locals" not in instrumented.__code__.co_names
+    step_pool = instrumented.__globals__[FieldNames.uzon_step_pool]
+    assert len(step_pool) == 5
+
+
+def test_capture_locals_reads_only_requested_bound_names() -> None:
+    """Unbound and unrequested names should not appear in the captured mapping."""
+    import sys
+
+    def probe():
+        first = 1
+        second = 2
+        captured = recorder.capture_locals(
+            sys._getframe(), ("first", "later", "len")
+        )
+        later = 3
+        return captured, second, later
+
+    captured, _, _ = probe()
+    assert captured == {"first": 1}
+
+
+@uzon_calc()
+async def _attribute_sheet():
+    section = SimpleNamespace(area=4)
+    width = 2
+    area = section.area * width
+
+
+def test_attribute_paths_are_substituted_from_captured_root() -> None:
+    """Attribute paths should still resolve through their captured root object."""
+    ctx = run_sync(_attribute_sheet)
+
+    area_line = next(line for line in ctx.contents if 'italic">area</mi>' in line)
+    assert "<mn>4</mn>" in area_line
+    assert "<mn>8</mn>" in area_line
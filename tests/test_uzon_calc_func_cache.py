@@ -0,0 +1,152 @@
+"""Tests for memoized uzon_calc_func helpers."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from uzoncalc import alias, run_sync, run_values, unit, uzon_calc, uzon_calc_func
+from uzoncalc.cache.call_cache import call_cache_info, clear_call_cache
+from uzoncalc.cache.fingerprint import fingerprint
+
+_CALLS: list[str] = []
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_call_cache()
+    _CALLS.clear()
+    yield
+    clear_call_cache()
+
+
+@uzon_calc_func(cache=True)
+def section_area(width, height=0.5):
+    _CALLS.append("section_area")
+    area = width * height
+    return area
+
+
+@uzon_calc_func
+def plain_area(width, height=0.5):
+    area = width * height
+    return area
+
+
+@uzon_calc_func(cache=True)
+def total_length(lengths):
+    _CALLS.append("total_length")
+    total = sum(lengths)
+    return total
+
+
+@uzon_calc()
+async def cached_sheet():
+    A_1 = section_area(0.3)
+    A_2 = section_area(0.3, height=0.5)
+    A_3 = section_area(width=0.3)
+
+
+@uzon_calc()
+async def plain_sheet():
+    A_1 = plain_area(0.3)
+    A_2 = plain_area(0.3, height=0.5)
+    A_3 = plain_area(width=0.3)
+
+
+def _plain_contents() -> list[str]:
+    return [
+        content.replace("plain_area", "section_area")
+        for content in run_sync(plain_sheet).contents
+    ]
+
+
+def test_hits_replay_the_recorded_content() -> None:
+    cached = run_sync(cached_sheet).contents
+
+    assert _CALLS == ["section_area"]
+    assert cached == _plain_contents()
+    assert call_cache_info().hits == 2
+
+
+def test_headless_calls_do_not_serve_recording_calls() -> None:
+    assert run_values(cached_sheet)["values"]["A_3"] == pytest.approx(0.15)
+    assert _CALLS == ["section_area"]
+
+    contents = run_sync(cached_sheet).contents
+
+    assert _CALLS == ["section_area"] * 2
+    assert contents == _plain_contents()
+
+
+@uzon_calc()
+async def alias_sheet():
+    alias("area", "A_s")
+    A_1 = section_area(0.3)
+    alias("area", "A_t")
+    A_2 = section_area(0.3)
+
+
+def test_alias_changes_are_part_of_the_key() -> None:
+    contents = run_sync(alias_sheet).contents
+
+    assert _CALLS == ["section_area"] * 2
+    assert contents[0] != contents[2]
+
+
+@uzon_calc()
+async def quantity_sheet():
+    L_1 = total_length([1 * unit.m, 2 * unit.m])
+    L_2 = total_length([1 * unit.m, 2 * unit.mm])
+    L_3 = total_length(np.array([1.0, 2.0]))
+    L_4 = total_length(np.array([1.0, 2.0]))
+    L_5 = total_length([1 * unit.m, 2 * unit.m])
+
+
+def test_quantities_and_arrays_are_fingerprinted_by_value() -> None:
+    values = run_values(quantity_sheet)["values"]
+
+    assert _CALLS == ["total_length"] * 3
+    assert values["L_2"] == 1.002 * unit.m
+    assert values["L_5"] == 3 * unit.m
+
+
+# 插桩后的入口不支持闭包，测试中按目录创建的 helper 通过模块级列表引用
+_DISK_HELPERS: list = []
+
+
+@uzon_calc()
+async def disk_sheet():
+    A = _DISK_HELPERS[0](0.3)
+
+
+def test_disk_cache_is_reused_across_runs(tmp_path) -> None:
+    def disk_area(width):
+        _CALLS.append("disk_area")
+        area = width * 2
+        return area
+
+    _DISK_HELPERS[:] = [uzon_calc_func(cache=True, cache_dir=tmp_path)(disk_area)]
+    first = run_sync(disk_sheet).contents
+    clear_call_cache()
+    second = run_sync(disk_sheet).contents
+
+    assert _CALLS == ["disk_area"]
+    assert second == first
+    assert list(tmp_path.glob("*.call"))
+
+
+def test_cache_dir_requires_cache(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        uzon_calc_func(cache_dir=tmp_path)
+
+
+def test_fingerprint_is_stable_for_equal_values() -> None:
+    assert fingerprint({"a": 1, "b": [2.5, "x"]}) == fingerprint(
+        {"b": [2.5, "x"], "a": 1}
+    )
+    assert fingerprint(1) != fingerprint(1.0)
+    assert fingerprint(np.float64(1.5)) != fingerprint(1.5)
+    assert fingerprint(2 * unit.m) != fingerprint(2 * unit.mm)
+    assert fingerprint(object()) is None
+    assert fingerprint(np.array([object()])) is None